@@ -1,8 +1,18 @@
 import os
 import numpy as np
 from scipy.integrate import odeint
+from scipy.special import expit
 
 class TomatoYieldModel:
+    # Parameters read by calculate_derivatives_batch (compared when members share one kernel)
+    BATCH_PARAMETERS = ('n_dev', 'SLA', 'LAI_MAX', 'J_25Leaf_MAX', 'G_MAX', 'C_Buf_MAX', 'C_Buf_MIN',
+                        'E_j', 'H', 'S', 'Rg', 'T_25K', 'M_CH2O', 'M_CO2', 'Q_10_m',
+                        'T_can_MIN', 'T_can_MAX', 'T_can24_MIN', 'T_can24_MAX', 'T_endSumC',
+                        'alpha', 'theta', 'c_Gamma', 'eta_CO2airStom', 'eta_C_DM', 'k', 'tau',
+                        'c_BufFruit_1_MAX', 'c_BufFruit_2_MAX', 'r_BufFruit_MAXFrtSet',
+                        'c_dev_1', 'c_dev_2', 'c_RGR', 'rg_Fruit', 'rg_Leaf', 'rg_Stem',
+                        'c_Fruit_g', 'c_Leaf_g', 'c_Stem_g', 'c_Fruit_m', 'c_Leaf_m', 'c_Stem_m')
+
     def __init__(
         self,
         n_dev=50,
@@ -113,8 +123,8 @@ class TomatoYieldModel:
 
     @staticmethod
     def _safe_sigmoid(x, scale=1.0):
-        """Safe sigmoid function"""
-        return 1.0 / (1.0 + np.exp(-np.clip(x * scale, -700, 700)))
+        """Safe sigmoid function (expit: no overflow for large |x|)"""
+        return expit(x * scale)
 
     def set_environmental_conditions(self, R_PAR_can=None, CO2_air=None, T_canK=None):
         """Update environmental conditions"""
@@ -154,231 +164,175 @@ class TomatoYieldModel:
         return np.maximum(GR, 0.01)
 
     def calculate_derivatives(self, y, t):
-        """Calculate derivatives for all state variables"""
+        """Calculate derivatives for all state variables (one column of calculate_derivatives_batch)"""
         try:
-            # Unpack state vector
-            C_Buf = max(0, y[0])
-            C_Leaf = max(0, y[1]) 
-            C_Stem = max(0, y[2])
-            C_Fruit = np.maximum(0, y[3:3+self.n_dev])
-            N_Fruit = np.maximum(0, y[3+self.n_dev:3+2*self.n_dev])
-            T_can24C = y[3+2*self.n_dev]
-            T_canSumC = max(0, y[3+2*self.n_dev+1])
-            W_Fruit_1_Pot = max(0, y[3+2*self.n_dev+2])
-            DM_Har = max(0, y[3+2*self.n_dev+3])
-
-            # Temperature
-            T_canC = self.T_canK - 273.15
-
-            # Update LAI
-            LAI = max(0.01, self.SLA * C_Leaf)
-            # LAI = self.SLA * self.C_Leaf
-
-            # Plant density
-            n_plants = self.calculate_plant_density(t)
-
-            # === PHOTOSYNTHESIS ===
-            CO2_stom = self.eta_CO2airStom * self.CO2_air
-            J_25Can_MAX = LAI * self.J_25Leaf_MAX
-            
-            # CO2 compensation point
-            if J_25Can_MAX > 1e-6:
-                Gamma = (self.J_25Leaf_MAX / J_25Can_MAX) * self.c_Gamma * T_canC + \
-                       20 * self.c_Gamma * (1 - self.J_25Leaf_MAX / J_25Can_MAX)
-            else:
-                Gamma = 20 * self.c_Gamma
-
-            # Electron transport
-            exp_arg1 = np.clip(self.E_j * (self.T_canK - self.T_25K) / (self.Rg * self.T_canK * self.T_25K), -50, 50)
-            exp_arg2 = np.clip((self.S * self.T_25K - self.H) / (self.Rg * self.T_25K), -50, 50)
-            exp_arg3 = np.clip((self.S * self.T_canK - self.H) / (self.Rg * self.T_canK), -50, 50)
-            
-            J_POT = J_25Can_MAX * np.exp(exp_arg1) * (1 + np.exp(exp_arg2)) / (1 + np.exp(exp_arg3))
-            
-            # Electron transport rate J
-            if self.R_PAR_can > 0 and J_POT > 0:
-                discriminant = (J_POT + self.alpha * self.R_PAR_can)**2 - 4 * self.theta * J_POT * self.alpha * self.R_PAR_can
-                discriminant = max(0, discriminant)
-                J = (J_POT + self.alpha * self.R_PAR_can - np.sqrt(discriminant)) / (2 * self.theta)
-            else:
-                J = 0
-
-            # Photosynthesis and photorespiration
-            if CO2_stom + 2 * Gamma > 0 and J > 0:
-                P = J / 4 * (CO2_stom - Gamma) / (CO2_stom + 2 * Gamma)
-                R = P * Gamma / CO2_stom if CO2_stom > 0 else 0
-            else:
-                P = R = 0
-
-            # Net photosynthesis
-            h_CBuf_MCairBuf = self._safe_sigmoid(C_Buf - self.C_Buf_MAX, -5e-3)
-            MC_AirBuf = self.M_CH2O * h_CBuf_MCairBuf * max(0, P - R)
-
-            # === GROWTH FLOWS (핵심 수정) ===
-            
-            # 원본 Modelica 코드의 정확한 억제 함수들
-            # h_CBuf_MCBufOrg = 1/(1+exp(-5e-2*(C_Buf-C_Buf_MIN)))
-            h_CBuf_MCBufOrg = self._safe_sigmoid(C_Buf - self.C_Buf_MIN, 5e-2)  # 부호 변경!
-            
-            # h_Tcan = 1/(1+exp(-0.869*(T_canC-T_can_MIN))) * 1/(1+exp(0.5793*(T_canC-T_can_MAX)))
-            h_Tcan = self._safe_sigmoid(T_canC - self.T_can_MIN, 0.869) * \
-                     self._safe_sigmoid(self.T_can_MAX - T_canC, 0.5793)
-            
-            # h_Tcan24 = 1/(1+exp(-1.1587*(T_can24C-T_can24_MIN))) * 1/(1+exp(1.3904*(T_can24C-T_can24_MAX)))
-            h_Tcan24 = self._safe_sigmoid(T_can24C - self.T_can24_MIN, 1.1587) * \
-                       self._safe_sigmoid(self.T_can24_MAX - T_can24C, 1.3904)
-            
-            # Generative phase - 원본 Modelica 구현
-            if self.T_endSumC > 0:
-                ratio = T_canSumC / self.T_endSumC
-                term1 = ratio + np.sqrt(ratio**2 + 1e-4)
-                term2 = (ratio - 1) + np.sqrt((ratio - 1)**2 + 1e-4)
-                h_TcanSum = 0.5 * term1 - 0.5 * term2
-                h_TcanSum = max(0, min(1, h_TcanSum))  # 0-1 범위로 제한
-            else:
-                h_TcanSum = 0
-
-            # g_Tcan24 = 0.047*T_can24C + 0.06
-            g_Tcan24 = 0.047 * T_can24C + 0.06
-
-            # Growth flows
-            MC_BufFruit = h_CBuf_MCBufOrg * h_Tcan * h_Tcan24 * h_TcanSum * g_Tcan24 * self.rg_Fruit
-            MC_BufLeaf = h_CBuf_MCBufOrg * h_Tcan24 * g_Tcan24 * self.rg_Leaf
-            MC_BufStem = h_CBuf_MCBufOrg * h_Tcan24 * g_Tcan24 * self.rg_Stem
-
-            # === FRUIT DEVELOPMENT ===
-            r_dev = max(1e-12, self.c_dev_1 + self.c_dev_2 * T_can24C)
-            
-            # Fruit set
-            MN_BufFruit_1_MAX = max(0, n_plants * (self.c_BufFruit_1_MAX + self.c_BufFruit_2_MAX * T_can24C))
-            MN_BufFruit_1 = self._safe_sigmoid(MC_BufFruit - self.r_BufFruit_MAXFrtSet, 58.9) * MN_BufFruit_1_MAX
-            
-            # Growth rates
-            GR = self.calculate_fruit_growth_rates(r_dev)
-            
-            # First stage carbohydrate flow
-            MC_BufFruit_1 = W_Fruit_1_Pot * MN_BufFruit_1
-
-            # Development flows
-            h_T_canSum_MN_Fruit = self._safe_sigmoid(T_canSumC, 5e-2)  # 부호 변경!
-
-            # === RESPIRATION ===
-            MC_FruitAir_g = self.c_Fruit_g * MC_BufFruit
-            MC_LeafAir_g = self.c_Leaf_g * MC_BufLeaf  
-            MC_StemAir_g = self.c_Stem_g * MC_BufStem
-            MC_BufAir = MC_FruitAir_g + MC_LeafAir_g + MC_StemAir_g
-
-            # Maintenance respiration
-            Q10_factor = self.Q_10_m ** (0.1 * (T_can24C - 25))
-            
-            # Individual fruit maintenance respiration
-            MC_FruitAir_j = np.zeros(self.n_dev)
-            for j in range(self.n_dev):
-                if GR[j] > 0 and self.G_MAX > 0:
-                    RGR_Fruit_j = GR[j] / self.G_MAX / 86400
-                    MC_FruitAir_j[j] = self.c_Fruit_m * Q10_factor * C_Fruit[j] * \
-                                      (1 - np.exp(-self.c_RGR * RGR_Fruit_j))
-
-            MC_FruitAir = np.sum(MC_FruitAir_j)
-            
-            # Leaf and stem maintenance
-            RGR_Leaf = self.rg_Leaf / max(1e-6, C_Leaf)
-            RGR_Stem = self.rg_Stem / max(1e-6, C_Stem)
-            
-            MC_LeafAir = self.c_Leaf_m * Q10_factor * C_Leaf * (1 - np.exp(-self.c_RGR * RGR_Leaf))
-            MC_StemAir = self.c_Stem_m * Q10_factor * C_Stem * (1 - np.exp(-self.c_RGR * RGR_Stem))
-
-            # === HARVEST CALCULATION ===
-            MC_FruitHar = max(0, r_dev * self.n_dev * C_Fruit[-1])
-
-            # === LEAF PRUNING ===
-            C_Leaf_MAX = self.LAI_MAX / self.SLA
-            LAI_min_threshold = 2.0
-            C_Leaf_min = LAI_min_threshold / self.SLA
-
-            # 내 버전 (if문 사용)
-            if C_Leaf > C_Leaf_MAX:
-                MC_LeafHar_raw = self._safe_sigmoid(C_Leaf - C_Leaf_MAX, 1e-5) * (C_Leaf - C_Leaf_MAX) * 0.1
-                # pruning 양이 C_Leaf - C_Leaf_min을 초과하지 않도록 제한 (odeint에 맞게 dt 사용 X)
-                MC_LeafHar = min(MC_LeafHar_raw, C_Leaf - C_Leaf_min)
-                MC_LeafHar = max(0, MC_LeafHar)
-            else:
-                MC_LeafHar = 0
-
-            # Modelica 원본 버전 (항상 계산)
-            # MC_LeafHar = max(0, self._safe_sigmoid(C_Leaf - C_Leaf_MAX, 5e-5) * (C_Leaf - C_Leaf_MAX))
-
-            # === DERIVATIVES ===
-            
-            # Buffer
-            dC_Buf = MC_AirBuf - MC_BufFruit - MC_BufLeaf - MC_BufStem - MC_BufAir
-
-            # Organs
-            dC_Leaf = MC_BufLeaf - MC_LeafAir - MC_LeafHar
-            dC_Stem = MC_BufStem - MC_StemAir
-
-            # Fruit derivatives
-            dC_Fruit = np.zeros(self.n_dev)
-            
-            # First stage
-            dC_Fruit[0] = MC_BufFruit_1 - MC_FruitAir_j[0]
-            if self.n_dev > 1:
-                dC_Fruit[0] -= r_dev * self.n_dev * C_Fruit[0]
-
-            # Middle stages
-            for j in range(1, self.n_dev-1):
-                inflow = r_dev * self.n_dev * C_Fruit[j-1]
-                outflow = r_dev * self.n_dev * C_Fruit[j] + MC_FruitAir_j[j]
-                dC_Fruit[j] = inflow - outflow
-
-            # Last stage (includes harvest)
-            if self.n_dev > 1:
-                inflow = r_dev * self.n_dev * C_Fruit[-2]
-                outflow = MC_FruitHar + MC_FruitAir_j[-1]
-                dC_Fruit[-1] = inflow - outflow
-
-            # Fruit numbers
-            dN_Fruit = np.zeros(self.n_dev)
-            dN_Fruit[0] = MN_BufFruit_1 - r_dev * self.n_dev * h_T_canSum_MN_Fruit * N_Fruit[0]
-            
-            for j in range(1, self.n_dev-1):
-                inflow = r_dev * self.n_dev * h_T_canSum_MN_Fruit * N_Fruit[j-1]
-                outflow = r_dev * self.n_dev * h_T_canSum_MN_Fruit * N_Fruit[j]
-                dN_Fruit[j] = inflow - outflow
-
-            if self.n_dev > 1:
-                dN_Fruit[-1] = r_dev * self.n_dev * h_T_canSum_MN_Fruit * N_Fruit[-2]
-
-            # Other derivatives
-            dT_can24C = (self.k * T_canC - T_can24C) / self.tau
-            dT_canSumC = T_canC / 86400
-            dW_Fruit_1_Pot = GR[0] / 86400 if len(GR) > 0 else 0
-            dDM_Har = max(0, self.eta_C_DM * MC_FruitHar)
-
-            # === AIR EXCHANGE ===
-            MC_AirCan = MC_AirBuf - MC_BufAir - MC_FruitAir - MC_LeafAir - MC_StemAir
-            self.MC_AirCan_mgCO2m2s = MC_AirCan / self.M_CH2O * self.M_CO2
+            flows = {}
+            dy, MC_AirCan = self.calculate_derivatives_batch(
+                np.asarray(y, dtype=float)[:, None], self.R_PAR_can, self.CO2_air, self.T_canK,
+                t, flows=flows)
+            self.MC_AirCan_mgCO2m2s = float(MC_AirCan[0])
 
             # 디버깅용 기록
-            self.debug_history['C_Buf'].append(C_Buf)
-            self.debug_history['MC_AirBuf'].append(MC_AirBuf)
-            self.debug_history['MC_BufLeaf'].append(MC_BufLeaf)
-            self.debug_history['MC_BufStem'].append(MC_BufStem)
-            self.debug_history['MC_BufFruit'].append(MC_BufFruit)
-            self.debug_history['MC_BufAir'].append(MC_BufAir)
+            for name, value in flows.items():
+                self.debug_history[name].append(float(value[0]))
             self.debug_history['t'].append(t)
 
-            return np.concatenate([
-                [dC_Buf, dC_Leaf, dC_Stem],
-                dC_Fruit,
-                dN_Fruit, 
-                [dT_can24C, dT_canSumC, dW_Fruit_1_Pot, dDM_Har]
-            ])
+            return dy[:, 0]
 
         except Exception as e:
             print(f"Error in derivatives calculation: {e}")
             return np.zeros_like(y)
 
+    def calculate_derivatives_batch(self, y, R_PAR_can, CO2_air, T_canK, t=0, flows=None):
+        """
+        calculate_derivatives의 배열 버전 (모델 속성과 debug_history를 바꾸지 않음)
+
+        Parameters:
+            y: 상태 배열 (n_states, ...) - 뒤쪽 축은 독립된 상태 열 (예: 앙상블 멤버)
+            R_PAR_can, CO2_air, T_canK: 환경 입력 (스칼라 또는 y[0]과 브로드캐스트되는 배열,
+                set_environmental_conditions와 같은 하한 적용)
+            t: 재배 시각 [s] (재식 밀도)
+            flows: dict를 주면 버퍼 유량(C_Buf, MC_AirBuf, MC_Buf*)을 채움 (debug_history 기록용)
+
+        Returns:
+            (dy, MC_AirCan_mgCO2m2s): y와 같은 모양의 미분과 작물 CO2 흡수량 [mg/(m2.s)]
+        """
+        y = np.asarray(y, dtype=float)
+        n = self.n_dev
+        R_PAR_can = np.maximum(0, R_PAR_can)
+        CO2_air = np.maximum(430, CO2_air)
+        T_canK = np.maximum(273.15, T_canK)
+
+        C_Buf = np.maximum(0, y[0])
+        C_Leaf = np.maximum(0, y[1])
+        C_Stem = np.maximum(0, y[2])
+        C_Fruit = np.maximum(0, y[3:3+n])
+        N_Fruit = np.maximum(0, y[3+n:3+2*n])
+        T_can24C = y[3+2*n]
+        T_canSumC = np.maximum(0, y[3+2*n+1])
+        W_Fruit_1_Pot = np.maximum(0, y[3+2*n+2])
+
+        T_canC = T_canK - 273.15
+        LAI = np.maximum(0.01, self.SLA * C_Leaf)
+        n_plants = self.calculate_plant_density(t)
+
+        # === PHOTOSYNTHESIS ===
+        CO2_stom = self.eta_CO2airStom * CO2_air
+        J_25Can_MAX = LAI * self.J_25Leaf_MAX
+        ratio_J = self.J_25Leaf_MAX / np.maximum(J_25Can_MAX, 1e-6)
+        Gamma = np.where(J_25Can_MAX > 1e-6,
+                         ratio_J * self.c_Gamma * T_canC + 20 * self.c_Gamma * (1 - ratio_J),
+                         20 * self.c_Gamma)
+
+        # np.clip 대신 ufunc 쌍 (작은 배열에서 호출 비용이 훨씬 작음)
+        exp_arg1 = np.minimum(np.maximum(self.E_j * (T_canK - self.T_25K)
+                                         / (self.Rg * T_canK * self.T_25K), -50), 50)
+        exp_arg2 = min(max((self.S * self.T_25K - self.H) / (self.Rg * self.T_25K), -50), 50)
+        exp_arg3 = np.minimum(np.maximum((self.S * T_canK - self.H) / (self.Rg * T_canK), -50), 50)
+        J_POT = J_25Can_MAX * np.exp(exp_arg1) * (1 + np.exp(exp_arg2)) / (1 + np.exp(exp_arg3))
+
+        aR = self.alpha * R_PAR_can
+        discriminant = np.maximum(0, (J_POT + aR)**2 - 4 * self.theta * J_POT * aR)
+        J = np.where((R_PAR_can > 0) & (J_POT > 0),
+                     (J_POT + aR - np.sqrt(discriminant)) / (2 * self.theta), 0.0)
+
+        active = (CO2_stom + 2 * Gamma > 0) & (J > 0)
+        P = np.where(active, J / 4 * (CO2_stom - Gamma) / np.where(active, CO2_stom + 2 * Gamma, 1.0), 0.0)
+        R = np.where(active & (CO2_stom > 0), P * Gamma / np.where(CO2_stom > 0, CO2_stom, 1.0), 0.0)
+
+        h_CBuf_MCairBuf = self._safe_sigmoid(C_Buf - self.C_Buf_MAX, -5e-3)
+        MC_AirBuf = self.M_CH2O * h_CBuf_MCairBuf * np.maximum(0, P - R)
+
+        # === GROWTH FLOWS ===
+        h_CBuf_MCBufOrg = self._safe_sigmoid(C_Buf - self.C_Buf_MIN, 5e-2)
+        h_Tcan = self._safe_sigmoid(T_canC - self.T_can_MIN, 0.869) * \
+                 self._safe_sigmoid(self.T_can_MAX - T_canC, 0.5793)
+        h_Tcan24 = self._safe_sigmoid(T_can24C - self.T_can24_MIN, 1.1587) * \
+                   self._safe_sigmoid(self.T_can24_MAX - T_can24C, 1.3904)
+        if self.T_endSumC > 0:
+            ratio = T_canSumC / self.T_endSumC
+            h_TcanSum = np.minimum(np.maximum(0.5 * (ratio + np.sqrt(ratio**2 + 1e-4))
+                                              - 0.5 * ((ratio - 1) + np.sqrt((ratio - 1)**2 + 1e-4)),
+                                              0), 1)
+        else:
+            h_TcanSum = 0
+        g_Tcan24 = 0.047 * T_can24C + 0.06
+
+        MC_BufFruit = h_CBuf_MCBufOrg * h_Tcan * h_Tcan24 * h_TcanSum * g_Tcan24 * self.rg_Fruit
+        MC_BufLeaf = h_CBuf_MCBufOrg * h_Tcan24 * g_Tcan24 * self.rg_Leaf
+        MC_BufStem = h_CBuf_MCBufOrg * h_Tcan24 * g_Tcan24 * self.rg_Stem
+
+        # === FRUIT DEVELOPMENT ===
+        r_dev = np.maximum(1e-12, self.c_dev_1 + self.c_dev_2 * T_can24C)
+        MN_BufFruit_1_MAX = np.maximum(0, n_plants * (self.c_BufFruit_1_MAX + self.c_BufFruit_2_MAX * T_can24C))
+        MN_BufFruit_1 = self._safe_sigmoid(MC_BufFruit - self.r_BufFruit_MAXFrtSet, 58.9) * MN_BufFruit_1_MAX
+
+        # 단계별 성장률 (calculate_fruit_growth_rates, j축이 첫 번째 축)
+        FGP = np.maximum(1.0, 1.0 / (r_dev * 86400))
+        M = np.maximum(1.0, -4.93 + 0.548 * FGP)
+        B = np.maximum(0.01, 1.0 / (2.44 + 0.403 * M))
+        stages = (np.arange(n) + 0.5) / n
+        exp_arg = np.minimum(np.maximum(-B * (np.multiply.outer(stages, FGP) - M), -700), 700)
+        GR = self.G_MAX * np.exp(np.minimum(np.maximum(-np.exp(exp_arg), -700), 700)) * B * np.exp(exp_arg)
+        GR = np.where(r_dev <= 1e-12, 0.1, np.maximum(GR, 0.01))
+
+        MC_BufFruit_1 = W_Fruit_1_Pot * MN_BufFruit_1
+        h_T_canSum_MN_Fruit = self._safe_sigmoid(T_canSumC, 5e-2)
+
+        # === RESPIRATION ===
+        MC_BufAir = (self.c_Fruit_g * MC_BufFruit + self.c_Leaf_g * MC_BufLeaf
+                     + self.c_Stem_g * MC_BufStem)
+        Q10_factor = self.Q_10_m ** (0.1 * (T_can24C - 25))
+        MC_FruitAir_j = np.where((GR > 0) & (self.G_MAX > 0),
+                                 self.c_Fruit_m * Q10_factor * C_Fruit *
+                                 (1 - np.exp(-self.c_RGR * GR / self.G_MAX / 86400)), 0.0)
+        MC_FruitAir = MC_FruitAir_j.sum(axis=0)
+        MC_LeafAir = self.c_Leaf_m * Q10_factor * C_Leaf * \
+                     (1 - np.exp(-self.c_RGR * self.rg_Leaf / np.maximum(1e-6, C_Leaf)))
+        MC_StemAir = self.c_Stem_m * Q10_factor * C_Stem * \
+                     (1 - np.exp(-self.c_RGR * self.rg_Stem / np.maximum(1e-6, C_Stem)))
+
+        # === HARVEST / LEAF PRUNING ===
+        r_n = r_dev * n
+        MC_FruitHar = np.maximum(0, r_n * C_Fruit[-1])
+        C_Leaf_MAX = self.LAI_MAX / self.SLA
+        C_Leaf_min = 2.0 / self.SLA
+        MC_LeafHar_raw = self._safe_sigmoid(C_Leaf - C_Leaf_MAX, 1e-5) * (C_Leaf - C_Leaf_MAX) * 0.1
+        MC_LeafHar = np.where(C_Leaf > C_Leaf_MAX,
+                              np.maximum(0, np.minimum(MC_LeafHar_raw, C_Leaf - C_Leaf_min)), 0.0)
+
+        # === DERIVATIVES ===
+        dy = np.empty((len(y),) + np.broadcast(y[0], T_canC).shape)
+        dy[0] = MC_AirBuf - MC_BufFruit - MC_BufLeaf - MC_BufStem - MC_BufAir
+        dy[1] = MC_BufLeaf - MC_LeafAir - MC_LeafHar
+        dy[2] = MC_BufStem - MC_StemAir
+
+        # 과실 단계 사슬: 앞 단계 유입 - 다음 단계 유출 - 유지 호흡 (마지막 단계는 수확)
+        dC_Fruit = dy[3:3+n]
+        dC_Fruit[:] = -MC_FruitAir_j
+        dC_Fruit[1:] += r_n * C_Fruit[:-1]
+        dC_Fruit[:-1] -= r_n * C_Fruit[:-1]
+        dC_Fruit[0] += MC_BufFruit_1
+        dC_Fruit[-1] -= MC_FruitHar
+
+        flow_N = r_n * h_T_canSum_MN_Fruit * N_Fruit[:-1]
+        dN_Fruit = dy[3+n:3+2*n]
+        dN_Fruit[:] = 0.0
+        dN_Fruit[1:] += flow_N
+        dN_Fruit[:-1] -= flow_N
+        dN_Fruit[0] += MN_BufFruit_1
+
+        dy[3+2*n] = (self.k * T_canC - T_can24C) / self.tau
+        dy[3+2*n+1] = T_canC / 86400
+        dy[3+2*n+2] = GR[0] / 86400
+        dy[3+2*n+3] = np.maximum(0, self.eta_C_DM * MC_FruitHar)
+
+        MC_AirCan = MC_AirBuf - MC_BufAir - MC_FruitAir - MC_LeafAir - MC_StemAir
+        if flows is not None:
+            flows.update(C_Buf=C_Buf, MC_AirBuf=MC_AirBuf, MC_BufLeaf=MC_BufLeaf,
+                         MC_BufStem=MC_BufStem, MC_BufFruit=MC_BufFruit, MC_BufAir=MC_BufAir)
+        return dy, MC_AirCan / self.M_CH2O * self.M_CO2
+
     def simulate(self, csv_file=None, duration_days=100):
         """Run simulation"""
         print(f"Starting simulation for {duration_days} days...")
@@ -437,16 +391,67 @@ class TomatoYieldModel:
             print(f"Integration failed: {e}")
             return None
 
-    def step(self, dt, R_PAR_can=None, CO2_air=None, T_canK=None):
-        """Single time step"""
-        self.set_environmental_conditions(R_PAR_can, CO2_air, T_canK)
-        
-        y = np.concatenate([
+    @property
+    def n_states(self):
+        """Length of the state vector used by calculate_derivatives"""
+        return 3 + 2 * self.n_dev + 4
+
+    def get_state_vector(self):
+        """Pack the crop states in calculate_derivatives order"""
+        return np.concatenate([
             [self.C_Buf, self.C_Leaf, self.C_Stem],
             self.C_Fruit,
             self.N_Fruit,
             [self.T_can24C, self.T_canSumC, self.W_Fruit_1_Pot, self.DM_Har]
         ])
+
+    def set_state_vector(self, y):
+        """Unpack a state vector (calculate_derivatives order) into the model"""
+        self.C_Buf = float(y[0])
+        self.C_Leaf = float(y[1])
+        self.C_Stem = float(y[2])
+        self.C_Fruit = np.array(y[3:3+self.n_dev], dtype=float)
+        self.N_Fruit = np.array(y[3+self.n_dev:3+2*self.n_dev], dtype=float)
+
+        idx = 3 + 2*self.n_dev
+        self.T_can24C = float(y[idx])
+        self.T_canSumC = float(y[idx+1])
+        self.W_Fruit_1_Pot = float(y[idx+2])
+        self.DM_Har = float(y[idx+3])
+
+        self.LAI = self.SLA * self.C_Leaf
+
+    def state_sparsity(self):
+        """Jacobian pattern of calculate_derivatives (n_states x n_states bool)"""
+        n = self.n_dev
+        F = np.arange(3, 3 + n)
+        N = np.arange(3 + n, 3 + 2*n)
+        T24, TSum, W, DM = 3 + 2*n, 3 + 2*n + 1, 3 + 2*n + 2, 3 + 2*n + 3
+        pattern = np.eye(self.n_states, dtype=bool)
+
+        # Buffer/leaf/stem: growth flows depend on C_Buf, LAI, T_can24, T_canSum
+        core = [0, 1, 2, T24, TSum]
+        pattern[np.ix_([0, 1, 2], core)] = True
+
+        # Fruit stages: chain through development rate (T_can24) and maintenance
+        pattern[F[1:], F[:-1]] = True
+        pattern[F, T24] = True
+        pattern[F[0], [0, T24, TSum, W]] = True
+
+        pattern[N[1:], N[:-1]] = True
+        pattern[N, T24] = True
+        pattern[N, TSum] = True
+        pattern[N[0], [0, T24, TSum]] = True
+
+        pattern[W, T24] = True
+        pattern[DM, [F[-1], T24]] = True
+        return pattern
+
+    def step(self, dt, R_PAR_can=None, CO2_air=None, T_canK=None):
+        """Single time step"""
+        self.set_environmental_conditions(R_PAR_can, CO2_air, T_canK)
+        
+        y = self.get_state_vector()
         
         dy = self.calculate_derivatives(y, 0)
         
@@ -2,7 +2,7 @@ import numpy as np
 from Components.Greenhouse.BasicComponents.AirVP import AirVP
 from Modelica.Thermal.HeatTransfer.Interfaces.HeatPort_a import HeatPort_a
 from Interfaces.Vapour.WaterMassPort_a import WaterMassPort_a
-from Modelica.Media.MoistAir.relativeHumidity_pTX import relativeHumidity_pTX
+from Functions import Psychrometrics
 
 class Air:
     """
@@ -88,18 +88,8 @@ class Air:
         self.heatPort.Q_flow = self.Q_flow
         self.heatPort.T = self.T
         
-        # 복사 파워 계산 (Modelica: P_Air = sum(R_Air_Glob)*A)
-        # 원본 Modelica: if cardinality(R_Air_Glob)==0 then R_Air_Glob[i]=0; end if;
-        if len(self.R_Air_Glob) == 0:
-            self.P_Air = 0.0
-        else:
-            self.P_Air = sum(self.R_Air_Glob) * self.A
-        
         # 온도 미분 (Modelica: der(T) = 1/(rho*c_p*V)*(Q_flow + P_Air))
-        if not (self._initialization_phase and self.steadystate):
-            if self.rho > 0 and self.c_p > 0 and self.V > 0:
-                dT_dt = (self.Q_flow + self.P_Air) / (self.rho * self.c_p * self.V)
-                self.T += dT_dt * dt
+        self.T += self.compute_derivatives() * dt
         
         # AirVP 컴포넌트 업데이트
         self.airVP.T = self.T
@@ -108,11 +98,32 @@ class Air:
         # 습도 계산 업데이트
         self._update_humidity()
     
+    def compute_derivatives(self):
+        """
+        온도 변화율 계산 (Modelica: der(T) = 1/(rho*c_p*V)*(Q_flow + P_Air))
+        
+        Returns:
+        --------
+        float - dT/dt [K/s] (초기화 단계의 steadystate이면 0)
+        """
+        # 복사 파워 계산 (Modelica: P_Air = sum(R_Air_Glob)*A)
+        # 원본 Modelica: if cardinality(R_Air_Glob)==0 then R_Air_Glob[i]=0; end if;
+        if len(self.R_Air_Glob) == 0:
+            self.P_Air = 0.0
+        else:
+            self.P_Air = sum(self.R_Air_Glob) * self.A
+        
+        if self._initialization_phase and self.steadystate:
+            return 0.0
+        if self.rho > 0 and self.c_p > 0 and self.V > 0:
+            return (self.Q_flow + self.P_Air) / (self.rho * self.c_p * self.V)
+        return 0.0
+    
     def _update_humidity(self):
         """
-        습도 계산 업데이트 (Modelica 방정식과 동일)
+        습도 계산 업데이트 (Modelica 방정식과 동일, Functions.Psychrometrics)
         - w_air = massPort.VP * R_a / (P_atm - massPort.VP) / R_s
-        - RH = relativeHumidity_pTX(P_atm, heatPort.T, {w_air})
+        - RH = massPort.VP / p_sat(heatPort.T)  (relativeHumidity_pTX(P_atm, heatPort.T, {w_air})와 같은 값)
         """
         VP = self.massPort.VP
         
@@ -126,19 +137,9 @@ class Air:
             VP = 0.99 * self.P_atm
             self.massPort.VP = VP
         
-        # 습도비 계산 (Modelica 방정식)
-        if (self.P_atm - VP) > 0:
-            self.w_air = VP * self.R_a / ((self.P_atm - VP) * self.R_s)
-        else:
-            self.w_air = 0.0
-        
-        # 상대습도 계산 (Modelica 방정식)
-        try:
-            X = [self.w_air]
-            self.RH = relativeHumidity_pTX(self.P_atm, self.T, X)
-            self.RH = max(0.0, min(1.0, self.RH))
-        except:
-            self.RH = 0.0
+        # 습도비, 상대습도 계산 (Modelica 방정식)
+        self.w_air = Psychrometrics.humidity_ratio(VP, self.P_atm)
+        self.RH = Psychrometrics.relative_humidity(self.T, VP)
     
     def set_inputs(self, Q_flow, R_Air_Glob=None):
         """입력값 설정 (Modelica와 동일)"""
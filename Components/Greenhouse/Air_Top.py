@@ -3,7 +3,7 @@ from Components.Greenhouse.BasicComponents.AirVP import AirVP
 from Modelica.Thermal.HeatTransfer.Interfaces.HeatPort_a import HeatPort_a
 from Interfaces.Vapour.WaterMassPort_a import WaterMassPort_a
 from Modelica.Thermal.HeatTransfer.Sources.PrescribedTemperature import PrescribedTemperature
-from Modelica.Media.MoistAir.relativeHumidity_pTX import relativeHumidity_pTX
+from Functions import Psychrometrics
 
 class Air_Top:
     """
@@ -92,16 +92,8 @@ class Air_Top:
         self.heatPort.Q_flow = self.Q_flow
         self.heatPort.T = self.T
         
-        # Calculate air density (Modelica: rho = Modelica.Media.Air.ReferenceAir.Air_pT.density_pT(1e5,heatPort.T))
-        # Simplified density calculation: rho = P / (R * T)
-        self.rho = 1e5 / (self.R_a * self.T)  # Using 1e5 Pa as reference pressure
-        
         # Temperature derivative (Modelica: der(T) = 1/(rho*c_p*V)*Q_flow)
-        if not (self._initialization_phase and self.steadystate):
-            # Only integrate if not in steady-state initialization
-            if self.rho > 0 and self.c_p > 0 and self.V > 0:
-                dT_dt = self.Q_flow / (self.rho * self.c_p * self.V)
-                self.T += dT_dt * dt
+        self.T += self.compute_derivatives() * dt
         
         # Update air component
         self.air.T = self.T
@@ -113,11 +105,31 @@ class Air_Top:
         # Update prescribed temperature
         self.preTem.update_temperature(self.T)
     
+    def compute_derivatives(self):
+        """
+        Temperature derivative (Modelica: der(T) = 1/(rho*c_p*V)*Q_flow)
+        
+        Returns:
+        --------
+        float
+            dT/dt [K/s], zero during steady-state initialization
+        """
+        # Calculate air density (Modelica: rho = Modelica.Media.Air.ReferenceAir.Air_pT.density_pT(1e5,heatPort.T))
+        # Simplified density calculation: rho = P / (R * T)
+        self.rho = 1e5 / (self.R_a * self.T)  # Using 1e5 Pa as reference pressure
+        
+        if self._initialization_phase and self.steadystate:
+            return 0.0
+        if self.rho > 0 and self.c_p > 0 and self.V > 0:
+            return self.Q_flow / (self.rho * self.c_p * self.V)
+        return 0.0
+    
     def _update_humidity(self):
         """
         Update humidity calculations exactly as in Modelica:
         - w_air = massPort.VP * R_a / (P_atm - massPort.VP) / R_s
         - RH = Modelica.Media.Air.MoistAir.relativeHumidity_pTX(P_atm, heatPort.T, {w_air})
+          (= massPort.VP / p_sat(heatPort.T), Functions.Psychrometrics)
         """
         # Get vapor pressure from massPort
         VP = self.massPort.VP
@@ -132,20 +144,9 @@ class Air_Top:
             VP = 0.99 * self.P_atm
             self.massPort.VP = VP
         
-        # Calculate humidity ratio (Modelica equation)
-        if (self.P_atm - VP) > 0:
-            self.w_air = VP * self.R_a / ((self.P_atm - VP) * self.R_s)
-        else:
-            self.w_air = 0.0
-        
-        # Calculate relative humidity (Modelica equation)
-        try:
-            X = [self.w_air]
-            self.RH = relativeHumidity_pTX(self.P_atm, self.T, X)
-            # Ensure RH is in valid range
-            self.RH = max(0.0, min(1.0, self.RH))
-        except:
-            self.RH = 0.0
+        # Calculate humidity ratio and relative humidity (Modelica equations)
+        self.w_air = Psychrometrics.humidity_ratio(VP, self.P_atm)
+        self.RH = Psychrometrics.relative_humidity(self.T, VP)
     
     def set_inputs(self, Q_flow):
         """Set input values for the component"""
@@ -67,21 +67,34 @@ class AirVP:
         if not (self._initialization_phase and self.steadystate):
             # Only integrate if not in steady-state initialization
             if self.T > 0 and self.V_air > 0:
-                # Calculate capacity term (exactly as in Modelica)
-                capacity = self.M_H * 1e3 * self.V_air / (self.R * self.T)
+                self.VP += self.compute_derivatives() * dt
                 
-                if capacity > 0:
-                    dVP_dt = self.MV_flow / capacity
-                    self.VP += dVP_dt * dt
-                    
-                    # Ensure VP stays positive
-                    self.VP = max(0.0, self.VP)
+                # Ensure VP stays positive
+                self.VP = max(0.0, self.VP)
         
         # Update port and prescribed pressure
         self.port.VP = self.VP
         self.prescribedPressure.VP = self.VP
         self.prescribedPressure.update()
     
+    def compute_derivatives(self):
+        """
+        Vapor pressure derivative (Modelica: der(VP) = 1/(M_H*1e3*V_air/(R*T))*(MV_flow))
+        
+        Returns:
+        --------
+        float
+            dVP/dt [Pa/s], zero during steady-state initialization
+        """
+        if self._initialization_phase and self.steadystate:
+            return 0.0
+        if self.T > 0 and self.V_air > 0:
+            # Calculate capacity term (exactly as in Modelica)
+            capacity = self.M_H * 1e3 * self.V_air / (self.R * self.T)
+            if capacity > 0:
+                return self.MV_flow / capacity
+        return 0.0
+    
     def connect(self, external_port):
         """Connect to external mass port"""
         # Synchronize vapor pressures
@@ -61,16 +61,35 @@ class Layer:
         """
         if not self.steadystate:
             # Modelica의 der(T) = 1/(rho*c_p*V)*(Q_flow) 방정식과 동일
-            dT_dt = self.Q_flow / (self.rho * self.c_p * self.V)
+            dT_dt = self.compute_derivatives()
             
             # 온도 변화 계산
             new_T = self.T + dT_dt * dt
             
             # 물리적으로 의미 있는 온도 범위로 제한 (절대 영도 이상)
-            self.T = np.clip(new_T, 173.15, 373.15)
-            
-            # 포트 온도 업데이트
-            self.preTem.update_temperature(self.T)
+            self.set_temperature(np.clip(new_T, 173.15, 373.15))
+
+    def compute_derivatives(self):
+        """
+        온도 변화율 der(T) = 1/(rho*c_p*V)*Q_flow [K/s] (steadystate이면 0)
+        """
+        if self.steadystate:
+            return 0.0
+        return self.Q_flow / (self.rho * self.c_p * self.V)
+
+    def set_temperature(self, T):
+        """
+        레이어 온도 설정 및 포트 동기화
+
+        Parameters:
+        -----------
+        T : float
+            레이어 온도 [K]
+        """
+        self.T = T
+        # 포트 온도 업데이트 (전도체가 heatPort.T를 읽으므로 함께 갱신)
+        self.heatPort.T = self.T
+        self.preTem.update_temperature(self.T)
 
     def get_temperature(self):
         """
@@ -1,4 +1,5 @@
 from Interfaces.Vapour.WaterMassPort_a import WaterMassPort_a
+from Functions import Psychrometrics
 
 class SurfaceVP:
     """
@@ -43,8 +44,7 @@ class SurfaceVP:
         float
             포화 수증기압 [Pa]
         """
-        from math import exp
-        return 610.78 * exp(17.269 * temp_C / (temp_C + 237.3))
+        return Psychrometrics.p_sat(temp_C + 273.15)
     
     def step(self, dt):
         """
@@ -56,8 +56,7 @@ class SurfaceVP:
             시간 스텝 [s] (이 모델에서는 사용하지 않음)
         """
         # Modelica 방정식: VP = Functions.SaturatedVapourPressure(T - 273.15)
-        T_C = self.T - 273.15
-        self.VP = self.saturated_vapor_pressure(T_C)
+        self.VP = Psychrometrics.p_sat(self.T)
         
         # Modelica 방정식: port.VP = VP
         self.port.VP = self.VP
@@ -71,12 +71,6 @@ class Floor:
         Args:
             dt (float): 시간 스텝 [s]
         """
-        # P_Flr 계산 (Modelica: P_Flr = sum(R_Flr_Glob)*A)
-        if hasattr(self.R_Flr_Glob, 'values') and self.R_Flr_Glob.values:
-            self.P_Flr = sum(self.R_Flr_Glob.values) * self.A
-        else:
-            self.P_Flr = 0.0
-        
         # 온도 업데이트 (Modelica: der(T) = 1/(rho*c_p*V)*(Q_flow + P_Flr))
         # initial equation: if steadystate then der(T)=0; end if;
         if self.steadystate and not self._is_initialized:
@@ -85,7 +79,7 @@ class Floor:
             # 온도 변화 없음
         else:
             # 정상적인 온도 적분
-            dT = (self.Q_flow + self.P_Flr) / (self.rho * self.c_p * self.V)
+            dT = self.compute_derivatives()
             self.T += dT * dt
         
         # heatPort 온도 동기화 (Modelica connect와 동일)
@@ -93,6 +87,21 @@ class Floor:
         
         return self.T
 
+    def compute_derivatives(self):
+        """
+        온도 변화율 계산 (Modelica: der(T) = 1/(rho*c_p*V)*(Q_flow + P_Flr))
+        
+        Returns:
+            float: dT/dt [K/s]
+        """
+        # P_Flr 계산 (Modelica: P_Flr = sum(R_Flr_Glob)*A)
+        if hasattr(self.R_Flr_Glob, 'values') and self.R_Flr_Glob.values:
+            self.P_Flr = sum(self.R_Flr_Glob.values) * self.A
+        else:
+            self.P_Flr = 0.0
+        
+        return (self.Q_flow + self.P_Flr) / (self.rho * self.c_p * self.V)
+
     def get_temperature(self):
         """현재 바닥 온도 반환 [K]"""
         return self.T
\ No newline at end of file
@@ -14,9 +14,13 @@ class HeatingPipe:
     energy balance and static mass and momentum balances are applied on the fluid cells.
     Heat is transferred by long-wave radiation to the canopy, floor and cover, and by
     convection to the air.
+    
+    The heat ports carry the water temperature of their cell and the heat flow through
+    each port (set_heat_flows) enters the energy balance of that cell.
     """
     
-    def __init__(self, A, d, l, N=2, N_p=1, freePipe=True, Mdotnom=0.528, steadystate=True):
+    def __init__(self, A, d, l, N=2, N_p=1, freePipe=True, Mdotnom=0.528, steadystate=True,
+                 method='explicit_euler'):
         """
         Initialize HeatingPipe model
         
@@ -38,6 +42,10 @@ class HeatingPipe:
             Nominal mass flow rate of the pipes [kg/s] (default: 0.528)
         steadystate : bool, optional
             If true, sets the derivative of h to zero during initialization (default: True)
+        method : str, optional
+            Time integration of the water cells, 'explicit_euler' or 'backward_euler'
+            (default: 'explicit_euler'; use 'backward_euler' for many cells, where the
+            residence time per cell drops below the time step)
         """
         # Parameters
         self.A = A
@@ -67,12 +75,17 @@ class HeatingPipe:
             pstart=200000,
             Tstart_inlet=353.15,
             Tstart_outlet=323.15,
-            steadystate=steadystate  # steadystate 파라미터 전달
+            steadystate=steadystate,  # steadystate 파라미터 전달
+            method=method,
+            imposed_heat_flow=True    # 열 포트 유량 = 셀로 들어가는 열 (벽 온도 = 물 온도)
         )
         
         # Initialize heat ports as NumPy array of HeatPort_a objects
         self.heatPorts = np.array([HeatPort_a() for _ in range(N)], dtype=object)
         
+        # Net heat flow into the pipe through its heat ports [W] (set by the greenhouse model)
+        self.Q_flow = 0.0
+        
         # Initialize fluid ports (Modelica 원본과 동일)
         self.pipe_in = FluidPort_a()   # 입구 포트
         self.pipe_out = FluidPort_b()  # 출구 포트
@@ -96,11 +109,42 @@ class HeatingPipe:
         # Step flow model
         self.flow1DimInc.step(dt)
         
-        # Update heat port temperatures from flow model's Summary
+        self._update_heat_ports()
+    
+    def update(self):
+        """Refresh the outlet port and heat ports from the current water enthalpies (no time step)"""
+        self.flow1DimInc.update()
+        self._update_heat_ports()
+    
+    def _update_heat_ports(self):
+        """Update heat port temperatures from flow model's Summary"""
         # Modelica에서는 connect(heatPorts, flow1DimInc.heatPorts_a)로 자동 연결되지만,
         # Python에서는 명시적으로 업데이트해야 함
-        for i in range(self.N):
-            self.heatPorts[i].T = self.flow1DimInc.Summary.T[i]
+        for port, T in zip(self.heatPorts, self.flow1DimInc.Summary.T.tolist()):
+            port.T = T
+    
+    def set_heat_flows(self, Q):
+        """
+        Set the heat flow into every cell through its heat port [W] (all N_p tubes)
+        
+        Parameters:
+        -----------
+        Q : array_like
+            Heat flow per cell, length N (negative when the pipe gives off heat)
+        """
+        Q_port = self.flow1DimInc.Q_port
+        Q_port[:] = Q
+        for port, q in zip(self.heatPorts, Q_port.tolist()):
+            port.Q_flow = q
+        self.Q_flow = float(Q_port.sum())
+        self.flow1DimInc.Q_tot = self.Q_flow
+    
+    def set_enthalpies(self, h):
+        """
+        Set the water enthalpy of every cell [J/kg] and synchronize the heat ports
+        """
+        self.flow1DimInc.set_enthalpies(h)
+        self._update_heat_ports()
     
     def get_effective_heat_transfer_area(self):
         """Get effective heat transfer area [m²]"""
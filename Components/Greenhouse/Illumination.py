@@ -6,6 +6,9 @@ class Illumination:
     Python version of Greenhouses.Components.Greenhouse.Illumination.
     Simulates artificial lighting radiation (HPS lamps) absorbed by air, canopy, and floor.
     """
+    # Outputs of step() / compute_batch() / the precomputed table (order of _kernel)
+    OUTPUTS = ('R_PAR', 'R_NIR', 'R_IluAir_Glob', 'R_IluCan_Glob', 'R_IluFlr_Glob',
+               'R_PAR_Can_umol', 'W_el')
 
     def __init__(self,
                  power_input=False,
@@ -49,29 +52,70 @@ class Illumination:
         self.R_IluCan_Glob = HeatFluxOutput(name="R_IluCan_Glob")  # Radiation absorbed by canopy
         self.R_IluFlr_Glob = HeatFluxOutput(name="R_IluFlr_Glob")  # Radiation absorbed by floor
 
+        # Precomputed outputs (precompute()), read by step(dt, row)
+        self.table = None
+
     def multilayer_tau_rho(self, tau_Can, tau_Flr, rho_Can, rho_Flr):
         tau = tau_Can * tau_Flr / (1 - rho_Can * rho_Flr)
         rho = rho_Can + tau_Can**2 * rho_Flr / (1 - rho_Can * rho_Flr)
         return tau, rho
 
-    def step(self, dt):
-        switch = self.switch
+    def step(self, dt, row=None):
+        """
+        Parameters:
+            dt: Time step [s]
+            row: Row of the table attached with precompute(); the outputs are then read
+                from the table instead of being computed from switch and LAI
+        """
+        if row is None:
+            values = self._kernel(self.switch, self.LAI)
+        else:
+            values = tuple(self.table[name][row] for name in self.OUTPUTS)
+        (self.R_PAR, self.R_NIR, R_IluAir_Glob, R_IluCan_Glob, R_IluFlr_Glob,
+         self.R_PAR_Can_umol, self.W_el) = values
+
+        # Update port values
+        self.R_IluAir_Glob.value = R_IluAir_Glob
+        self.R_IluCan_Glob.value = R_IluCan_Glob
+        self.R_IluFlr_Glob.value = R_IluFlr_Glob
+
+        return dict(zip(self.OUTPUTS, values))
+
+    def compute_batch(self, switch, LAI=None):
+        """
+        Lamp radiation over a whole switch/LAI trajectory
+
+        Parameters:
+            switch: Lamp on/off trajectory [0-1]
+            LAI: Leaf area index trajectory or scalar (default: current LAI)
 
+        Returns:
+            dict: output name (OUTPUTS) -> NumPy array with the broadcast shape of the inputs
+        """
+        switch, LAI = np.broadcast_arrays(np.asarray(switch, dtype=float),
+                                          np.asarray(self.LAI if LAI is None else LAI, dtype=float))
+        values = self._kernel(switch, LAI)
+        return {name: np.broadcast_to(value, switch.shape).copy()
+                for name, value in zip(self.OUTPUTS, values)}
+
+    def precompute(self, switch, LAI=None):
+        """Attach compute_batch() results as the table read by step(dt, row)"""
+        self.table = self.compute_batch(switch, LAI)
+        return self.table
+
+    def _kernel(self, switch, LAI):
+        """Outputs in OUTPUTS order (scalars or NumPy arrays)"""
         # Power per area
         P = self.p_el if self.power_input else self.P_el / self.A
-        self.W_el = P * self.A * switch  # Store W_el as instance variable
+        W_el = P * self.A * switch
 
         # Radiation components
         R_PAR = 0.25 * P * switch
         R_NIR = 0.17 * P * switch
         R_IluAir_Glob = 0.58 * P * switch
-        
-        # Store radiation components as instance attributes
-        self.R_PAR = R_PAR
-        self.R_NIR = R_NIR
 
         # NIR multilayer model
-        tau_Can = np.exp(-self.K_NIR * self.LAI)
+        tau_Can = np.exp(-self.K_NIR * LAI)
         rho_Can = self.rho_CanNIR * (1 - tau_Can)
         tau_CF_NIR, rho_CF_NIR = self.multilayer_tau_rho(
             tau_Can,
@@ -83,32 +127,20 @@ class Illumination:
         alpha_FlrNIR = tau_CF_NIR
 
         # Canopy absorbed
-        R_IluCan_PAR = R_PAR * (1 - self.rho_CanPAR) * (1 - np.exp(-self.K1_PAR * self.LAI))
-        R_FlrCan_PAR = R_PAR * np.exp(-self.K1_PAR * self.LAI) * self.rho_FlrPAR * \
-                       (1 - self.rho_CanPAR) * (1 - np.exp(-self.K2_PAR * self.LAI))
+        exp_PAR1 = np.exp(-self.K1_PAR * LAI)
+        R_IluCan_PAR = R_PAR * (1 - self.rho_CanPAR) * (1 - exp_PAR1)
+        R_FlrCan_PAR = R_PAR * exp_PAR1 * self.rho_FlrPAR * \
+                       (1 - self.rho_CanPAR) * (1 - np.exp(-self.K2_PAR * LAI))
         R_IluCan_NIR = R_NIR * alpha_CanNIR
         R_IluCan_Glob = R_IluCan_PAR + R_FlrCan_PAR + R_IluCan_NIR
 
         # PAR absorbed in canopy (converted to umol/m²/s)
         R_PAR_Can = R_IluCan_PAR + R_FlrCan_PAR
-        self.R_PAR_Can_umol = R_PAR_Can / 0.25 * self.eta_GlobPAR  # Store as instance variable
+        R_PAR_Can_umol = R_PAR_Can / 0.25 * self.eta_GlobPAR
 
         # Floor absorbed
         R_IluFlr_NIR = R_NIR * alpha_FlrNIR
-        R_IluFlr_PAR = R_PAR * np.exp(-self.K1_PAR * self.LAI) * (1 - self.rho_FlrPAR)
+        R_IluFlr_PAR = R_PAR * exp_PAR1 * (1 - self.rho_FlrPAR)
         R_IluFlr_Glob = R_IluFlr_PAR + R_IluFlr_NIR
 
-        # Update port values
-        self.R_IluAir_Glob.value = R_IluAir_Glob
-        self.R_IluCan_Glob.value = R_IluCan_Glob
-        self.R_IluFlr_Glob.value = R_IluFlr_Glob
-
-        return {
-            "R_PAR": R_PAR,
-            "R_NIR": R_NIR,
-            "R_IluAir_Glob": R_IluAir_Glob,
-            "R_IluCan_Glob": R_IluCan_Glob,
-            "R_IluFlr_Glob": R_IluFlr_Glob,
-            "R_PAR_Can_umol": self.R_PAR_Can_umol,
-            "W_el": self.W_el
-        }
+        return (R_PAR, R_NIR, R_IluAir_Glob, R_IluCan_Glob, R_IluFlr_Glob, R_PAR_Can_umol, W_el)
@@ -1,6 +1,12 @@
 import math
+import numpy as np
 
 class Solar_model:
+    # Outputs of compute_batch() / the precomputed table (order of _kernel)
+    OUTPUTS = ('R_SunCov_Glob', 'P_SunCov_Glob', 'R_SunCan_Glob', 'P_SunCan_Glob',
+               'R_SunFlr_Glob', 'P_SunFlr_Glob', 'R_SunAir_Glob', 'P_SunAir_Glob',
+               'R_PAR_Can_umol', 'R_t_Glob')
+
     def __init__(self,
                  A,
                  I_glob,
@@ -61,12 +67,15 @@ class Solar_model:
         self.R_PAR_Can_umol = 0.0
         self.R_t_Glob = 0.0
 
+        # Precomputed outputs (precompute()), read by step(dt, row)
+        self.table = None
+
     def multi_layer_tau_rho(self, tau1, tau2, rho1, rho2):
         tau_total = tau1 * tau2 / (1 - rho1 * rho2)
         rho_total = rho1 + (tau1**2 * rho2 / (1 - rho1 * rho2))
         return tau_total, rho_total
 
-    def step(self, dt):
+    def step(self, dt, row=None):
         """
         Advance the simulation by one time step
         
@@ -74,43 +83,86 @@ class Solar_model:
         -----------
         dt : float
             Time step [s]
+        row : int, optional
+            Row of the table attached with precompute(); the outputs are then read
+            from the table instead of being computed from I_glob, SC and LAI
         """
-        results = self.compute()
-        
-        # Update class attributes with computed values
-        self.R_SunCov_Glob = results["R_SunCov_Glob"]
-        self.P_SunCov_Glob = results["P_SunCov_Glob"]
-        self.R_SunCan_Glob = results["R_SunCan_Glob"]
-        self.P_SunCan_Glob = results["P_SunCan_Glob"]
-        self.R_SunFlr_Glob = results["R_SunFlr_Glob"]
-        self.P_SunFlr_Glob = results["P_SunFlr_Glob"]
-        self.R_SunAir_Glob = results["R_SunAir_Glob"]
-        self.P_SunAir_Glob = results["P_SunAir_Glob"]
-        self.R_PAR_Can_umol = results["R_PAR_Can_umol"]
+        if row is None:
+            self._set_outputs(self._kernel(self.I_glob, self.SC, self.LAI, math.exp))
+        else:
+            self._set_outputs(tuple(self.table[name][row] for name in self.OUTPUTS))
 
     def compute(self):
+        """Scalar light distribution for the current I_glob, SC and LAI (dict of outputs)"""
+        values = self._kernel(self.I_glob, self.SC, self.LAI, math.exp)
+        self.R_t_Glob = values[-1]
+        return dict(zip(self.OUTPUTS[:-1], values[:-1]))
+
+    def compute_batch(self, I_glob, SC=None, LAI=None):
+        """
+        Light distribution over a whole input trajectory
+
+        Parameters:
+        -----------
+        I_glob : array_like
+            Global radiation [W/m²]
+        SC : array_like or float, optional
+            Screen closure [0-1] (default: current SC)
+        LAI : array_like or float, optional
+            Leaf area index (default: current LAI)
+
+        Returns:
+        --------
+        dict
+            Output name (OUTPUTS) -> NumPy array with the broadcast shape of the inputs
+        """
+        I_glob, SC, LAI = np.broadcast_arrays(
+            np.asarray(I_glob, dtype=float),
+            np.asarray(self.SC if SC is None else SC, dtype=float),
+            np.asarray(self.LAI if LAI is None else LAI, dtype=float))
+        values = self._kernel(I_glob, SC, LAI, np.exp)
+        return {name: np.broadcast_to(value, I_glob.shape).copy()
+                for name, value in zip(self.OUTPUTS, values)}
+
+    def precompute(self, I_glob, SC=None, LAI=None):
+        """Attach compute_batch() results as the table read by step(dt, row)"""
+        self.table = self.compute_batch(I_glob, SC, LAI)
+        return self.table
+
+    def _set_outputs(self, values):
+        (self.R_SunCov_Glob, self.P_SunCov_Glob, self.R_SunCan_Glob, self.P_SunCan_Glob,
+         self.R_SunFlr_Glob, self.P_SunFlr_Glob, self.R_SunAir_Glob, self.P_SunAir_Glob,
+         self.R_PAR_Can_umol, self.R_t_Glob) = values
+
+    def _kernel(self, I_glob, SC, LAI, exp):
+        """Outputs in OUTPUTS order (scalars with exp=math.exp, arrays with exp=np.exp)"""
         tau_ML_covPAR, rho_ML_covPAR = self.multi_layer_tau_rho(
             self.tau_RfPAR, self.tau_thScrPAR, self.rho_RfPAR, self.rho_thScrPAR)
         tau_ML_covNIR, rho_ML_covNIR = self.multi_layer_tau_rho(
             self.tau_RfNIR, self.tau_thScrNIR, self.rho_RfNIR, self.rho_thScrNIR)
 
-        tau_covPAR = (1 - self.SC) * self.tau_RfPAR + self.SC * tau_ML_covPAR
-        rho_covPAR = (1 - self.SC) * self.rho_RfPAR + self.SC * rho_ML_covPAR
-        tau_covNIR = (1 - self.SC) * self.tau_RfNIR + self.SC * tau_ML_covNIR
-        rho_covNIR = (1 - self.SC) * self.rho_RfNIR + self.SC * rho_ML_covNIR
+        tau_covPAR = (1 - SC) * self.tau_RfPAR + SC * tau_ML_covPAR
+        rho_covPAR = (1 - SC) * self.rho_RfPAR + SC * rho_ML_covPAR
+        tau_covNIR = (1 - SC) * self.tau_RfNIR + SC * tau_ML_covNIR
+        rho_covNIR = (1 - SC) * self.rho_RfNIR + SC * rho_ML_covNIR
 
         alpha_covPAR = 1 - tau_covPAR - rho_covPAR
         alpha_covNIR = 1 - tau_covNIR - rho_covNIR
 
-        R_SunCov_Glob = (alpha_covPAR * self.eta_glob_PAR + alpha_covNIR * self.eta_glob_NIR) * self.I_glob
+        R_SunCov_Glob = (alpha_covPAR * self.eta_glob_PAR + alpha_covNIR * self.eta_glob_NIR) * I_glob
         P_SunCov_Glob = R_SunCov_Glob * self.A
 
-        R_t_PAR = self.I_glob * self.eta_glob_PAR * tau_covPAR * (1 - self.eta_glob_air)
-        R_NIR = self.I_glob * self.eta_glob_NIR * (1 - self.eta_glob_air)
+        R_t_PAR = I_glob * self.eta_glob_PAR * tau_covPAR * (1 - self.eta_glob_air)
+        R_NIR = I_glob * self.eta_glob_NIR * (1 - self.eta_glob_air)
+
+        # Canopy extinction terms (evaluated once per call)
+        exp_NIR = exp(-self.K_NIR * LAI)
+        exp_PAR1 = exp(-self.K1_PAR * LAI)
+        exp_PAR2 = exp(-self.K2_PAR * LAI)
 
         tau_CF_NIR, rho_CF_NIR = self.multi_layer_tau_rho(
-            math.exp(-self.K_NIR * self.LAI), 1 - self.rho_FlrNIR,
-            self.rho_CanNIR * (1 - math.exp(-self.K_NIR * self.LAI)), self.rho_FlrNIR)
+            exp_NIR, 1 - self.rho_FlrNIR,
+            self.rho_CanNIR * (1 - exp_NIR), self.rho_FlrNIR)
 
         tau_CCF_NIR, rho_CCF_NIR = self.multi_layer_tau_rho(
             tau_covNIR, tau_CF_NIR, rho_covNIR, rho_CF_NIR)
@@ -118,35 +170,25 @@ class Solar_model:
         alpha_FlrNIR = tau_CCF_NIR
         alpha_CanNIR = 1 - tau_CCF_NIR - rho_CCF_NIR
 
-        R_SunCan_PAR = R_t_PAR * (1 - self.rho_CanPAR) * (1 - math.exp(-self.K1_PAR * self.LAI))
-        R_FlrCan_PAR = R_t_PAR * math.exp(-self.K1_PAR * self.LAI) * self.rho_FlrPAR * (1 - self.rho_CanPAR) * (1 - math.exp(-self.K2_PAR * self.LAI))
+        R_SunCan_PAR = R_t_PAR * (1 - self.rho_CanPAR) * (1 - exp_PAR1)
+        R_FlrCan_PAR = R_t_PAR * exp_PAR1 * self.rho_FlrPAR * (1 - self.rho_CanPAR) * (1 - exp_PAR2)
         R_SunCan_NIR = R_NIR * alpha_CanNIR
         R_PAR_Can = R_SunCan_PAR + R_FlrCan_PAR
         R_PAR_Can_umol = R_PAR_Can / self.eta_glob_PAR * self.eta_GlobPAR
         R_SunCan_Glob = R_SunCan_PAR + R_FlrCan_PAR + R_SunCan_NIR
         P_SunCan_Glob = R_SunCan_Glob * self.A
 
-        R_SunFlr_PAR = R_t_PAR * math.exp(-self.K1_PAR * self.LAI) * (1 - self.rho_FlrPAR)
+        R_SunFlr_PAR = R_t_PAR * exp_PAR1 * (1 - self.rho_FlrPAR)
         R_SunFlr_NIR = R_NIR * alpha_FlrNIR
         R_SunFlr_Glob = R_SunFlr_PAR + R_SunFlr_NIR
         P_SunFlr_Glob = R_SunFlr_Glob * self.A
 
-        R_SunAir_Glob = self.eta_glob_air * self.I_glob * (tau_covPAR * self.eta_glob_PAR + (alpha_CanNIR + alpha_FlrNIR) * self.eta_glob_NIR)
+        R_SunAir_Glob = self.eta_glob_air * I_glob * (tau_covPAR * self.eta_glob_PAR + (alpha_CanNIR + alpha_FlrNIR) * self.eta_glob_NIR)
         P_SunAir_Glob = R_SunAir_Glob * self.A
 
         # Calculate total transmitted radiation above the canopy
-        self.R_t_Glob = self.I_glob * (1 - self.eta_glob_air) * (self.eta_glob_PAR * tau_covPAR + self.eta_glob_NIR * (alpha_CanNIR + alpha_FlrNIR))
-
-        return {
-            "R_SunCov_Glob": R_SunCov_Glob,
-            "P_SunCov_Glob": P_SunCov_Glob,
-            "R_SunCan_Glob": R_SunCan_Glob,
-            "P_SunCan_Glob": P_SunCan_Glob,
-            "R_SunFlr_Glob": R_SunFlr_Glob,
-            "P_SunFlr_Glob": P_SunFlr_Glob,
-            "R_SunAir_Glob": R_SunAir_Glob,
-            "P_SunAir_Glob": P_SunAir_Glob,
-            "R_PAR_Can_umol": R_PAR_Can_umol
-        }
-
+        R_t_Glob = I_glob * (1 - self.eta_glob_air) * (self.eta_glob_PAR * tau_covPAR + self.eta_glob_NIR * (alpha_CanNIR + alpha_FlrNIR))
 
+        return (R_SunCov_Glob, P_SunCov_Glob, R_SunCan_Glob, P_SunCan_Glob,
+                R_SunFlr_Glob, P_SunFlr_Glob, R_SunAir_Glob, P_SunAir_Glob,
+                R_PAR_Can_umol, R_t_Glob)
@@ -90,19 +90,10 @@ class ThermalScreen:
         self.surfaceVP.T = self.T
         self.surfaceVP.step(dt)  # SurfaceVP 업데이트
         
-        # 잠열 계산
-        self.L_scr = self.massPort.MV_flow * 2.45e6
+        # 잠열 계산 및 온도 변화율
+        dT_dt = self.compute_derivatives()
         
         if not self.steadystate:
-            # 온도 업데이트 (Modelica 방정식과 정확히 일치)
-            # der(T) = 1/(rho*c_p*h*A)*(Q_flow + L_scr)
-            dT_dt = (self.Q_flow + self.L_scr) / (self.rho * self.c_p * self.h * self.A)
-            
-            # 온도 변화율 제한 (물리적 한계 적용)
-            max_dT_dt = 1.0  # 최대 온도 변화율 [K/s] - 더 보수적인 값
-            if abs(dT_dt) > max_dT_dt:
-                dT_dt = max_dT_dt if dT_dt > 0 else -max_dT_dt
-            
             # 온도 업데이트
             new_T = self.T + dT_dt * dt
             
@@ -126,6 +117,30 @@ class ThermalScreen:
             # Steady state: 온도 변화 없음
             pass
     
+    def compute_derivatives(self):
+        """
+        Temperature derivative der(T) = 1/(rho*c_p*h*A)*(Q_flow + L_scr)
+        
+        Returns:
+        --------
+        float
+            dT/dt [K/s], limited to the physical rate bound (zero if steadystate)
+        """
+        # 잠열 계산
+        self.L_scr = self.massPort.MV_flow * 2.45e6
+        
+        if self.steadystate:
+            return 0.0
+        
+        # 온도 업데이트 (Modelica 방정식과 정확히 일치)
+        dT_dt = (self.Q_flow + self.L_scr) / (self.rho * self.c_p * self.h * self.A)
+        
+        # 온도 변화율 제한 (물리적 한계 적용)
+        max_dT_dt = 1.0  # 최대 온도 변화율 [K/s] - 더 보수적인 값
+        if abs(dT_dt) > max_dT_dt:
+            dT_dt = max_dT_dt if dT_dt > 0 else -max_dT_dt
+        return dT_dt
+    
     def get_temperature(self):
         """Return the current temperature"""
         return self.T
@@ -48,6 +48,7 @@ class Cell1DimInc2Ports:
     pstart: float = 101325.0 # 초기 압력 [Pa]
     steadystate: bool = True
     FlowReversal: bool = False
+    properties: Optional[object] = None  # 물 물성 테이블 (Media.PropertyTables.WaterProperties), None이면 선형 근사
 
     # 상태 변수
     h: float = field(default_factory=lambda: 1e5)
@@ -78,8 +79,7 @@ class Cell1DimInc2Ports:
         self.hnode_ex = self.hstart
         
         # 초기 물성 계산
-        self.T = h_to_T(self.h)
-        self.rho = rho_water(self.T)
+        self._update_fluid_properties()
         
         # 열전달 모델 초기화
         self.heatTransfer = MassFlowDependence(
@@ -97,8 +97,13 @@ class Cell1DimInc2Ports:
 
     def _update_fluid_properties(self):
         """유체 물성 업데이트"""
-        self.T = h_to_T(self.h)
-        self.rho = rho_water(self.T)
+        if self.properties is None:
+            self.T = h_to_T(self.h)
+            self.rho = rho_water(self.T)
+        else:
+            # 테이블 엔탈피 기준(h(273.15 K) = 0)으로 변환: h_to_T와 같이 h = 1e5일 때 300 K
+            self.T = self.properties.temperature(self.h - 1e5 + self.properties.enthalpy(300.0))
+            self.rho = self.properties.density(self.T)
 
     def _handle_flow_reversal(self):
         """유량 역류 처리"""
@@ -241,6 +246,5 @@ class Cell1DimInc2Ports:
         self.p = self.pstart
         self.hnode_su = self.hstart
         self.hnode_ex = self.hstart
-        self.T = h_to_T(self.h)
-        self.rho = rho_water(self.T)
+        self._update_fluid_properties()
         self._time = 0.0
\ No newline at end of file
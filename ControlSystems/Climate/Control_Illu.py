@@ -1,7 +1,12 @@
+import numpy as np
+
+
 class Control_Illu:
     """
     Controller for the artificial illumination
     """
+    # Threshold margins of the transition conditions (see guard_values)
+    GUARDS = ('h - 6', 'h - 22', 'h', 'E_acc - E_acc_limit', 'R_t_PAR - 40', 'R_t_PAR - 120')
     
     def __init__(self, R_illu=100):
         """
@@ -100,3 +105,8 @@ class Control_Illu:
         self.illu_signal = 1 if self.state == "on" else 0
         
         return self.illu_signal
+
+    def guard_values(self) -> np.ndarray:
+        """Threshold margins in GUARDS order (a sign change means a condition may switch)"""
+        return np.array([self.h - 6, self.h - 22, self.h, self.E_acc - self.E_acc_limit,
+                         self.R_t_PAR - 40, self.R_t_PAR - 120], dtype=float)
@@ -1,14 +1,82 @@
+import math
+import numpy as np
+
+# 상태 (정수 id = STATES 내 위치)
+CLOSED, OPENING_CD, OPENING_WD, OPEN, CLOSING_CD, CRACK, CRACK2 = range(7)
+STATES = ('closed', 'opening_ColdDay', 'opening_WarmDay', 'open', 'closing_ColdDay', 'crack', 'crack2')
+STATE_IDS = {name: i for i, name in enumerate(STATES)}
+
+# 전이 조건 (매 스텝 입력으로 한 번 계산하는 bool 튜플의 인덱스)
+RH_OVER_83, RH_UNDER_70, RH_OVER_85, SUN_COLD, SUN_WARM, CLOSE_COLD = range(6)
+
+# 타이머 (속성 이름)
+TIMERS = ('timer', 'timer_closing_CD', 'timer_crack')
+MAIN, CLOSING, CRACK_TIMER = range(3)
+
+# 상태별 누적 타이머: (타이머, 누적 조건) (다른 타이머는 매 스텝 0으로 리셋)
+_TIMER_OF_STATE = {
+    OPENING_CD: (MAIN, None), OPENING_WD: (MAIN, None), OPEN: (MAIN, None),
+    CLOSING_CD: (CLOSING, None),
+    CRACK: (CRACK_TIMER, RH_OVER_85),
+}
+
+# 전이 표: 상태 → 우선순위 순 (조건, 타이머, 대기 시간 [s], 다음 상태, blocking)
+# - 조건이 None이면 항상 참, 타이머가 None이면 조건만으로 전이
+# - blocking: 조건이 참이지만 타이머가 아직이면 이후 전이를 검사하지 않음
+#   (Modelica enableTimer 전이 T4: 대기 중에는 다른 전이가 막힘)
+_TRANSITIONS = (
+    # closed (InitialStep)
+    ((RH_OVER_83, None, 0.0, CRACK, False),              # T5
+     (SUN_COLD, None, 0.0, OPENING_CD, False),           # T2
+     (SUN_WARM, None, 0.0, OPENING_WD, False),           # T3
+     (CLOSE_COLD, MAIN, 2 * 3600.0, CLOSING_CD, True)),  # T4 (closed에서는 타이머가 누적되지 않음)
+    # opening_ColdDay
+    ((None, MAIN, 52 * 60.0, OPEN, False),               # T6
+     (SUN_WARM, None, 0.0, OPENING_WD, False),           # T3b
+     (RH_UNDER_70, None, 0.0, CLOSED, False)),           # T8
+    # opening_WarmDay
+    ((None, MAIN, 32 * 60.0, OPEN, False),               # T7
+     (SUN_COLD, None, 0.0, OPENING_CD, False),           # T2c
+     (RH_UNDER_70, None, 0.0, CLOSED, False)),           # T8
+    # open
+    ((CLOSE_COLD, MAIN, 2 * 3600.0, CLOSING_CD, True),   # T4
+     (SUN_COLD, None, 0.0, OPENING_CD, False),           # T2
+     (SUN_WARM, None, 0.0, OPENING_WD, False)),          # T3
+    # closing_ColdDay
+    ((None, CLOSING, 52 * 60.0, CLOSED, False),),        # T1
+    # crack
+    ((RH_UNDER_70, None, 0.0, CLOSED, False),            # T8
+     (RH_OVER_85, CRACK_TIMER, 15 * 60.0, CRACK2, False),  # T9
+     (SUN_COLD, None, 0.0, OPENING_CD, False),           # T2b
+     (SUN_WARM, None, 0.0, OPENING_WD, False)),          # T3b
+    # crack2
+    ((RH_UNDER_70, None, 0.0, CLOSED, False),            # T8b
+     (SUN_COLD, None, 0.0, OPENING_CD, False),           # T2c
+     (SUN_WARM, None, 0.0, OPENING_WD, False)),          # T3c
+)
+
+# 전이 조건의 임계값 여유 (부호가 바뀌면 조건 전이가 일어날 수 있음)
+GUARDS = ('RH_air - 0.83', 'RH_air - 0.7', 'RH_air - 0.85',
+          'R_Glob_can - R_Glob_can_min', 'T_out - (T_air_sp - 7)', 'SC_usable')
+
+
 class Control_ThScreen:
     """
     Modelica Control_ThScreen StateGraph 논리를 1:1로 반영한 보온 스크린 제어기
     (상태/전이 이름, 타이머, 조건 모두 Modelica와 동일하게 구현)
+    - StateGraph는 정수 상태 id의 전이 표(_TRANSITIONS)로 컴파일되어 있음
+    - time_to_next_event(): 입력이 일정할 때 다음 타이머 전이(52분, 32분, 2시간, 15분)까지의 시간
+    - guard_values(): 조건 전이 임계값 여유 (부호 변화 = 임계값 교차)
+    - advance(dt): 큰 dt도 타이머 전이 시각에서 나누어 진행 (전이를 놓치지 않음)
     """
+    GUARDS = GUARDS
+
     def __init__(self, R_Glob_can=0.0, R_Glob_can_min=32):
         # 입력 파라미터 (Modelica와 동일)
         self.R_Glob_can = R_Glob_can
         self.R_Glob_can_min = R_Glob_can_min
         # 상태 변수 (Modelica 상태 이름과 동일)
-        self.state = "closed"  # InitialStep
+        self.state_id = CLOSED  # InitialStep
         self.timer = 0.0       # opening_ColdDay, opening_WarmDay, closing_ColdDay, open용 타이머
         self.timer_crack = 0.0 # crack → crack2 전이용 타이머
         self.timer_closing_CD = 0.0 # closing_ColdDay용 타이머
@@ -33,129 +101,117 @@ class Control_ThScreen:
         self.RH_air = 0.0
         self.SC_usable = 0.0
         
+    @property
+    def state(self) -> str:
+        """현재 상태 이름 (Modelica 상태 이름)"""
+        return STATES[self.state_id]
+
+    @state.setter
+    def state(self, name: str) -> None:
+        self.state_id = STATE_IDS[name]
+
+    def _conditions(self):
+        """전이 조건 (_TRANSITIONS의 조건 인덱스 순서)"""
+        threshold = self.T_air_sp - 7
+        sun = self.R_Glob_can > self.R_Glob_can_min
+        return (self.RH_air > 0.83,
+                self.RH_air < 0.7,
+                self.RH_air > 0.85,
+                sun and self.T_out <= threshold,
+                sun and self.T_out > threshold,
+                self.SC_usable > 0 and self.T_out < threshold)
+
+    def _accumulating_timer(self, conditions):
+        """현재 상태에서 누적되는 타이머 (없으면 None)"""
+        entry = _TIMER_OF_STATE.get(self.state_id)
+        if entry is None or (entry[1] is not None and not conditions[entry[1]]):
+            return None
+        return entry[0]
+
+    def guard_values(self) -> np.ndarray:
+        """조건 전이 임계값 여유 (GUARDS 순서, 부호가 바뀌면 전이 가능)"""
+        return np.array([self.RH_air - 0.83, self.RH_air - 0.7, self.RH_air - 0.85,
+                         self.R_Glob_can - self.R_Glob_can_min,
+                         self.T_out - (self.T_air_sp - 7), self.SC_usable], dtype=float)
+
+    def time_to_next_event(self) -> float:
+        """
+        입력이 일정할 때 다음 전이까지의 시간 [s]
+
+        step(h)는 타이머를 h만큼 누적한 뒤 전이를 검사하므로, h = time_to_next_event()로
+        진행하면 타이머 전이가 정확히 그 스텝 끝에서 일어납니다.
+        0이면 조건 전이가 이미 가능한 상태이고, 예정된 전이가 없으면 inf입니다.
+        """
+        conditions = self._conditions()
+        active = self._accumulating_timer(conditions)
+        best = math.inf
+        for condition, timer, wait, target, blocking in _TRANSITIONS[self.state_id]:
+            if condition is not None and not conditions[condition]:
+                continue
+            if timer is None:
+                return 0.0
+            # 누적되지 않는 타이머는 스텝마다 0으로 리셋됨
+            elapsed = getattr(self, TIMERS[timer]) if timer == active else 0.0
+            if elapsed >= wait:
+                return 0.0
+            if timer == active:
+                best = min(best, wait - elapsed)
+            if blocking:
+                break
+        return best
+
+    def advance(self, dt: float, max_events: int = 64) -> float:
+        """
+        입력을 일정하게 유지하며 dt만큼 진행 (타이머 전이 시각마다 스텝을 나눔)
+
+        조건 전이는 즉시(길이 0 스텝) 일어나고, 타이머는 전이 시각부터 다시 누적됩니다.
+        """
+        remaining = dt
+        for _ in range(max_events):
+            h = min(remaining, self.time_to_next_event())
+            self.step(h)
+            remaining -= h
+            if remaining <= 0:
+                return self.SC
+        # 조건 전이가 순환하는 경우: 남은 시간을 한 번에 진행
+        return self.step(remaining)
+
     def step(self, dt: float) -> float:
         """
-        Modelica StateGraph 논리 1:1 반영 (상태/전이 이름 동일)
+        Modelica StateGraph 논리 1:1 반영 (컴파일된 전이 표 사용)
         외부온도와 설정온도 차이만으로 제어 (실내온도 무관)
         """
-        prev_state = self.state
+        conditions = self._conditions()
         
-        # 1. 타이머 업데이트 (상태별)
-        if self.state in ("opening_ColdDay", "opening_WarmDay", "open"):
-            self.timer += dt
-        else:
-            self.timer = 0.0
-        if self.state == "closing_ColdDay":
-            self.timer_closing_CD += dt
-        else:
-            self.timer_closing_CD = 0.0
-        # crack → crack2용 타이머 (T9)
-        if self.state == "crack" and self.RH_air > 0.85:
-            self.timer_crack += dt
-        else:
-            self.timer_crack = 0.0
+        # 1. 타이머 업데이트 (현재 상태의 타이머만 누적, 나머지는 리셋)
+        active = self._accumulating_timer(conditions)
+        self.timer = self.timer + dt if active == MAIN else 0.0
+        self.timer_closing_CD = self.timer_closing_CD + dt if active == CLOSING else 0.0
+        self.timer_crack = self.timer_crack + dt if active == CRACK_TIMER else 0.0
             
-        # 2. 상태 전이 (Modelica Transition 이름 주석)
-        # closed (InitialStep)
-        if self.state == "closed":
-            # T5: closed → crack (RH_air > 0.83)
-            if self.RH_air > 0.83:
-                self.state = "crack"
-            # T2: closed → opening_ColdDay (R_Glob_can > min, T_out <= T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out <= (self.T_air_sp - 7):
-                self.state = "opening_ColdDay"
-            # T3: closed → opening_WarmDay (R_Glob_can > min, T_out > T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out > (self.T_air_sp - 7):
-                self.state = "opening_WarmDay"
-            # T4: closed → closing_ColdDay (SC_usable > 0, T_out < T_air_sp-7, enableTimer, waitTime=2h)
-            elif self.SC_usable > 0 and self.T_out < (self.T_air_sp - 7):
-                if self.timer >= 2 * 3600:
-                    self.state = "closing_ColdDay"
-                    
-        # opening_ColdDay
-        elif self.state == "opening_ColdDay":
-            # T6: opening_ColdDay → open (timer >= 52min)
-            if self.timer >= 52 * 60:
-                self.state = "open"
-            # T3b: opening_ColdDay → opening_WarmDay (R_Glob_can > min, T_out > T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out > (self.T_air_sp - 7):
-                self.state = "opening_WarmDay"
-            # T8: opening_ColdDay → closed (RH_air < 0.7)
-            elif self.RH_air < 0.7:
-                self.state = "closed"
-                
-        # opening_WarmDay
-        elif self.state == "opening_WarmDay":
-            # T7: opening_WarmDay → open (timer >= 32min)
-            if self.timer >= 32 * 60:
-                self.state = "open"
-            # T2c: opening_WarmDay → opening_ColdDay (R_Glob_can > min, T_out <= T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out <= (self.T_air_sp - 7):
-                self.state = "opening_ColdDay"
-            # T8: opening_WarmDay → closed (RH_air < 0.7)
-            elif self.RH_air < 0.7:
-                self.state = "closed"
-                
-        # open
-        elif self.state == "open":
-            # T4: open → closing_ColdDay (SC_usable > 0, T_out < T_air_sp-7, enableTimer, waitTime=2h)
-            if self.SC_usable > 0 and self.T_out < (self.T_air_sp - 7):
-                if self.timer >= 2 * 3600:
-                    self.state = "closing_ColdDay"
-            # T2: open → opening_ColdDay (R_Glob_can > min, T_out <= T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out <= (self.T_air_sp - 7):
-                self.state = "opening_ColdDay"
-            # T3: open → opening_WarmDay (R_Glob_can > min, T_out > T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out > (self.T_air_sp - 7):
-                self.state = "opening_WarmDay"
-                
-        # closing_ColdDay
-        elif self.state == "closing_ColdDay":
-            # T1: closing_ColdDay → closed (timer >= 52min)
-            if self.timer_closing_CD >= 52 * 60:
-                self.state = "closed"
-                
-        # crack
-        elif self.state == "crack":
-            # T8: crack → closed (RH_air < 0.7)
-            if self.RH_air < 0.7:
-                self.state = "closed"
-            # T9: crack → crack2 (RH_air > 0.85, timer_crack >= 15min)
-            elif self.RH_air > 0.85 and self.timer_crack >= 15 * 60:
-                self.state = "crack2"
-            # T2b: crack → opening_ColdDay (R_Glob_can > min, T_out <= T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out <= (self.T_air_sp - 7):
-                self.state = "opening_ColdDay"
-            # T3b: crack → opening_WarmDay (R_Glob_can > min, T_out > T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out > (self.T_air_sp - 7):
-                self.state = "opening_WarmDay"
-                
-        # crack2
-        elif self.state == "crack2":
-            # T8b: crack2 → closed (RH_air < 0.7)
-            if self.RH_air < 0.7:
-                self.state = "closed"
-            # T2c: crack2 → opening_ColdDay (R_Glob_can > min, T_out <= T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out <= (self.T_air_sp - 7):
-                self.state = "opening_ColdDay"
-            # T3c: crack2 → opening_WarmDay (R_Glob_can > min, T_out > T_air_sp-7)
-            elif self.R_Glob_can > self.R_Glob_can_min and self.T_out > (self.T_air_sp - 7):
-                self.state = "opening_WarmDay"
-                
-        # 상태가 바뀌면 타이머 리셋
-        if self.state != prev_state:
-            self.timer = 0.0
-            self.timer_crack = 0.0
-            self.timer_closing_CD = 0.0
+        # 2. 상태 전이 (전이 표의 우선순위 순서)
+        for condition, timer, wait, target, blocking in _TRANSITIONS[self.state_id]:
+            if condition is not None and not conditions[condition]:
+                continue
+            if timer is None or getattr(self, TIMERS[timer]) >= wait:
+                # 상태가 바뀌면 타이머 리셋
+                self.state_id = target
+                self.timer = 0.0
+                self.timer_crack = 0.0
+                self.timer_closing_CD = 0.0
+                break
+            if blocking:
+                break
             
         # 3. 출력 신호 계산 (Modelica와 동일)
-        self.opening_CD = self.SC_OCD_value if self.state == "opening_ColdDay" else 0.0
-        self.opening_WD = self.SC_OWD_value if self.state == "opening_WarmDay" else 0.0
-        self.closing_CD = self.SC_CCD_value if self.state == "closing_ColdDay" else 0.0
-        self.op = 0.0 if self.state == "open" else 0.0
-        self.cl = 1.0 if self.state == "closed" else 0.0
-        self.crack = self.SC_crack_value if self.state == "crack" else 0.0
-        self.crack2 = self.SC_crack2_value if self.state == "crack2" else 0.0
+        state = self.state_id
+        self.opening_CD = self.SC_OCD_value if state == OPENING_CD else 0.0
+        self.opening_WD = self.SC_OWD_value if state == OPENING_WD else 0.0
+        self.closing_CD = self.SC_CCD_value if state == CLOSING_CD else 0.0
+        self.op = 0.0
+        self.cl = 1.0 if state == CLOSED else 0.0
+        self.crack = self.SC_crack_value if state == CRACK else 0.0
+        self.crack2 = self.SC_crack2_value if state == CRACK2 else 0.0
         self.SC = (self.opening_CD + self.opening_WD + self.closing_CD + self.op + self.cl + self.crack + self.crack2)
         
         # SC_usable=0일 때 강제 개방 (Modelica와 동일)
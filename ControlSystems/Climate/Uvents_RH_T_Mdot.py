@@ -64,40 +64,51 @@ class Uvents_RH_T_Mdot:
         # 출력 신호
         self.y = 0.0
         
-    def step(self, dt: float) -> float:
-        """
-        한 타임스텝(dt)마다 제어 신호 계산 (Modelica와 동일한 논리)
-        """
+    @property
+    def controllers(self):
+        """내부 PID 컨트롤러 (PIDBank 등록용)"""
+        return (self.PID, self.PIDT, self.PIDT_noH)
+
+    def set_pid_inputs(self) -> None:
+        """PID 컨트롤러들: 입력값 연결 (PV, SP)"""
         # cardinality 체크: RH_air가 연결되지 않은 경우 RH_air_input 사용
         if self.RH_air is None:
             rh_air = self.RH_air_input
         else:
             rh_air = self.RH_air
         
-        # PID 컨트롤러들: 입력값 연결 (PV, SP)
         self.PID.PV = rh_air
         self.PID.SP = self.RH_max
-        self.PID.step(dt)
         
         self.PIDT.PV = self.T_air
         self.PIDT.SP = self.Tmax_tomato
-        self.PIDT.step(dt)
         
         self.PIDT_noH.PV = self.T_air
         self.PIDT_noH.SP = self.T_air_sp + 2.0
-        self.PIDT_noH.step(dt)
-        
+
+    def combine(self) -> float:
+        """PID 출력 결합 (질량유량 시그모이드 가중치)"""
         # 시그모이드 함수 계산 (질량유량에 따른 가중치, 수치 안정성 위해 clip)
         x = 200.0 * (self.Mdot - 0.05)
         x = np.clip(x, -500.0, 500.0)  # exp 오버플로 방지
         sigmoid1 = 1.0 / (1.0 + np.exp(-x))
-        sigmoid2 = 1.0 / (1.0 + np.exp(x))
         
         # PID 출력 결합 (Modelica 원본과 정확히 동일)
         # y = 1/(1+exp(-200*(Mdot-0.05)))*max(PID.CS,PIDT.CS) + 1/(1+exp(200*(Mdot-0.05)))*max(PID.CS,PIDT_noH.CS)
+        # 두 가중치의 합은 1이므로 볼록 결합으로 계산 (두 항이 모두 1일 때 1을 넘는 반올림 방지)
         term1 = max(self.PID.CS, self.PIDT.CS)
         term2 = max(self.PID.CS, self.PIDT_noH.CS)
-        self.y = sigmoid1 * term1 + sigmoid2 * term2
+        self.y = term2 + sigmoid1 * (term1 - term2)
+        return self.y
+
+    def step(self, dt: float) -> float:
+        """
+        한 타임스텝(dt)마다 제어 신호 계산 (Modelica와 동일한 논리)
+        """
+        self.set_pid_inputs()
+        for pid in self.controllers:
+            pid.step(dt)
+        self.combine()
 
         # # 디버깅 출력 (10분마다)
         # if hasattr(self, '_debug_counter'):
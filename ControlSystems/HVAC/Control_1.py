@@ -1,7 +1,15 @@
+import numpy as np
+
+
 class Control_1:
     """
     Controller for the CHP and heat pump and TES
     """
+    # Threshold margins of the transition/output conditions (see guard_values)
+    GUARDS = ('T_tank - T_min', 'T_tank - (T_max - 10)', 'T_tank - T_max',
+              'T_tank - hysteresis_high', 'T_tank - hysteresis_low',
+              'Mdot_1ry - 0.1*Mdot_max', 'Mdot_1ry - Mdot_max', 'T_high_tank - T_max',
+              'T_low_TES - 333.15', 'time - 1e3')
     
     def __init__(self):
         # Parameters
@@ -10,7 +18,10 @@ class Control_1:
         self.waitTime = 2  # Wait time, between operations
         self.Mdot_max = 38  # Maximum mass flow rate in the greenhouse heating circuit
         
-        # Varying inputs
+        # Varying inputs (set by step() or directly before guard_values())
+        self.T_tank = self.T_min
+        self.Mdot_1ry = 0.0
+        self.T_low_TES = 333.15
         self.T_high_tank = 90 + 273.15
         
         # State variables
@@ -37,6 +48,7 @@ class Control_1:
             T_low_TES (float): Low temperature thermal energy storage [K]
             dt (float): Time step [s]
         """
+        self.T_tank, self.Mdot_1ry, self.T_low_TES = T_tank, Mdot_1ry, T_low_TES
         self.time += dt
         
         # Update hysteresis
@@ -64,3 +76,17 @@ class Control_1:
         self.HP = self.state == "runCHP" and T_low_TES < 333.15
         
         return self.CHP, self.ElectricalHeater, self.HP
+
+    def guard_values(self) -> np.ndarray:
+        """
+        Threshold margins in GUARDS order (a sign change means a condition may switch)
+
+        Reads the inputs set on the controller (T_tank, Mdot_1ry, T_high_tank, T_low_TES),
+        the same values step() uses.
+        """
+        return np.array([self.T_tank - self.T_min, self.T_tank - (self.T_max - 10),
+                         self.T_tank - self.T_max,
+                         self.T_tank - self.hysteresis_high, self.T_tank - self.hysteresis_low,
+                         self.Mdot_1ry - 0.1 * self.Mdot_max, self.Mdot_1ry - self.Mdot_max,
+                         self.T_high_tank - self.T_max, self.T_low_TES - 333.15,
+                         self.time - 1e3], dtype=float)
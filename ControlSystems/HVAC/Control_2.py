@@ -1,7 +1,14 @@
+import numpy as np
+
+
 class Control_2:
     """
     Controller for the CHP and heat pump and TES with modified conditions
     """
+    # Threshold margins of the transition/output conditions (see guard_values)
+    GUARDS = ('T_tank - T_min', 'T_tank - T_max', 'T_su_hx - 363.15',
+              'Mdot_1ry - 0.1*Mdot_max', 'T_tank - hysteresis_high', 'T_tank - hysteresis_low',
+              'T_low_TES - 333.15', 'time - 1e3')
     
     def __init__(self):
         # Parameters
@@ -10,7 +17,10 @@ class Control_2:
         self.waitTime = 2  # Wait time, between operations
         self.Mdot_max = 38  # Maximum mass flow rate in the greenhouse heating circuit
         
-        # Varying inputs
+        # Varying inputs (set by step() or directly before guard_values())
+        self.T_tank = self.T_min
+        self.T_low_TES = 333.15
+        self.T_su_hx = 363.15
         self.Mdot_1ry = 30  # Primary mass flow rate
         
         # State variables
@@ -38,6 +48,7 @@ class Control_2:
             T_su_hx (float): Supply heat exchanger temperature [K]
             dt (float): Time step [s]
         """
+        self.T_tank, self.T_low_TES, self.T_su_hx = T_tank, T_low_TES, T_su_hx
         self.time += dt
         
         # Update hysteresis
@@ -71,3 +82,15 @@ class Control_2:
         self.HP = self.state == "runCHP" and T_low_TES < 333.15
         
         return self.CHP, self.ElectricalHeater, self.HP
+
+    def guard_values(self) -> np.ndarray:
+        """
+        Threshold margins in GUARDS order (a sign change means a condition may switch)
+
+        Reads the inputs set on the controller (T_tank, T_su_hx, Mdot_1ry, T_low_TES),
+        the same values step() uses. The 60 s wait of transition T2 is a timer, not a guard.
+        """
+        return np.array([self.T_tank - self.T_min, self.T_tank - self.T_max, self.T_su_hx - 363.15,
+                         self.Mdot_1ry - 0.1 * self.Mdot_max,
+                         self.T_tank - self.hysteresis_high, self.T_tank - self.hysteresis_low,
+                         self.T_low_TES - 333.15, self.time - 1e3], dtype=float)
@@ -1,9 +1,12 @@
+import numpy as np
 from ControlSystems.PID import PID
 
 class Control_Dehumidifier:
     """
     Controller for the dehumidifier with state machine and PID control
     """
+    # Threshold margins of the state transitions (see guard_values)
+    GUARDS = ('T_air - 293.15', 'T_air - 295.15')
     
     def __init__(self):
         # Parameters
@@ -36,6 +39,11 @@ class Control_Dehumidifier:
         # Humidity setpoint
         self.RH_setpoint = 0.85
         
+        # Varying inputs (set by step() or directly before guard_values())
+        self.T_air = 293.15
+        self.air_RH = 0.85
+        self.T_air_sp = 293.15
+        
     def step(self, T_air: float, air_RH: float, T_air_sp: float, dt: float):
         """
         Step control system state and outputs
@@ -46,6 +54,7 @@ class Control_Dehumidifier:
             T_air_sp (float): Air temperature setpoint [K]
             dt (float): Time step [s]
         """
+        self.T_air, self.air_RH, self.T_air_sp = T_air, air_RH, T_air_sp
         self.time += dt
         
         # State machine logic
@@ -71,3 +80,12 @@ class Control_Dehumidifier:
             self.CS = 0  # Default control signal when dehumidifier is off
     
         return self.Dehum, self.CS
+
+    def guard_values(self) -> np.ndarray:
+        """
+        Threshold margins in GUARDS order (a sign change means a transition may fire)
+
+        Reads T_air as set on the controller; air_RH drives the PID continuously
+        and is not a transition condition.
+        """
+        return np.array([self.T_air - 293.15, self.T_air - 295.15], dtype=float)
@@ -151,14 +151,27 @@
 #         self.I = np.clip(self.I, min_I, max_I)
         
 #         return self.CS
+import math
 import numpy as np
-from scipy.integrate import solve_ivp
 
 class PID:
     """
     Modelica의 ISA PID 컨트롤러를 Python으로 구현한 클래스.
-    - scipy.integrate.solve_ivp를 사용하여 ODE 시스템 해석
+    - 한 스텝 동안 SP, PV와 포화 여부가 일정하므로 상태 방정식 [I, Dx]를 해석해로 이산화
+      I(t+dt)  = I + dt * (SPs - PVs) / Ti                  (포화 없음: 입력 일정 → 선형)
+      I(t+dt)  = I + Ni * (SPs - PVs + track) * (1 - exp(-dt / (Ni * Ti)))
+                 (포화: track = (CSs - Kp*(P + I + D))/(Kp*Ni)이 I에 따라 줄어드는 1차 지연,
+                  dt ≫ Ni*Ti인 샘플링(integrate의 출력 구간)에서도 적분 항이 발산하지 않음)
+      Dx(t+dt) = u + (Dx - u) * exp(-Nd * dt / Td)          (미분 필터: 1차 지연, u = c*SPs - PVs)
+      (감쇠율 exp(-Nd*dt/Td)은 dt/Nd/Td가 바뀔 때만 다시 계산)
+    - 연속 시간 상태 방정식은 _system_dynamics에 그대로 둠 (solve_ivp 적분 결과와 비교용)
+    - PIDBank에 등록하면 y는 뱅크 상태 배열의 행 뷰가 되고, step은 같은 스칼라 경로로
+      그 뷰를 진행한 뒤 track/CS를 뱅크에 기록 (뱅크 전체 진행은 PIDBank.step)
     """
+    # 연결된 컨트롤러 뱅크와 뱅크 내 인덱스 (ControlSystems.PIDBank.register에서 설정)
+    bank = None
+    bank_index = None
+
     def __init__(self, Kp, Ti, Td=0, Nd=1, Ni=1, b=1, c=0,
                  PVmin=0, PVmax=1, CSmin=0, CSmax=1,
                  PVstart=0.5, CSstart=0.5, steadyStateInit=False):
@@ -179,7 +192,7 @@ class PID:
         # 상태 변수 벡터 [I, Dx]
         initial_I = CSstart / Kp if Kp != 0 else 0
         initial_Dx = c * PVstart - PVstart
-        self.y = np.array([initial_I, initial_Dx])
+        self.y = np.array([initial_I, initial_Dx], dtype=float)
 
         # 현재값(PV), 목표값(SP), 제어신호(CS)
         self.PV = PVstart * (PVmax - PVmin) + PVmin
@@ -189,17 +202,25 @@ class PID:
         # 안티 와인드업을 위한 내부 변수
         self.track = 0.0
 
-    def _system_dynamics(self, t, y, SPs, PVs):
+        # 미분 필터 감쇠율 캐시 ((dt, Nd, Td) → exp(-Nd*dt/Td))
+        self._decay_key = None
+        self._decay = 1.0
+
+    def _system_dynamics(self, t, y, SPs, PVs, I_start=None):
         """
-        solve_ivp가 호출할 ODE 시스템 정의 함수
+        연속 시간 상태 방정식 (Modelica 모델과 동일)
         y[0] = I (적분 항)
         y[1] = Dx (미분 상태 변수)
+        I_start: 스텝 시작의 I (주면 포화 중 track이 I를 따라 줄어듦, P와 D는 일정)
         """
         I_current, Dx_current = y
+        track = self.track
+        if track != 0 and I_start is not None:
+            track -= (I_current - I_start) / self.Ni
 
         # der(I) 계산
         if self.Ti > 0:
-            dI_dt = (SPs - PVs + self.track) / self.Ti
+            dI_dt = (SPs - PVs + track) / self.Ti
         else:
             dI_dt = 0
 
@@ -211,26 +232,30 @@ class PID:
             
         return [dI_dt, dDx_dt]
 
+    def _advance(self, dt: float, SPs: float, PVs: float) -> None:
+        """상태 [I, Dx]를 dt만큼 해석적으로 진행 (SPs, PVs와 포화 여부는 스텝 동안 일정)"""
+        y = self.y
+        if self.Ti > 0:
+            if self.track != 0:
+                y[0] += self.Ni * (SPs - PVs + self.track) * -math.expm1(-dt / (self.Ni * self.Ti))
+            else:
+                y[0] += dt * (SPs - PVs) / self.Ti
+        if self.Td > 0:
+            key = (dt, self.Nd, self.Td)
+            if key != self._decay_key:
+                self._decay_key = key
+                self._decay = math.exp(-self.Nd * dt / self.Td)
+            u = self.c * SPs - PVs
+            y[1] = u + (y[1] - u) * self._decay
+
     def step(self, dt: float) -> float:
         """한 타임스텝(dt)마다 제어 신호를 계산합니다."""
-        
         # --- 1. 스케일링 ---
         SPs = (self.SP - self.PVmin) / (self.PVmax - self.PVmin)
         PVs = (self.PV - self.PVmin) / (self.PVmax - self.PVmin)
 
-        # --- 2. ODE 풀이 (solve_ivp 사용) ---
-        # t_span: 현재 시간(0)부터 다음 스텝(dt)까지
-        # y0: 현재 상태 변수 값
-        sol = solve_ivp(
-            fun=self._system_dynamics,
-            t_span=[0, dt],
-            y0=self.y,
-            method='RK45',  # 기본 룬게-쿤타 계열 솔버
-            args=(SPs, PVs)
-        )
-        
-        # 다음 스텝의 상태 변수 값 업데이트
-        self.y = sol.y[:, -1]
+        # --- 2. 상태 변수 진행 (이산 시간 해석해) ---
+        self._advance(dt, SPs, PVs)
         I, Dx = self.y[0], self.y[1]
 
         # --- 3. P, D 항 계산 ---
@@ -242,13 +267,24 @@ class PID:
         
         # --- 4. 제어 신호 계산 및 포화 처리 ---
         CSbs = self.Kp * (P + I + D)
-        CSs = np.clip(CSbs, 0, 1)
+        CSs = min(max(CSbs, 0.0), 1.0)
 
         # --- 5. 안티 와인드업 track 신호 업데이트 ---
-        # 다음 스텝의 _system_dynamics 계산에 사용될 값
+        # 다음 스텝의 적분 항 계산에 사용될 값
         self.track = (CSs - CSbs) / (self.Kp * self.Ni) if self.Kp != 0 else 0
 
         # --- 6. 최종 제어 신호 변환 ---
         self.CS = self.CSmin + CSs * (self.CSmax - self.CSmin)
 
-        return self.CS
\ No newline at end of file
+        if self.bank is not None:
+            self.bank._track[self.bank_index] = self.track
+            self.bank._CS[self.bank_index] = self.CS
+        return self.CS
+
+    def __setstate__(self, state):
+        # pickle(checkpoint/fork) 후 y를 뱅크 상태 배열의 뷰로 다시 연결
+        # (뱅크가 아직 복원 중이면 PIDBank.__setstate__가 연결)
+        self.__dict__.update(state)
+        bank = self.bank
+        if bank is not None and '_y' in bank.__dict__:
+            self.y = bank._y[self.bank_index]
@@ -0,0 +1,164 @@
+import math
+import numpy as np
+from typing import List, Optional, Sequence
+
+from ControlSystems.PID import PID
+
+
+class PIDBank:
+    """
+    여러 ISA PID 컨트롤러를 NumPy 배열로 묶어 한 번에 진행하는 컨트롤러 뱅크
+    - 파라미터(Kp, Ti, Td, Nd, Ni, b, c, PV/CS 스케일 범위)와 내부 상태(I, Dx, track, CS)를
+      컨트롤러별 배열 원소로 저장하고 PID.step과 같은 이산 시간 해석해를 벡터 연산으로 계산
+    - register(pid): 기존 PID 객체의 파라미터/상태를 뱅크로 옮기고 PID를 뱅크에 연결
+      (PV/SP는 지금처럼 PID 객체에 설정, 뱅크가 진행되면 각 PID의 CS/track이 갱신됨)
+    - step(dt): 등록된 모든 컨트롤러를 한 번에 진행 (여러 온실을 함께 진행할 때 한 번 호출)
+    - 연결된 PID의 y는 뱅크 상태 배열 [I, Dx]의 행 뷰이므로 뱅크와 항상 같은 값
+      (pid.step(dt)은 스칼라 경로로 그 뷰를 직접 진행하고 track/CS를 뱅크에 기록)
+    - 파라미터는 등록 시점 값을 사용 (등록 후 PID 객체의 파라미터를 바꾸면 반영되지 않음)
+    """
+
+    _PARAMETERS = ('Kp', 'Ti', 'Td', 'Nd', 'Ni', 'b', 'c', 'PVmin', 'PVmax', 'CSmin', 'CSmax')
+    _STATES = ('track', 'CS')
+
+    def __init__(self, capacity: int = 16):
+        self.n = 0
+        self.members: List[PID] = []
+        for name in self._PARAMETERS + self._STATES:
+            setattr(self, '_' + name, np.zeros(capacity))
+        self._y = np.zeros((capacity, 2))   # 컨트롤러별 [I, Dx] (PID.y가 행 뷰)
+        # 미분 필터 감쇠율 / 포화 적분 이득 캐시 (dt → exp(-Nd*dt/Td), Ni*(1 - exp(-dt/(Ni*Ti))),
+        # 등록 시 초기화)
+        self._decay_dt = None
+        self._decay = None
+        self._gain = None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getattr__(self, name):
+        # bank.Kp, bank.track, ... → 등록된 컨트롤러 수만큼의 배열 뷰
+        if name in self._PARAMETERS or name in self._STATES:
+            return self.__dict__['_' + name][:self.n]
+        if name == 'I':
+            return self.__dict__['_y'][:self.n, 0]
+        if name == 'Dx':
+            return self.__dict__['_y'][:self.n, 1]
+        raise AttributeError(name)
+
+    def __setstate__(self, state):
+        # pickle(checkpoint/fork)은 뷰를 복사본으로 저장하므로 PID.y를 다시 연결
+        self.__dict__.update(state)
+        self._link_members()
+
+    def _link_members(self) -> None:
+        for i, pid in enumerate(self.members):
+            pid.y = self._y[i]
+
+    def _grow(self) -> None:
+        for name in self._PARAMETERS + self._STATES:
+            old = getattr(self, '_' + name)
+            new = np.zeros(max(2 * len(old), 1))
+            new[:len(old)] = old
+            setattr(self, '_' + name, new)
+        old = self._y
+        self._y = np.zeros((max(2 * len(old), 1), 2))
+        self._y[:len(old)] = old
+        self._link_members()
+
+    def register(self, pid: PID) -> int:
+        """
+        PID를 뱅크에 등록합니다.
+
+        Returns:
+            뱅크 내 컨트롤러 인덱스 (pid.bank_index에도 저장)
+        """
+        if pid.bank is not None:
+            raise ValueError("이미 다른 뱅크에 등록된 PID입니다")
+        if self.n == len(self._Kp):
+            self._grow()
+        i = self.n
+        for name in self._PARAMETERS:
+            getattr(self, '_' + name)[i] = getattr(pid, name)
+        self._y[i] = pid.y
+        self._track[i] = pid.track
+        self._CS[i] = pid.CS
+        self.n += 1
+        self.members.append(pid)
+        pid.bank, pid.bank_index = self, i
+        pid.y = self._y[i]
+        self._decay_dt = None
+        return i
+
+    def register_all(self, pids: Sequence[PID]) -> np.ndarray:
+        """여러 PID를 등록하고 인덱스 배열을 반환합니다."""
+        return np.array([self.register(pid) for pid in pids], dtype=np.intp)
+
+    def _decay_factors(self, dt: float) -> np.ndarray:
+        if dt != self._decay_dt:
+            # PID._advance와 같은 math.exp 사용 (단일 PID와 비트 단위로 같은 결과)
+            self._decay = np.array([math.exp(-nd * dt / td) if td > 0 else 1.0
+                                    for nd, td in zip(self.Nd.tolist(), self.Td.tolist())])
+            self._gain = np.array([ni * -math.expm1(-dt / (ni * ti)) if ti > 0 else 0.0
+                                   for ni, ti in zip(self.Ni.tolist(), self.Ti.tolist())])
+            self._decay_dt = dt
+        return self._decay
+
+    def step(self, dt: float, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        등록된 컨트롤러(또는 indices의 컨트롤러)를 한 스텝 진행합니다.
+
+        각 PID 객체의 PV/SP를 읽어 진행한 뒤 PID.CS/track을 갱신합니다. (y는 뱅크 배열의 뷰)
+
+        Returns:
+            진행한 컨트롤러의 제어 신호 CS
+        """
+        sel = slice(0, self.n) if indices is None else indices
+        members = self.members if indices is None else [self.members[i] for i in indices]
+        m = len(members)
+        PV = np.fromiter((pid.PV for pid in members), float, m)
+        SP = np.fromiter((pid.SP for pid in members), float, m)
+
+        Kp, Ti, Td, Nd = self._Kp[sel], self._Ti[sel], self._Td[sel], self._Nd[sel]
+        PVmin, PVspan = self._PVmin[sel], self._PVmax[sel] - self._PVmin[sel]
+        CSmin, CSspan = self._CSmin[sel], self._CSmax[sel] - self._CSmin[sel]
+        c = self._c[sel]
+
+        # --- 1. 스케일링 ---
+        SPs = (SP - PVmin) / PVspan
+        PVs = (PV - PVmin) / PVspan
+
+        # --- 2. 상태 변수 진행 (PID._advance와 같은 해석해) ---
+        has_I, has_D = Ti > 0, Td > 0
+        y = self._y[sel]
+        decay = self._decay_factors(dt)[sel]
+        track = self._track[sel]
+        I = np.where(track != 0, y[:, 0] + (SPs - PVs + track) * self._gain[sel],
+                     y[:, 0] + dt * (SPs - PVs) / np.where(has_I, Ti, 1.0))
+        I = np.where(has_I, I, y[:, 0])
+        u = c * SPs - PVs
+        Dx = y[:, 1]
+        Dx = np.where(has_D, u + (Dx - u) * decay, Dx)
+
+        # --- 3. P, D 항 계산 ---
+        P = self._b[sel] * SPs - PVs
+        D = np.where(has_D, Nd * (u - Dx), 0.0)
+
+        # --- 4. 제어 신호 계산 및 포화 처리 ---
+        CSbs = Kp * (P + I + D)
+        CSs = np.clip(CSbs, 0.0, 1.0)
+
+        # --- 5. 안티 와인드업 track 신호 ---
+        nonzero = Kp != 0
+        track = np.where(nonzero, (CSs - CSbs) / np.where(nonzero, Kp * self._Ni[sel], 1.0), 0.0)
+
+        # --- 6. 최종 제어 신호 변환 ---
+        CS = CSmin + CSs * CSspan
+
+        y[:, 0], y[:, 1] = I, Dx
+        self._y[sel] = y
+        self._track[sel], self._CS[sel] = track, CS
+        for pid, value, tr in zip(members, CS.tolist(), track.tolist()):
+            pid.CS = value
+            pid.track = tr
+        return CS
@@ -61,13 +61,7 @@ class CO2_Air:
         self.port.MC_flow = self.MC_flow
 
         # 2) 농도 변화 적분 (steadystate는 초기화 플래그일 뿐, 시뮬레이션 중에는 항상 변화 허용)
-        dC_dt = self.MC_flow / self.cap_CO2
-        
-        # **안정화**: CO2 농도 변화를 제한하여 급격한 변화 방지
-        max_dC = 50.0  # 최대 CO2 농도 변화량 [mg/m³/s] (더 보수적인 값으로 조정)
-        if abs(dC_dt) > max_dC:
-            dC_dt = max_dC if dC_dt > 0 else -max_dC
-        
+        dC_dt = self.compute_derivatives()
         self.CO2 += dC_dt * dt
 
         # 3) ppm 변환
@@ -80,3 +74,18 @@ class CO2_Air:
 
         # (필요시) MC_flow 반환
         return self.CO2, self.CO2_ppm, self.MC_flow
+
+    def compute_derivatives(self) -> float:
+        """
+        CO2 농도 변화율 (Modelica: der(CO2) = 1/cap_CO2 * MC_flow)
+        
+        Returns:
+            float: dCO2/dt [mg/(m3.s)], 안정화 한계(±50)로 제한된 값
+        """
+        dC_dt = self.MC_flow / self.cap_CO2
+        
+        # **안정화**: CO2 농도 변화를 제한하여 급격한 변화 방지
+        max_dC = 50.0  # 최대 CO2 농도 변화량 [mg/m³/s] (더 보수적인 값으로 조정)
+        if abs(dC_dt) > max_dC:
+            dC_dt = max_dC if dC_dt > 0 else -max_dC
+        return dC_dt
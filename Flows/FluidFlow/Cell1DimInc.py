@@ -5,6 +5,7 @@ from Modelica.Fluid.Interfaces.FluidPort_a import FluidPort_a
 from Modelica.Fluid.Interfaces.FluidPort_b import FluidPort_b
 from Interfaces.Heat.ThermalPortL import ThermalPortL
 from Flows.FluidFlow.HeatTransfer.MassFlowDependence import MassFlowDependence
+from Media.PropertyTables import water_properties
 
 class Cell1DimInc:
     """
@@ -20,7 +21,7 @@ class Cell1DimInc:
                  pstart: float, hstart: float = 1e5,
                  Nt: int = 1, steadystate: bool = True,
                  discretization: Discretizations = Discretizations.centr_diff,
-                 Medium=None):
+                 Medium=None, properties=None):
         """
         Initialize cell model
         
@@ -35,6 +36,8 @@ class Cell1DimInc:
             steadystate (bool): If true, sets the derivative of h to zero during initialization
             discretization (Discretizations): Spatial discretization scheme
             Medium: Fluid medium model
+            properties: Water property tables used without a Medium
+                (default: Media.PropertyTables.water_properties())
         """
         # Geometric characteristics
         self.Vi = Vi
@@ -49,6 +52,8 @@ class Cell1DimInc:
         self.steadystate = steadystate
         self.discretization = discretization
         self.Medium = Medium
+        self.properties = water_properties() if properties is None else properties
+        self.h_ref = 4.2e5  # Enthalpy at 273.15 K without a Medium [J/kg]
         
         # Constants
         self.pi = np.pi
@@ -107,19 +112,9 @@ class Cell1DimInc:
             dict: Fluid state containing temperature, density, etc.
         """
         if self.Medium is None:
-            # Simple ideal gas approximation for testing
-            # Use more realistic values for water-like fluid
-            # Calculate temperature from enthalpy with proper reference
-            h_ref = 4.2e5  # Reference enthalpy at 273.15 K [J/kg]
-            cp = 4200.0    # Specific heat capacity [J/(kg·K)]
-            T_ref = 273.15 # Reference temperature [K]
-            
-            # Temperature calculation: T = T_ref + (h - h_ref) / cp
-            T = T_ref + (self.h - h_ref) / cp
-            # T = max(273.15, T)  # 이 줄을 주석 처리
-            
-            # Density calculation using ideal gas law
-            rho = max(1.0, self.p / (287.0 * T))
+            # Water property tables (h_ref at 273.15 K)
+            T = self.properties.temperature(self.h - self.h_ref)
+            rho = self.properties.density(T)
             
             return {
                 'temperature': T,
@@ -133,13 +128,17 @@ class Cell1DimInc:
     
     def _update_fluid_properties(self):
         """Update fluid properties from current state"""
-        self.fluidState = self._calculate_fluid_state()
-        
         if self.Medium is None:
-            # 온도 제한 해제
-            self.T = self.fluidState['temperature']
-            self.rho = max(1.0, self.fluidState['density'])  # Minimum density of 1 kg/m³
+            # Table lookups, the state dict is updated in place
+            self.T = self.properties.temperature(self.h - self.h_ref)
+            self.rho = self.properties.density(self.T)
+            state = self.fluidState
+            state['temperature'] = self.T
+            state['density'] = self.rho
+            state['pressure'] = self.p
+            state['enthalpy'] = self.h
         else:
+            self.fluidState = self._calculate_fluid_state()
             self.T = self.Medium.temperature(self.fluidState)
             self.rho = max(1.0, self.Medium.density(self.fluidState))  # Safety check
     
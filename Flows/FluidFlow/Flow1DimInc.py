@@ -1,6 +1,7 @@
 import numpy as np
 from dataclasses import dataclass
 from typing import List, Optional, TYPE_CHECKING
+from scipy.linalg import solve_banded
 from Modelica.Fluid.Interfaces.FluidPort_a import FluidPort_a
 from Modelica.Fluid.Interfaces.FluidPort_b import FluidPort_b
 from Interfaces.Heat.ThermalPortConverter import ThermalPortConverter
@@ -13,6 +14,29 @@ from Modelica.Fluid.Interfaces.FluidPort import Medium
 if TYPE_CHECKING:
     from Modelica.Fluid.Interfaces.FluidPort import Medium as MediumType
 
+# Time integration of the cell energy balances in Flow1DimInc.step
+FLOW_METHODS = ('explicit_euler', 'backward_euler')
+
+
+class WallPortView(ThermalPortL):
+    """
+    ThermalPortL whose temperature is one element of a wall temperature array
+    (the Wall_int port of a cell owned by Flow1DimInc)
+    """
+    
+    def __init__(self, T_wall: np.ndarray, i: int):
+        self._T_wall = T_wall
+        self._i = i
+        super().__init__(T=T_wall[i])
+    
+    @property
+    def T(self) -> float:
+        return float(self._T_wall[self._i])
+    
+    @T.setter
+    def T(self, value: float):
+        self._T_wall[self._i] = value
+
 @dataclass
 class SummaryClass:
     """Summary class for storing simulation results"""
@@ -58,8 +82,9 @@ class Cell1DimInc:
         self.OutFlow = FluidPort_b(Medium=self.medium, p_start=self.pstart, h_start=self.hstart)
         self.Wall_int = ThermalPortL()
         
-        # Initialize state variables
-        self.h = self.hstart  # Fluid specific enthalpy [J/kg]
+        # Initialize state variables (h is stored in an array, see bind)
+        self._h = np.array([self.hstart], dtype=float)
+        self._i = 0
         self.rho = 1000.0     # Water density [kg/m³]
         self.c_p = 4186.0     # Water specific heat capacity [J/(kg·K)]
         
@@ -88,6 +113,26 @@ class Cell1DimInc:
             p=self.pstart
         )
     
+    def bind(self, h: np.ndarray, T_wall: np.ndarray, i: int):
+        """
+        Make the cell a view on element i of the enthalpy and wall temperature
+        arrays of a Flow1DimInc (the arrays are the storage, the cell holds no copy)
+        """
+        h[i] = self.h
+        T_wall[i] = self.Wall_int.T
+        self._h = h
+        self._i = i
+        self.Wall_int = WallPortView(T_wall, i)
+    
+    @property
+    def h(self) -> float:
+        """Fluid specific enthalpy [J/kg]"""
+        return float(self._h[self._i])
+    
+    @h.setter
+    def h(self, value: float):
+        self._h[self._i] = value
+    
     @property
     def T(self) -> float:
         """Calculate temperature from enthalpy"""
@@ -107,19 +152,8 @@ class Cell1DimInc:
         dt : float
             Time step [s]
         """
-        # Update mass flow rate (중요: cell 자체의 M_dot도 업데이트)
-        self.M_dot = self.InFlow.m_flow / self.Nt  # cell 자체의 M_dot 업데이트
-        self.heatTransfer.M_dot = self.M_dot       # heatTransfer의 M_dot 업데이트
-        
-        # Calculate heat transfer coefficient
-        self.heatTransfer.calculate()
-        U = self.heatTransfer.U[0]  # 첫 번째 노드의 열전달 계수 사용
-        
-        # Calculate heat flux
-        Q = U * self.Ai * (self.Wall_int.T - self.T)
-        
         # Calculate enthalpy change
-        dh = (Q + self.InFlow.m_flow * (self.InFlow.h_outflow - self.h)) / (self.rho * self.Vi)
+        dh = self.compute_derivatives()
         
         # Update enthalpy
         if not self.steadystate:
@@ -148,15 +182,54 @@ class Cell1DimInc:
         self.Summary.Mdot = self.InFlow.m_flow
         self.Summary.p = self.InFlow.p
 
+    def compute_derivatives(self) -> float:
+        """
+        Enthalpy derivative of the cell (without the steadystate switch)
+        
+        Returns:
+        --------
+        float
+            dh/dt [J/(kg.s)]
+        """
+        # Update mass flow rate (중요: cell 자체의 M_dot도 업데이트)
+        self.M_dot = self.InFlow.m_flow / self.Nt  # cell 자체의 M_dot 업데이트
+        self.heatTransfer.M_dot = self.M_dot       # heatTransfer의 M_dot 업데이트
+        
+        # Calculate heat transfer coefficient
+        self.heatTransfer.calculate()
+        U = self.heatTransfer.U[0]  # 첫 번째 노드의 열전달 계수 사용
+        
+        # Calculate heat flux
+        Q = U * self.Ai * (self.Wall_int.T - self.T)
+        
+        return (Q + self.InFlow.m_flow * (self.InFlow.h_outflow - self.h)) / (self.rho * self.Vi)
+
 class Flow1DimInc:
     """
     1-D fluid flow model (finite volume discretization - incompressible fluid model).
     Based on the Cell component.
+    
+    The cell enthalpies, heat transfer coefficients and wall temperatures are stored
+    as NumPy arrays (h, U, T_wall) and all N cells are advanced together with one
+    upwind energy balance:
+    
+        rho*Vi*dh_i/dt = M_dot*(h_{i-1} - h_i) + Ai*U_i*(T_wall_i - T_i),   h_{-1} = inlet
+    
+    with M_dot = InFlow.m_flow/Nt the flow per tube. The Cells are kept as views on
+    the arrays (Cells[i].h, Cells[i].Wall_int.T) for port connections.
+    Reverse flow is not modelled (negative flows carry no enthalpy).
+    
+    With imposed_heat_flow the heat ports set the heat flow instead of the wall
+    temperature (wall at the water temperature): Q_port[i] is the heat flow into
+    cell i of all Nt tubes and replaces the wall term,
+    
+        rho*Vi*dh_i/dt = M_dot*(h_{i-1} - h_i) + Q_port_i/Nt
     """
     
     def __init__(self, N=10, A=16.18, Nt=1, Mdotnom=0.2588, Unom=1000.0,
                  V=0.03781, pstart=1e5, Tstart_inlet=293.15, Tstart_outlet=283.15,
-                 steadystate=True, medium: Optional['MediumType'] = None):
+                 steadystate=True, medium: Optional['MediumType'] = None,
+                 method='explicit_euler', properties=None, imposed_heat_flow=False):
         """
         Initialize flow model
         
@@ -182,9 +255,23 @@ class Flow1DimInc:
             Outlet temperature start value [K]
         steadystate : bool
             If true, sets the derivative of h to zero during initialization
+            (applies to all cells of the pipe, until complete_initialization())
         medium : Optional['MediumType']
             Medium model
+        method : str
+            Time integration of step, one of FLOW_METHODS:
+            'explicit_euler' (stable while dt < rho*Vi/(M_dot + Ai*U/c_p)) or
+            'backward_euler' (implicit, unconditionally stable for short residence times)
+        properties : Media.PropertyTables.WaterProperties, optional
+            Water property tables; cell temperatures, densities and heat capacities
+            then follow h instead of the constants rho and c_p
+        imposed_heat_flow : bool
+            If true, the cells take the heat flow Q_port from the heat ports instead
+            of the wall heat transfer Ai*U*(T_wall - T)
         """
+        if method not in FLOW_METHODS:
+            raise ValueError(f"method must be one of {FLOW_METHODS}, got {method!r}")
+        
         # Set default Medium if None
         if medium is None:
             medium = Medium()
@@ -198,10 +285,16 @@ class Flow1DimInc:
         self.V = V
         self.steadystate = steadystate
         self.Medium = medium
+        self.method = method
+        self.properties = properties
+        self.imposed_heat_flow = imposed_heat_flow
+        self._initialization_phase = True
         
         # Constants
         self.rho = 1000.0  # Water density [kg/m³]
         self.c_p = 4186.0  # Water specific heat capacity [J/(kg·K)]
+        self.Vi = V / N    # Cell volume [m³]
+        self.Ai = A / N    # Cell lateral surface [m²]
         
         # Calculate initial enthalpy vector
         hstart = np.linspace(
@@ -210,11 +303,17 @@ class Flow1DimInc:
             N
         )
         
-        # Initialize cells
+        # Cell arrays
+        self.h = np.array(hstart, dtype=float)         # Fluid specific enthalpy [J/kg]
+        self.U = np.full(N, Unom * 0.00001)            # Heat transfer coefficient [W/(m²·K)]
+        self.T_wall = np.full(N, 293.15)               # Wall temperature [K]
+        self.Q_port = np.zeros(N)                      # Heat flow into each cell, all tubes [W]
+        
+        # Initialize cells (views on the arrays)
         self.Cells = [
             Cell1DimInc(
-                Vi=V/N,
-                Ai=A/N,
+                Vi=self.Vi,
+                Ai=self.Ai,
                 Nt=Nt,
                 Mdotnom=Mdotnom,
                 Unom=Unom,
@@ -225,6 +324,8 @@ class Flow1DimInc:
             )
             for i in range(N)
         ]
+        for i, cell in enumerate(self.Cells):
+            cell.bind(self.h, self.T_wall, i)
         
         # Initialize ports and converters
         self.InFlow = FluidPort_a(Medium=medium, p_start=pstart, h_start=hstart[0])
@@ -255,25 +356,138 @@ class Flow1DimInc:
         self.hnode_[1:] = hstart
         
         # Initialize summary
+        T = self.temperatures()
         self.Summary = SummaryClass(
             n=N,
-            T_cell=np.array([cell.T for cell in self.Cells]),
-            h=np.array([cell.h for cell in self.Cells]),
-            T=np.array([cell.T for cell in self.Cells]),
+            T_cell=T,
+            h=self.h.copy(),
+            T=T.copy(),
             hnode=self.hnode_,
-            rho=np.array([cell.rho for cell in self.Cells]),
+            rho=np.full(N, self.rho) if properties is None else self.densities(),
             Mdot=Mdotnom,
             p=pstart
         )
+        self.Summary.T_cell = T
         
         # State variables
         self.Q_tot = 0.0  # Total heat flux [W]
         self.M_tot = 0.0  # Total mass [kg]
     
+    def complete_initialization(self):
+        """End the initialization phase (steadystate no longer freezes h)"""
+        self._initialization_phase = False
+    
+    @property
+    def frozen(self) -> bool:
+        """True while the steadystate switch holds dh/dt at zero"""
+        return self._initialization_phase and self.steadystate
+    
+    def get_enthalpies(self) -> np.ndarray:
+        """Cell enthalpy vector [J/kg]"""
+        return self.h.copy()
+    
+    def set_enthalpies(self, h) -> None:
+        """
+        Set the cell enthalpies and refresh the Summary temperature profile
+        
+        Parameters:
+        -----------
+        h : array_like
+            Cell enthalpies [J/kg], length N
+        """
+        self.h[:] = h
+        self.OutFlow.h_outflow = self.h[-1]
+        self._update_summary()
+    
+    def temperatures(self) -> np.ndarray:
+        """Cell temperature vector [K]"""
+        if self.properties is not None:
+            return self.properties.temperature(self.h)
+        return self.h / self.c_p + 273.15
+    
+    def densities(self):
+        """Cell densities [kg/m³] (array with properties, else the constant rho)"""
+        if self.properties is not None:
+            return self.properties.density(self.temperatures())
+        return self.rho
+    
+    def _flow_per_tube(self) -> float:
+        """Mass flow rate per tube entering the first cell [kg/s]"""
+        return self.InFlow.m_flow / self.Nt
+    
+    def _heat_transfer_coefficients(self, M_dot: float) -> np.ndarray:
+        """U of every cell (MassFlowDependence: Unom*(1e-5 + |M_dot/Mdotnom|^0.8))"""
+        ratio = abs(M_dot / self.Mdotnom) if self.Mdotnom != 0 else 0.0
+        self.U[:] = self.Unom * (0.00001 + ratio ** 0.8)
+        return self.U
+    
+    def compute_derivatives(self) -> np.ndarray:
+        """
+        Cell enthalpy derivatives dh/dt [J/(kg.s)], zero for a steady-state pipe
+        during initialization
+        """
+        if self.frozen:
+            return np.zeros(self.N)
+        M_dot = self._flow_per_tube()
+        U = self._heat_transfer_coefficients(M_dot)
+        h_su = np.empty(self.N)
+        h_su[0] = self.InFlow.h_outflow
+        h_su[1:] = self.h[:-1]
+        return (max(M_dot, 0.0) * (h_su - self.h) + self._wall_heat_flow(U)) / (
+            self.densities() * self.Vi)
+    
+    def _wall_heat_flow(self, U: np.ndarray) -> np.ndarray:
+        """Heat flow into each cell of one tube [W]"""
+        if self.imposed_heat_flow:
+            return self.Q_port / self.Nt
+        return self.Ai * U * (self.T_wall - self.temperatures())
+    
+    def _implicit_step(self, dt: float, M_dot: float, U: np.ndarray) -> np.ndarray:
+        """
+        Backward Euler step of the upwind balance. The system matrix is lower
+        bidiagonal (each cell only sees its upstream neighbour):
+        
+            (rho*Vi/dt + M + Ai*U_i/c_p)*h_i - M*h_{i-1} = rho*Vi/dt*h_i^n + Ai*U_i*(T_wall_i - 273.15)
+        
+        (with imposed_heat_flow: U_i = 0 and Q_port_i/Nt on the right-hand side).
+        With property tables T(h) is linearised around h^n (T ~ T^n + (h - h^n)/c_p(T^n))
+        and rho, c_p are taken at T^n, so 273.15 becomes T^n - h^n/c_p(T^n).
+        """
+        M = max(M_dot, 0.0)
+        if self.properties is None:
+            rho, c_p, T_0 = self.rho, self.c_p, 273.15
+        else:
+            T = self.temperatures()
+            rho, c_p = self.properties.density(T), self.properties.cp(T)
+            T_0 = T - self.h / c_p
+        C = rho * self.Vi / dt
+        ab = np.empty((2, self.N))
+        ab[1, :-1] = -M
+        ab[1, -1] = 0.0
+        if self.imposed_heat_flow:
+            ab[0] = C + M
+            rhs = C * self.h + self.Q_port / self.Nt
+        else:
+            G = self.Ai * U
+            ab[0] = C + M + G / c_p
+            rhs = C * self.h + G * (self.T_wall - T_0)
+        rhs[0] += M * self.InFlow.h_outflow
+        return solve_banded((1, 0), ab, rhs)
+    
     def specific_enthalpy(self, p, T):
         """Calculate specific enthalpy of water"""
+        if self.properties is not None:
+            return self.properties.enthalpy(T)
         return self.c_p * (T - 273.15)
     
+    def _update_summary(self):
+        T = self.temperatures()
+        self.Summary.T_cell = T
+        self.Summary.h = self.h.copy()
+        self.Summary.T = T
+        if self.properties is not None:
+            self.Summary.rho = self.properties.density(T)
+    
     def step(self, dt):
         """
         Advance the simulation by one time step
@@ -283,28 +497,47 @@ class Flow1DimInc:
         dt : float
             Time step [s]
         """
-        # Update cells
-        for cell in self.Cells:
-            cell.step(dt)
+        if not self.frozen:
+            if self.method == 'backward_euler':
+                M_dot = self._flow_per_tube()
+                self.h[:] = self._implicit_step(dt, M_dot, self._heat_transfer_coefficients(M_dot))
+            else:
+                self.h += self.compute_derivatives() * dt
+        self.update()
+    
+    def update(self):
+        """
+        Update the outlet port, converters, node enthalpies, Q_tot and Summary
+        from the current enthalpies (no time integration)
+        """
+        U = self._heat_transfer_coefficients(self._flow_per_tube())
         
-        # Update converters
-        self.thermalPortConverter.update()
+        # Outlet port (static mass balance)
+        self.OutFlow.h_outflow = self.h[-1]
+        self.OutFlow.p = self.InFlow.p
+        self.OutFlow.m_flow = -self.InFlow.m_flow
+        
+        # Update converters (single[i].T = multi.T[i] is written to the wall array at once)
+        self.T_wall[:] = self.thermalPortConverter.multi.T
         self.heatPort_ThermoCycle_Modelica.update()
         
-        # Update node enthalpies (Modelica와 동일하게)
-        for i in range(self.N):
-            self.hnode_[i+1] = self.Cells[i].hnode_su
-        self.hnode_[self.N] = self.Cells[-1].hnode_ex
+        # Update node enthalpies (Modelica와 동일하게: 셀 입구 노드 + 마지막 셀 출구)
+        self.hnode_[0] = self.InFlow.h_outflow
+        self.hnode_[1:] = self.h
         
         # Calculate total heat flux and mass (Modelica와 동일하게)
-        self.Q_tot = self.A/self.N * sum(cell.heatTransfer.q_dot[0] for cell in self.Cells) * self.Nt
-        self.M_tot = self.V/self.N * sum(cell.rho for cell in self.Cells)
+        if self.imposed_heat_flow:
+            self.Q_tot = float(np.sum(self.Q_port))
+        else:
+            q_dot = U * (self.T_wall - self.temperatures())
+            self.Q_tot = self.Ai * float(np.sum(q_dot)) * self.Nt
+        if self.properties is None:
+            self.M_tot = self.V * self.rho
+        else:
+            self.M_tot = self.Vi * float(np.sum(self.densities()))
         
         # Update summary (Modelica와 동일하게)
-        self.Summary.T_cell = np.array([cell.T for cell in self.Cells])
-        self.Summary.h = np.array([cell.h for cell in self.Cells])
-        self.Summary.T = np.array([cell.T for cell in self.Cells])
+        self._update_summary()
         self.Summary.hnode = self.hnode_
-        self.Summary.rho = np.array([cell.rho for cell in self.Cells])
-        self.Summary.Mdot = self.Cells[0].InFlow.m_flow  # InFlow.m_flow 사용
-        self.Summary.p = self.Cells[0].p  # Cells[1].p 사용
+        self.Summary.Mdot = self.InFlow.m_flow
+        self.Summary.p = self.InFlow.p
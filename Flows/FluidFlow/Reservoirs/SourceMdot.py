@@ -43,9 +43,9 @@ class SourceMdot:
             if self.Medium and hasattr(self.Medium, 'specificEnthalpy_pTX'):
                 self.h = self.Medium.specificEnthalpy_pTX(self.p, T, [])
             else:
-                # For water: h = c_p * T (approximate)
+                # For water: h = c_p * (T - 273.15) (approximate, same reference as Flow1DimInc)
                 c_p = 4186.0  # [J/kg·K] for water
-                self.h = c_p * T
+                self.h = c_p * (T - 273.15)
             self.flangeB.h_outflow = self.h
         else:
             self.flangeB.h_outflow = h
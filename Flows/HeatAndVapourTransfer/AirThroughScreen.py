@@ -6,7 +6,7 @@ class AirThroughScreen(Element1D):
     Heat and mass flux exchange and air exchange rate through the screen
     """
     
-    def __init__(self, A: float, W: float, K: float, SC: float = 0.0):
+    def __init__(self, A: float, W: float, K: float, SC: float = 0.0, properties=None):
         """
         Initialize air through screen model
         
@@ -15,6 +15,8 @@ class AirThroughScreen(Element1D):
             W (float): Length of the screen when closed (SC=1) [m]
             K (float): Screen flow coefficient
             SC (float): Screen closure (1:closed, 0:open)
+            properties: Air property tables (Media.PropertyTables.AirProperties) for the
+                densities and c_p at the port temperatures (default: ideal gas, constant c_p)
         """
         super().__init__()  # Initialize Element1D
         
@@ -23,6 +25,7 @@ class AirThroughScreen(Element1D):
         self.W = W
         self.K = K
         self.SC = SC  # Initialize SC as a parameter
+        self.properties = properties
         
         # Constants
         self.c_p_air = 1005.0  # Specific heat capacity of air [J/(kg.K)]
@@ -60,8 +63,13 @@ class AirThroughScreen(Element1D):
             tuple: (Q_flow, MV_flow) Heat and mass flow rates [W, kg/s]
         """
         # Calculate air densities (simplified from Modelica.Media.Air.ReferenceAir.Air_pT)
-        self.rho_air = 1e5 / (287.0 * T_a)  # Ideal gas law
-        self.rho_top = 1e5 / (287.0 * T_b)
+        if self.properties is None:
+            self.rho_air = 1e5 / (287.0 * T_a)  # Ideal gas law
+            self.rho_top = 1e5 / (287.0 * T_b)
+        else:
+            self.rho_air = self.properties.density(1e5, T_a)
+            self.rho_top = self.properties.density(1e5, T_b)
+            self.c_p_air = self.properties.cp(T_a)
         self.rho_mean = (self.rho_air + self.rho_top) / 2
         
         # Calculate air exchange rate
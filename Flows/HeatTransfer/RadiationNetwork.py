@@ -0,0 +1,159 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+class RadiationNetwork:
+    """
+    Long-wave radiation network between the greenhouse surfaces.
+
+    Every surface is one or more nodes (a heating pipe has one node per cell) and every
+    radiation element (Radiation_T4 between two single surfaces, Radiation_N between the
+    N cells of a pipe and a single surface) is a link whose exchange coefficient REC_ab
+    is written into a node-by-node REC matrix. All long-wave flows are then computed at
+    once with one T^4 evaluation per node:
+
+        Q = A ∘ REC ∘ (T4[:, None] - T4[None, :])      (Q[i, j]: heat flow node i → node j [W])
+
+    where A[i, j] is the exchange area of the pair (A of the element, A/N for the N cells
+    of a Radiation_N). The net flow received by each surface feeds the heat balances directly.
+
+    The elements keep their parameters and view factors (FFa, FFb, FFab1-4); the network
+    reads REC_ab in update_coefficients(), so the elements' own step() is not needed.
+    """
+
+    def __init__(self):
+        self.surfaces: Dict[str, slice] = {}
+        self.links: List[Tuple[str, object, str, str]] = []
+        self.n = 0
+
+        # Node arrays
+        self.T = np.zeros(0)          # Node temperatures [K]
+        self.REC = np.zeros((0, 0))   # Radiation exchange coefficients [W/(m²·K⁴)]
+        self.A = np.zeros((0, 0))     # Exchange area of each node pair [m²]
+        self.Q = np.zeros((0, 0))     # Heat flow node i → node j [W]
+
+        # Results
+        self.Q_node = np.zeros(0)     # Net heat flow received by each node [W]
+        self.Q_surface = np.zeros(0)  # Net heat flow received by each surface [W]
+        self.Q_link = np.zeros(0)     # Heat flow of each link, surface a → surface b [W]
+
+        self._link_index: Dict[str, int] = {}
+        self._surface_index: Dict[str, int] = {}
+
+    def add_surface(self, name: str, N: int = 1) -> slice:
+        """
+        Add a surface with N nodes
+
+        Args:
+            name: Surface name (unique)
+            N: Number of nodes (e.g. cells of a heating pipe)
+
+        Returns:
+            slice of the surface nodes in T
+        """
+        if name in self.surfaces:
+            raise ValueError(f"Surface '{name}' already exists")
+        if N < 1:
+            raise ValueError(f"N must be at least 1, got {N}")
+        nodes = slice(self.n, self.n + N)
+        self.surfaces[name] = nodes
+        self._surface_index[name] = len(self._surface_index)
+        self.n += N
+        self.T = np.concatenate([self.T, np.full(N, 293.15)])
+        self._resize()
+        return nodes
+
+    def connect(self, name: str, element, a: str, b: str) -> None:
+        """
+        Add a radiation element as a link from surface a to surface b
+
+        Args:
+            name: Link name (e.g. 'Q_rad_CanCov')
+            element: Radiation_T4 (a, b single nodes) or Radiation_N (a has element.N nodes)
+            a: Name of the surface on port_a / heatPorts_a
+            b: Name of the surface on port_b
+        """
+        if name in self._link_index:
+            raise ValueError(f"Link '{name}' already exists")
+        nodes_a, nodes_b = self.surfaces[a], self.surfaces[b]
+        N_a = nodes_a.stop - nodes_a.start
+        if N_a != getattr(element, 'N', 1) or nodes_b.stop - nodes_b.start != 1:
+            raise ValueError(f"Link '{name}': surface '{a}' must have {getattr(element, 'N', 1)} "
+                             f"node(s) and surface '{b}' one node")
+        rows = np.arange(nodes_a.start, nodes_a.stop)
+        if np.any(self.A[rows, nodes_b.start] != 0) or np.any(self.A[nodes_b.start, rows] != 0):
+            raise ValueError(f"Link '{name}': surfaces '{a}' and '{b}' are already connected")
+        self.A[rows, nodes_b.start] = element.A / N_a
+        self._link_index[name] = len(self.links)
+        self.links.append((name, element, a, b))
+        self._pairs = None
+        self.Q_link = np.zeros(len(self.links))
+
+    def _resize(self):
+        n = self.n
+        A = np.zeros((n, n))
+        A[:self.A.shape[0], :self.A.shape[1]] = self.A
+        self.A = A
+        self.REC = np.zeros((n, n))
+        self.Q = np.zeros((n, n))
+        self.Q_node = np.zeros(n)
+        self.Q_surface = np.zeros(len(self.surfaces))
+        self._pairs = None
+
+    def _build_pairs(self):
+        """Node pairs (rows, cols) of every link and the link each pair belongs to"""
+        rows, cols, link = [], [], []
+        for k, (_, _, a, b) in enumerate(self.links):
+            nodes_a = self.surfaces[a]
+            for i in range(nodes_a.start, nodes_a.stop):
+                rows.append(i)
+                cols.append(self.surfaces[b].start)
+                link.append(k)
+        self._pairs = (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp),
+                       np.array(link, dtype=np.intp))
+        self._surface_starts = np.array([nodes.start for nodes in self.surfaces.values()],
+                                        dtype=np.intp)
+
+    def set_temperature(self, name: str, T) -> None:
+        """Set the node temperature(s) of a surface [K] (scalar or one value per node)"""
+        self.T[self.surfaces[name]] = T
+
+    def update_coefficients(self) -> None:
+        """Read REC_ab of every link element into the REC matrix"""
+        if self._pairs is None:
+            self._build_pairs()
+        rows, cols, link = self._pairs
+        rec = np.array([element.REC_ab for _, element, _, _ in self.links], dtype=float)
+        self.REC[rows, cols] = rec[link]
+
+    def step(self) -> np.ndarray:
+        """
+        Compute all long-wave flows from the current node temperatures
+
+        Returns:
+            Net heat flow received by each surface [W] (order of add_surface)
+        """
+        if self._pairs is None:
+            self.update_coefficients()
+        if np.any(self.T <= 0):
+            raise ValueError("Temperatures must be positive (in Kelvin)")
+        rows, cols, link = self._pairs
+
+        T4 = self.T ** 4
+        self.Q = self.A * self.REC * (T4[:, None] - T4[None, :])
+        self.Q_node = self.Q.sum(axis=0) - self.Q.sum(axis=1)
+        self.Q_surface = np.add.reduceat(self.Q_node, self._surface_starts)
+        self.Q_link = np.bincount(link, weights=self.Q[rows, cols], minlength=len(self.links))
+        return self.Q_surface
+
+    def net_flow(self, name: str) -> float:
+        """Net long-wave heat flow received by a surface [W]"""
+        return float(self.Q_surface[self._surface_index[name]])
+
+    def node_flows(self, name: str) -> np.ndarray:
+        """Net long-wave heat flow received by each node of a surface [W]"""
+        return self.Q_node[self.surfaces[name]]
+
+    def link_flow(self, name: str) -> float:
+        """Heat flow of a link from its surface a to its surface b [W]"""
+        return float(self.Q_link[self._link_index[name]])
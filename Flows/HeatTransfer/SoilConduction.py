@@ -1,17 +1,156 @@
 import numpy as np
+from scipy.linalg import lapack
+from typing import Dict, Tuple
 from Modelica.Thermal.HeatTransfer.Interfaces.HeatPort_a import HeatPort_a
 from Modelica.Thermal.HeatTransfer.Sources.PrescribedTemperature import PrescribedTemperature
 from Flows.HeatTransfer.ThermalConductor import ThermalConductor
 from Components.Greenhouse.BasicComponents.Layer import Layer
 
+SOIL_METHODS = ('exact', 'backward_euler', 'crank_nicolson')
+
+
+def tridiagonal_factor(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    삼중대각 행렬의 LU 분해 (LAPACK dgttrf, 같은 행렬로 여러 번 풀 때 재사용)
+
+    Args:
+        lower: 하부 대각 (길이 n-1, 행 i+1의 열 i)
+        diag: 주 대각 (길이 n)
+        upper: 상부 대각 (길이 n-1, 행 i의 열 i+1)
+
+    Returns:
+        tridiagonal_solve에 넘길 분해 결과 (dl, d, du, du2, ipiv), n < 3이면 (밀집 행렬,)
+    """
+    if len(diag) < 3:    # scipy의 dgttrf 래퍼는 n >= 3만 받음
+        return (np.diag(diag) + np.diag(lower, -1) + np.diag(upper, 1),)
+    dl, d, du, du2, ipiv, info = lapack.dgttrf(lower, diag, upper)
+    if info != 0:
+        raise np.linalg.LinAlgError(f"삼중대각 행렬이 특이합니다 (dgttrf info={info})")
+    return dl, d, du, du2, ipiv
+
+
+def tridiagonal_solve(factor: Tuple[np.ndarray, ...], rhs: np.ndarray) -> np.ndarray:
+    """tridiagonal_factor 결과로 삼중대각 연립방정식 M x = rhs 풀이 (LAPACK dgttrs, O(n))"""
+    if len(factor) == 1:
+        return np.linalg.solve(factor[0], rhs)
+    x, info = lapack.dgttrs(*factor, rhs)
+    if info != 0:
+        raise ValueError(f"dgttrs 인자 오류 (info={info})")
+    return x
+
+
+class LayerPortView(HeatPort_a):
+    """온도와 열유속이 SoilConduction 레이어 배열의 한 원소인 HeatPort_a"""
+
+    def __init__(self, T: np.ndarray, Q_flow: np.ndarray, i: int):
+        self._T = T
+        self._Q_flow = Q_flow
+        self._i = i
+
+    @property
+    def T(self) -> float:
+        return float(self._T[self._i])
+
+    @T.setter
+    def T(self, value: float):
+        self._T[self._i] = value
+
+    @property
+    def Q_flow(self) -> float:
+        return float(self._Q_flow[self._i])
+
+    @Q_flow.setter
+    def Q_flow(self, value: float):
+        self._Q_flow[self._i] = value
+
+
+class SoilLayer(Layer):
+    """
+    온도(T)와 순열유속(Q_flow)이 SoilConduction 레이어 배열의 한 원소인 Layer
+    (heatPort도 같은 원소를 가리키므로 레이어/포트 온도 동기화가 필요 없음)
+    """
+
+    def __init__(self, T: np.ndarray, Q_flow: np.ndarray, i: int, **kwargs):
+        self._T = T
+        self._Q_flow = Q_flow
+        self._i = i
+        super().__init__(T_init=T[i], **kwargs)
+        self.heatPort = LayerPortView(T, Q_flow, i)
+
+    @property
+    def T(self) -> float:
+        return float(self._T[self._i])
+
+    @T.setter
+    def T(self, value: float):
+        self._T[self._i] = value
+
+    @property
+    def Q_flow(self) -> float:
+        return float(self._Q_flow[self._i])
+
+    @Q_flow.setter
+    def Q_flow(self, value: float):
+        self._Q_flow[self._i] = value
+
+
 class SoilConduction:
-    def __init__(self, A, N_c=2, N_s=5, lambda_c=1.7, lambda_s=0.85, steadystate=False):
+    """
+    바닥 아래 콘크리트(N_c) + 토양(N_s) 레이어 전도 모델
+
+    레이어 체인은 고정된 G, C를 가진 선형 RC 회로이므로, 생성 시 열용량 C,
+    전도도 행렬 K(삼중대각), 경계 입력 행렬 B(경계 = [바닥 온도, 심토양 온도])를 한 번 조립하고
+    C dT/dt = -K T + B u 를 다음 방법 중 하나로 적분합니다 (u는 dt 동안 일정):
+    - 'exact': T(t+dt) = Phi(dt) T(t) + Gam(dt) u
+      Phi = exp(-C⁻¹K dt)는 대칭화한 C^-1/2 K C^-1/2의 고유분해로 계산하고 dt별로 캐시
+      (스텝은 작은 행렬-벡터 곱 하나)
+    - 'backward_euler' / 'crank_nicolson': (C/dt + θK) T_new = (C/dt - (1-θ)K) T + B u
+      (θ = 1 / 0.5)를 삼중대각 LU 분해로 풂 (LAPACK dgttrf 분해는 dt별로 캐시,
+      스텝은 dgttrs 한 번으로 O(N))
+    세 방법 모두 무조건 안정하므로 dt = 3600 s에서도 얇은 레이어가 발산하지 않습니다
+    (Crank–Nicolson은 얇은 레이어의 빠른 모드가 큰 dt에서 진동하며 천천히 감쇠,
+     backward Euler는 단조롭지만 1차 정확도).
+
+    레이어 온도와 순열유속은 배열 T_layers, Q_layers(layers 순서)에 저장되고, Layer_c/Layer_s와
+    그 heatPort는 배열 원소를 가리키는 뷰입니다 (Flow1DimInc의 벽 온도와 같은 방식).
+    calculate()는 체인 전도도 g와 [바닥, 레이어들, 심토양] 온도로 전도체 유속을 벡터 연산으로
+    구합니다 (ThermalConductor 객체는 회로 구성과 G만 보관).
+
+    레이어 두께는 기본 배가(doubling) 방식 외에 th_c/th_s로 임의 분포를 줄 수 있고,
+    lambda_*, rho_cp_*는 스칼라 또는 레이어별 배열입니다 (예: 30~100층 깊은 토양 열저장).
+    """
+
+    def __init__(self, A, N_c=2, N_s=5, lambda_c=1.7, lambda_s=0.85, steadystate=False,
+                 th_c=None, th_s=None, rho_cp_c=2e6, rho_cp_s=1.73e6, method='exact'):
+        """
+        Args:
+            A: 바닥 면적 [m²]
+            N_c: 콘크리트 구간 수 (레이어는 N_c - 1개, th_c가 주어지면 len(th_c) + 1)
+            N_s: 토양 레이어 수 (th_s가 주어지면 len(th_s))
+            lambda_c, lambda_s: 열전도율 [W/(m·K)] (스칼라 또는 레이어별 배열)
+            steadystate: True이면 레이어 온도를 진행하지 않음
+            th_c, th_s: 레이어 두께 [m] (None이면 기본 배가 방식)
+            rho_cp_c, rho_cp_s: 체적 열용량 [J/(m³·K)] (스칼라 또는 레이어별 배열)
+            method: 'exact', 'backward_euler', 'crank_nicolson'
+        """
+        if method not in SOIL_METHODS:
+            raise ValueError(f"지원하지 않는 토양 적분 방법: {method} {SOIL_METHODS}")
+        self._custom_profile = th_c is not None or th_s is not None
+        if th_c is not None:
+            N_c = len(th_c) + 1
+        if th_s is not None:
+            N_s = len(th_s)
+        if N_s < 1:
+            raise ValueError(f"토양 레이어 수는 1 이상이어야 합니다: {N_s}")
         self.A = A
         self.N_c = N_c
         self.N_s = N_s
         self.lambda_c = lambda_c
         self.lambda_s = lambda_s
+        self.rho_cp_c = rho_cp_c
+        self.rho_cp_s = rho_cp_s
         self.steadystate = steadystate
+        self.method = method
 
         # Floor 입력 포트
         self.port_a = HeatPort_a()
@@ -20,19 +159,38 @@ class SoilConduction:
         self.T_soil_sp = 283.15  # 사용자가 외부에서 바꿀 수 있음
 
         # 두께 및 전도도 배열 초기화
-        self.th_s = np.zeros(N_s)
+        self.th_s = np.zeros(N_s) if th_s is None else np.array(th_s, dtype=float)
         self.G_s = np.zeros(N_s)
-        self.th_c = np.zeros(max(0, N_c - 1))
+        self.th_c = np.zeros(max(0, N_c - 1)) if th_c is None else np.array(th_c, dtype=float)
         self.G_c = np.zeros(max(0, N_c - 1))
         self.G_cc = 0.0
         self.G_ss = 0.0
 
-        # 두께·전도도 계산
+        # 두께·전도도 계산 (이후 변경되지 않는 파라미터 표이므로 읽기 전용으로 고정,
+        # 모델 fork 시 자식들과 공유됨)
         self._calculate_parameters()
+        for table in (self.th_s, self.G_s, self.th_c, self.G_c):
+            table.setflags(write=False)
         # 컴포넌트 생성 및 포트 연결
         self._initialize_components()
+        # 레이어 RC 회로 행렬 (정확/암시적 적분 엔진)
+        self._build_network()
+
+    @staticmethod
+    def _per_layer(value, n: int) -> np.ndarray:
+        """스칼라 또는 길이 n 배열 → 길이 n 배열"""
+        values = np.asarray(value, dtype=float)
+        if values.ndim and len(values) != n:
+            raise ValueError(f"레이어별 값의 길이 {len(values)}가 레이어 수 {n}와 다릅니다")
+        return np.broadcast_to(values, (n,)).copy()
 
     def _calculate_parameters(self):
+        lam_s = self._per_layer(self.lambda_s, self.N_s)
+        lam_c = self._per_layer(self.lambda_c, max(1, self.N_c - 1))
+        if self._custom_profile:
+            self._calculate_profile_conductances(lam_c, lam_s)
+            return
+
         # 1) Soil 첫 두께
         if self.N_c == 0:
             self.th_s[0] = 0.05
@@ -53,28 +211,56 @@ class SoilConduction:
         if self.N_c == 0:
             # Concrete 없을 때
             for i in range(self.N_s):
-                self.G_s[i] = (self.lambda_s * self.A) / (self.th_s[i] * 0.75)
+                self.G_s[i] = (lam_s[i] * self.A) / (self.th_s[i] * 0.75)
             self.G_cc = 0.0
         else:
             if self.N_c == 1:
-                self.G_cc = (self.lambda_c * self.A) / 0.005
+                self.G_cc = (lam_c[0] * self.A) / 0.005
             else:
                 for i in range(self.N_c - 1):
-                    self.G_c[i] = (self.lambda_c * self.A) / (self.th_c[i] * 0.75)
-                self.G_cc = (self.lambda_c * self.A) / (self.th_c[-1] * 0.5)
+                    self.G_c[i] = (lam_c[i] * self.A) / (self.th_c[i] * 0.75)
+                self.G_cc = (lam_c[-1] * self.A) / (self.th_c[-1] * 0.5)
 
             for i in range(self.N_s):
-                self.G_s[i] = (self.lambda_s * self.A) / (self.th_s[i] * 0.75)
+                self.G_s[i] = (lam_s[i] * self.A) / (self.th_s[i] * 0.75)
 
         # 마지막 Soil층 ↔ 심토양 전도도
-        self.G_ss = (self.lambda_s * self.A) / (self.th_s[-1] * 0.5)
+        self.G_ss = (lam_s[-1] * self.A) / (self.th_s[-1] * 0.5)
+
+    def _calculate_profile_conductances(self, lam_c: np.ndarray, lam_s: np.ndarray) -> None:
+        """
+        임의 두께 분포의 전도도: 인접 레이어 중심 사이 열저항의 직렬 합
+        (경계면 ↔ 첫 레이어 중심, 마지막 레이어 중심 ↔ 심토양은 반 두께)
+        """
+        def chain(th, lam):
+            half = th / (2 * lam * self.A)         # 레이어 반 두께의 열저항 [K/W]
+            G = np.empty(len(th))
+            G[0] = 1.0 / half[0]
+            G[1:] = 1.0 / (half[:-1] + half[1:])
+            return G, half
+
+        if self.N_c > 1:
+            G_c, half_c = chain(self.th_c, lam_c)
+            self.G_c[:] = G_c
+            self.G_cc = 1.0 / half_c[-1]
+        elif self.N_c == 1:
+            self.G_cc = (lam_c[0] * self.A) / 0.005
+        G_s, half_s = chain(self.th_s, lam_s)
+        self.G_s[:] = G_s
+        self.G_ss = 1.0 / half_s[-1]
 
     def _initialize_components(self):
+        # 레이어 온도/순열유속 배열 (콘크리트 → 토양 순, 레이어 객체는 원소 뷰)
+        n_c = max(0, self.N_c - 1)
+        self.T_layers = np.full(n_c + self.N_s, 293.15)
+        self.Q_layers = np.zeros(n_c + self.N_s)
+
         # --- Soil용 ThermalConductor & Layer 생성 ---
         self.TC_s = [ThermalConductor(G=g) for g in self.G_s]
         self.Layer_s = [
-            Layer(rho=1, c_p=1.73e6, A=self.A, V=self.A * th, steadystate=self.steadystate)
-            for th in self.th_s
+            SoilLayer(self.T_layers, self.Q_layers, n_c + i, rho=1, c_p=rho_cp, A=self.A,
+                      V=self.A * th, steadystate=self.steadystate)
+            for i, (th, rho_cp) in enumerate(zip(self.th_s, self._per_layer(self.rho_cp_s, self.N_s)))
         ]
         self.TC_ss = ThermalConductor(G=self.G_ss)
 
@@ -84,8 +270,9 @@ class SoilConduction:
             if self.N_c > 1:
                 self.TC_c = [ThermalConductor(G=g) for g in self.G_c]
                 self.Layer_c = [
-                    Layer(rho=1, c_p=2e6, A=self.A, V=self.A * th, steadystate=self.steadystate)
-                    for th in self.th_c
+                    SoilLayer(self.T_layers, self.Q_layers, i, rho=1, c_p=rho_cp, A=self.A,
+                              V=self.A * th, steadystate=self.steadystate)
+                    for i, (th, rho_cp) in enumerate(zip(self.th_c, self._per_layer(self.rho_cp_c, n_c)))
                 ]
 
         # --- 포트 연결 로직 ---
@@ -136,90 +323,125 @@ class SoilConduction:
         # TC_ss.port_b ↔ soil.port
         self.TC_ss.port_b = self.soil.port
 
+    def _chain_conductances(self) -> np.ndarray:
+        """
+        바닥 → 레이어들 → 심토양 체인의 인접 노드 간 전도도 (길이 레이어 수 + 1)
+
+        TC_cc와 TC_s[0] 사이의 연결점은 열용량이 없는 노드이므로 직렬 전도도로 합침
+        """
+        if self.N_c == 0:
+            first = [self.G_s[0]]
+        else:
+            series = self.G_cc * self.G_s[0] / (self.G_cc + self.G_s[0])
+            first = [series] if self.N_c == 1 else list(self.G_c) + [series]
+        return np.array(first + list(self.G_s[1:]) + [self.G_ss], dtype=float)
+
+    def _build_network(self) -> None:
+        """열용량 C, 삼중대각 전도도 행렬 K, 경계 입력 행렬 B 조립"""
+        g = self._g = self._chain_conductances()
+        # TC_cc와 TC_s[0]은 같은 유속을 나르므로 총 Q_flow에서 직렬 연결 유속을 한 번 더 더함
+        self._series = self.N_c - 1 if self.N_c > 0 else None
+        self._C = np.array([layer.rho * layer.c_p * layer.V for layer in self.layers], dtype=float)
+        self._K_diag = g[:-1] + g[1:]
+        self._K_off = -g[1:-1]          # K[i, i+1] = K[i+1, i]
+        B = np.zeros((len(self._C), 2))
+        B[0, 0] = g[0]     # 바닥 (port_a)
+        B[-1, 1] = g[-1]   # 심토양 (T_soil_sp)
+        self._B = B
+        self._eigen = None
+        self._propagators: Dict[float, Tuple[np.ndarray, np.ndarray]] = {}
+        self._factors: Dict[float, Tuple[np.ndarray, ...]] = {}
+
+    def _K_dot(self, T: np.ndarray) -> np.ndarray:
+        """K T (삼중대각 곱)"""
+        KT = self._K_diag * T
+        KT[:-1] += self._K_off * T[1:]
+        KT[1:] += self._K_off * T[:-1]
+        return KT
+
+    def propagator(self, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+        """dt 동안의 정확한 전이 행렬 (Phi, Gam): T(t+dt) = Phi T(t) + Gam [T_floor, T_soil]"""
+        cached = self._propagators.get(dt)
+        if cached is None:
+            if self._eigen is None:
+                K = np.diag(self._K_diag) + np.diag(self._K_off, 1) + np.diag(self._K_off, -1)
+                # 경계 온도가 일정할 때의 평형 분포 T_ss = K⁻¹ B u
+                steady_gain = np.linalg.solve(K, self._B)
+                # 대칭화: S = C^-1/2 K C^-1/2 = V diag(lam) V^T → Phi = C^-1/2 V exp(-lam dt) V^T C^1/2
+                scale = np.sqrt(self._C)
+                lam, V = np.linalg.eigh(K / np.outer(scale, scale))
+                self._eigen = (lam, V / scale[:, None], V.T * scale[None, :], steady_gain)
+            lam, V_left, V_right, steady_gain = self._eigen
+            Phi = (V_left * np.exp(-lam * dt)) @ V_right
+            Gam = steady_gain - Phi @ steady_gain
+            cached = self._propagators[dt] = (Phi, Gam)
+        return cached
+
+    def _implicit_step(self, dt: float, theta: float) -> np.ndarray:
+        """(C/dt + θK) T_new = C/dt T - (1-θ) K T + B u 를 캐시한 삼중대각 LU 분해로 풂"""
+        factor = self._factors.get(dt)
+        if factor is None:
+            off = theta * self._K_off
+            factor = self._factors[dt] = tridiagonal_factor(off, self._C / dt + theta * self._K_diag, off)
+        T = self.T_layers
+        rhs = self._C / dt * T + self._B @ self._boundary()
+        if theta < 1.0:
+            rhs -= (1.0 - theta) * self._K_dot(T)
+        return tridiagonal_solve(factor, rhs)
+
+    def _boundary(self) -> np.ndarray:
+        return np.array([self.port_a.T, self.T_soil_sp], dtype=float)
+
     def calculate(self):
         """
-        수정된 calculate():
-        1) 모든 Conductor 계산값을 리스트에 저장
-        2) 각 Layer가 받아야 할 순열유속(net Q)을 계산하여 set_heat_flow() 호출
-        3) 총 Q_flow를 반환
+        전도체 유속으로 레이어 순열유속(Q_layers)을 갱신하고 모든 전도체 유속의 합을 반환
+
+        체인 노드 [바닥, 레이어들, 심토양] 사이 유속 q = g (T_위 - T_아래)
+        (레이어 i 순열유속 = q[i] - q[i+1])
         """
-        # (0) 심토양 온도 설정
-        self.soil.T = self.T_soil_sp
+        # 심토양 온도 설정 (경계 포트까지 갱신)
+        self.soil.update_temperature(self.T_soil_sp)
+        nodes = np.concatenate(((self.port_a.T,), self.T_layers, (self.T_soil_sp,)))
+        q = self._g * (nodes[:-1] - nodes[1:])
+        np.subtract(q[:-1], q[1:], out=self.Q_layers)
+        Q_flow = q.sum()
+        if self._series is not None:
+            Q_flow += q[self._series]
+        return float(Q_flow)
+
+    @property
+    def layers(self):
+        """콘크리트층(Layer_c) 다음에 토양층(Layer_s) 순서의 레이어 리스트"""
+        if self.N_c > 1:
+            return self.Layer_c + self.Layer_s
+        return list(self.Layer_s)
 
-        # (1) 콘크리트가 없는 경우 (N_c == 0)
-        if self.N_c == 0:
-            Q_list_s = [tc.calculate() for tc in self.TC_s]  # Soil 전도체들
-            Q_ss = self.TC_ss.calculate()
+    def get_layer_temperatures(self):
+        """레이어 온도 벡터 [K] (layers 순서, 복사본)"""
+        return self.T_layers.copy()
 
-            # Soil층 순열유속 계산
-            for i in range(self.N_s):
-                if i == 0:
-                    net_Q = Q_list_s[0] - (Q_list_s[1] if self.N_s > 1 else 0.0)
-                elif i < self.N_s - 1:
-                    net_Q = Q_list_s[i] - Q_list_s[i+1]
-                else:
-                    net_Q = Q_list_s[-1] - Q_ss
-                self.Layer_s[i].set_heat_flow(net_Q)
-
-            Q_flow = sum(Q_list_s) + Q_ss
-            return Q_flow
-
-        # (2) 콘크리트 1겹인 경우 (N_c == 1)
-        if self.N_c == 1:
-            Q_cc = self.TC_cc.calculate()
-            Q_list_s = [tc.calculate() for tc in self.TC_s]
-            Q_ss = self.TC_ss.calculate()
-
-            # Soil층 순열유속 계산
-            for i in range(self.N_s):
-                if i == 0:
-                    net_Q = Q_list_s[0] - (Q_list_s[1] if self.N_s > 1 else 0.0)
-                elif i < self.N_s - 1:
-                    net_Q = Q_list_s[i] - Q_list_s[i+1]
-                else:
-                    net_Q = Q_list_s[-1] - Q_ss
-                self.Layer_s[i].set_heat_flow(net_Q)
-
-            Q_flow = Q_cc + sum(Q_list_s) + Q_ss
-            return Q_flow
-
-        # (3) 콘크리트 2겹 이상인 경우 (N_c > 1)
-        Q_list_c = [tc.calculate() for tc in self.TC_c]  # Concrete 전도체들
-        Q_cc = self.TC_cc.calculate()
-        Q_list_s = [tc.calculate() for tc in self.TC_s]  # Soil 전도체들
-        Q_ss = self.TC_ss.calculate()
-
-        # (3-1) Concrete층 순열유속 계산
-        for i in range(self.N_c - 1):
-            if i == 0:
-                net_Q_c = Q_list_c[0] - (Q_list_c[1] if self.N_c - 1 > 1 else 0.0)
-            elif i < self.N_c - 2:
-                net_Q_c = Q_list_c[i] - Q_list_c[i+1]
-            else:
-                net_Q_c = Q_list_c[-1] - Q_cc
-            self.Layer_c[i].set_heat_flow(net_Q_c)
-
-        # (3-2) Soil층 순열유속 계산
-        for i in range(self.N_s):
-            if i == 0:
-                net_Q_s = Q_list_s[0] - (Q_list_s[1] if self.N_s > 1 else 0.0)
-            elif i < self.N_s - 1:
-                net_Q_s = Q_list_s[i] - Q_list_s[i+1]
-            else:
-                net_Q_s = Q_list_s[-1] - Q_ss
-            self.Layer_s[i].set_heat_flow(net_Q_s)
+    def set_layer_temperatures(self, T):
+        """레이어 온도 벡터 [K] 설정 (레이어와 포트는 같은 배열을 가리킴)"""
+        self.T_layers[:] = T
 
-        Q_flow = sum(Q_list_c) + Q_cc + sum(Q_list_s) + Q_ss
-        return Q_flow
+    def compute_derivatives(self):
+        """
+        레이어별 온도 변화율 [K/s] (layers 순서): C⁻¹(-K T + B u)
+        """
+        if self.steadystate:
+            return np.zeros(len(self.layers))
+        return (self._B @ self._boundary() - self._K_dot(self.T_layers)) / self._C
 
     def step(self, dt):
         self.Q_flow = self.calculate()  # Q_flow를 객체의 속성으로 저장
 
         if not self.steadystate:
-            if self.N_c > 1:
-                for layer in self.Layer_c:
-                    layer.update(dt)
-            for layer in self.Layer_s:
-                layer.update(dt)
+            # 바닥/심토양 온도를 dt 동안 일정하게 두고 레이어 온도를 적분
+            if self.method == 'exact':
+                Phi, Gam = self.propagator(dt)
+                T = Phi @ self.T_layers + Gam @ self._boundary()
+            else:
+                T = self._implicit_step(dt, 1.0 if self.method == 'backward_euler' else 0.5)
+            self.T_layers[:] = T
 
         return self.Q_flow  # 저장된 Q_flow 반환
\ No newline at end of file
@@ -0,0 +1,116 @@
+import operator
+from typing import Callable, Dict, List, Tuple, Union
+
+
+class ViewFactorCache:
+    """
+    Dependency cache for the view factors of radiation elements.
+
+    Every entry is a radiation element (Radiation_T4 / Radiation_N) with the view factor
+    attributes it takes from the model, e.g.
+
+        cache.add_entry('Q_rad_CanScr', model.Q_rad_CanScr,
+                        {'FFa': 'canopy.FF', 'FFb': 'thScreen.FF_i', 'FFab1': 'pipe_up.FF'})
+        cache.update(model)
+
+    Sources are dotted attribute paths (the inputs) or constants. The paths are resolved
+    on the object passed to update(model), so the cache holds no reference to the model
+    and is pickled with it (checkpoint/fork). update() reads every input once and
+    recomputes REC_ab only for the entries that depend on an input which moved more than
+    tol since the entry was last computed; all other entries are cache hits.
+
+    In a greenhouse the inputs follow the screen closure (thScreen.FF_i, FF_ij), the leaf
+    area index (canopy.FF) and the pipe geometry (pipe FF), so with a constant screen and
+    a slowly growing crop most updates are hits.
+
+    The element's own parameters (emissivities by default) are compared as well, so a
+    parameter set after construction (e.g. an ensemble member) still reaches REC_ab.
+    """
+
+    def __init__(self, tol: float = 1e-12):
+        """
+        Args:
+            tol: Absolute change of an input that makes its dependent entries dirty
+        """
+        self.tol = tol
+        self.entries: Dict[str, Tuple[object, Dict[str, Union[str, float]], Tuple[str, ...]]] = {}
+
+        # Inputs: getter, value at the last recompute, dependent entries
+        self._getters: Dict[str, Callable] = {}
+        self._values: Dict[str, float] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        self._dirty = set()
+        self._parameters: Dict[str, tuple] = {}  # Element parameters at the last recompute
+
+        # Counters (one per entry and update)
+        self.hits = 0
+        self.misses = 0
+
+    def add_entry(self, name: str, element, view_factors: Dict[str, Union[str, float]],
+                  parameters: Tuple[str, ...] = ('epsilon_a', 'epsilon_b')) -> None:
+        """
+        Add a radiation element
+
+        Args:
+            name: Entry name (unique)
+            element: Radiation element with _update_REC_ab()
+            view_factors: Element attribute -> input path or constant
+            parameters: Element attributes REC_ab also depends on (compared exactly)
+        """
+        if name in self.entries:
+            raise ValueError(f"Entry '{name}' already exists")
+        for attr, source in view_factors.items():
+            if not hasattr(element, attr):
+                raise ValueError(f"Entry '{name}': element has no attribute '{attr}'")
+            if isinstance(source, str):
+                if source not in self._getters:
+                    self._getters[source] = operator.attrgetter(source)
+                    self._dependents[source] = []
+                self._dependents[source].append(name)
+        self.entries[name] = (element, dict(view_factors), tuple(parameters))
+        self._dirty.add(name)
+
+    def invalidate(self, name: str = None) -> None:
+        """Force a recompute of one entry (or all entries) at the next update()"""
+        self._dirty.update(self.entries if name is None else (name,))
+
+    def update(self, model) -> bool:
+        """
+        Recompute REC_ab of the entries whose inputs changed
+
+        Args:
+            model: Object the input paths are resolved on (e.g. the greenhouse model)
+
+        Returns:
+            True if any REC_ab was recomputed
+        """
+        dirty = self._dirty
+        for source, getter in self._getters.items():
+            value = float(getter(model))
+            last = self._values.get(source)
+            if last is None or abs(value - last) > self.tol:
+                self._values[source] = value
+                dirty.update(self._dependents[source])
+
+        for name, (element, view_factors, names) in self.entries.items():
+            parameters = tuple(getattr(element, attr) for attr in names)
+            if name not in dirty:
+                if parameters == self._parameters[name]:
+                    self.hits += 1
+                    continue
+                dirty.add(name)
+            self._parameters[name] = parameters
+            for attr, source in view_factors.items():
+                setattr(element, attr, self._values[source] if isinstance(source, str) else source)
+            element._update_REC_ab()
+            self.misses += 1
+
+        changed = bool(dirty)
+        dirty.clear()
+        return changed
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of entry updates served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
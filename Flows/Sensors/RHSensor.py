@@ -1,7 +1,7 @@
 import numpy as np
 from Interfaces.Vapour.WaterMassPort_a import WaterMassPort_a
 from Modelica.Thermal.HeatTransfer.Interfaces.HeatPort_a import HeatPort_a
-from Modelica.Media.MoistAir.relativeHumidity_pTX import relativeHumidity_pTX
+from Functions import Psychrometrics
 
 import numpy as np
 import math
@@ -46,7 +46,7 @@ class RHSensor:
         
     def calculate_saturation_pressure(self, T: float) -> float:
         """
-        포화 수증기압 계산 (Antoine 방정식 사용)
+        포화 수증기압 계산 (Functions.Psychrometrics, Air/SurfaceVP와 같은 식)
         
         Args:
             T: 온도 (K)
@@ -54,22 +54,7 @@ class RHSensor:
         Returns:
             포화 수증기압 (Pa)
         """
-        # Antoine 방정식 계수 (물)
-        A = 8.07131
-        B = 1730.63
-        C = 233.426
-        
-        # 온도를 섭씨로 변환
-        T_celsius = T - 273.15
-        
-        # 포화 수증기압 계산 (mmHg)
-        log_p_sat = A - B / (C + T_celsius)
-        p_sat_mmHg = 10 ** log_p_sat
-        
-        # Pa로 변환
-        p_sat_Pa = p_sat_mmHg * 133.322
-        
-        return p_sat_Pa
+        return Psychrometrics.p_sat(T)
     
     def calculate_relative_humidity_simple(self, P_atm: float, T: float, VP: float) -> float:
         """
@@ -83,14 +68,8 @@ class RHSensor:
         Returns:
             상대습도 (0~1)
         """
-        # 포화 수증기압 계산
-        P_sat = self.calculate_saturation_pressure(T)
-        
-        # 상대습도 = 실제 수증기압 / 포화 수증기압
-        RH = VP / P_sat
-        
-        # 0과 1 사이로 제한
-        return max(0.0, min(1.0, RH))
+        # 상대습도 = 실제 수증기압 / 포화 수증기압 (0과 1 사이로 제한)
+        return Psychrometrics.relative_humidity(T, VP)
     
     def calculate_relative_humidity_detailed(self, P_atm: float, T: float, w_air: float) -> float:
         """
@@ -104,17 +83,9 @@ class RHSensor:
         Returns:
             상대습도 (0~1)
         """
-        # 포화 수증기압 계산
-        P_sat = self.calculate_saturation_pressure(T)
-        
-        # 현재 수증기 압력 계산
-        VP = w_air * P_atm / (self.R_s / self.R_a + w_air)
-        
-        # 상대습도 계산
-        RH = VP / P_sat
-        
-        # 0과 1 사이로 제한
-        return max(0.0, min(1.0, RH))
+        # 현재 수증기 압력 → 상대습도 (0과 1 사이로 제한)
+        VP = Psychrometrics.vapour_pressure_from_humidity_ratio(w_air, P_atm)
+        return Psychrometrics.relative_humidity(T, VP)
     
     def update(self):
         """
@@ -125,18 +96,13 @@ class RHSensor:
         self.massPort.MV_flow = 0.0
         self.heatPort.Q_flow = 0.0
 
-        # 습도비 계산 (Modelica와 동일)
-        if self.P_atm - self.massPort.VP > 0:
-            self.w_air = (self.massPort.VP * self.R_a) / ((self.P_atm - self.massPort.VP) * self.R_s)
+        # 습도비, 상대습도 계산 (Modelica: w_air, relativeHumidity_pTX(P_atm, T, {w_air}))
+        VP = self.massPort.VP
+        if self.P_atm - VP > 0:
+            self.w_air = Psychrometrics.humidity_ratio(VP, self.P_atm)
         else:
             self.w_air = 0.0
-
-        # Modelica와 동일하게 조성 벡터 생성
-        X_water = self.w_air / (1 + self.w_air)
-        X = [X_water]
-
-        # Modelica의 relativeHumidity_pTX 함수 사용
-        self.RH = relativeHumidity_pTX(self.P_atm, self.heatPort.T, X)
+        self.RH = Psychrometrics.relative_humidity(self.heatPort.T, VP)
     
     def get_output(self) -> Dict[str, float]:
         """
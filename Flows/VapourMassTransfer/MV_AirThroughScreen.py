@@ -24,7 +24,7 @@ class MV_AirThroughScreen(Element1D):
     """
     
     def __init__(self, A: float, input_f_AirTop: bool = True, f_AirTop: float = 0.0,
-                 W: float = 0.0, K: float = 0.0):
+                 W: float = 0.0, K: float = 0.0, properties=None):
         """
         Initialize the MV_AirThroughScreen model.
         
@@ -34,6 +34,8 @@ class MV_AirThroughScreen(Element1D):
             f_AirTop (float): Air exchange rate when input_f_AirTop is True
             W (float): Length of the screen when closed (SC=1) in m
             K (float): Screen flow coefficient
+            properties: Air property tables (Media.PropertyTables.AirProperties) for the
+                densities (default: Air_pT.density_pT)
         """
         super().__init__()
         
@@ -43,6 +45,7 @@ class MV_AirThroughScreen(Element1D):
         self.f_AirTop = f_AirTop
         self.W = W
         self.K = K
+        self.properties = properties
         
         # Varying inputs
         self.SC = 0.0  # Screen closure 1:closed, 0:open
@@ -106,8 +109,12 @@ class MV_AirThroughScreen(Element1D):
             self.dT = 999.0
         else:
             # Calculate air densities using Air_pT model (Modelica: Air_pT.density_pT)
-            self.rho_air = Air_pT.density_pT(1e5, self.T_a)
-            self.rho_top = Air_pT.density_pT(1e5, self.T_b)
+            if self.properties is None:
+                self.rho_air = Air_pT.density_pT(1e5, self.T_a)
+                self.rho_top = Air_pT.density_pT(1e5, self.T_b)
+            else:
+                self.rho_air = self.properties.density(1e5, self.T_a)
+                self.rho_top = self.properties.density(1e5, self.T_b)
             self.rho_mean = (self.rho_air + self.rho_top) / 2
             self.dT = self.T_a - self.T_b
             
@@ -1,4 +1,4 @@
-import numpy as np
+from Functions import Psychrometrics
 
 class DerivativeSaturatedVapourPressure:
     """
@@ -15,5 +15,4 @@ class DerivativeSaturatedVapourPressure:
         Returns:
             float: Slope of saturation pressure [Pa/K]
         """
-        dpSat_dT = 47.82 * np.exp(0.0545 * TSat)
-        return dpSat_dT
+        return Psychrometrics.dp_sat_dT(TSat + 273.15)
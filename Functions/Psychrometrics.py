@@ -0,0 +1,76 @@
+"""
+Psychrometrics.py
+습공기 상태 함수 (포화수증기압, 기울기, RH↔VP, 습도비, 이슬점)
+- 모든 함수는 스칼라 또는 배열을 받음: 스칼라(float/int, np.float64 포함)는 math로 계산하는
+  빠른 경로, 배열/리스트는 NumPy로 한 번에 계산
+- 포화수증기압은 한 가지 식(Modelica.Media.Air.MoistAir.saturationPressureLiquid)만 사용
+  (Air/Air_Top/RHSensor의 RH, SurfaceVP의 표면 포화수증기압, 외기 VPout이 같은 식을 공유)
+- 온도는 켈빈 [K], 상대습도는 0~1
+"""
+
+import math
+import numpy as np
+
+P_ATM = 101325.0   # 대기압 [Pa]
+R_A = 287.0        # 건조공기 기체상수 [J/(kg·K)]
+R_S = 461.5        # 수증기 기체상수 [J/(kg·K)]
+
+# 포화수증기압 계수 (Modelica.Media.Air.MoistAir): p_sat = P0 * exp(A - B / (T - C))
+P0 = 611.657       # [Pa]
+A = 17.2799
+B = 4102.99        # [K]
+C = 35.719         # [K]
+
+
+def _as_input(x):
+    """(값, 스칼라 여부): 스칼라는 그대로, 그 외는 float 배열"""
+    if isinstance(x, (float, int)):
+        return x, True
+    return np.asarray(x, dtype=float), False
+
+
+def p_sat(T):
+    """포화수증기압 [Pa] (T: 온도 [K])"""
+    T, scalar = _as_input(T)
+    x = A - B / (T - C)
+    return P0 * (math.exp(x) if scalar else np.exp(x))
+
+
+def dp_sat_dT(T):
+    """포화수증기압의 온도 기울기 [Pa/K] (T: 온도 [K])"""
+    T, _ = _as_input(T)
+    return p_sat(T) * B / (T - C) ** 2
+
+
+def vapour_pressure(T, RH):
+    """상대습도로부터 수증기압 [Pa] (T: 온도 [K], RH: 상대습도 0~1)"""
+    RH, _ = _as_input(RH)
+    return RH * p_sat(T)
+
+
+def relative_humidity(T, VP, clip=True):
+    """수증기압으로부터 상대습도 0~1 (clip=True이면 0~1로 제한)"""
+    VP, scalar = _as_input(VP)
+    RH = VP / p_sat(T)
+    if not clip:
+        return RH
+    return max(0.0, min(1.0, RH)) if scalar else np.clip(RH, 0.0, 1.0)
+
+
+def humidity_ratio(VP, P=P_ATM):
+    """습도비 [kg water/kg dry air] (Modelica Air: w_air = VP*R_a/((P - VP)*R_s))"""
+    VP, _ = _as_input(VP)
+    return VP * R_A / ((P - VP) * R_S)
+
+
+def vapour_pressure_from_humidity_ratio(w, P=P_ATM):
+    """습도비로부터 수증기압 [Pa] (humidity_ratio의 역함수)"""
+    w, _ = _as_input(w)
+    return w * P / (R_A / R_S + w)
+
+
+def dew_point(VP):
+    """이슬점 온도 [K] (p_sat(dew_point(VP)) = VP, VP > 0)"""
+    VP, scalar = _as_input(VP)
+    x = math.log(VP / P0) if scalar else np.log(VP / P0)
+    return C + B / (A - x)
@@ -1,4 +1,4 @@
-import numpy as np
+from Functions import Psychrometrics
 
 class SaturatedVapourPressure:
     """
@@ -15,5 +15,4 @@ class SaturatedVapourPressure:
         Returns:
             float: Saturation pressure [Pa]
         """
-        pSat = -274.36 + 877.52 * np.exp(0.0545 * TSat)
-        return pSat
+        return Psychrometrics.p_sat(TSat + 273.15)
@@ -1,4 +1,4 @@
-from Functions.SaturatedVapourPressure import SaturatedVapourPressure
+from Functions import Psychrometrics
 
 class WaterVapourPressure:
     """
@@ -17,6 +17,4 @@ class WaterVapourPressure:
         Returns:
             float: Water vapour pressure [Pa]
         """
-        sat_pressure = SaturatedVapourPressure().calculate(TSat)
-        VP = RH / 100 * sat_pressure
-        return VP
+        return Psychrometrics.vapour_pressure(TSat + 273.15, RH / 100)
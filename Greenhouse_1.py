@@ -6,8 +6,11 @@ Greenhouse_1.py
 - 날씨 데이터: TMY (Typical Meteorological Year) for Brussels
 """
 
+import os
 import numpy as np
 import pandas as pd
+from scipy import sparse
+from scipy.integrate import solve_ivp
 from typing import Dict, List, Optional, Union, Tuple, Any
 from dataclasses import dataclass
 
@@ -26,6 +29,8 @@ from Components.CropYield.TomatoYieldModel import TomatoYieldModel
 # Flows
 from Flows.HeatTransfer.Radiation_T4 import Radiation_T4
 from Flows.HeatTransfer.Radiation_N import Radiation_N
+from Flows.HeatTransfer.RadiationNetwork import RadiationNetwork
+from Flows.HeatTransfer.ViewFactorCache import ViewFactorCache
 from Flows.HeatTransfer.CanopyFreeConvection import CanopyFreeConvection
 from Flows.HeatTransfer.FreeConvection import FreeConvection
 from Flows.HeatTransfer.OutsideAirConvection import OutsideAirConvection
@@ -45,7 +50,16 @@ from Flows.FluidFlow.Reservoirs.SinkP import SinkP
 from Flows.Sensors.RHSensor import RHSensor
 from Flows.Sources.CO2.PrescribedCO2Flow import PrescribedCO2Flow
 from Flows.Sources.CO2.PrescribedConcentration import PrescribedConcentration
-from Functions.WaterVapourPressure import WaterVapourPressure
+from Functions import Psychrometrics
+from state_vector import StateLayout, band_pattern
+from connection_plan import ConnectionPlan, load_connections
+from multirate import build_greenhouse_scheduler
+from input_provider import InputProvider
+from input_cache import load_input_table
+from events import GuardEvents, GUARD_ZERO_TOL
+from steady_state import SteadyStateResult, solve_steady_state
+from flux_kernel import FluxKernel
+import checkpoint
 
 # Control Systems
 from ControlSystems.PID import PID
@@ -109,20 +123,94 @@ VALIDATION_THRESHOLDS = {
     'temperature_range': (273.15, 323.15)  # Valid temperature range [K]
 }
 
+# 열/수증기/CO2 밸런스 상태 블록 (initialize_steady_state(states=...)로 모두 평형에서 시작)
+# 토양 레이어(시정수 수백 시간, 다중 속도 갱신)와 난방 파이프 셀(steadystate 플래그로 처리)은 제외
+BALANCE_STATES = (
+    'air.T', 'air_Top.T', 'cover.T', 'canopy.T', 'floor.T', 'thScreen.T',
+    'air.VP', 'air_Top.VP', 'CO2_air.CO2', 'CO2_top.CO2',
+)
+
+# 제어기 샘플링(_begin_sample)이 읽는 상태 블록
+# (실내 온도/수증기압 → 스크린·환기·난방 PID, CO2 → CO2 PID, 작물 LAI → 작물 수준 일사량)
+CONTROL_STATES = ('air.T', 'air.VP', 'CO2_air.CO2', 'TYM')
+
+# 정상상태 잔차 척도: 단위별 상태 척도 / 1시간 (잔차 1 = 시간당 척도만큼 변화)
+STEADY_STATE_SCALES = {'K': 1.0, 'Pa': 10.0, 'mg/m3': 10.0, 'J/kg': 1e3}
+
+# 장파 복사 네트워크 링크: (복사 요소, port_a 표면, port_b 표면)
+RADIATION_LINKS = (
+    ('Q_rad_CanCov', 'canopy', 'cover'),
+    ('Q_rad_CanScr', 'canopy', 'thScreen'),
+    ('Q_rad_CovSky', 'cover', 'sky'),
+    ('Q_rad_FlrCan', 'floor', 'canopy'),
+    ('Q_rad_FlrCov', 'floor', 'cover'),
+    ('Q_rad_FlrScr', 'floor', 'thScreen'),
+    ('Q_rad_ScrCov', 'thScreen', 'cover'),
+    ('Q_rad_LowFlr', 'pipe_low', 'floor'),
+    ('Q_rad_LowCan', 'pipe_low', 'canopy'),
+    ('Q_rad_LowCov', 'pipe_low', 'cover'),
+    ('Q_rad_LowScr', 'pipe_low', 'thScreen'),
+    ('Q_rad_UpFlr', 'pipe_up', 'floor'),
+    ('Q_rad_UpCan', 'pipe_up', 'canopy'),
+    ('Q_rad_UpCov', 'pipe_up', 'cover'),
+    ('Q_rad_UpScr', 'pipe_up', 'thScreen'),
+)
+
+# 복사 요소별 view factor 의존성: 요소 속성 -> 입력 경로 (또는 상수)
+# 입력은 스크린 개폐(thScreen.FF_i, FF_ij), LAI(canopy.FF), 파이프 형상(pipe FF)만 따르므로
+# ViewFactorCache가 바뀐 입력에 의존하는 REC_ab만 다시 계산
+VIEW_FACTORS = {
+    'Q_rad_CanCov': {'FFa': 'canopy.FF', 'FFb': 1.0, 'FFab1': 'pipe_up.FF', 'FFab2': 'thScreen.FF_ij'},
+    'Q_rad_CanScr': {'FFa': 'canopy.FF', 'FFb': 'thScreen.FF_i', 'FFab1': 'pipe_up.FF'},
+    'Q_rad_CovSky': {},
+    'Q_rad_FlrCan': {'FFa': 1.0, 'FFb': 'canopy.FF', 'FFab1': 'pipe_low.FF'},
+    'Q_rad_FlrCov': {'FFa': 1.0, 'FFb': 1.0, 'FFab1': 'pipe_low.FF', 'FFab3': 'pipe_up.FF',
+                     'FFab4': 'thScreen.FF_ij'},
+    'Q_rad_FlrScr': {'FFa': 1.0, 'FFb': 'thScreen.FF_i', 'FFab2': 'pipe_up.FF', 'FFab3': 'pipe_low.FF'},
+    'Q_rad_ScrCov': {'FFa': 'thScreen.FF_i', 'FFb': 1.0},
+    'Q_rad_LowFlr': {'FFa': 'pipe_low.FF'},
+    'Q_rad_LowCan': {'FFa': 'pipe_low.FF', 'FFb': 'canopy.FF'},
+    'Q_rad_LowCov': {'FFa': 'pipe_low.FF', 'FFab1': 'canopy.FF', 'FFab2': 'pipe_up.FF',
+                     'FFab3': 'thScreen.FF_ij'},
+    'Q_rad_LowScr': {'FFa': 'pipe_low.FF', 'FFb': 'thScreen.FF_i', 'FFab1': 'canopy.FF',
+                     'FFab2': 'pipe_up.FF'},
+    'Q_rad_UpFlr': {'FFa': 'pipe_up.FF', 'FFab1': 'canopy.FF', 'FFab2': 'pipe_low.FF'},
+    'Q_rad_UpCan': {'FFa': 'pipe_up.FF', 'FFb': 'canopy.FF'},
+    'Q_rad_UpCov': {'FFa': 'pipe_up.FF', 'FFab1': 'thScreen.FF_ij'},
+    'Q_rad_UpScr': {'FFa': 'pipe_up.FF', 'FFb': 'thScreen.FF_i'},
+}
+
 # File paths
 WEATHER_DATA_PATH = "./10Dec-22Nov.txt"
 SETPOINT_DATA_PATH = "./SP_10Dec-22Nov.txt"
 SCREEN_USABLE_PATH = "./SC_usable_10Dec-22Nov.txt"
+PORT_CONNECTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     'config', 'port_connections.yaml')
 
 class Greenhouse_1:
 
-    def __init__(self, time_unit_scaling: float = 1.0):
-        """온실 시뮬레이션 모델 초기화"""
+    def __init__(self, time_unit_scaling: float = 1.0,
+                 update_periods: Optional[Dict[str, float]] = None,
+                 input_interpolation: str = 'linear'):
+        """
+        온실 시뮬레이션 모델 초기화
+        
+        Args:
+            time_unit_scaling (float): 시간 단위 스케일
+            update_periods (Dict[str, float]): 느린 컴포넌트 갱신 주기 [s]
+                (None이면 multirate.UPDATE_PERIODS, 0이면 매 스텝 갱신)
+            input_interpolation (str): 입력 보간 방식 ('linear' 또는 'zoh')
+        """
         self.time_unit_scaling = time_unit_scaling
         self.dt = 0.0  # 시간 간격 초기화
+        self.next_time_idx = 0  # 다음에 실행할 스텝 인덱스 (체크포인트 재개 위치)
+        self.pid_bank = None    # PID 컨트롤러 뱅크 (register_controllers로 연결)
+        self._pid_indices = None
         
         # 통합 입력 데이터프레임 생성
         self.input_df = self._load_and_merge_inputs()
+        self.inputs = InputProvider.from_array(self._input_table, list(self.input_df.columns),
+                                               mode=input_interpolation)
         
         # 날씨 데이터 및 설정값 초기화 (Modelica 원본과 일치)
         self.Tout = 293.15      # 외부 온도 [K] (Modelica: Tout)
@@ -148,34 +236,33 @@ class Greenhouse_1:
         # 초기 데이터 로드 (첫 번째 스텝의 데이터로 초기화)
         self._load_initial_data()
         
+        # 느린 컴포넌트(작물, 토양) 다중 속도 스케줄러
+        self.scheduler = build_greenhouse_scheduler(self, update_periods)
+        
+        # 평탄화된 상태 벡터 레이아웃 (pack_state / unpack_state / rhs)
+        self.state_layout = self._build_state_layout()
+        
         print("Greenhouse_1 초기화 완료")
     
     def _load_and_merge_inputs(self):
-        # 파일 읽기 (헤더 포함, skiprows 없이)
-        weather = pd.read_csv(WEATHER_DATA_PATH, sep='\t')
-        setpoint = pd.read_csv(SETPOINT_DATA_PATH, sep='\t')
-        sc_usable = pd.read_csv(SCREEN_USABLE_PATH, sep='\t')
-        # 컬럼명 통일 (필요시)
-        weather = weather.rename(columns={weather.columns[0]: 'time'})
-        setpoint = setpoint.rename(columns={setpoint.columns[0]: 'time'})
-        sc_usable = sc_usable.rename(columns={sc_usable.columns[0]: 'time'})
-        # time 기준 merge (outer join)
-        df = pd.merge(weather, setpoint, on='time', how='outer')
-        df = pd.merge(df, sc_usable, on='time', how='outer')
-        # 시간순 정렬
-        df = df.sort_values('time').reset_index(drop=True)
-        # 결측치 선형 보간
-        df = df.interpolate(method='linear', limit_direction='both')
-        return df
+        # 날씨/설정값/스크린 파일을 time 기준 병합 + 선형 보간 (input_cache.merge_input_tables)
+        # 원본이 바뀌지 않았으면 __inputcache__/의 .npy를 읽기 전용 메모리 매핑으로 재사용
+        names, self._input_table = load_input_table(
+            [WEATHER_DATA_PATH, SETPOINT_DATA_PATH, SCREEN_USABLE_PATH])
+        return pd.DataFrame(self._input_table, columns=names, copy=False)
 
     def _get_input_row(self, current_time):
         # current_time: 초 단위
-        # 가장 가까운 time 행을 반환
-        idx = (self.input_df['time'] - current_time).abs().idxmin()
-        return self.input_df.iloc[idx]
+        # 입력 제공자의 커서 기반 O(1) 조회 (선형 보간 또는 0차 유지, float 값 구조체)
+        return self.inputs.row(current_time)
 
     def _load_initial_data(self) -> None:
-        """초기 데이터를 로드하여 환경 조건을 설정합니다."""
+        """
+        초기 데이터를 로드하여 환경 조건을 설정합니다.
+
+        온도는 외기 기준 경험값으로 시작하며, 평형 상태에서 시작하려면
+        생성 후 initialize_steady_state()를 호출합니다.
+        """
         try:
             # 시간 0초의 입력값으로 초기화
             row = self._get_input_row(0)
@@ -232,7 +319,12 @@ class Greenhouse_1:
             # CO₂ 농도 초기화
             self.CO2_air.CO2 = 1940.0  # 하부공기
             self.CO2_top.CO2 = 1940.0  # 상부공기도 동일하게 초기화
-            
+
+            # 난방 파이프 셀은 시작 엔탈피(Tstart 분포)에서 동적으로 진행
+            # (steadystate 평형 시작은 initialize_steady_state에서 풂)
+            self.pipe_low.flow1DimInc.complete_initialization()
+            self.pipe_up.flow1DimInc.complete_initialization()
+
         except Exception as e:
             print(f"초기 데이터 로드 실패: {e}")
             # 기본값 유지
@@ -539,7 +631,8 @@ class Greenhouse_1:
             epsilon_a=0.88,
             FFa=0.0,  # 임시값, 나중에 pipe_up.FF로 업데이트
             epsilon_b=1.0,
-            FFb=0.0  # 임시값, 나중에 thScreen.FF_i로 업데이트
+            FFb=0.0,  # 임시값, 나중에 thScreen.FF_i로 업데이트
+            N=self.pipe_up.N
         )
 
         # 33. Q_cnv_AirScr (Modelica 원본 순서)
@@ -718,7 +811,19 @@ class Greenhouse_1:
         self.RH_air_sensor = RHSensor()
         self.RH_out_sensor = RHSensor()
 
-        # 56. 컴포넌트 간 연결 업데이트 (순환 참조 해결)
+        # 56. 장파 복사 네트워크 (Q_rad_* 요소를 링크로 사용) + view factor 캐시
+        self.radiation = self._build_radiation_network()
+        self.view_factors = ViewFactorCache()
+        for name, view_factors in VIEW_FACTORS.items():
+            self.view_factors.add_entry(name, getattr(self, name), view_factors)
+
+        # 57. 포트 연결 계획 (config/port_connections.yaml을 한 번 해석)
+        self.heat_connections = ConnectionPlan(
+            self, load_connections(PORT_CONNECTIONS_PATH, ['heat_connections']))
+        self.mass_connections = ConnectionPlan(
+            self, load_connections(PORT_CONNECTIONS_PATH, ['mass_connections', 'co2_connections']))
+
+        # 58. 컴포넌트 간 연결 업데이트 (순환 참조 해결)
         self._update_component_connections()
     
     def _init_state_variables(self) -> None:
@@ -733,6 +838,7 @@ class Greenhouse_1:
         
         # 전기 관련 변수
         self.W_el_illu = 0.0       # 조명 전력 [kWh/m²]
+        self.W_el_illu_instant = 0.0  # 순간 조명 전력 [W/m²]
         self.E_el_tot_kWhm2 = 0.0  # 단위 면적당 총 전기 에너지 [kWh/m²]
         self.E_el_tot = 0.0        # 총 전기 에너지 [kWh]
         
@@ -747,7 +853,7 @@ class Greenhouse_1:
         외부 환경 조건을 설정합니다.
         
         Args:
-            row: 입력 데이터프레임의 한 행(Series)
+            row: 현재 시간의 입력값 (InputRow)
         """
         
         # 외부 온도 (Modelica: TMY_and_control.y[1]) - 섭씨를 켈빈으로 변환
@@ -763,8 +869,8 @@ class Greenhouse_1:
         self.I_glob = row['I_glob']  # col_4가 일사량
         
         # 외부 수증기압 [Pa]
-        # 섭씨 온도와 습도를 사용하여 수증기압 계산
-        self.VPout = WaterVapourPressure().calculate(row['T_out'], row['RH_out'])  # 섭씨 온도, 습도
+        # 외기 온도(°C → K)와 상대습도(% → 0~1)로 수증기압 계산
+        self.VPout = Psychrometrics.vapour_pressure(row['T_out'] + 273.15, row['RH_out'] / 100)
         
         # 조명 ON/OFF 신호 (Modelica: TMY_and_control.y[9])
         self.OnOff = row['ilu_sp'] if 'ilu_sp' in row else 0  # col_9가 조명
@@ -781,7 +887,7 @@ class Greenhouse_1:
         설정값을 업데이트합니다.
         
         Args:
-            row: 입력 데이터프레임의 한 행(Series)
+            row: 현재 시간의 입력값 (InputRow)
         """
         # 공기 온도 설정값 [K]
         self.Tair_setpoint = row['T_sp'] + 273.15 if 'T_sp' in row else 293.15
@@ -791,7 +897,14 @@ class Greenhouse_1:
 
     def step(self, dt: float, time_idx: int) -> None:
         """시뮬레이션 스텝 실행"""
+        row = self._begin_step(dt, time_idx)
+        self._step_controllers(dt)
+        self._finish_step(dt, time_idx, row)
+
+    def _begin_step(self, dt: float, time_idx: int):
+        """스텝 전반부: 입력/설정값 갱신과 제어기 입력(PV, SP) 설정 (PID 진행 전까지)"""
         self.dt = dt  # 시간 간격 업데이트
+        self.next_time_idx = time_idx + 1
         
         # 실제 시간 계산 (초 단위)
         current_time = time_idx * dt  # [초]
@@ -804,8 +917,14 @@ class Greenhouse_1:
         self._set_environmental_conditions(row)
         self._update_setpoints(row)
         
-        # 2. 제어 시스템 업데이트 (스크린 동기화 포함)
-        self._update_control_systems(dt, row)
+        # 2. 제어 시스템 입력 업데이트 (스크린 제어/동기화 포함)
+        self._set_control_inputs(row)
+        return row
+
+    def _finish_step(self, dt: float, time_idx: int, row) -> None:
+        """스텝 후반부: PID 출력 적용 이후의 연결/열·질량 전달/상태 갱신"""
+        # 2. 제어 시스템 출력 적용
+        self._apply_control_outputs(row)
         
         # 3. 난방 시스템 업데이트 (소스/싱크)
         # self._update_heating_system(dt)  # 제거
@@ -843,6 +962,582 @@ class Greenhouse_1:
             except ValueError as e:
                 raise ValueError(f"상태 검증 실패: {str(e)}")
     
+    # ------------------------------------------------------------------
+    # 평탄화된 상태 벡터 인터페이스
+    # ------------------------------------------------------------------
+    def _build_state_layout(self) -> StateLayout:
+        """
+        모든 동적 상태를 하나의 float64 벡터로 배치하는 레이아웃을 생성합니다.
+        
+        순서: 온도(air, air_Top, cover, canopy, floor, thScreen) → 수증기압(air, air_Top)
+        → CO2(air, top) → 토양 레이어 → 난방 파이프 셀 엔탈피 → 작물(TYM) 상태
+        """
+        layout = StateLayout()
+        
+        def set_T(component, *ports):
+            def setter(y):
+                component.T = float(y[0])
+                component.heatPort.T = component.T
+                for port in ports:
+                    port.T = component.T
+            return setter
+        
+        # 1. 온도 [K]
+        layout.add('air.T', 1, lambda: self.air.T,
+                   set_T(self.air, self.air.airVP), self.air.compute_derivatives, 'K',
+                   flags=[(self.air, 'steadystate')])
+        layout.add('air_Top.T', 1, lambda: self.air_Top.T,
+                   set_T(self.air_Top, self.air_Top.air), self.air_Top.compute_derivatives, 'K',
+                   flags=[(self.air_Top, 'steadystate')])
+        layout.add('cover.T', 1, lambda: self.cover.T,
+                   set_T(self.cover, self.cover.surfaceVP), self.cover.compute_derivatives, 'K',
+                   flags=[(self.cover, 'steadystate')])
+        layout.add('canopy.T', 1, lambda: self.canopy.T,
+                   set_T(self.canopy, self.canopy.surfaceVP), self.canopy.compute_derivatives, 'K',
+                   flags=[(self.canopy, 'steadystate')])
+        layout.add('floor.T', 1, lambda: self.floor.T,
+                   set_T(self.floor), self.floor.compute_derivatives, 'K',
+                   flags=[(self.floor, 'steadystate')])
+        layout.add('thScreen.T', 1, lambda: self.thScreen.T,
+                   set_T(self.thScreen, self.thScreen.surfaceVP), self.thScreen.compute_derivatives, 'K',
+                   flags=[(self.thScreen, 'steadystate')])
+        
+        # 2. 수증기압 [Pa] (AirVP 적분기)
+        layout.add('air.VP', 1, lambda: self.air.airVP.VP,
+                   lambda y: self.air.airVP.set_prescribed_pressure(float(y[0])),
+                   self.air.airVP.compute_derivatives, 'Pa',
+                   flags=[(self.air.airVP, 'steadystate')])
+        layout.add('air_Top.VP', 1, lambda: self.air_Top.air.VP,
+                   lambda y: self.air_Top.air.set_prescribed_pressure(float(y[0])),
+                   self.air_Top.air.compute_derivatives, 'Pa',
+                   flags=[(self.air_Top.air, 'steadystate')])
+        
+        # 3. CO2 농도 [mg/m³]
+        for name, co2 in (('CO2_air', self.CO2_air), ('CO2_top', self.CO2_top)):
+            def set_CO2(y, co2=co2):
+                co2.CO2 = float(y[0])
+                co2.CO2_ppm = co2.CO2 / 1.94
+                co2.port.CO2 = co2.CO2
+            # 정상상태 잔차는 안정화 한계(±50 mg/m³/s)로 잘리기 전의 밸런스
+            layout.add(f'{name}.CO2', 1, lambda co2=co2: co2.CO2, set_CO2,
+                       co2.compute_derivatives, 'mg/m3', flags=[(co2, 'steadystate')],
+                       residual=lambda co2=co2: co2.MC_flow / co2.cap_CO2)
+        
+        # 4. 토양 레이어 온도 [K] (콘크리트 → 토양 순)
+        layout.add('Q_cd_Soil.T', len(self.Q_cd_Soil.layers),
+                   self.Q_cd_Soil.get_layer_temperatures,
+                   self.Q_cd_Soil.set_layer_temperatures,
+                   self.Q_cd_Soil.compute_derivatives, 'K',
+                   sparsity=band_pattern(len(self.Q_cd_Soil.layers)),
+                   flags=[(self.Q_cd_Soil, 'steadystate')] +
+                         [(layer, 'steadystate') for layer in self.Q_cd_Soil.layers])
+        
+        # 5. 난방 파이프 셀 엔탈피 [J/kg]
+        for name, pipe in (('pipe_low', self.pipe_low), ('pipe_up', self.pipe_up)):
+            layout.add(f'{name}.h', pipe.N, pipe.flow1DimInc.get_enthalpies,
+                       pipe.set_enthalpies, pipe.flow1DimInc.compute_derivatives, 'J/kg',
+                       sparsity=band_pattern(pipe.N, lower=1, upper=0),  # 상류 셀 → 하류 셀
+                       flags=[(pipe.flow1DimInc, 'steadystate')])
+        
+        # 6. 작물 생육 상태 (TomatoYieldModel.calculate_derivatives 순서)
+        # (미분은 _evaluate_fluxes에서 MC_AirCan 계산과 함께 평가된 값을 사용)
+        layout.add('TYM', self.TYM.n_states, self.TYM.get_state_vector,
+                   self.TYM.set_state_vector, lambda: self._TYM_derivatives,
+                   sparsity=self.TYM.state_sparsity())
+        
+        return layout
+    
+    def pack_state(self) -> np.ndarray:
+        """현재 컴포넌트 상태를 평탄화된 float64 벡터로 반환합니다."""
+        return self.state_layout.pack()
+    
+    def unpack_state(self, y: np.ndarray, names: Optional[List[str]] = None) -> None:
+        """평탄화된 상태 벡터를 각 컴포넌트 객체에 설정합니다. (names가 있으면 그 블록만)"""
+        self.state_layout.unpack(y, names)
+    
+    def rhs(self, t: float, y: np.ndarray) -> np.ndarray:
+        """
+        전체 온실 모델의 우변 함수 dy/dt = f(t, y)
+        
+        FluxKernel이 y의 슬라이스와 컴포넌트 파라미터로 열/수분/CO2 유속을 직접 계산하며
+        컴포넌트 객체와 포트에는 쓰지 않습니다. 제어기(스크린, 환기, PID)는 상태를
+        진행시키지 않고 마지막 출력을 유지합니다 (제어기 갱신은 step() 경계에서 수행되는
+        이산 샘플링으로 취급). 커널은 첫 호출에서 만들어 재사용하므로 파라미터를 바꾼 뒤에는
+        self._flux_kernel = None으로 다시 만들게 합니다.
+        
+        Args:
+            t (float): 시간 [s]
+            y (np.ndarray): 상태 벡터 (state_layout 순서), (n, k)이면 열마다 독립된 상태
+            
+        Returns:
+            np.ndarray: dy/dt (y와 같은 모양)
+        """
+        kernel = getattr(self, '_flux_kernel', None)
+        if kernel is None:
+            kernel = self._flux_kernel = FluxKernel([self])
+        kernel.hold()
+        return kernel.derivatives(t, y)
+    
+    def _evaluate_fluxes(self, t: float) -> None:
+        """
+        시간 t에서 모든 유속(열, 수증기, CO2)을 계산합니다. (상태 적분 없음)
+        
+        step()의 1~9단계와 동일한 순서를 dt=0으로 실행하므로
+        각 컴포넌트의 x += dxdt*dt 갱신은 변화를 만들지 않습니다.
+        """
+        dt_saved = self.dt
+        self.dt = 0.0
+        self._current_time = t
+        try:
+            row = self._get_input_row(t)
+            self._set_environmental_conditions(row)
+            self._update_setpoints(row)
+            
+            # 단파 복사 출력 (대수식)
+            self.solar_model.step(0.0)
+            self.illu.step(0.0)
+            
+            # 캐노피 view factor는 현재 LAI 상태로 계산
+            self.canopy.LAI = self.TYM.LAI
+            self.canopy.FF = 1 - np.exp(-0.94 * self.canopy.LAI)
+            
+            self._update_component_connections()
+            
+            # 작물 CO2 흡수량은 작물 미분 계산의 부산물이므로 먼저 평가
+            self._TYM_derivatives = self.TYM.calculate_derivatives(self.TYM.get_state_vector(), 0)
+            self.MC_AirCan.MC_AirCan = self.TYM.MC_AirCan_mgCO2m2s
+            
+            self._update_port_connections_ports_only(0.0)
+            self._update_heating_system(0.0)
+            self._update_heat_transfer(0.0)
+            self._update_mass_transfer(0.0)
+            self._calculate_component_heat_balance()
+            
+            # 현재 환기율로 다시 계산된 MC 유량으로 CO2 질량 균형 갱신
+            self._calculate_co2_balance()
+            
+            # 바닥 입력값 전달 (_update_components와 동일)
+            self.floor.set_inputs(Q_flow=self.floor.Q_flow, R_Flr_Glob=[self.solar_model.R_SunFlr_Glob, self.illu.R_IluFlr_Glob])
+        finally:
+            self.dt = dt_saved
+
+    def _state_couplings(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        """
+        유속 컴포넌트 → 연결된 상태 블록 목록 (_update_*_ports의 포트 연결과 동일한 위상)
+
+        각 유속은 연결된 블록들의 상태에 의존하고 그 블록들의 밸런스에 들어가므로
+        야코비안에서 블록 쌍 사이가 모두 비영(non-zero)이 될 수 있습니다.
+        """
+        return [
+            # 대류 + 응축 (열/수증기 동시)
+            ('Q_cnv_AirScr', ('air.T', 'air.VP', 'thScreen.T')),
+            ('Q_cnv_TopCov', ('air_Top.T', 'air_Top.VP', 'cover.T')),
+            ('Q_cnv_ScrTop', ('thScreen.T', 'air_Top.T', 'air_Top.VP')),
+            ('Q_cnv_AirCov', ('air.T', 'air.VP', 'cover.T')),
+            ('Q_cnv_CovOut', ('cover.T',)),
+            ('Q_cnv_FlrAir', ('floor.T', 'air.T')),
+            ('Q_cnv_CanAir', ('canopy.T', 'air.T')),
+            ('Q_cnv_LowAir', ('pipe_low.h', 'air.T')),
+            ('Q_cnv_UpAir', ('pipe_up.h', 'air.T')),
+
+            # 환기 (열/수증기, 상부공기 안정화 항 포함)
+            ('Q_ven_AirOut', ('air.T', 'air.VP')),
+            ('Q_ven_TopOut', ('air_Top.T', 'air_Top.VP')),
+            ('Q_ven_AirTop', ('air.T', 'air.VP', 'air_Top.T', 'air_Top.VP')),
+
+            # 장파 복사
+            ('Q_rad_CanCov', ('canopy.T', 'cover.T')),
+            ('Q_rad_CanScr', ('canopy.T', 'thScreen.T')),
+            ('Q_rad_CovSky', ('cover.T',)),
+            ('Q_rad_FlrCan', ('floor.T', 'canopy.T')),
+            ('Q_rad_FlrCov', ('floor.T', 'cover.T')),
+            ('Q_rad_FlrScr', ('floor.T', 'thScreen.T')),
+            ('Q_rad_ScrCov', ('thScreen.T', 'cover.T')),
+            ('Q_rad_LowFlr', ('pipe_low.h', 'floor.T')),
+            ('Q_rad_LowCan', ('pipe_low.h', 'canopy.T')),
+            ('Q_rad_LowCov', ('pipe_low.h', 'cover.T')),
+            ('Q_rad_LowScr', ('pipe_low.h', 'thScreen.T')),
+            ('Q_rad_UpFlr', ('pipe_up.h', 'floor.T')),
+            ('Q_rad_UpCan', ('pipe_up.h', 'canopy.T')),
+            ('Q_rad_UpCov', ('pipe_up.h', 'cover.T')),
+            ('Q_rad_UpScr', ('pipe_up.h', 'thScreen.T')),
+
+            # 전도 (바닥 ↔ 토양 첫 레이어)
+            ('Q_cd_Soil', ('floor.T', 'Q_cd_Soil.T')),
+
+            # 난방수 흐름 (pipe_low 출구 → pipe_up 입구)
+            ('pipe_low.pipe_out', ('pipe_low.h', 'pipe_up.h')),
+
+            # 작물 LAI → 캐노피 view factor (FF) → 장파 복사 계수
+            ('canopy.FF', ('TYM', 'canopy.T', 'cover.T', 'floor.T', 'thScreen.T',
+                           'pipe_low.h', 'pipe_up.h')),
+
+            # 증산 (작물 온도, 공기 수증기압, LAI)
+            ('MV_CanAir', ('canopy.T', 'air.T', 'air.VP', 'TYM')),
+
+            # CO2 (환기율은 공기 온도에 의존)
+            ('MC_AirCan', ('CO2_air.CO2', 'canopy.T', 'TYM')),
+            ('MC_AirTop', ('CO2_air.CO2', 'CO2_top.CO2', 'air.T', 'air_Top.T')),
+            ('MC_AirOut', ('CO2_air.CO2', 'air.T')),
+            ('MC_TopOut', ('CO2_top.CO2', 'air_Top.T')),
+        ]
+
+    def jacobian_sparsity(self):
+        """
+        rhs()의 희소 야코비안 패턴 (scipy.sparse csr_matrix)
+
+        블록 내부 패턴(토양/파이프 체인, 작물 모델)과 _state_couplings()의
+        컴포넌트 연결로부터 생성하며, 레이아웃이 고정이므로 한 번만 계산합니다.
+        """
+        if getattr(self, '_jac_sparsity', None) is None:
+            self._jac_sparsity = self.state_layout.jacobian_sparsity(self._state_couplings())
+        return self._jac_sparsity
+
+    def _default_atol(self) -> np.ndarray:
+        """상태 블록 단위별 절대 허용오차"""
+        unit_atol = {'K': 1e-3, 'Pa': 1e-1, 'mg/m3': 1e-1, 'J/kg': 1.0}
+        atol = np.empty(len(self.state_layout))
+        for block in self.state_layout.blocks:
+            atol[block.slice] = unit_atol.get(block.unit, 1e-6)
+        return atol
+
+    def initialize_steady_state(self, t: float = 0.0, states: Optional[List[str]] = None,
+                                tol: float = 1e-3, max_nfev: Optional[int] = None) -> SteadyStateResult:
+        """
+        시간 t의 입력에서 정상상태(der(x)=0)가 되도록 초기 상태를 풉니다.
+
+        Modelica의 initial equation(steadystate=true이면 der(x)=0, 아니면 시작값 고정)과 같이
+        steadystate 플래그가 켜진 컴포넌트의 상태를 풀고 나머지는 현재 값으로 고정합니다.
+        1. 제어기를 시간 t에서 dt=0으로 샘플링 (풀이 중 제어 출력은 유지)
+        2. 플래그를 잠시 끄고(전체 밸런스의 변화율) steady_state.solve_steady_state로
+           결합된 열/수증기/CO2 밸런스의 잔차를 동시에 풂 (희소 유한차분 야코비안)
+        3. 풀린 상태를 설정하고 초기화 단계를 종료 (Air/AirVP 등은 이후 동적 진행)
+
+        Args:
+            t (float): 초기화 시각 [s]
+            states (List[str]): 풀 상태 블록 이름 (None이면 steadystate 플래그가 켜진 블록,
+                모든 밸런스를 평형에서 시작하려면 BALANCE_STATES)
+            tol (float): 수렴 기준 (잔차 최대값, 시간당 STEADY_STATE_SCALES 단위 변화)
+            max_nfev (int): 최대 rhs 호출 수
+
+        Returns:
+            SteadyStateResult (수렴하지 않으면 RuntimeError, 모델 상태는 변경되지 않음)
+        """
+        layout = self.state_layout
+        names = layout.steadystate_names() if states is None else list(states)
+        unknown = [name for name in names if name not in layout]
+        if unknown:
+            raise KeyError(f"등록되지 않은 상태 블록: {unknown}")
+
+        y0 = self.pack_state()
+        self.unpack_state(y0)
+        self._sample_controllers(t, 0.0)
+        self._evaluate_fluxes(t)  # 포트 값을 샘플링된 제어 출력과 일치시킴
+
+        index = layout.indices(names)
+        scale = np.empty(len(layout))
+        for block in layout.blocks:
+            scale[block.slice] = STEADY_STATE_SCALES.get(block.unit, 1.0)
+        def residual(y):
+            self.unpack_state(y)
+            self._evaluate_fluxes(t)
+            return layout.residuals()
+
+        with layout.released(names):
+            result = solve_steady_state(residual, y0, index,
+                                        rate_scale=scale[index] / 3600.0,
+                                        state_scale=scale[index],
+                                        jac_sparsity=self.jacobian_sparsity().toarray(),
+                                        lower=0.0, tol=tol, max_nfev=max_nfev)
+        if not result.success:
+            self.unpack_state(y0)
+            self._evaluate_fluxes(t)
+            raise RuntimeError(f"정상상태 초기화 실패 (잔차 {result.residual:.3g} > {tol}): "
+                               f"{result.message}")
+
+        self.unpack_state(result.y)
+        for name in names:
+            for obj, _ in layout.block(name).flags:
+                if hasattr(obj, 'complete_initialization'):
+                    obj.complete_initialization()
+        self._evaluate_fluxes(t)
+        return result
+
+    def integrate(self, t_end: float, t_start: float = 0.0, output_dt: float = 300.0,
+                  method: str = 'BDF', rtol: float = 1e-4,
+                  atol: Optional[Union[float, np.ndarray]] = None,
+                  detect_events: bool = True, max_events: int = 100) -> Dict[str, Any]:
+        """
+        암시적(stiff) 적분기로 전체 온실 모델을 적분합니다.
+
+        시작 시각에서 제어기(스크린, 환기, PID, CO2, 조명)를 dt=0으로 샘플링한 뒤,
+        출력 격자(output_dt 간격) 구간을 다음 하위 구간으로 나누어 진행합니다:
+        1. 구간 끝 = min(출력 시각, 보온 스크린의 다음 타이머 전이 시각 SC.time_to_next_event())
+        2. solve_ivp(BDF/Radau)로 rhs()를 적분 (제어 출력은 구간 동안 유지하는 sample-and-hold,
+           jacobian_sparsity()를 사용해 유한차분 야코비안을 열 그룹 단위로 계산)
+           guarded_controllers의 guard(예: SC의 RH_air - 0.83)의 영교차는 종료 이벤트로
+           근 찾기하여 교차 시각에서 구간을 끝냄 (다시 시작한 구간에서는 그 guard가 0에서
+           벗어날 때까지 반대 방향의 교차만 검출하므로 같은 교차를 반복 검출하지 않음)
+        3. 에너지 누적: 난방 열량 max(q_tot, 0)과 조명 전력을 적분기의 보조(quadrature) 상태로
+           함께 적분 (rhs의 유속을 그대로 사용하므로 구간 시작 유속 × 경과 시간 근사가 없음,
+           보조 상태는 다른 상태에 영향을 주지 않으므로 야코비안 패턴에서 제외)
+        4. 구간 끝 시각에서 제어기를 경과 시간만큼 갱신 (타이머/적분 진행, 교차한 조건의 전이 반영)
+        따라서 큰 output_dt에서도 스크린 전이가 정확한 시각에 일어납니다.
+        rhs는 FluxKernel의 배열 평가(vectorized)를 사용하고 컴포넌트 객체는 종료 시각에서
+        한 번만 _evaluate_fluxes()로 갱신합니다.
+
+        Args:
+            t_end (float): 종료 시간 [s]
+            t_start (float): 시작 시간 [s]
+            output_dt (float): 출력 격자 간격 [s] (제어기 샘플링 주기)
+            method (str): 'BDF' 또는 'Radau'
+            rtol (float): 상대 허용오차
+            atol (float 또는 np.ndarray): 절대 허용오차 (None이면 단위별 기본값)
+            detect_events (bool): 제어기 guard 영교차 검출 여부
+            max_events (int): 출력 구간당 최대 guard 이벤트 수 (초과 시 그 구간의 검출 중단)
+
+        Returns:
+            Dict[str, Any]: 'time' (n_out,), 'y' (n_out, n_states), 'labels',
+            'nfev', 'njev', 'nlu' (적분기 통계 합계), 'events' [(시각, guard_names의 이름), ...]
+        """
+        if method not in ('BDF', 'Radau'):
+            raise ValueError(f"지원하지 않는 적분 방법: {method} ('BDF' 또는 'Radau')")
+        if output_dt <= 0:
+            raise ValueError(f"output_dt는 양수여야 합니다: {output_dt}")
+        if t_end <= t_start:
+            raise ValueError(f"t_end({t_end})는 t_start({t_start})보다 커야 합니다")
+
+        n_intervals = int(np.ceil((t_end - t_start) / output_dt - 1e-9))
+        times = np.minimum(t_start + output_dt * np.arange(n_intervals + 1), t_end)
+        n = len(self.state_layout)
+
+        # 상태 + 보조 상태 [E_th, W_el] (구간마다 0에서 시작하는 누적 에너지 [kWh/m²])
+        atol = np.broadcast_to(self._default_atol() if atol is None else atol, (n,))
+        atol = np.concatenate((atol, [1e-6, 1e-6]))
+        sparsity = self.jacobian_sparsity()
+        sparsity = sparse.block_diag((sparsity, sparse.csr_matrix((2, 2))), format='csr')
+
+        # 파라미터가 바뀌었을 수 있으므로 커널을 새로 생성
+        kernel = self._flux_kernel = FluxKernel([self])
+
+        def rhs(t, z):
+            dz = np.empty_like(z)
+            dz[:n], Q_heat = kernel.evaluate(t, z[:n])
+            dz[n] = np.maximum(Q_heat / surface, 0.0) / (1000 * 3600)   # 양의 열량만
+            dz[n + 1] = kernel.W_el / surface / (1000 * 3600)
+            return dz
+
+        def guard_values(t, z):
+            return self._guard_values(t, z[:n])
+
+        y = self.pack_state()
+        ys = np.empty((len(times), n))
+        ys[0] = y
+        stats = {'nfev': 0, 'njev': 0, 'nlu': 0}
+        events = []
+
+        # 시작 시각에서 제어기 샘플링 (dt=0: 상태 진행 없이 출력 갱신)
+        # 포트 값(예: air.massPort.VP)을 상태 벡터와 일치시킨 뒤 샘플링
+        self.unpack_state(y)
+        self._sample_controllers(times[0], 0.0)
+        kernel.hold()
+
+        # 교차 직후 0 근처에 있는 guard → 그 교차의 방향 (다음 구간은 반대 방향만 검출)
+        crossed: Dict[int, float] = {}
+        guard_names = self.guard_names
+
+        for k in range(n_intervals):
+            t0, t_out = times[k], times[k + 1]
+            n_events = 0
+            while t0 < t_out:
+                # 1. 스크린 타이머 전이 시각에서 구간 분할
+                t1 = t_out
+                t_event = self.SC.time_to_next_event()
+                if 1e-6 < t_event < t1 - t0:
+                    t1 = t0 + t_event
+
+                # 2. 구간 적분 (guard 영교차 시 교차 시각에서 종료)
+                z = np.concatenate((y, [0.0, 0.0]))
+                guards = None
+                if detect_events and n_events < max_events:
+                    g0 = guard_values(t0, z)
+                    directions = GuardEvents.directions_from(g0)
+                    for i, direction in list(crossed.items()):
+                        if abs(g0[i]) > GUARD_ZERO_TOL:
+                            del crossed[i]   # 0에서 충분히 멀어지면 부호로 판단
+                        else:
+                            directions[i] = -direction
+                    guards = GuardEvents(guard_values, g0, directions)
+                sol = solve_ivp(rhs, (t0, t1), z, method=method, rtol=rtol, atol=atol,
+                                jac_sparsity=sparsity, vectorized=True,
+                                events=guards.functions if guards is not None else None)
+                if not sol.success:
+                    raise RuntimeError(f"적분 실패 (t={t0:.0f}~{t1:.0f} s): {sol.message}")
+                for key in stats:
+                    stats[key] += getattr(sol, key)
+                crossing = GuardEvents.first(sol.t_events) if guards is not None else None
+                if crossing is not None and crossing[0] <= t0:
+                    # 시작 시각의 교차는 진행이 없으므로 기록하지 않고 반대 방향으로 다시 적분
+                    crossed[crossing[1]] = guards.functions[crossing[1]].direction
+                    n_events += 1
+                    continue
+                if crossing is not None:
+                    t1, i = crossing
+                    z1 = sol.y_events[i][0]
+                    events.append((t1, guard_names[i]))
+                    crossed[i] = guards.functions[i].direction
+                    n_events += 1
+                else:
+                    z1 = sol.y[:, -1]
+
+                # 3. 보조 상태로 적분된 에너지 누적
+                self._accumulate_energy(z1[n], z1[n + 1])
+
+                # 4. 구간 끝에서 제어기 갱신 (경과 시간만큼 진행)
+                y = z1[:n]
+                self.unpack_state(y)
+                self._sample_controllers(t1, t1 - t0)
+                kernel.hold()
+                t0 = t1
+            ys[k + 1] = y
+
+            if k > 0:
+                # 검증용 순간 열량/조명 전력 (커널 평가 한 번, 파이프별 q_low/q_up은 종료 시 갱신)
+                self.q_tot = kernel.evaluate(t_out, y)[1] / surface
+                self.W_el_illu_instant = kernel.W_el / surface
+                try:
+                    self._verify_state()
+                except ValueError as e:
+                    raise ValueError(f"상태 검증 실패: {str(e)}")
+
+        # 컴포넌트/포트 값을 최종 상태와 일치시킴
+        self._evaluate_fluxes(times[-1])
+        self._calculate_energy_per_area()
+        self.dt = output_dt
+        self._current_time = times[-1]
+        return {'time': times, 'y': ys, 'labels': self.state_layout.labels(),
+                'events': events, **stats}
+
+    def _sample_controllers(self, t: float, dt: float) -> None:
+        """
+        현재 상태(unpack_state 이후)에서 시간 t의 입력으로 제어기를 dt만큼 갱신합니다.
+
+        유속은 다시 계산하지 않고 제어기가 읽는 값(외기, 설정값, 일사량, 상대습도)만 갱신합니다.
+        """
+        row = self._begin_sample(t, dt)
+        self._step_controllers(dt)
+        self._finish_sample(row)
+
+    def _begin_sample(self, t: float, dt: float, row=None):
+        """
+        샘플링 전반부: 제어기가 읽는 값과 제어기 입력(PV, SP) 설정 (PID 진행 전까지)
+
+        제어기는 CONTROL_STATES 블록의 상태만 읽습니다. row를 주면 입력 보간을 생략합니다
+        (같은 입력 테이블을 쓰는 앙상블 구성원).
+        """
+        if row is None:
+            row = self._get_input_row(t)
+        self._set_environmental_conditions(row)
+        self._update_setpoints(row)
+        self.solar_model.LAI = self.TYM.LAI
+        self.solar_model.step(0.0)  # 스크린 제어기의 작물 수준 일사량
+        self.air._update_humidity()  # 환기 제어기의 상대습도
+        self.RH_air_sensor.heatPort.T = self.air.T
+        self.RH_air_sensor.massPort.VP = self.air.massPort.VP
+        self.dt = dt
+        self._set_control_inputs(row)
+        return row
+
+    def _finish_sample(self, row) -> None:
+        """샘플링 후반부: PID 출력 적용, 공급수 포트와 스크린 view factor 갱신"""
+        self._apply_control_outputs(row)
+        # 공급수 엔탈피 (step()에서는 _update_heating_system이 갱신)
+        self.sourceMdot_1ry.step(0.0)
+        # 스크린 view factor (step()에서는 ThermalScreen.step()이 갱신)
+        self.thScreen.set_screen_closure(self.thScreen.SC)
+
+    def _accumulate_energy(self, E_th: float, W_el: float) -> None:
+        """구간 동안 적분된 난방/조명 에너지 [kWh/m²]를 누적합니다."""
+        self.E_th_tot_kWhm2 += E_th
+        self.E_th_tot = self.E_th_tot_kWhm2 * surface
+        self.W_el_illu += W_el
+        self.E_el_tot_kWhm2 = self.W_el_illu
+        self.E_el_tot = self.E_el_tot_kWhm2 * surface
+
+    @property
+    def guarded_controllers(self) -> Tuple[Tuple[str, Any], ...]:
+        """
+        영교차 이벤트를 검출하는 제어기 (이름, 제어기) 목록
+
+        각 제어기는 GUARDS와 guard_values()를 선언하고, guard_values()는 step()과 같이
+        제어기에 설정된 입력 속성을 읽습니다. (입력 설정은 _set_guard_inputs)
+        조명은 입력 테이블의 ilu_sp 신호를 따르므로 이벤트 제어기가 아닙니다.
+        """
+        return (('SC', self.SC),)
+
+    @property
+    def guard_names(self) -> List[str]:
+        """_guard_values 순서의 guard 이름 ('제어기: 조건', 예: 'SC: RH_air - 0.83')"""
+        return [f"{name}: {guard}" for name, controller in self.guarded_controllers
+                for guard in controller.GUARDS]
+
+    def _set_guard_inputs(self, row) -> None:
+        """guarded_controllers의 입력을 현재 상태와 입력 행으로 설정 (제어기 상태는 유지)"""
+        self.RH_air_sensor.heatPort.T = self.air.T
+        self.RH_air_sensor.massPort.VP = self.air.massPort.VP
+        self._set_screen_inputs(row)
+
+    def _guard_values(self, t: float, y: np.ndarray) -> np.ndarray:
+        """
+        상태 y, 시간 t에서 모든 guarded_controllers의 guard 값을 이어 붙인 배열 (guard_names 순서)
+
+        제어기 상태는 바꾸지 않고 입력(설정값, 외기, 일사량, 상대습도)만 갱신해 계산합니다.
+        """
+        self.unpack_state(y)
+        row = self._get_input_row(t)
+        self._set_environmental_conditions(row)
+        self.solar_model.step(0.0)
+        self._set_guard_inputs(row)
+        return np.concatenate([controller.guard_values()
+                               for _, controller in self.guarded_controllers])
+
+    def save_checkpoint(self, path: str) -> None:
+        """
+        전체 동적 상태를 체크포인트 파일로 저장합니다.
+        
+        컴포넌트 상태, 제어기 내부 상태(PID, 스크린 제어 상태/타이머, 환기 PID),
+        누적 에너지, 스케줄러와 입력 커서를 포함하며 입력 테이블은 저장하지 않습니다.
+        재개 위치는 next_time_idx입니다.
+        """
+        checkpoint.save_checkpoint(self, path)
+    
+    @classmethod
+    def from_checkpoint(cls, path: str) -> 'Greenhouse_1':
+        """
+        체크포인트 파일에서 모델을 복원합니다. (__init__ 재실행 없음)
+        
+        step(dt, model.next_time_idx)부터 이어서 실행하면 중단 없는 실행과
+        비트 단위로 같은 궤적을 얻습니다.
+        """
+        return checkpoint.load_checkpoint(path, cls)
+    
+    def fork(self, k: int = 1,
+             overrides: Optional[List[Optional[Dict[str, Any]]]] = None) -> List['Greenhouse_1']:
+        """
+        현재 상태에서 K개의 독립된 모델을 분기합니다. (__init__ 재실행 없음)
+        
+        동적 상태와 제어기 상태, 입력 커서는 자식마다 복제하고 입력 테이블과
+        읽기 전용 파라미터 배열은 공유합니다.
+        
+        Args:
+            k: 자식 수
+            overrides: 자식별 입력 override (예: [{'T_sp': 18.0}, {'T_sp': lambda t, v: v + 1}])
+        
+        Returns:
+            List[Greenhouse_1]: step(dt, child.next_time_idx)부터 진행할 수 있는 자식 모델들
+        """
+        return checkpoint.fork(self, k, overrides)
+    
     def _update_components(self, dt: float) -> None:
         """컴포넌트 상태를 업데이트합니다."""
 
@@ -855,12 +1550,11 @@ class Greenhouse_1:
         self.floor.step(dt)
         self.canopy.step(dt)
         self.thScreen.step(dt)
-        # self.pipe_low.step(dt)
-        # self.pipe_up.step(dt)
+        self.pipe_low.step(dt)
+        self.pipe_up.step(dt)
         self.illu.step(dt)
         self.solar_model.step(dt)
-        self.TYM.step(dt)
-        self.Q_cd_Soil.step(dt)
+        self.scheduler.advance(dt)  # 작물(TYM), 토양 레이어: 각자의 주기로 갱신
         self.CO2_air.step(dt)
         self.CO2_top.step(dt)
         
@@ -914,72 +1608,13 @@ class Greenhouse_1:
     
     def _update_heat_ports(self) -> None:
         """열 포트 연결을 업데이트합니다."""
-        # Air ↔ Screen 대류
-        self.Q_cnv_AirScr.heatPort_a.T = self.air.T
-        self.Q_cnv_AirScr.heatPort_b.T = self.thScreen.T
-        
-        # Top Air ↔ Cover 대류
-        self.Q_cnv_TopCov.heatPort_a.T = self.air_Top.T
-        self.Q_cnv_TopCov.heatPort_b.T = self.cover.T
-        
-        # Screen ↔ Top Air 대류
-        self.Q_cnv_ScrTop.heatPort_a.T = self.thScreen.T
-        self.Q_cnv_ScrTop.heatPort_b.T = self.air_Top.T
-        
-        # Air ↔ Cover 대류
-        self.Q_cnv_AirCov.heatPort_a.T = self.air.T
-        self.Q_cnv_AirCov.heatPort_b.T = self.cover.T
-        
-        # Floor ↔ Air 대류 
-        self.Q_cnv_FlrAir.port_a.T = self.floor.T
-        self.Q_cnv_FlrAir.port_b.T = self.air.T
-
-        # 바닥 ↔ 토양 전도 포트 연결
-        self.Q_cd_Soil.port_a.T = self.floor.T
-        # 외부 토양 온도 설정 (Modelica: connect(Tsoil7.y, Q_cd_Soil.T_layer_Nplus1))
-        self.Q_cd_Soil.T_soil_sp = self.T_soil7  # 외부 토양 온도(K) - 이미 Kelvin 단위
-        
-        # RH 센서 연결
-        self.RH_air_sensor.heatPort.T = self.air.T
-        self.RH_air_sensor.massPort.VP = self.air.massPort.VP
-        
-        # 외부 환경 포트 연결 
-        # Q_ven_AirOut (하부공기 ↔ 외부)
-        self.Q_ven_AirOut.HeatPort_a.T = self.air.T
-        self.Q_ven_AirOut.HeatPort_b.T = self.Tout
-
-        # Q_cnv_CanAir (작물↔공기 자유대류)
-        self.Q_cnv_CanAir.port_a.T = self.canopy.T
-        self.Q_cnv_CanAir.port_b.T = self.air.T
-
-        # Q_ven_TopOut (상부공기 ↔ 외부)
-        self.Q_ven_TopOut.HeatPort_a.T = self.air_Top.T
-        self.Q_ven_TopOut.HeatPort_b.T = self.Tout
-
-        # Q_ven_AirTop (하부공기 ↔ 상부공기, AirThroughScreen)
-        self.Q_ven_AirTop.HeatPort_a.T = self.air.T
-        self.Q_ven_AirTop.HeatPort_b.T = self.air_Top.T
-
-        # 외피 ↔ 외부 자연대류
-        self.Q_cnv_CovOut.port_a.T = self.cover.T
-        self.Q_cnv_CovOut.port_b.T = self.Tout
-        
-        # 외부 수증기압 포트
-        self.Q_ven_AirOut.MassPort_b.VP = self.VPout
-        self.Q_ven_TopOut.MassPort_b.VP = self.VPout
-        
-        # 1) ppm → mg/m³ 변환값을 CO2out 컴포넌트에 할당  
-        self.CO2out.CO2 = self.CO2out_ppm_to_mgm3  
-        self.CO2out.calculate()  # 내부 로직이 run 되면서 port_a, port_b 값이 설정됨  
-
-        # 2) 변환된 농도를 외부 배출 포트(MC_AirOut, MC_TopOut)의 port_b에 연결  
-        self.MC_AirOut.port_b.CO2 = self.CO2out.CO2  
-        self.MC_TopOut.port_b.CO2 = self.CO2out.CO2  
+        # 온도 포트, 토양 경계 온도, 난방 유량 (config/port_connections.yaml의 heat_connections)
+        self.heat_connections.execute(self)
 
         # 태양광 열원 연결
         self.air.R_Air_Glob = [
             self.solar_model.R_SunAir_Glob,  # 태양광 → 공기
-            self.illu.R_IluAir_Glob          # 조명 → 공기
+            self.illu.R_IluAir_Glob.value    # 조명 → 공기
         ]
         
         self.cover.R_SunCov_Glob = self.solar_model.R_SunCov_Glob  # 태양광 → 외피
@@ -996,23 +1631,23 @@ class Greenhouse_1:
         ]
         
         # 난방 파이프 연결
-        
-        # 1. PID 제어 → 소스 유량 (Modelica: connect(PID_Mdot.CS, sourceMdot_1ry.in_Mdot))
-        self.sourceMdot_1ry.in_Mdot = self.PID_Mdot.CS
+        # 1. PID 제어 → 소스 유량 (Modelica: connect(PID_Mdot.CS, sourceMdot_1ry.in_Mdot), heat_connections)
         
         # 2. 소스 → 하부 파이프 (Modelica: connect(sourceMdot_1ry.flangeB, pipe_low.pipe_in))
         self.pipe_low.pipe_in.p = self.sourceMdot_1ry.flangeB.p
-        self.pipe_low.pipe_in.m_flow = self.sourceMdot_1ry.flangeB.m_flow
+        self.pipe_low.pipe_in.m_flow = -self.sourceMdot_1ry.flangeB.m_flow
         self.pipe_low.pipe_in.h_outflow = self.sourceMdot_1ry.flangeB.h_outflow
+        self.pipe_low.update()  # 출구 포트/열 포트 = 현재 셀 엔탈피
         
         # 3. 하부 파이프 → 상부 파이프 (Modelica: connect(pipe_low.pipe_out, pipe_up.pipe_in))
         self.pipe_up.pipe_in.p = self.pipe_low.pipe_out.p
-        self.pipe_up.pipe_in.m_flow = self.pipe_low.pipe_out.m_flow
+        self.pipe_up.pipe_in.m_flow = -self.pipe_low.pipe_out.m_flow
         self.pipe_up.pipe_in.h_outflow = self.pipe_low.pipe_out.h_outflow
+        self.pipe_up.update()
         
         # 4. 상부 파이프 → 싱크 (Modelica: connect(pipe_up.pipe_out, sinkP_2ry.flangeB))
         self.sinkP_2ry.flangeB.p = self.pipe_up.pipe_out.p
-        self.sinkP_2ry.flangeB.m_flow = self.pipe_up.pipe_out.m_flow
+        self.sinkP_2ry.flangeB.m_flow = -self.pipe_up.pipe_out.m_flow
         self.sinkP_2ry.flangeB.h_outflow = self.pipe_up.pipe_out.h_outflow
         
         # # 난방 파이프 대류 열전달 포트 연결
@@ -1037,67 +1672,14 @@ class Greenhouse_1:
             for i, port in enumerate(q_cnv.heatPorts_a.ports):
                 port.T = pipe.T
 
-            # 2) flow1DimInc 각 셀에 유량(M_dot)·유체온도 셋업
-            m_dot_per_cell = abs(self.sourceMdot_1ry.flangeB.m_flow) / pipe.N
-            for cell in pipe.flow1DimInc.Cells:
-                cell.M_dot = m_dot_per_cell
-                cell.heatTransfer.M_dot = m_dot_per_cell
-                cell.heatTransfer.T_fluid = [self.sourceMdot_1ry.T_0]  # 공급수 온도 사용
-                # 3) 셀별 열전달 계산 (T는 읽기 전용이므로 계산만 수행)
-                cell.heatTransfer.calculate()
-
-            # 4) 공기측 포트 온도
+            # 2) 공기측 포트 온도
             q_cnv.port_b.T = self.air.T
 
     def _update_mass_ports(self) -> None:
         """질량 포트 연결을 업데이트합니다."""
-        # Air ↔ Screen 대류
-        self.Q_cnv_AirScr.massPort_a.VP = self.air.massPort.VP
-        self.Q_cnv_AirScr.massPort_b.VP = self.thScreen.massPort.VP
-        
-        # Top Air ↔ Cover 대류
-        self.Q_cnv_TopCov.massPort_a.VP = self.air_Top.massPort.VP
-        self.Q_cnv_TopCov.massPort_b.VP = self.cover.massPort.VP
-        
-        # Screen ↔ Top Air 대류
-        self.Q_cnv_ScrTop.massPort_a.VP = self.thScreen.massPort.VP
-        self.Q_cnv_ScrTop.massPort_b.VP = self.air_Top.massPort.VP
-        
-        # Air ↔ Cover 대류
-        self.Q_cnv_AirCov.massPort_a.VP = self.air.massPort.VP
-        self.Q_cnv_AirCov.massPort_b.VP = self.cover.massPort.VP
-        
-        # 작물과 공기 사이의 질량 포트 (증산)
-        self.MV_CanAir.port_a.VP = self.canopy.massPort.VP
-        self.MV_CanAir.port_b.VP = self.air.massPort.VP
-        
-        # 환기 관련 질량 포트
-        self.Q_ven_AirOut.MassPort_a.VP = self.air.massPort.VP
-        self.Q_ven_AirOut.MassPort_b.VP = self.VPout
-        
-        self.Q_ven_TopOut.MassPort_a.VP = self.air_Top.massPort.VP
-        self.Q_ven_TopOut.MassPort_b.VP = self.VPout
-        
-        self.Q_ven_AirTop.MassPort_a.VP = self.air.massPort.VP
-        self.Q_ven_AirTop.MassPort_b.VP = self.air_Top.massPort.VP
-        
-        # --- CO2out 변환 및 포트 설정 ---
-        self.CO2out.CO2 = self.CO2out_ppm_to_mgm3
+        # 수증기압/CO2 포트 (config/port_connections.yaml의 mass_connections, co2_connections)
+        self.mass_connections.execute(self)
         self.CO2out.calculate()
-        self.MC_AirOut.port_b.CO2 = self.CO2out.CO2
-        self.MC_TopOut.port_b.CO2 = self.CO2out.CO2
-
-        # --- 내부 CO2 (two-port) 설정 ---
-        self.MC_AirOut.port_a.CO2 = self.CO2_air.CO2
-        self.MC_AirTop.port_a.CO2 = self.CO2_air.CO2
-        self.MC_AirTop.port_b.CO2 = self.CO2_top.CO2
-        self.MC_TopOut.port_a.CO2 = self.CO2_top.CO2
-
-        # --- MC_ExtAir (one-port) 포트 설정 ---
-        self.MC_ExtAir.port.CO2 = self.CO2_air.CO2
-
-        # --- 작물흡수(MC_AirCan) one-port ---
-        self.MC_AirCan.port.CO2 = self.CO2_air.CO2
 
         # MC_ventilation2 컴포넌트들: 환기율을 미리 설정하고 step() 호출
         self.MC_AirOut.f_vent = self.Q_ven_AirOut.f_vent_total
@@ -1112,6 +1694,10 @@ class Greenhouse_1:
         # MC_AirCan: 작물 CO2 흡수 (대수 방정식)
         self.MC_AirCan.step()
         
+        self._calculate_co2_balance()
+    
+    def _calculate_co2_balance(self) -> None:
+        """CO2_air / CO2_top 질량 균형 (MC 컴포넌트들의 포트 유량 합)"""
         # CO2_air 질량 균형: 주입 - 배출 - 이동 - 흡수
         self.CO2_air.MC_flow = (
             - self.MC_ExtAir.port.MC_flow      # 외부 CO2 주입 (Air로 들어옴, 음수 → 양수로 변환)
@@ -1126,77 +1712,29 @@ class Greenhouse_1:
             - self.MC_TopOut.port_a.MC_flow    # 상부 환기로 인한 CO2 배출 (Air에서 나감, 양수 → 음수로 변환)
         )
         
-    def _update_radiation_ports(self) -> None:
-        """복사 포트 연결을 업데이트합니다."""
-        # 작물과 외피 사이의 복사
-        self.Q_rad_CanCov.port_a.T = self.canopy.T
-        self.Q_rad_CanCov.port_b.T = self.cover.T
-        
-        # 작물과 스크린 사이의 복사
-        self.Q_rad_CanScr.port_a.T = self.canopy.T
-        self.Q_rad_CanScr.port_b.T = self.thScreen.T
-        
-        # 외피와 하늘 사이의 복사
-        self.Q_rad_CovSky.port_a.T = self.cover.T
-        self.Q_rad_CovSky.port_b.T = self.Tsky  # Celsius → Kelvin
+    def _build_radiation_network(self) -> RadiationNetwork:
+        """장파 복사 네트워크 구성 (표면 + RADIATION_LINKS의 복사 요소)"""
+        network = RadiationNetwork()
+        for name in ('canopy', 'cover', 'floor', 'thScreen', 'sky'):
+            network.add_surface(name)
+        network.add_surface('pipe_low', N=self.pipe_low.N)  # 셀마다 한 노드
+        network.add_surface('pipe_up', N=self.pipe_up.N)
+        for name, a, b in RADIATION_LINKS:
+            network.connect(name, getattr(self, name), a, b)
+        network.update_coefficients()
+        return network
 
-        # 바닥 → 스크린 복사
-        self.Q_rad_FlrScr.port_a.T = self.floor.T      # 바닥 온도
-        self.Q_rad_FlrScr.port_b.T = self.thScreen.T   # 스크린 온도
-
-        # 바닥 → 작물 복사 (Modelica 원본과 일치)
-        self.Q_rad_FlrCan.port_a.T = self.floor.T      # 바닥 온도
-        self.Q_rad_FlrCan.port_b.T = self.canopy.T     # 작물 온도
-
-        # 바닥 → 외피 복사 (Modelica 원본과 일치)
-        self.Q_rad_FlrCov.port_a.T = self.floor.T      # 바닥 온도
-        self.Q_rad_FlrCov.port_b.T = self.cover.T      # 외피 온도
-
-        # 스크린 → 외피 복사
-        self.Q_rad_ScrCov.port_a.T = self.thScreen.T   # 스크린 온도
-        self.Q_rad_ScrCov.port_b.T = self.cover.T      # 외피 온도
-        
-        # 난방 파이프 관련 복사 포트
-        self._update_pipe_radiation_ports()
-    
-    def _update_pipe_radiation_ports(self) -> None:
-        """난방 파이프 관련 복사 열전달을 계산합니다."""
-        # 하부 파이프 복사
-        for port in self.Q_rad_LowFlr.heatPorts_a:
-            port.T = self.pipe_low.T
-            
-        for port in self.Q_rad_LowCan.heatPorts_a:
-            port.T = self.pipe_low.T
-            
-        for port in self.Q_rad_LowCov.heatPorts_a:
-            port.T = self.pipe_low.T
-            
-        for port in self.Q_rad_LowScr.heatPorts_a:
-            port.T = self.pipe_low.T
-        
-        # 상부 파이프 복사
-        for port in self.Q_rad_UpFlr.heatPorts_a:
-            port.T = self.pipe_up.T
-            
-        for port in self.Q_rad_UpCan.heatPorts_a:
-            port.T = self.pipe_up.T
-            
-        for port in self.Q_rad_UpCov.heatPorts_a:
-            port.T = self.pipe_up.T
-            
-        for port in self.Q_rad_UpScr.heatPorts_a:
-            port.T = self.pipe_up.T
-            
-        # 복사 포트 b 연결 (스크린, 바닥, 작물, 외피)
-        self.Q_rad_LowScr.port_b.T = self.thScreen.T
-        self.Q_rad_LowFlr.port_b.T = self.floor.T
-        self.Q_rad_LowCan.port_b.T = self.canopy.T
-        self.Q_rad_LowCov.port_b.T = self.cover.T
-        
-        self.Q_rad_UpScr.port_b.T = self.thScreen.T
-        self.Q_rad_UpFlr.port_b.T = self.floor.T
-        self.Q_rad_UpCan.port_b.T = self.canopy.T
-        self.Q_rad_UpCov.port_b.T = self.cover.T
+    def _update_radiation_ports(self) -> None:
+        """복사 네트워크의 표면 온도를 업데이트합니다."""
+        network = self.radiation
+        network.set_temperature('canopy', self.canopy.T)
+        network.set_temperature('cover', self.cover.T)
+        network.set_temperature('floor', self.floor.T)
+        network.set_temperature('thScreen', self.thScreen.T)
+        network.set_temperature('sky', self.Tsky)
+        # 난방 파이프: 셀별 열 포트 온도 (Modelica: connect(pipe.heatPorts, Q_rad_*.heatPorts_a))
+        network.set_temperature('pipe_low', self.pipe_low.flow1DimInc.Summary.T)
+        network.set_temperature('pipe_up', self.pipe_up.flow1DimInc.Summary.T)
             
     def _update_heat_transfer(self, dt: float) -> None:
         # 1. 대류 열전달 계산
@@ -1230,20 +1768,7 @@ class Greenhouse_1:
         # 작물과 공기 사이의 자유 대류
         self.Q_cnv_CanAir.step()
         
-        # 난방 파이프와 공기 사이의 대류
-        self.pipe_low.step(dt=self.dt)  # 추가
-        self.pipe_up.step(dt=self.dt)
-
-        # 하부 파이프 셀에 유량 분배
-        for cell in self.pipe_low.flow1DimInc.Cells:
-            cell.M_dot = abs(self.pipe_low.pipe_in.m_flow) / self.pipe_low.N
-            cell.heatTransfer.M_dot = cell.M_dot
-
-        # 상부 파이프 셀에 유량 분배
-        for cell in self.pipe_up.flow1DimInc.Cells:
-            cell.M_dot = abs(self.pipe_up.pipe_in.m_flow) / self.pipe_up.N
-            cell.heatTransfer.M_dot = cell.M_dot
-
+        # 난방 파이프와 공기 사이의 대류 (파이프 출구/열 포트는 연결 업데이트에서 갱신)
         self.Q_cnv_LowAir.step()
         self.Q_cnv_UpAir.step()
         
@@ -1253,46 +1778,12 @@ class Greenhouse_1:
         self.Q_ven_AirTop.step()
     
     def _calculate_radiation(self) -> None:
-        # 작물과 외피 사이의 복사
-        self.Q_rad_CanCov.step()
-        
-        # 작물과 스크린 사이의 복사
-        self.Q_rad_CanScr.step()
-        
-        # 외피와 하늘 사이의 복사
-        self.Q_rad_CovSky.step()
-        
-        # 바닥과 작물 사이의 복사
-        self.Q_rad_FlrCan.step()
-        
-        # 바닥과 외피 사이의 복사
-        self.Q_rad_FlrCov.step()
-        
-        # 스크린과 외피 사이의 복사
-        self.Q_rad_ScrCov.step()
-        
-        # 난방 파이프 관련 복사
-        self._calculate_pipe_radiation()
-    
-    def _calculate_pipe_radiation(self) -> None:
-        # 하부 파이프 복사
-        self.Q_rad_LowFlr.step()
-        self.Q_rad_LowCan.step()
-        self.Q_rad_LowCov.step()
-        self.Q_rad_LowScr.step()
-        
-        # 상부 파이프 복사
-        self.Q_rad_UpFlr.step()
-        self.Q_rad_UpCan.step()
-        self.Q_rad_UpCov.step()
-        self.Q_rad_UpScr.step()
-        
-        # 바닥→스크린 복사 
-        self.Q_rad_FlrScr.step()
+        # 모든 장파 복사 (표면별 순유입은 _calculate_component_heat_balance에서 사용)
+        self.radiation.step()
     
     def _calculate_conduction(self) -> None:
-        # 바닥과 토양 사이의 전도
-        self.Q_cd_Soil.step(dt=self.dt)  # dt 인자 추가
+        # 바닥과 토양 사이의 전도 (유속만 계산, 레이어 온도는 scheduler에서 갱신)
+        self.Q_cd_Soil.Q_flow = self.Q_cd_Soil.calculate()
     
     def _calculate_component_heat_balance(self) -> None:
         
@@ -1318,6 +1809,14 @@ class Greenhouse_1:
             
             return 0.0
         
+        # 스크린 통과 공기 교환 (하부공기 → 상부공기): 스크린이 열리면 교환 시정수가 1초 미만이므로
+        # step()에서는 두 구역 온도차의 지수 감쇠로 구한 스텝 평균 유량을 사용 (dt=0이면 순간 유량)
+        screen = self.Q_ven_AirTop
+        Q_AirTop = get_heat_flow_value(screen) * self._step_average(
+            screen.A * screen.HEC_ab,
+            self.air.rho * self.air.c_p * self.air.V,
+            1e5 / (self.air_Top.R_a * self.air_Top.T) * self.air_Top.c_p * self.air_Top.V)
+        
         # 공기 열 균형
         self.air.Q_flow = (
             -get_heat_flow_value(self.Q_cnv_AirScr)
@@ -1327,7 +1826,7 @@ class Greenhouse_1:
             +get_heat_flow_value(self.Q_cnv_UpAir)
             +get_heat_flow_value(self.Q_cnv_CanAir)
             -get_heat_flow_value(self.Q_ven_AirOut)
-            -get_heat_flow_value(self.Q_ven_AirTop)
+            -Q_AirTop
         )
         
         # 상부 공기 열 균형
@@ -1335,7 +1834,7 @@ class Greenhouse_1:
             -get_heat_flow_value(self.Q_cnv_TopCov)   # 상부공기 → 외피 (상부공기가 줌, 음수)
             +get_heat_flow_value(self.Q_cnv_ScrTop)    # 스크린 → 상부공기 (상부공기가 받음, 양수)
             -get_heat_flow_value(self.Q_ven_TopOut)   # 상부공기 → 외부 (상부공기가 줌, 음수)
-            +get_heat_flow_value(self.Q_ven_AirTop)    # 하부공기 → 상부공기 (상부공기가 받음, 양수)
+            +Q_AirTop                                  # 하부공기 → 상부공기 (상부공기가 받음, 양수)
         )
         
         # 상부공기 열 균형에 안정화 항 추가 (온도차가 0이 되는 것을 방지)
@@ -1349,91 +1848,134 @@ class Greenhouse_1:
             else:  # 상부공기가 더 따뜻하면
                 self.air_Top.Q_flow -= stabilization_heat
         
+        # 장파 복사: 표면별 순유입 (RadiationNetwork, 받으면 양수)
+        radiation = self.radiation
+        
         # 외피 열 균형
         self.cover.Q_flow = (
-            get_heat_flow_value(self.Q_rad_CanCov)      # 작물 → 외피 복사 (외피가 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_FlrCov)      # 바닥 → 외피 복사 (외피가 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_ScrCov)      # 스크린 → 외피 복사 (외피가 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_LowCov)      # 하부파이프 → 외피 복사 (외피가 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_UpCov)       # 상부파이프 → 외피 복사 (외피가 받음, 양수)
+            radiation.net_flow('cover')                 # 작물/바닥/스크린/파이프 → 외피, 외피 → 하늘 복사
             +get_heat_flow_value(self.Q_cnv_AirCov)      # 공기 → 외피 대류 (외피가 받음, 양수)
             +get_heat_flow_value(self.Q_cnv_TopCov)      # 상부공기 → 외피 대류 (외피가 받음, 양수)
-            -get_heat_flow_value(self.Q_rad_CovSky)     # 외피 → 하늘 복사 (외피가 줌, 음수)
             -get_heat_flow_value(self.Q_cnv_CovOut)       # 외피 → 외부 대류 (외피가 줌, 음수)
         )
         
         # 작물 열 균형
         self.canopy.Q_flow = (
             -get_heat_flow_value(self.Q_cnv_CanAir)   # 작물 → 공기 대류
-            -get_heat_flow_value(self.Q_rad_CanCov)   # 작물 → 외피 복사
-            -get_heat_flow_value(self.Q_rad_CanScr)   # 스크린 → 작물 복사
-            +get_heat_flow_value(self.Q_rad_LowCan)   # 작물 → 하부파이프 복사
-            +get_heat_flow_value(self.Q_rad_UpCan)    # 상부파이프 → 작물 복사 (양수)
-            +get_heat_flow_value(self.Q_rad_FlrCan)   # 작물 → 바닥 복사
+            +radiation.net_flow('canopy')             # 작물 ↔ 외피/스크린/바닥/파이프 복사
         )
         
         # 바닥 열 균형
         self.floor.Q_flow = (
-            -get_heat_flow_value(self.Q_cnv_FlrAir) +      # 바닥 → 공기 대류 (바닥이 줌, 음수)
-            -get_heat_flow_value(self.Q_cd_Soil) +         # 바닥 → 토양 전도 (바닥이 줌, 음수)
-            get_heat_flow_value(self.Q_rad_LowFlr) +       # 하부파이프 → 바닥 복사 (바닥이 받음, 양수)
-            get_heat_flow_value(self.Q_rad_UpFlr) +        # 상부파이프 → 바닥 복사 (바닥이 받음, 양수)
-            -get_heat_flow_value(self.Q_rad_FlrScr) -      # 바닥 → 스크린 복사 (바닥이 줌, 음수)
-            -get_heat_flow_value(self.Q_rad_FlrCan) -      # 바닥 → 작물 복사 (바닥이 줌, 음수)
-            -get_heat_flow_value(self.Q_rad_FlrCov)        # 바닥 → 외피 복사 (바닥이 줌, 음수)
+            -get_heat_flow_value(self.Q_cnv_FlrAir)       # 바닥 → 공기 대류 (바닥이 줌, 음수)
+            -get_heat_flow_value(self.Q_cd_Soil)          # 바닥 → 토양 전도 (바닥이 줌, 음수)
+            +radiation.net_flow('floor')                  # 바닥 ↔ 작물/외피/스크린/파이프 복사
         )
         
         # 스크린 열 균형
         self.thScreen.Q_flow = (
-            get_heat_flow_value(self.Q_rad_CanScr)     # 작물 → 스크린 복사 (스크린이 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_FlrScr)      # 바닥 → 스크린 복사 (스크린이 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_LowScr)      # 하부파이프 → 스크린 복사 (스크린이 받음, 양수)
-            +get_heat_flow_value(self.Q_rad_UpScr)       # 상부파이프 → 스크린 복사 (스크린이 받음, 양수)
+            radiation.net_flow('thScreen')              # 작물/바닥/파이프 → 스크린, 스크린 → 외피 복사
             +get_heat_flow_value(self.Q_cnv_AirScr)      # 공기 → 스크린 대류 (스크린이 받음, 양수)
-            -get_heat_flow_value(self.Q_rad_ScrCov)     # 스크린 → 외피 복사 (스크린이 줌, 음수)
             -get_heat_flow_value(self.Q_cnv_ScrTop)       # 스크린 → 상부공기 대류 (스크린이 줌, 음수)
         )
 
-        self.pipe_low.Q_flow = (
-            -get_heat_flow_value(self.Q_rad_LowCov)      # pipe_low → 외피 복사 (pipe_low가 줌, 음수)
-            -get_heat_flow_value(self.Q_rad_LowCan)       # 작물 → pipe_low 복사 (pipe_low가 받음, 양수)
-            -get_heat_flow_value(self.Q_rad_LowFlr)       # 바닥 → pipe_low 복사 (pipe_low가 받음, 양수)
-            -get_heat_flow_value(self.Q_cnv_LowAir)      # pipe_low → 공기 대류 (pipe_low가 줌, 음수)
-            -get_heat_flow_value(self.Q_rad_LowScr)       # pipe_low → 스크린 복사 (pipe_low가 줌, 음수)
-        )
-        
-        self.pipe_up.Q_flow = (
-            -get_heat_flow_value(self.Q_rad_UpCov)       # pipe_up → 외피 복사 (pipe_up가 줌, 음수)
-            -get_heat_flow_value(self.Q_rad_UpCan)       # pipe_up → 작물 복사 (pipe_up가 줌, 음수)
-            -get_heat_flow_value(self.Q_cnv_UpAir)       # pipe_up → 공기 대류 (pipe_up가 줌, 음수)
-            -get_heat_flow_value(self.Q_rad_UpFlr)        # 바닥 → pipe_up 복사 (pipe_up가 받음, 양수)
-            -get_heat_flow_value(self.Q_rad_UpScr)         # 스크린 → pipe_up 복사 (pipe_up가 받음, 양수)
-        )
+        # 난방 파이프 셀별 열 포트 유량 → 셀 에너지 밸런스 (pipe.Q_flow = 셀 합)
+        for name, pipe, q_cnv in (('pipe_low', self.pipe_low, self.Q_cnv_LowAir),
+                                  ('pipe_up', self.pipe_up, self.Q_cnv_UpAir)):
+            pipe.set_heat_flows(
+                radiation.node_flows(name)                               # 셀 ↔ 외피/작물/바닥/스크린 복사
+                - [port.Q_flow for port in q_cnv.heatPorts_a.ports])     # 셀 → 공기 대류 (파이프가 줌, 음수)
     
+    def _step_average(self, G: float, C_a: float, C_b: float) -> float:
+        """
+        두 열용량 C_a, C_b 사이 교환 유량(컨덕턴스 G)의 스텝 평균 / 순간 값 비율
+
+        온도차는 exp(-x*t/dt)로 감쇠하므로 (1 - exp(-x))/x, x = G*dt*(1/C_a + 1/C_b)
+        """
+        x = G * self.dt * (1.0 / C_a + 1.0 / C_b)
+        return -np.expm1(-x) / x if x > 1e-12 else 1.0
+
     def _update_control_systems(self, dt: float, row) -> None:
+        self._set_control_inputs(row)
+        self._step_controllers(dt)
+        self._apply_control_outputs(row)
+
+    @property
+    def controllers(self):
+        """PID 컨트롤러 (환기 3개, 난방, CO2)"""
+        return self.U_vents.controllers + (self.PID_Mdot, self.PID_CO2)
+
+    def register_controllers(self, bank) -> None:
+        """
+        PID 컨트롤러들을 PIDBank에 등록합니다.
+
+        여러 온실이 같은 뱅크를 공유하면 _begin_step → bank.step → _finish_step
+        (또는 _begin_sample → bank.step → _finish_sample) 순서로 모든 온실의 PID를
+        한 번의 벡터 연산으로 진행할 수 있습니다 (GreenhouseEnsemble 참고).
+        """
+        self._pid_indices = bank.register_all(self.controllers)
+        self.pid_bank = bank
+
+    def _set_control_inputs(self, row) -> None:
         # 1. 보온 스크린 제어 업데이트
         self._update_thermal_screen_control(row)
         
-        # 2. 환기 제어 업데이트
+        # 2. 환기 제어 입력 (Modelica 원본과 일치)
+        self.U_vents.T_air = self.air.T  # 현재 온실 내부 온도
+        self.U_vents.T_air_sp = row['T_sp'] + 273.15  # 설정 온도 (K)
+        self.U_vents.RH_air = self.air.RH  # 현재 상대습도
+        self.U_vents.Mdot = self.PID_Mdot.CS  # PID 제어기로부터 계산된 질량 유량 (이전 스텝 값)
+        self.U_vents.set_pid_inputs()
+        
+        # 3. 난방 PID 제어 입력값 업데이트 (Modelica 원본과 일치)
+        self.PID_Mdot.PV = self.air.T                  # 현재 온도
+        self.PID_Mdot.SP = row['T_sp'] + 273.15        # 온도 설정값 [K]
+        
+        # 4. CO2 PID 제어 입력값 업데이트 (Modelica 원본과 일치)
+        self.PID_CO2.PV = self.CO2_air.CO2  # 현재 CO2 농도 [mg/m³]
+        self.PID_CO2.SP = self.CO2_SP_var   # CO2 설정값 [mg/m³] (이미 mg/m³ 단위)
+
+    def _step_controllers(self, dt: float) -> None:
+        # PID 진행 (뱅크에 등록되어 있으면 이 온실의 컨트롤러만 벡터 연산으로 진행)
+        if self.pid_bank is None:
+            for pid in self.controllers:
+                pid.step(dt=self.dt)
+        else:
+            self.pid_bank.step(self.dt, self._pid_indices)
+
+    def _apply_control_outputs(self, row) -> None:
+        # 1. 환기 제어 출력 (PID 출력 결합)
         self._update_ventilation_control(row)
         
-        # 3. 난방 제어 업데이트
+        # 2. 난방 제어 출력
         self._update_heating_control(row)
         
-        # 4. CO2 제어 업데이트
+        # 3. CO2 제어 출력
         self._update_co2_control(row)
         
-        # 5. 조명 제어 업데이트
+        # 4. 조명 제어 업데이트
         self._update_illumination_control(row)
     
     def _update_thermal_screen_control(self, row) -> None:
+        self._set_screen_inputs(row)
+        
+        # 보온 스크린 제어 업데이트
+        self.SC.step(dt=self.dt)
+        
+        # 보온 스크린 상태 업데이트
+        self.thScreen.SC = self.SC.SC
+        
+        # 모든 스크린 관련 컴포넌트에 SC 동기화
+        self._synchronize_screen_components()
+
+    def _set_screen_inputs(self, row) -> None:
         # 보온 스크린 제어 입력값 업데이트
         self.SC.T_air_sp = row['T_sp'] + 273.15  # 온도 설정값 (K)
         self.SC.Tout_Kelvin = self.Tout  # 외부 온도 (이미 켈빈 단위)
         
         # RH 센서 계산 및 연결 (Modelica 원본과 일치)
-        self.RH_air_sensor.calculate()
-        self.SC.RH_air = self.RH_air_sensor.RH / 100.0  # % → 소수점으로 변환
+        self.RH_air_sensor.update()
+        self.SC.RH_air = self.RH_air_sensor.RH  # 이미 0~1 범위
         
         # sc_usable이 리스트인지 스칼라인지 확인하여 안전하게 처리
         if isinstance(row['SC'], list):
@@ -1442,15 +1984,6 @@ class Greenhouse_1:
             self.SC.SC_usable = row['SC']         # 스크린 사용 가능 시간 (스칼라 값)
             
         self.SC.R_Glob_can = self.solar_model.R_t_Glob  # 작물 수준 전천일사량
-        
-        # 보온 스크린 제어 업데이트
-        self.SC.step(dt=self.dt)
-        
-        # 보온 스크린 상태 업데이트
-        self.thScreen.SC = self.SC.SC
-        
-        # 모든 스크린 관련 컴포넌트에 SC 동기화
-        self._synchronize_screen_components()
     
     def _synchronize_screen_components(self) -> None:
         current_sc = self.thScreen.SC
@@ -1473,119 +2006,22 @@ class Greenhouse_1:
         # 4. 태양광 모델 동기화
         self.solar_model.SC = current_sc
         
-        # 5. View Factor 업데이트 (순환 참조 해결)
-        self._update_view_factors()
-        
-        # 6. 전체 복사 열전달 계수 업데이트 (스크린 관련 포함)
-        self._update_radiation_coefficients()
-    
-    def _update_view_factors(self) -> None:
-        # Q_rad_CanCov View Factor 업데이트
-        self.Q_rad_CanCov.FFab1 = self.pipe_up.FF
-        self.Q_rad_CanCov.FFab2 = self.thScreen.FF_ij
-        self.Q_rad_CanCov._update_REC_ab()
-        
-        # Q_rad_FlrCan View Factor 업데이트
-        self.Q_rad_FlrCan.FFab1 = self.pipe_low.FF
-        self.Q_rad_FlrCan._update_REC_ab()
-        
-        # Q_rad_FlrCov View Factor 업데이트
-        self.Q_rad_FlrCov.FFab1 = self.pipe_low.FF
-        self.Q_rad_FlrCov.FFab3 = self.pipe_up.FF
-        self.Q_rad_FlrCov.FFab4 = self.thScreen.FF_ij
-        self.Q_rad_FlrCov._update_REC_ab()
-        
-        # Q_rad_CanScr View Factor 업데이트
-        self.Q_rad_CanScr.FFab1 = self.pipe_up.FF
-        self.Q_rad_CanScr.FFb = self.thScreen.FF_i
-        self.Q_rad_CanScr._update_REC_ab()
-        
-        # Q_rad_FlrScr View Factor 업데이트
-        self.Q_rad_FlrScr.FFb = self.thScreen.FF_i
-        self.Q_rad_FlrScr.FFab2 = self.pipe_up.FF
-        self.Q_rad_FlrScr.FFab3 = self.pipe_low.FF
-        self.Q_rad_FlrScr._update_REC_ab()
-        
-        # Q_rad_ScrCov View Factor 업데이트
-        self.Q_rad_ScrCov.FFa = self.thScreen.FF_i
-        self.Q_rad_ScrCov._update_REC_ab()
-        
-        # Radiation_N 컴포넌트들 View Factor 업데이트
-        # Q_rad_LowFlr View Factor 업데이트
-        self.Q_rad_LowFlr.FFa = self.pipe_low.FF
-        self.Q_rad_LowFlr._update_REC_ab()
-        
-        # Q_rad_LowCan View Factor 업데이트
-        self.Q_rad_LowCan.FFa = self.pipe_low.FF
-        self.Q_rad_LowCan.FFb = self.canopy.FF
-        self.Q_rad_LowCan._update_REC_ab()
-        
-        # Q_rad_LowCov View Factor 업데이트
-        self.Q_rad_LowCov.FFa = self.pipe_low.FF
-        self.Q_rad_LowCov.FFab1 = self.canopy.FF
-        self.Q_rad_LowCov.FFab2 = self.pipe_up.FF
-        self.Q_rad_LowCov.FFab3 = self.thScreen.FF_ij
-        self.Q_rad_LowCov._update_REC_ab()
-        
-        # Q_rad_LowScr View Factor 업데이트
-        self.Q_rad_LowScr.FFa = self.pipe_low.FF
-        self.Q_rad_LowScr.FFb = self.thScreen.FF_i
-        self.Q_rad_LowScr.FFab1 = self.canopy.FF
-        self.Q_rad_LowScr.FFab2 = self.pipe_up.FF
-        self.Q_rad_LowScr._update_REC_ab()
-        
-        # Q_rad_UpFlr View Factor 업데이트
-        self.Q_rad_UpFlr.FFa = self.pipe_up.FF
-        self.Q_rad_UpFlr.FFab1 = self.canopy.FF
-        self.Q_rad_UpFlr.FFab2 = self.pipe_low.FF
-        self.Q_rad_UpFlr._update_REC_ab()
-        
-        # Q_rad_UpCan View Factor 업데이트
-        self.Q_rad_UpCan.FFa = self.pipe_up.FF
-        self.Q_rad_UpCan.FFb = self.canopy.FF
-        self.Q_rad_UpCan._update_REC_ab()
-        
-        # Q_rad_UpCov View Factor 업데이트
-        self.Q_rad_UpCov.FFa = self.pipe_up.FF
-        self.Q_rad_UpCov.FFab1 = self.thScreen.FF_ij
-        self.Q_rad_UpCov._update_REC_ab()
-        
-        # Q_rad_UpScr View Factor 업데이트
-        self.Q_rad_UpScr.FFa = self.pipe_up.FF
-        self.Q_rad_UpScr.FFb = self.thScreen.FF_i
-        self.Q_rad_UpScr._update_REC_ab()
+        # 복사 열전달 계수는 유속 계산 전의 _update_component_connections()에서 갱신
+        # (스크린 view factor FF_i/FF_ij는 그 시점에 ThermalScreen.step()으로 갱신됨)
     
     def _update_ventilation_control(self, row) -> None:
-        # 환기 제어 입력값 업데이트 (Modelica 원본과 일치)
-        self.U_vents.T_air = self.air.T  # 현재 온실 내부 온도
-        self.U_vents.T_air_sp = row['T_sp'] + 273.15  # 설정 온도 (K)
-        self.U_vents.RH_air = self.air.RH  # 현재 상대습도
-        self.U_vents.Mdot = self.PID_Mdot.CS  # PID 제어기로부터 계산된 질량 유량
-        
-        # 환기 제어 계산 및 적용
-        self.U_vents.step(dt=self.dt)
+        # 환기 제어 계산 및 적용 (입력/PID 진행은 _set_control_inputs, _step_controllers)
+        self.U_vents.combine()
         
         # 환기 컴포넌트들의 U_vents 값 업데이트
         self.Q_ven_AirOut.U_vents = self.U_vents.y
         self.Q_ven_TopOut.U_vents = self.U_vents.y
     
     def _update_heating_control(self, row) -> None:
-        # 난방 PID 제어 입력값 업데이트 (Modelica 원본과 일치)
-        self.PID_Mdot.PV = self.air.T                  # 현재 온도
-        self.PID_Mdot.SP = row['T_sp'] + 273.15        # 온도 설정값 [K]
-        
-        # 난방 PID 제어 업데이트
-        self.PID_Mdot.step(dt=self.dt)
-        
         # 난방수 유량 업데이트
         self.sourceMdot_1ry.Mdot = self.PID_Mdot.CS
     
     def _update_co2_control(self, row) -> None:
-        # CO2 PID 제어 입력값 업데이트 (Modelica 원본과 일치)
-        self.PID_CO2.PV = self.CO2_air.CO2  # 현재 CO2 농도 [mg/m³]
-        self.PID_CO2.SP = self.CO2_SP_var   # CO2 설정값 [mg/m³] (이미 mg/m³ 단위)
-        self.PID_CO2.step(dt=self.dt)
-        
         # PID 제어기의 출력값을 외부 CO2 주입 컴포넌트에 연결
         self.MC_ExtAir.U_MCext = self.PID_CO2.CS
         
@@ -1610,10 +2046,11 @@ class Greenhouse_1:
         self._calculate_energy_per_area()
     
     def _calculate_heating_energy(self, dt: float) -> None:
+        # 파이프 열량 = 열 포트로 빠져나간 열 (-Q_flow, 셀 엔탈피 감소량과 같음)
         # 하부 파이프 열량
-        q_low = -self.pipe_low.flow1DimInc.Q_tot / surface
+        q_low = -self.pipe_low.Q_flow / surface
         # 상부 파이프 열량
-        q_up = -self.pipe_up.flow1DimInc.Q_tot / surface
+        q_up = -self.pipe_up.Q_flow / surface
         # 총 열량
         q_tot = q_low + q_up
 
@@ -1642,8 +2079,8 @@ class Greenhouse_1:
     
     def _calculate_energy_per_area(self) -> None:
         # 난방 에너지 (W/m²)
-        self.q_low = -self.pipe_low.flow1DimInc.Q_tot / surface
-        self.q_up = -self.pipe_up.flow1DimInc.Q_tot / surface
+        self.q_low = -self.pipe_low.Q_flow / surface
+        self.q_up = -self.pipe_up.Q_flow / surface
         self.q_tot = self.q_low + self.q_up
         
         # 전기 에너지 (W/m²)
@@ -1652,8 +2089,8 @@ class Greenhouse_1:
         # 디버깅 출력 (1시간마다)
         if hasattr(self, '_debug_step') and self._debug_step:
             print(f"\n=== 에너지 단위면적 계산 디버깅 ({self._current_time/3600:.1f}시간) ===")
-            print(f"pipe_low.flow1DimInc.Q_tot: {self.pipe_low.flow1DimInc.Q_tot:.1f} W")
-            print(f"pipe_up.flow1DimInc.Q_tot: {self.pipe_up.flow1DimInc.Q_tot:.1f} W")
+            print(f"pipe_low.Q_flow: {self.pipe_low.Q_flow:.1f} W")
+            print(f"pipe_up.Q_flow: {self.pipe_up.Q_flow:.1f} W")
             print(f"surface: {surface:.0f} m²")
             print(f"q_low 계산: {self.q_low:.1f} W/m²")
             print(f"q_up 계산: {self.q_up:.1f} W/m²")
@@ -1862,38 +2299,15 @@ class Greenhouse_1:
             raise ValueError(f"조명 상태({control['illumination']['switch']:.2f})가 허용 범위를 벗어났습니다")
 
     def _update_radiation_coefficients(self) -> None:
-        # 바닥→작물 복사 열전달 계수 업데이트
-        self.Q_rad_FlrCan.FFa = 1.0
-        self.Q_rad_FlrCan.FFb = self.canopy.FF
-        self.Q_rad_FlrCan._update_REC_ab()
-        
-        # 바닥→외피 복사 열전달 계수 업데이트
-        self.Q_rad_FlrCov.FFa = 1.0
-        self.Q_rad_FlrCov.FFb = 1.0
-        self.Q_rad_FlrCov._update_REC_ab()
-        
-        # 바닥→스크린 복사 열전달 계수 업데이트
-        self.Q_rad_FlrScr.FFa = 1.0
-        self.Q_rad_FlrScr.FFb = self.thScreen.FF_i
-        self.Q_rad_FlrScr._update_REC_ab()
-        
-        # 스크린→외피 복사 열전달 계수 업데이트
-        self.Q_rad_ScrCov.FFa = self.thScreen.FF_i
-        self.Q_rad_ScrCov.FFb = 1.0
-        self.Q_rad_ScrCov._update_REC_ab()
-        
-        # 작물→스크린 복사 열전달 계수 업데이트
-        self.Q_rad_CanScr.FFa = self.canopy.FF
-        self.Q_rad_CanScr.FFb = self.thScreen.FF_i
-        self.Q_rad_CanScr._update_REC_ab()
-        
-        # 작물→외피 복사 열전달 계수 업데이트
-        self.Q_rad_CanCov.FFa = self.canopy.FF
-        self.Q_rad_CanCov.FFb = 1.0
-        self.Q_rad_CanCov.FFab1 = self.pipe_up.FF
-        self.Q_rad_CanCov.FFab2 = self.thScreen.FF_ij
-        self.Q_rad_CanCov._update_REC_ab()
-        
+        """
+        복사 열전달 계수 업데이트
+
+        view factor 입력(스크린 개폐, LAI, 파이프 FF)이 바뀐 요소만 REC_ab를 다시 계산하고
+        (self.view_factors.hits / misses로 확인), 바뀐 경우에만 네트워크 REC 행렬을 갱신
+        """
+        if self.view_factors.update(self):
+            self.radiation.update_coefficients()
+
     def _update_component_connections(self) -> None:
         # 1. TYM 모델의 환경 조건 업데이트
         self.TYM.set_environmental_conditions(
@@ -1933,10 +2347,7 @@ class Greenhouse_1:
         # 9. 스크린 관련 컴포넌트 연결 업데이트
         self.Q_cnv_ScrTop.MV_AirScr = self.Q_cnv_AirScr.MV_flow
         
-        # 10. View Factor 업데이트 (순환 참조 해결)
-        self._update_view_factors()
-        
-        # 11. 복사 열전달 계수 업데이트
+        # 10. View Factor 기반 복사 열전달 계수 업데이트
         self._update_radiation_coefficients()
 
     def _print_mc_flows(self):
@@ -10,7 +10,11 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Union, Tuple, Any
 from port_connection_manager import PortConnectionManager, PipeConnectionManager, PortType
-from Functions.WaterVapourPressure import WaterVapourPressure
+from Functions import Psychrometrics
+from multirate import build_greenhouse_scheduler
+from input_provider import InputProvider
+from input_cache import load_input_table
+import checkpoint
 
 # Constants
 # Physical constants
@@ -28,10 +32,21 @@ SCREEN_USABLE_PATH = "./SC_usable_10Dec-22Nov.txt"
 
 class Greenhouse_2:
 
-    def __init__(self, time_unit_scaling: float = 1.0):
-        """온실 시뮬레이션 모델 초기화"""
+    def __init__(self, time_unit_scaling: float = 1.0,
+                 update_periods: Optional[Dict[str, float]] = None,
+                 input_interpolation: str = 'linear'):
+        """
+        온실 시뮬레이션 모델 초기화
+        
+        Args:
+            time_unit_scaling (float): 시간 단위 스케일
+            update_periods (Dict[str, float]): 느린 컴포넌트 갱신 주기 [s]
+                (None이면 multirate.UPDATE_PERIODS, 0이면 매 스텝 갱신)
+            input_interpolation (str): 입력 보간 방식 ('linear' 또는 'zoh')
+        """
         self.time_unit_scaling = time_unit_scaling
         self.dt = 0.0  # 시간 간격 초기화
+        self.next_time_idx = 0  # 다음에 실행할 스텝 인덱스 (체크포인트 재개 위치)
         
         # 포트 연결 관리자들 초기화
         self.port_manager = PortConnectionManager()
@@ -51,6 +66,8 @@ class Greenhouse_2:
         
         # 통합 입력 데이터프레임 생성
         self.input_df = self._load_and_merge_inputs()
+        self.inputs = InputProvider.from_array(self._input_table, list(self.input_df.columns),
+                                               mode=input_interpolation)
         
         # 날씨 데이터 및 설정값 초기화 (Modelica 원본과 일치)
         self.Tout = 293.15      # 외부 온도 [K] (Modelica: Tout)
@@ -76,31 +93,22 @@ class Greenhouse_2:
         # 초기 데이터 로드 (첫 번째 스텝의 데이터로 초기화)
         self._load_initial_data()
         
+        # 느린 컴포넌트(작물, 토양) 다중 속도 스케줄러
+        self.scheduler = build_greenhouse_scheduler(self, update_periods)
+        
         print("Greenhouse_2 초기화 완료")
     
     def _load_and_merge_inputs(self):
-        # 파일 읽기 (헤더 포함, skiprows 없이)
-        weather = pd.read_csv(WEATHER_DATA_PATH, sep='\t')
-        setpoint = pd.read_csv(SETPOINT_DATA_PATH, sep='\t')
-        sc_usable = pd.read_csv(SCREEN_USABLE_PATH, sep='\t')
-        # 컬럼명 통일 (필요시)
-        weather = weather.rename(columns={weather.columns[0]: 'time'})
-        setpoint = setpoint.rename(columns={setpoint.columns[0]: 'time'})
-        sc_usable = sc_usable.rename(columns={sc_usable.columns[0]: 'time'})
-        # time 기준 merge (outer join)
-        df = pd.merge(weather, setpoint, on='time', how='outer')
-        df = pd.merge(df, sc_usable, on='time', how='outer')
-        # 시간순 정렬
-        df = df.sort_values('time').reset_index(drop=True)
-        # 결측치 선형 보간
-        df = df.interpolate(method='linear', limit_direction='both')
-        return df
+        # 날씨/설정값/스크린 파일을 time 기준 병합 + 선형 보간 (input_cache.merge_input_tables)
+        # 원본이 바뀌지 않았으면 __inputcache__/의 .npy를 읽기 전용 메모리 매핑으로 재사용
+        names, self._input_table = load_input_table(
+            [WEATHER_DATA_PATH, SETPOINT_DATA_PATH, SCREEN_USABLE_PATH])
+        return pd.DataFrame(self._input_table, columns=names, copy=False)
 
     def _get_input_row(self, current_time):
         # current_time: 초 단위
-        # 가장 가까운 time 행을 반환
-        idx = (self.input_df['time'] - current_time).abs().idxmin()
-        return self.input_df.iloc[idx]
+        # 입력 제공자의 커서 기반 O(1) 조회 (선형 보간 또는 0차 유지, float 값 구조체)
+        return self.inputs.row(current_time)
 
     def _load_initial_data(self) -> None:
         """초기 데이터를 로드하여 환경 조건을 설정합니다."""
@@ -136,26 +144,21 @@ class Greenhouse_2:
             self.pipe_up.flow1DimInc.Tstart_inlet = 353.15   # 80°C
             self.pipe_up.flow1DimInc.Tstart_outlet = 323.15  # 50°C
             
-            # 원하는 RH(50%)에 맞는 수증기압 계산
-            from Functions.WaterVapourPressure import WaterVapourPressure
-            
             # 각 온도에서 50% 상대습도에 해당하는 수증기압 계산
-            vp_calculator = WaterVapourPressure()
-            
             # 실내 공기: 50% RH
-            air_vp = vp_calculator.calculate(self.air.T - 273.15, 50.0)  # 온도(°C), RH(%)
+            air_vp = Psychrometrics.vapour_pressure(self.air.T, 0.5)
             self.air.massPort.VP = air_vp
             self.air.airVP.VP = air_vp  # ⭐ AirVP 컴포넌트의 VP도 설정!
             self.air.airVP.port.VP = air_vp  # ⭐ AirVP 포트의 VP도 설정!
             
             # 상부 공기: 50% RH
-            air_top_vp = vp_calculator.calculate(self.air_Top.T - 273.15, 50.0)
+            air_top_vp = Psychrometrics.vapour_pressure(self.air_Top.T, 0.5)
             self.air_Top.massPort.VP = air_top_vp
             self.air_Top.air.VP = air_top_vp  # ⭐ Air_Top의 AirVP 컴포넌트도 설정!
             self.air_Top.air.port.VP = air_top_vp  # ⭐ Air_Top의 포트도 설정!
             
             # 작물: 60% RH (약간 높게)
-            canopy_vp = vp_calculator.calculate(self.canopy.T - 273.15, 60.0)
+            canopy_vp = Psychrometrics.vapour_pressure(self.canopy.T, 0.6)
             self.canopy.massPort.VP = canopy_vp
             
             # 외피: 외부 수증기압과 동일 (외부와 접촉)
@@ -231,7 +234,7 @@ class Greenhouse_2:
         외부 환경 조건을 설정합니다.
         
         Args:
-            row: 입력 데이터프레임의 한 행(Series)
+            row: 현재 시간의 입력값 (InputRow)
         """
         
         # 외부 온도 (Modelica: TMY_and_control.y[1]) - 섭씨를 켈빈으로 변환
@@ -247,8 +250,8 @@ class Greenhouse_2:
         self.I_glob = row['I_glob']  # col_4가 일사량
         
         # 외부 수증기압 [Pa]
-        # 섭씨 온도와 습도를 사용하여 수증기압 계산
-        self.VPout = WaterVapourPressure().calculate(row['T_out'], row['RH_out'])  # 섭씨 온도, 습도
+        # 외기 온도(°C → K)와 상대습도(% → 0~1)로 수증기압 계산
+        self.VPout = Psychrometrics.vapour_pressure(row['T_out'] + 273.15, row['RH_out'] / 100)
         
         # 조명 ON/OFF 신호 (Modelica: TMY_and_control.y[9])
         self.OnOff = row['ilu_sp'] if 'ilu_sp' in row else 0  # col_9가 조명
@@ -265,7 +268,7 @@ class Greenhouse_2:
         설정값을 업데이트합니다.
         
         Args:
-            row: 입력 데이터프레임의 한 행(Series)
+            row: 현재 시간의 입력값 (InputRow)
         """
         # 공기 온도 설정값 [K]
         self.Tair_setpoint = row['T_sp'] + 273.15
@@ -276,6 +279,7 @@ class Greenhouse_2:
     def step(self, dt: float, time_idx: int) -> None:
         """시뮬레이션 스텝 실행"""
         self.dt = dt  # 시간 간격 업데이트
+        self.next_time_idx = time_idx + 1
         
         # 실제 시간 계산 (초 단위)
         current_time = time_idx * dt  # [초]
@@ -341,6 +345,43 @@ class Greenhouse_2:
         #     except ValueError as e:
         #         raise ValueError(f"상태 검증 실패: {str(e)}")
     
+    def save_checkpoint(self, path: str) -> None:
+        """
+        전체 동적 상태를 체크포인트 파일로 저장합니다.
+        
+        컴포넌트 상태, 제어기 내부 상태(PID, 스크린 제어 상태/타이머, 환기 PID),
+        누적 에너지, 스케줄러와 입력 커서를 포함하며 입력 테이블은 저장하지 않습니다.
+        재개 위치는 next_time_idx입니다.
+        """
+        checkpoint.save_checkpoint(self, path)
+    
+    @classmethod
+    def from_checkpoint(cls, path: str) -> 'Greenhouse_2':
+        """
+        체크포인트 파일에서 모델을 복원합니다. (__init__ 재실행 없음)
+        
+        step(dt, model.next_time_idx)부터 이어서 실행하면 중단 없는 실행과
+        비트 단위로 같은 궤적을 얻습니다.
+        """
+        return checkpoint.load_checkpoint(path, cls)
+    
+    def fork(self, k: int = 1,
+             overrides: Optional[List[Optional[Dict[str, Any]]]] = None) -> List['Greenhouse_2']:
+        """
+        현재 상태에서 K개의 독립된 모델을 분기합니다. (__init__ 재실행 없음)
+        
+        동적 상태와 제어기 상태, 입력 커서는 자식마다 복제하고 입력 테이블과
+        읽기 전용 파라미터 배열은 공유합니다.
+        
+        Args:
+            k: 자식 수
+            overrides: 자식별 입력 override (예: [{'T_sp': 18.0}, {'T_sp': lambda t, v: v + 1}])
+        
+        Returns:
+            List[Greenhouse_2]: step(dt, child.next_time_idx)부터 진행할 수 있는 자식 모델들
+        """
+        return checkpoint.fork(self, k, overrides)
+    
     def _update_components(self, dt: float) -> None:
         """컴포넌트 상태를 업데이트합니다."""
 
@@ -379,8 +420,7 @@ class Greenhouse_2:
         self.thScreen.step(dt)
         self.illu.step(dt)
         self.solar_model.step(dt)
-        self.TYM.step(dt)
-        self.Q_cd_Soil.step(dt)
+        self.scheduler.advance(dt)  # 작물(TYM), 토양 레이어: 각자의 주기로 갱신
         self.CO2_air.step(dt)
         self.CO2_top.step(dt)
         
@@ -527,17 +567,17 @@ class Greenhouse_2:
         
         # 2. 소스 → 하부 파이프
         self.pipe_low.pipe_in.p = self.sourceMdot_1ry.flangeB.p
-        self.pipe_low.pipe_in.m_flow = self.sourceMdot_1ry.flangeB.m_flow
+        self.pipe_low.pipe_in.m_flow = -self.sourceMdot_1ry.flangeB.m_flow
         self.pipe_low.pipe_in.h_outflow = self.sourceMdot_1ry.flangeB.h_outflow
         
         # 3. 하부 파이프 → 상부 파이프
         self.pipe_up.pipe_in.p = self.pipe_low.pipe_out.p
-        self.pipe_up.pipe_in.m_flow = self.pipe_low.pipe_out.m_flow
+        self.pipe_up.pipe_in.m_flow = -self.pipe_low.pipe_out.m_flow
         self.pipe_up.pipe_in.h_outflow = self.pipe_low.pipe_out.h_outflow
         
         # 4. 상부 파이프 → 싱크
         self.sinkP_2ry.flangeB.p = self.pipe_up.pipe_out.p
-        self.sinkP_2ry.flangeB.m_flow = self.pipe_up.pipe_out.m_flow
+        self.sinkP_2ry.flangeB.m_flow = -self.pipe_up.pipe_out.m_flow
         self.sinkP_2ry.flangeB.h_outflow = self.pipe_up.pipe_out.h_outflow
         
         # 5. 파이프 대류 열전달 포트 연결
@@ -547,14 +587,6 @@ class Greenhouse_2:
             for i, port in enumerate(q_cnv.heatPorts_a.ports):
                 port.T = pipe.T
 
-            # flow1DimInc 각 셀에 유량(M_dot)·유체온도 셋업
-            m_dot_per_cell = abs(self.sourceMdot_1ry.flangeB.m_flow) / pipe.N
-            for cell in pipe.flow1DimInc.Cells:
-                cell.M_dot = m_dot_per_cell
-                cell.heatTransfer.M_dot = m_dot_per_cell
-                cell.heatTransfer.T_fluid = [self.sourceMdot_1ry.T_0]
-                cell.heatTransfer.calculate()
-
             # 공기측 포트 온도
             q_cnv.port_b.T = self.air.T
     
@@ -650,16 +682,6 @@ class Greenhouse_2:
         self.pipe_low.step(dt=self.dt)  # 추가
         self.pipe_up.step(dt=self.dt)
 
-        # 하부 파이프 셀에 유량 분배
-        for cell in self.pipe_low.flow1DimInc.Cells:
-            cell.M_dot = abs(self.pipe_low.pipe_in.m_flow) / self.pipe_low.N
-            cell.heatTransfer.M_dot = cell.M_dot
-
-        # 상부 파이프 셀에 유량 분배
-        for cell in self.pipe_up.flow1DimInc.Cells:
-            cell.M_dot = abs(self.pipe_up.pipe_in.m_flow) / self.pipe_up.N
-            cell.heatTransfer.M_dot = cell.M_dot
-
         self.Q_cnv_LowAir.step()
         self.Q_cnv_UpAir.step()
         
@@ -707,8 +729,8 @@ class Greenhouse_2:
         self.Q_rad_FlrScr.step()
     
     def _calculate_conduction(self) -> None:
-        # 바닥과 토양 사이의 전도
-        self.Q_cd_Soil.step(dt=self.dt)  # dt 인자 추가
+        # 바닥과 토양 사이의 전도 (유속만 계산, 레이어 온도는 scheduler에서 갱신)
+        self.Q_cd_Soil.Q_flow = self.Q_cd_Soil.calculate()
     
     def _calculate_component_heat_balance(self) -> None:
         
@@ -1059,10 +1081,12 @@ class Greenhouse_2:
         self._calculate_energy_per_area()
     
     def _calculate_heating_energy(self, dt: float) -> None:
+        # 파이프 열량 = 열 포트로 빠져나간 열 (-Q_flow)
+        # (벽 포트가 연결되지 않아 표면은 물 온도이므로 flow1DimInc.Q_tot 대신 포트 밸런스 사용)
         # 하부 파이프 열량
-        q_low = -self.pipe_low.flow1DimInc.Q_tot / surface
+        q_low = -self.pipe_low.Q_flow / surface
         # 상부 파이프 열량
-        q_up = -self.pipe_up.flow1DimInc.Q_tot / surface
+        q_up = -self.pipe_up.Q_flow / surface
         # 총 열량
         q_tot = q_low + q_up
 
@@ -1091,8 +1115,8 @@ class Greenhouse_2:
     
     def _calculate_energy_per_area(self) -> None:
         # 난방 에너지 (W/m²)
-        self.q_low = -self.pipe_low.flow1DimInc.Q_tot / surface
-        self.q_up = -self.pipe_up.flow1DimInc.Q_tot / surface
+        self.q_low = -self.pipe_low.Q_flow / surface
+        self.q_up = -self.pipe_up.Q_flow / surface
         self.q_tot = self.q_low + self.q_up
         
         # 전기 에너지 (W/m²)
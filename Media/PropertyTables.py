@@ -0,0 +1,346 @@
+"""
+PropertyTables.py
+물/공기 물성 테이블 (운전 범위에서 미리 계산한 1-D/2-D 격자 + 벡터화 보간)
+
+- PropertyTable: 균일 1-D 격자, 3차 스플라인(cubic, 기본) 또는 선형(linear) 보간
+- PropertyTable2D: 균일 2-D 격자, 쌍선형(bilinear) 보간
+- WaterProperties: 물 0~100 °C (T -> rho, cp, h / h -> T)
+- AirProperties: 건조공기 -20~60 °C (T -> cp, h, k, mu / (p, T) -> rho)
+- water_properties(), air_properties(): 기본 격자로 한 번만 만들어 공유하는 인스턴스
+
+입력은 스칼라(빠른 경로, float 반환) 또는 배열(NumPy로 한 번에 계산)이고,
+격자 밖에서는 끝점 기울기로 선형 외삽함 (오차 한계는 격자 범위 안에서만 유효).
+
+오차 한계: 테이블을 만들 때 각 셀의 1/4, 1/2, 3/4 지점(2-D는 셀 중심과 변 중점)에서
+기준식과 비교한 최대 절대오차를 table.error[name]에 저장함. 기본 격자의 값:
+
+    물 (1 K 간격, cubic)      rho < 1e-6 kg/m³, cp < 1e-6 J/(kg·K), h < 1e-4 J/kg, T(h) < 1e-8 K
+    공기 (1 K 간격, cubic)    cp, h, k, mu: 상대오차 < 1e-11
+    공기 rho (bilinear, 2 kPa x 1 K)   < 1e-5 kg/m³ (상대오차 < 1e-5)
+
+기준식:
+- 물 밀도: Kell (1975), 1 atm
+- 물 비열: Zografos et al. (1987) 다항식 (0~100 °C에서 IAPWS 대비 약 0.1 %),
+  엔탈피 h는 비열의 해석 적분 (h(273.15 K) = 0, Flow1DimInc의 h = c_p*(T - 273.15)과 같은 기준)
+- 공기: 이상기체 rho = p/(R_s*T) (R_s = 287, Media.Air.ReferenceAir.Air_pT와 동일),
+  cp = 1002.5 + 275e-6*(T - 200)², 점성계수/열전도율은 Sutherland 식
+"""
+
+import functools
+from typing import Callable, Dict
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+INTERPOLATIONS = ('cubic', 'linear')
+
+T_WATER_MIN, T_WATER_MAX = 273.15, 373.15   # 물 온도 범위 [K]
+T_AIR_MIN, T_AIR_MAX = 253.15, 333.15       # 공기 온도 범위 [K]
+P_AIR_MIN, P_AIR_MAX = 0.9e5, 1.1e5         # 공기 압력 범위 [Pa]
+R_AIR = 287.0                               # 건조공기 기체상수 [J/(kg·K)]
+
+
+class PropertyTable:
+    """
+    균일 1-D 격자 물성 테이블
+
+    각 구간 i의 다항식 계수 c[:, i]를 미리 계산해 두고
+    f(x) = ((c0*t + c1)*t + c2)*t + c3, t = x - x_i 로 계산 (선형은 c0 = c1 = 0)
+    """
+
+    def __init__(self, x_min: float, x_max: float, n: int,
+                 functions: Dict[str, Callable], kind: str = 'cubic'):
+        """
+        Args:
+            x_min, x_max: 격자 범위
+            n: 격자점 수 (2 이상, cubic은 4 이상)
+            functions: 물성 이름 -> 기준식 (배열 입력)
+            kind: 보간 방식 ('cubic' 또는 'linear')
+        """
+        if kind not in INTERPOLATIONS:
+            raise ValueError(f"kind must be one of {INTERPOLATIONS}, got {kind!r}")
+        if n < (4 if kind == 'cubic' else 2) or not x_max > x_min:
+            raise ValueError(f"Invalid grid: [{x_min}, {x_max}] with {n} points ({kind})")
+        self.kind = kind
+        self.x_min = float(x_min)
+        self.x_max = float(x_max)
+        self.n = n
+        self.x = np.linspace(x_min, x_max, n)
+        self.dx = (self.x_max - self.x_min) / (n - 1)
+
+        self.coefficients: Dict[str, np.ndarray] = {}   # 이름 -> (4, n-1) 구간별 계수
+        self._rows: Dict[str, list] = {}                # 이름 -> 구간별 계수 튜플 (스칼라 경로)
+        self._slopes: Dict[str, tuple] = {}             # 이름 -> (왼쪽 끝, 오른쪽 끝) 기울기
+        self.error: Dict[str, float] = {}               # 이름 -> 최대 절대오차
+        for name, function in functions.items():
+            self._add(name, function)
+
+    def _add(self, name: str, function: Callable) -> None:
+        y = np.asarray(function(self.x), dtype=float)
+        if self.kind == 'cubic':
+            spline = CubicSpline(self.x, y)
+            c = np.array(spline.c)
+            slopes = (float(spline(self.x_min, 1)), float(spline(self.x_max, 1)))
+        else:
+            c = np.zeros((4, self.n - 1))
+            c[2] = np.diff(y) / self.dx
+            c[3] = y[:-1]
+            slopes = (c[2, 0], c[2, -1])
+        self.coefficients[name] = c
+        self._rows[name] = [tuple(row) for row in c.T.tolist()]
+        self._slopes[name] = slopes
+
+        x_check = (self.x[:-1, None] + self.dx * np.array([0.25, 0.5, 0.75])).ravel()
+        self.error[name] = float(np.max(np.abs(self(name, x_check) - function(x_check))))
+
+    @property
+    def names(self):
+        return tuple(self.coefficients)
+
+    def __call__(self, name: str, x):
+        """물성 name의 x에서의 값 (스칼라 또는 배열)"""
+        if isinstance(x, (float, int)):
+            xc = min(max(x, self.x_min), self.x_max)
+            i = min(int((xc - self.x_min) / self.dx), self.n - 2)
+            t = xc - self.x_min - i * self.dx
+            c0, c1, c2, c3 = self._rows[name][i]
+            value = ((c0 * t + c1) * t + c2) * t + c3
+            if xc != x:
+                value += self._slopes[name][x > xc] * (x - xc)
+            return float(value)
+
+        c = self.coefficients[name]
+        x = np.asarray(x, dtype=float)
+        xc = np.clip(x, self.x_min, self.x_max)
+        i = np.minimum(((xc - self.x_min) / self.dx).astype(np.intp), self.n - 2)
+        t = xc - self.x_min - i * self.dx
+        value = ((c[0, i] * t + c[1, i]) * t + c[2, i]) * t + c[3, i]
+        outside = x - xc
+        if np.any(outside):
+            low, high = self._slopes[name]
+            value = value + np.where(outside > 0, high, low) * outside
+        return value
+
+
+class PropertyTable2D:
+    """
+    균일 2-D 격자 물성 테이블 (쌍선형 보간, 격자 밖은 가장자리 셀로 외삽)
+    """
+
+    def __init__(self, x_min: float, x_max: float, nx: int,
+                 y_min: float, y_max: float, ny: int,
+                 functions: Dict[str, Callable]):
+        """
+        Args:
+            x_min, x_max, nx: 첫 번째 변수의 격자 (예: 압력 [Pa])
+            y_min, y_max, ny: 두 번째 변수의 격자 (예: 온도 [K])
+            functions: 물성 이름 -> 기준식 f(x, y) (배열 입력)
+        """
+        if nx < 2 or ny < 2 or not (x_max > x_min and y_max > y_min):
+            raise ValueError("Invalid 2-D grid")
+        self.x_min, self.x_max, self.nx = float(x_min), float(x_max), nx
+        self.y_min, self.y_max, self.ny = float(y_min), float(y_max), ny
+        self.x = np.linspace(x_min, x_max, nx)
+        self.y = np.linspace(y_min, y_max, ny)
+        self.dx = (self.x_max - self.x_min) / (nx - 1)
+        self.dy = (self.y_max - self.y_min) / (ny - 1)
+
+        self.values: Dict[str, np.ndarray] = {}   # 이름 -> (nx, ny) 격자값
+        self.error: Dict[str, float] = {}
+        X, Y = np.meshgrid(self.x, self.y, indexing='ij')
+        for name, function in functions.items():
+            self.values[name] = np.asarray(function(X, Y), dtype=float)
+            # 셀 중심과 변 중점에서 검사
+            xs = np.concatenate([self.x, self.x[:-1] + 0.5 * self.dx])
+            ys = np.concatenate([self.y, self.y[:-1] + 0.5 * self.dy])
+            XC, YC = np.meshgrid(xs, ys, indexing='ij')
+            self.error[name] = float(np.max(np.abs(self(name, XC, YC) - function(XC, YC))))
+
+    @property
+    def names(self):
+        return tuple(self.values)
+
+    def __call__(self, name: str, x, y):
+        """물성 name의 (x, y)에서의 값 (스칼라 또는 같은 모양으로 브로드캐스트되는 배열)"""
+        v = self.values[name]
+        if isinstance(x, (float, int)) and isinstance(y, (float, int)):
+            i = min(max(int((x - self.x_min) / self.dx), 0), self.nx - 2)
+            j = min(max(int((y - self.y_min) / self.dy), 0), self.ny - 2)
+            u = (x - self.x[i]) / self.dx
+            w = (y - self.y[j]) / self.dy
+            return float((1 - u) * ((1 - w) * v[i, j] + w * v[i, j + 1])
+                         + u * ((1 - w) * v[i + 1, j] + w * v[i + 1, j + 1]))
+
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        i = np.clip(np.floor((x - self.x_min) / self.dx).astype(np.intp), 0, self.nx - 2)
+        j = np.clip(np.floor((y - self.y_min) / self.dy).astype(np.intp), 0, self.ny - 2)
+        u = (x - self.x[i]) / self.dx
+        w = (y - self.y[j]) / self.dy
+        return ((1 - u) * ((1 - w) * v[i, j] + w * v[i, j + 1])
+                + u * ((1 - w) * v[i + 1, j] + w * v[i + 1, j + 1]))
+
+
+# ===== 기준식 =====
+
+# Zografos et al. (1987): cp = a0 + a1*T + a2*T² + a6*T⁶ [J/(kg·K)]
+_CP_WATER = (8155.99, -28.0627, 5.11283e-2, -2.17582e-13)
+
+
+def water_density(T):
+    """물 밀도 [kg/m³] (Kell 1975, 1 atm, T: 온도 [K])"""
+    t = np.asarray(T, dtype=float) - 273.15
+    return ((((( -280.54253e-12 * t + 105.56302e-9) * t - 46.170461e-6) * t
+              - 7.9870401e-3) * t + 16.945176) * t + 999.83952) / (1 + 16.879850e-3 * t)
+
+
+def water_cp(T):
+    """물 비열 [J/(kg·K)] (T: 온도 [K])"""
+    T = np.asarray(T, dtype=float)
+    a0, a1, a2, a6 = _CP_WATER
+    return a0 + a1 * T + a2 * T ** 2 + a6 * T ** 6
+
+
+def _water_cp_integral(T):
+    a0, a1, a2, a6 = _CP_WATER
+    return a0 * T + a1 * T ** 2 / 2 + a2 * T ** 3 / 3 + a6 * T ** 7 / 7
+
+
+def water_enthalpy(T):
+    """물 비엔탈피 [J/kg] (h(273.15 K) = 0, T: 온도 [K])"""
+    T = np.asarray(T, dtype=float)
+    return _water_cp_integral(T) - _water_cp_integral(273.15)
+
+
+def water_temperature(h):
+    """물 비엔탈피로부터 온도 [K] (water_enthalpy의 역함수, 뉴턴 반복)"""
+    h = np.asarray(h, dtype=float)
+    T = 273.15 + h / 4186.0
+    for _ in range(6):
+        T = T - (water_enthalpy(T) - h) / water_cp(T)
+    return T
+
+
+def air_density(p, T):
+    """건조공기 밀도 [kg/m³] (이상기체, p: 압력 [Pa], T: 온도 [K])"""
+    return np.asarray(p, dtype=float) / (R_AIR * np.asarray(T, dtype=float))
+
+
+def air_cp(T):
+    """건조공기 정압비열 [J/(kg·K)] (T: 온도 [K])"""
+    return 1002.5 + 275e-6 * (np.asarray(T, dtype=float) - 200.0) ** 2
+
+
+def air_enthalpy(T):
+    """건조공기 비엔탈피 [J/kg] (h(273.15 K) = 0, T: 온도 [K])"""
+    T = np.asarray(T, dtype=float)
+    return 1002.5 * (T - 273.15) + 275e-6 / 3 * ((T - 200.0) ** 3 - 73.15 ** 3)
+
+
+def air_viscosity(T):
+    """건조공기 점성계수 [Pa·s] (Sutherland, T: 온도 [K])"""
+    T = np.asarray(T, dtype=float)
+    return 1.716e-5 * (T / 273.15) ** 1.5 * (273.15 + 110.4) / (T + 110.4)
+
+
+def air_conductivity(T):
+    """건조공기 열전도율 [W/(m·K)] (Sutherland, T: 온도 [K])"""
+    T = np.asarray(T, dtype=float)
+    return 0.0241 * (T / 273.15) ** 1.5 * (273.15 + 194.0) / (T + 194.0)
+
+
+# ===== 물성 모델 =====
+
+class WaterProperties:
+    """
+    물 물성 테이블 (0~100 °C, 1 atm)
+
+    엔탈피 기준은 h(273.15 K) = 0 (Flow1DimInc와 동일)
+    """
+
+    def __init__(self, n: int = 101, kind: str = 'cubic'):
+        """
+        Args:
+            n: 온도/엔탈피 격자점 수 (기본 101: 1 K 간격)
+            kind: 보간 방식 ('cubic' 또는 'linear')
+        """
+        self.T_table = PropertyTable(T_WATER_MIN, T_WATER_MAX, n,
+                                     {'rho': water_density, 'cp': water_cp, 'h': water_enthalpy}, kind)
+        self.h_table = PropertyTable(float(water_enthalpy(T_WATER_MIN)), float(water_enthalpy(T_WATER_MAX)),
+                                     n, {'T': water_temperature}, kind)
+
+    @property
+    def error(self) -> Dict[str, float]:
+        """물성별 최대 절대오차"""
+        return {**self.T_table.error, **self.h_table.error}
+
+    def density(self, T):
+        """밀도 [kg/m³] (T: 온도 [K])"""
+        return self.T_table('rho', T)
+
+    def cp(self, T):
+        """비열 [J/(kg·K)] (T: 온도 [K])"""
+        return self.T_table('cp', T)
+
+    def enthalpy(self, T):
+        """비엔탈피 [J/kg] (T: 온도 [K])"""
+        return self.T_table('h', T)
+
+    def temperature(self, h):
+        """온도 [K] (h: 비엔탈피 [J/kg])"""
+        return self.h_table('T', h)
+
+
+class AirProperties:
+    """
+    건조공기 물성 테이블 (-20~60 °C, 0.9~1.1 bar)
+    """
+
+    def __init__(self, n: int = 81, n_p: int = 11, kind: str = 'cubic'):
+        """
+        Args:
+            n: 온도 격자점 수 (기본 81: 1 K 간격)
+            n_p: 밀도 테이블의 압력 격자점 수 (기본 11: 2 kPa 간격)
+            kind: 1-D 테이블 보간 방식 ('cubic' 또는 'linear')
+        """
+        self.T_table = PropertyTable(T_AIR_MIN, T_AIR_MAX, n,
+                                     {'cp': air_cp, 'h': air_enthalpy,
+                                      'k': air_conductivity, 'mu': air_viscosity}, kind)
+        self.pT_table = PropertyTable2D(P_AIR_MIN, P_AIR_MAX, n_p, T_AIR_MIN, T_AIR_MAX, n,
+                                        {'rho': air_density})
+
+    @property
+    def error(self) -> Dict[str, float]:
+        """물성별 최대 절대오차"""
+        return {**self.T_table.error, **self.pT_table.error}
+
+    def density(self, p, T):
+        """밀도 [kg/m³] (p: 압력 [Pa], T: 온도 [K])"""
+        return self.pT_table('rho', p, T)
+
+    def cp(self, T):
+        """정압비열 [J/(kg·K)]"""
+        return self.T_table('cp', T)
+
+    def enthalpy(self, T):
+        """비엔탈피 [J/kg] (h(273.15 K) = 0)"""
+        return self.T_table('h', T)
+
+    def conductivity(self, T):
+        """열전도율 [W/(m·K)]"""
+        return self.T_table('k', T)
+
+    def viscosity(self, T):
+        """점성계수 [Pa·s]"""
+        return self.T_table('mu', T)
+
+
+@functools.lru_cache(maxsize=None)
+def water_properties(n: int = 101, kind: str = 'cubic') -> WaterProperties:
+    """격자별로 한 번만 만드는 공유 물 물성 테이블"""
+    return WaterProperties(n, kind)
+
+
+@functools.lru_cache(maxsize=None)
+def air_properties(n: int = 81, n_p: int = 11, kind: str = 'cubic') -> AirProperties:
+    """격자별로 한 번만 만드는 공유 공기 물성 테이블"""
+    return AirProperties(n, n_p, kind)
@@ -1,4 +1,4 @@
-import numpy as np
+from Functions import Psychrometrics
 
 # 건조공기/수증기 분자량 비 (Modelica 표준값)
 k_mair = 0.62198
@@ -12,8 +12,7 @@ def saturation_pressure(T):
     Returns:
         포화수증기압 [Pa]
     """
-    T_C = T - 273.15  # K → °C
-    return 610.78 * np.exp(17.2694 * T_C / (T_C + 238.3))
+    return Psychrometrics.p_sat(T)
 
 # 상대습도 계산 함수 (Modelica와 동일 논리)
 def relativeHumidity_pTX(p, T, X):
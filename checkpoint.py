@@ -0,0 +1,202 @@
+"""
+checkpoint.py
+온실 모델(Greenhouse_1/Greenhouse_2)의 전체 상태 체크포인트와 재개
+- 컴포넌트/포트/제어기 객체 그래프를 pickle로 저장 (공유 포트 참조 유지)
+  → PID 내부 상태(y, track 등), 스크린 제어 상태/타이머, 환기 PID, 누적 에너지까지 포함되어
+    재개한 궤적이 중단 없는 실행과 비트 단위로 동일
+- 정적 대용량 입력(입력 테이블, DataFrame, InputProvider 배열)은 저장하지 않고
+  input_cache에서 다시 로드하며 입력 커서만 저장
+- 클로저를 가진 다중 속도 스케줄러는 재생성 후 그룹 상태(주기/경과시간/누적합/갱신 횟수)만 복원
+  (Greenhouse_1의 상태 벡터 레이아웃도 접근자 클로저이므로 재생성)
+- type()으로 즉석 생성한 임시 포트 객체(예: type('MassPort', (), {...})())는
+  클래스 이름과 속성으로 재구성
+- file_utils.atomic_write로 원자적 쓰기 (쓰는 도중 중단되어도 이전 체크포인트 유지)
+- fork: 실행 중인 모델을 __init__ 재실행 없이 K개의 독립된 자식으로 복제
+  (동적 상태는 한 번 직렬화 후 K번 역직렬화, 입력 테이블과 읽기 전용 파라미터 배열은 공유)
+"""
+
+import io
+import os
+import pickle
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from file_utils import atomic_write
+from input_provider import InputProvider, Override
+from multirate import build_greenhouse_scheduler
+
+CHECKPOINT_VERSION = 1
+
+# 체크포인트에서 제외하고 재개 시 다시 만드는 속성
+STATIC_ATTRIBUTES = ('input_df', '_input_table', 'inputs', 'scheduler', 'state_layout',
+                     '_flux_kernel')
+
+
+def _rebuild_adhoc(name: str, class_attrs: Dict[str, Any]) -> Any:
+    return type(name, (), class_attrs)()
+
+
+def _is_adhoc(cls: type) -> bool:
+    """모듈에서 이름으로 찾을 수 없는 클래스 (type()으로 즉석 생성)"""
+    if cls.__module__ == 'builtins':
+        return False
+    node = sys.modules.get(cls.__module__)
+    for name in cls.__qualname__.split('.'):
+        node = getattr(node, name, None)
+    return node is not cls
+
+
+class _Pickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        cls = type(obj)
+        # object를 직접 상속한 파이썬 클래스 중 이름으로 찾을 수 없는 것만 처리
+        if cls.__bases__ == (object,) and '__dict__' in vars(cls) and _is_adhoc(cls):
+            class_attrs = {k: v for k, v in vars(cls).items() if not k.startswith('__')}
+            # 인스턴스 속성은 state로 전달 (객체가 먼저 memo에 등록되어 순환 참조 처리)
+            return _rebuild_adhoc, (cls.__name__, class_attrs), dict(vars(obj))
+        return NotImplemented
+
+
+class _SharingPickler(_Pickler):
+    """읽기 전용 NumPy 배열은 복사하지 않고 shared 목록의 인덱스로 기록"""
+
+    def __init__(self, file, shared: List[Any]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared = shared
+
+    def persistent_id(self, obj):
+        if isinstance(obj, np.ndarray) and not obj.flags.writeable:
+            self._shared.append(obj)
+            return len(self._shared) - 1
+        return None
+
+
+class _SharingUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared: List[Any]):
+        super().__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        return self._shared[pid]
+
+
+def capture_state(model: Any) -> Dict[str, Any]:
+    """
+    모델의 동적 상태 (정적 입력/스케줄러 제외한 속성 + 입력 커서 + 스케줄러 그룹 상태)
+
+    입력 override(InputProvider.overrides)는 함수일 수 있으므로 포함하지 않습니다.
+    """
+    attributes = {k: v for k, v in vars(model).items() if k not in STATIC_ATTRIBUTES}
+    return {
+        'attributes': attributes,
+        'input_cursor': model.inputs._cursor,
+        'input_mode': model.inputs.mode,
+        'scheduler': {name: {'period': g.period, 'elapsed': g.elapsed,
+                             'sums': dict(g.sums), 'n_updates': g.n_updates}
+                      for name, g in model.scheduler.groups.items()},
+    }
+
+
+def restore_state(cls: type, state: Dict[str, Any], shared: Optional[Any] = None) -> Any:
+    """
+    capture_state 결과로 모델을 재구성합니다. (__init__ 재실행 없음)
+
+    Args:
+        cls: 모델 클래스 (Greenhouse_1 또는 Greenhouse_2)
+        state: capture_state 결과 (attributes는 그대로 새 모델의 속성이 됨)
+        shared: 입력 테이블을 공유할 기존 모델 (None이면 input_cache에서 로드)
+    """
+    model = cls.__new__(cls)
+    model.__dict__.update(state['attributes'])
+    if shared is not None:
+        model._input_table = shared._input_table
+        model.input_df = shared.input_df
+    else:
+        model.input_df = model._load_and_merge_inputs()
+    model.inputs = InputProvider.from_array(model._input_table, list(model.input_df.columns),
+                                            mode=state['input_mode'])
+    model.inputs._cursor = state['input_cursor']
+
+    model.scheduler = build_greenhouse_scheduler(
+        model, {name: g['period'] for name, g in state['scheduler'].items()})
+    for name, saved in state['scheduler'].items():
+        group = model.scheduler[name]
+        group.elapsed = saved['elapsed']
+        group.sums.update(saved['sums'])
+        group.n_updates = saved['n_updates']
+
+    if hasattr(model, '_build_state_layout'):
+        model.state_layout = model._build_state_layout()
+    return model
+
+
+def fork(model: Any, k: int,
+         overrides: Optional[Sequence[Optional[Dict[str, Override]]]] = None) -> List[Any]:
+    """
+    모델을 K개의 독립된 자식 모델로 복제합니다. (__init__ 재실행 없음)
+
+    동적 상태(컴포넌트, 제어기, 누적 에너지, 스케줄러, 입력 커서)는 자식마다 새로 만들고,
+    입력 테이블과 읽기 전용 파라미터 배열(예: 토양 두께/전도도 표)은 부모와 공유합니다.
+    자식끼리 가변 객체를 공유하지 않으므로 서로 다른 스레드/프로세스에서 따로 진행할 수 있습니다.
+
+    Args:
+        model: 복제할 모델 (Greenhouse_1 또는 Greenhouse_2)
+        k: 자식 수
+        overrides: 자식별 입력 override (InputProvider.override 형식, 예: {'T_sp': 18.0}).
+            부모의 override를 물려받은 뒤 적용
+
+    Returns:
+        자식 모델 목록
+    """
+    if overrides is not None and len(overrides) != k:
+        raise ValueError(f"overrides 길이({len(overrides)})가 자식 수({k})와 다릅니다")
+    shared: List[Any] = []
+    buffer = io.BytesIO()
+    _SharingPickler(buffer, shared).dump(capture_state(model))
+    data = buffer.getvalue()
+
+    children = []
+    for i in range(k):
+        state = _SharingUnpickler(io.BytesIO(data), shared).load()
+        child = restore_state(type(model), state, shared=model)
+        child.inputs.overrides.update(model.inputs.overrides)
+        for name, value in ((overrides[i] if overrides else None) or {}).items():
+            child.inputs.override(name, value)
+        children.append(child)
+    return children
+
+
+def dumps(model: Any) -> bytes:
+    """모델 상태를 체크포인트 바이트열로 직렬화"""
+    buffer = io.BytesIO()
+    payload = {
+        'version': CHECKPOINT_VERSION,
+        'class': type(model).__name__,
+        'state': capture_state(model),
+    }
+    _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(payload)
+    return buffer.getvalue()
+
+
+def loads(data: bytes, cls: type) -> Any:
+    """체크포인트 바이트열로부터 모델 재구성"""
+    payload = pickle.loads(data)
+    if payload.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"지원하지 않는 체크포인트 버전: {payload.get('version')}")
+    if payload['class'] != cls.__name__:
+        raise ValueError(f"{payload['class']} 체크포인트는 {cls.__name__}로 로드할 수 없습니다")
+    return restore_state(cls, payload['state'])
+
+
+def save_checkpoint(model: Any, path: str) -> None:
+    """모델 상태를 파일로 원자적으로 저장합니다."""
+    data = dumps(model)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, lambda f: f.write(data))
+
+
+def load_checkpoint(path: str, cls: type) -> Any:
+    """파일에서 모델 상태를 로드합니다."""
+    with open(path, 'rb') as f:
+        return loads(f.read(), cls)
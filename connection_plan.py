@@ -0,0 +1,129 @@
+"""
+connection_plan.py
+포트 연결 설정(config/port_connections.yaml)을 한 번 해석해 두는 연결 계획
+- load_connections(): YAML의 섹션(heat/mass/radiation/co2_connections) → PortConnection 목록
+- ConnectionPlan(model, connections): 모든 연결 경로를 생성 시 한 번만 해석
+  - 값 출처(target.target_attr, 또는 모델 속성 target)는 중복 없이 슬롯으로 모으고
+  - 각 연결은 (슬롯 인덱스, 대상 포트 객체, 포트 속성)으로 저장
+- execute(model): 슬롯마다 값을 한 번 읽은 뒤 연결별 슬롯 인덱스로 포트 속성에 기록
+  (매 스텝 getattr 체인, 문자열 분리, 예외 처리 없음)
+- 포트가 개별 파이썬 객체이므로 연결마다 setattr 한 번은 남으며, 값은 변환 없이
+  그대로 전달됨 (None, np.float64 포함)
+
+YAML 항목 형식 (값은 target → source.source_port 방향으로 전달됨):
+    - source: "Q_cnv_AirScr"       # 값을 받는 컴포넌트
+      source_port: "heatPort_a"    # 컴포넌트의 포트 ("" 이면 컴포넌트 자체)
+      target: "air"                # 값을 가진 컴포넌트 (target_attr가 ""이면 모델 속성)
+      target_attr: "T"             # 값 속성 경로 (예: "massPort.VP")
+      port_attr: "T"               # 선택: 기록할 포트 속성 (기본: 섹션 타입별 T/VP/CO2)
+"""
+
+import operator
+import warnings
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import yaml
+
+from port_connection_manager import PortConnection, PortType, PORT_ATTRIBUTES
+
+# YAML 섹션 이름 → 포트 타입
+SECTIONS = {
+    'heat_connections': PortType.HEAT,
+    'mass_connections': PortType.MASS,
+    'radiation_connections': PortType.RADIATION,
+    'co2_connections': PortType.CO2,
+}
+
+
+def load_connections(path: str, sections: Optional[Sequence[str]] = None) -> List[PortConnection]:
+    """
+    포트 연결 설정 파일 읽기
+
+    Args:
+        path: YAML 파일 경로
+        sections: 읽을 섹션 이름 (None이면 SECTIONS 전체, 파일에 없는 섹션은 빈 목록)
+
+    Returns:
+        섹션 순서, 파일 내 순서대로의 PortConnection 목록
+    """
+    with open(path, encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    connections = []
+    for section in (SECTIONS if sections is None else sections):
+        if section not in SECTIONS:
+            raise ValueError(f"Unknown connection section '{section}', expected one of {tuple(SECTIONS)}")
+        for entry in config.get(section) or ():
+            connections.append(PortConnection(
+                source_component=entry['source'],
+                source_port=entry.get('source_port', ''),
+                target_component=entry['target'],
+                target_attribute=entry.get('target_attr', ''),
+                port_type=SECTIONS[section],
+                description=entry.get('description', ''),
+                port_attribute=entry.get('port_attr', ''),
+            ))
+    return connections
+
+
+class ConnectionPlan:
+    """
+    해석이 끝난 포트 연결 목록
+
+    포트 객체를 직접 참조하므로 모델 구성이 끝난 뒤(포트 재할당 이후) 만들어야 하며,
+    모델과 함께 pickle된다 (checkpoint/fork).
+    """
+
+    def __init__(self, model, connections: Iterable[PortConnection], strict: bool = True):
+        """
+        Args:
+            model: 경로를 해석할 객체 (예: 온실 모델)
+            connections: PortConnection 목록 (load_connections 결과)
+            strict: True이면 해석할 수 없는 연결에서 ValueError,
+                False이면 경고(warnings.warn)를 한 번 내고 그 연결을 제외
+        """
+        self.connections: List[PortConnection] = []
+        self.paths: List[str] = []            # 슬롯별 값 출처 경로
+        self._getters = []
+        self._targets = []                    # 연결별 (포트 객체, 속성 이름)
+        slots: Dict[str, int] = {}
+        index = []
+
+        for connection in connections:
+            path = connection.target_component
+            if connection.target_attribute:
+                path = f"{path}.{connection.target_attribute}"
+            attr = connection.port_attribute or PORT_ATTRIBUTES[connection.port_type]
+            try:
+                if path not in slots:
+                    operator.attrgetter(path)(model)
+                port = getattr(model, connection.source_component)
+                if connection.source_port:
+                    port = operator.attrgetter(connection.source_port)(port)
+                if not hasattr(port, attr):
+                    raise AttributeError(f"port has no attribute '{attr}'")
+            except AttributeError as e:
+                message = (f"Unresolved connection {connection.source_component}.{connection.source_port}"
+                           f".{attr} <- {path}: {e}")
+                if strict:
+                    raise ValueError(message) from e
+                warnings.warn(f"포트 연결 제외: {message}", stacklevel=2)
+                continue
+
+            if path not in slots:
+                slots[path] = len(self.paths)
+                self.paths.append(path)
+                self._getters.append(operator.attrgetter(path))
+            index.append(slots[path])
+            self._targets.append((port, attr))
+            self.connections.append(connection)
+
+        self.source_index = tuple(index)   # 연결별 슬롯 인덱스
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def execute(self, model) -> None:
+        """모든 연결의 값을 전달 (값 출처는 슬롯마다 한 번 읽음)"""
+        values = [get(model) for get in self._getters]
+        for (port, attr), i in zip(self._targets, self.source_index):
+            setattr(port, attr, values[i])
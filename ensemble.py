@@ -0,0 +1,205 @@
+"""
+ensemble.py
+파라미터 세트 N개를 하나의 배치 상태 배열로 함께 진행하는 Greenhouse_1 앙상블
+- 기준 모델의 현재 상태를 fork로 N개 복제
+  (__init__ 재실행 없음, 입력 테이블/읽기 전용 파라미터 표 공유)
+- 파라미터는 점(.)으로 연결한 속성 경로별 길이 N 배열로 지정
+  (예: {'Q_rad_CovSky.epsilon_a': [0.8, 0.84, 0.9]},
+   여러 경로에 같은 값: {('Q_rad_CanCov.epsilon_b', 'Q_rad_CovSky.epsilon_a'): eps})
+- 상태는 구성원 축이 마지막인 배열 y (n_states, N) (state_layout 순서)
+  매 스텝 FluxKernel(구성원들)이 열/수증기/CO2 밸런스, 장파 복사, 환기, 토양, 난방 파이프,
+  작물 미분을 (N,) 파라미터 배열과 함께 한 번의 배열 커널 호출로 계산하고 명시적 오일러로 진행
+- 제어기(스크린 상태 기계, 타이머, 환기/난방/CO2 로직)는 구성원별로 샘플링하며,
+  shared_controllers=True이면 PID는 하나의 PIDBank에서 한 번의 벡터 연산으로 진행
+- 구성원 객체는 sync()(또는 상태가 아닌 경로의 get())에서 y와 누적 에너지로 갱신
+- 상태/출력은 구성원 축을 가진 배열로 조회 (get('air.T') → (N,), states() → (N, n_states))
+- 주의: 파라미터는 생성 시점(setup 이후)의 값이 사용됨 (생성자에서 파생값을 계산하는
+  파라미터는 setup 함수에서 파생값까지 갱신해야 함), 단파 복사/조명/작물 파라미터와
+  모델 구조는 구성원 사이에 같아야 함 (다르면 FluxKernel이 ValueError)
+"""
+
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from ControlSystems.PIDBank import PIDBank
+from flux_kernel import FluxKernel
+from Greenhouse_1 import CONTROL_STATES, surface
+
+ParameterKey = Union[str, Tuple[str, ...]]
+
+
+def resolve(obj: Any, path: str) -> Any:
+    """점(.)으로 연결한 속성 경로의 값 (리스트 인덱스 허용: 'pipe_low.flow1DimInc.Cells.0.T')"""
+    for name in path.split('.'):
+        obj = obj[int(name)] if name.isdigit() else getattr(obj, name)
+    return obj
+
+
+def assign(obj: Any, path: str, value: Any) -> None:
+    """점(.)으로 연결한 속성 경로에 값 설정"""
+    head, _, name = path.rpartition('.')
+    target = resolve(obj, head) if head else obj
+    if name.isdigit():
+        target[int(name)] = value
+    else:
+        if not hasattr(target, name):
+            raise AttributeError(f"'{path}' 속성이 없습니다")
+        setattr(target, name, value)
+
+
+class GreenhouseEnsemble:
+    """
+    Greenhouse_1 앙상블 (구성원 축 배치 상태를 FluxKernel로 함께 진행)
+
+    Args:
+        base: 기준 모델 (현재 상태에서 분기, state_layout이 있는 Greenhouse_1)
+        parameters: 속성 경로 (또는 경로 튜플) → 구성원별 값 (길이 N)
+        n: 구성원 수 (parameters가 없을 때 필요)
+        setup: setup(model, i) 형태의 구성원별 추가 설정 함수
+        overrides: 구성원별 입력 override (Greenhouse.fork와 같은 형식)
+        shared_controllers: 구성원들의 PID를 공유 PIDBank로 함께 진행
+    """
+
+    def __init__(self, base: Any, parameters: Optional[Dict[ParameterKey, Sequence[float]]] = None,
+                 n: Optional[int] = None, setup: Optional[Callable[[Any, int], None]] = None,
+                 overrides: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+                 shared_controllers: bool = False):
+        if not hasattr(base, 'state_layout'):
+            raise TypeError("평탄 상태 벡터(state_layout)가 있는 모델(Greenhouse_1)이 필요합니다")
+        parameters = {key: np.asarray(values) for key, values in (parameters or {}).items()}
+        sizes = {len(values) for values in parameters.values()}
+        if n is not None:
+            sizes.add(n)
+        if len(sizes) != 1:
+            raise ValueError(f"구성원 수를 결정할 수 없습니다: {sorted(sizes)}")
+        self.n = sizes.pop()
+        self.parameters = parameters
+
+        self.members: List[Any] = base.fork(self.n, overrides)
+        for i, member in enumerate(self.members):
+            for key, values in parameters.items():
+                for path in ((key,) if isinstance(key, str) else key):
+                    assign(member, path, values[i].item())
+            if setup is not None:
+                setup(member, i)
+
+        # PID 파라미터는 등록 시점 값이 사용되므로 setup 이후에 등록
+        self.pid_bank: Optional[PIDBank] = None
+        if shared_controllers:
+            self.pid_bank = PIDBank()
+            for member in self.members:
+                member.register_controllers(self.pid_bank)
+
+        # 배치 상태 (n_states, N)와 마지막 sync() 이후 누적 에너지 [kWh/m²]
+        self.layout = base.state_layout
+        self.kernel = FluxKernel(self.members)
+        self.y = np.stack([member.pack_state() for member in self.members], axis=-1)
+        self.next_time_idx = base.next_time_idx
+        self.time = base.next_time_idx * base.dt
+        self._E_th = np.zeros(self.n)
+        self._W_el = np.zeros(self.n)
+        self._synced = True
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __iter__(self):
+        self.sync()
+        return iter(self.members)
+
+    def __getitem__(self, i: int) -> Any:
+        self.sync()
+        return self.members[i]
+
+    def step(self, dt: float, time_idx: Optional[int] = None) -> None:
+        """
+        모든 구성원을 한 스텝 진행 (time_idx가 None이면 다음 스텝)
+
+        1. 구성원별로 제어기가 읽는 상태(CONTROL_STATES)를 풀어 제어기를 샘플링
+           (shared_controllers이면 PID는 공유 뱅크에서 한 번에)
+        2. FluxKernel.hold()로 제어 출력을 읽고 y 전체의 dy/dt를 한 번에 계산
+        3. y += dt * dy/dt (step()의 컴포넌트별 x += dxdt*dt와 같은 명시적 오일러),
+           난방 열량 max(q_tot, 0)과 조명 전력을 구성원별로 누적
+        """
+        if time_idx is None:
+            time_idx = self.next_time_idx
+        t = time_idx * dt
+        members, y, kernel = self.members, self.y, self.kernel
+
+        # 입력 테이블을 공유하면 입력 행은 한 번만 보간, 제어기가 읽는 상태 블록만 풂
+        row = members[0]._get_input_row(t) if kernel.shared_inputs else None
+        rows = []
+        for member, column in zip(members, y.T):
+            member.unpack_state(column, CONTROL_STATES)
+            member.next_time_idx = time_idx + 1
+            member._current_time = t
+            rows.append(member._begin_sample(t, dt, row))
+        if self.pid_bank is not None:
+            self.pid_bank.step(dt)
+        else:
+            for member in members:
+                member._step_controllers(dt)
+        for member, row in zip(members, rows):
+            member._finish_sample(row)
+
+        kernel.hold()
+        dy, Q_heat = kernel.evaluate(t, y)
+        y += dt * dy
+        self._E_th += np.maximum(Q_heat / surface, 0.0) * dt / (1000 * 3600)
+        self._W_el += kernel.W_el / surface * dt / (1000 * 3600)
+
+        self.next_time_idx = time_idx + 1
+        self.time = t + dt
+        self._synced = False
+
+    def sync(self) -> None:
+        """y와 누적 에너지를 구성원 객체에 반영하고 유속/포트 값을 다시 계산"""
+        if self._synced:
+            return
+        for i, member in enumerate(self.members):
+            member.unpack_state(self.y[:, i])
+            member._accumulate_energy(self._E_th[i], self._W_el[i])
+            member._current_time = self.time
+            member._evaluate_fluxes(self.time)
+            member._calculate_energy_per_area()
+        self._E_th[:] = 0.0
+        self._W_el[:] = 0.0
+        self._synced = True
+
+    def get(self, path: str) -> np.ndarray:
+        """
+        구성원별 값 (N,) (예: get('air.T'))
+
+        상태 블록 이름은 y에서 바로 읽고 (여러 원소 블록은 (N, 크기)),
+        그 밖의 경로는 sync() 후 구성원 객체에서 읽습니다.
+        """
+        if path in self.layout:
+            block = self.y[self.layout[path]]
+            return block[0].copy() if len(block) == 1 else block.T.copy()
+        self.sync()
+        return np.array([resolve(member, path) for member in self.members], dtype=float)
+
+    def states(self) -> np.ndarray:
+        """구성원별 평탄 상태 벡터 (N, n_states)"""
+        return self.y.T.copy()
+
+    def run(self, n_steps: int, dt: float, record: Sequence[str] = (),
+            every: int = 1) -> Dict[str, np.ndarray]:
+        """
+        n_steps 스텝 진행하며 record 경로들을 every 스텝마다 기록
+
+        Returns:
+            {'time': (n_samples,), 경로: (n_samples, N)} (time은 [s])
+        """
+        start = self.next_time_idx
+        n_samples = (n_steps + every - 1) // every
+        out = {path: np.empty((n_samples, self.n)) for path in record}
+        times = np.empty(n_samples)
+        for k in range(n_steps):
+            self.step(dt, start + k)
+            if k % every == 0:
+                j = k // every
+                times[j] = (start + k) * dt
+                for path in record:
+                    out[path][j] = self.get(path)
+        out['time'] = times
+        return out
@@ -0,0 +1,75 @@
+"""
+events.py
+제어기 임계값(guard) 영교차 이벤트 검출
+- 제어기는 GUARDS(이름 튜플)와 guard_values()(같은 순서의 임계값 여유 배열)를 선언
+  (예: Control_ThScreen의 RH_air - 0.83, Control_1의 T_tank - T_max)
+  guard_values()는 인자 없이 제어기에 설정된 입력 속성(step()이 쓰는 값)을 읽으므로
+  적분기는 입력을 설정한 뒤 여러 제어기의 guard를 이어 붙여 하나의 이벤트 목록으로 사용
+- 값의 부호가 바뀌면 조건 전이가 일어날 수 있으므로, 적분기는 구간 안에서 부호가
+  바뀌는 정확한 시각을 근 찾기로 구해 그 시각에서 제어기를 갱신하고 다시 시작
+  (Modelica 이벤트 처리와 같은 방식)
+- GuardEvents: solve_ivp의 events 인자로 쓰는 종료(terminal) 이벤트 함수 목록
+  (같은 (t, y)에 대한 guard 계산은 한 번만 수행)
+  교차 시각에서 다시 시작하면 그 guard 값은 0 근처이므로 부호로 방향을 정할 수 없음
+  → 직전 교차의 반대 방향을 directions로 넘겨 같은 교차가 다시 검출되지 않게 함
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 교차 직후 guard 값을 "0에 있음"으로 보는 절대 여유 (근 찾기 잔차보다 충분히 큼)
+GUARD_ZERO_TOL = 1e-8
+
+
+class GuardEvents:
+    """
+    solve_ivp용 guard 영교차 이벤트
+
+    Args:
+        guard_fun: guard_fun(t, y) → guard 값 배열
+        g0: 구간 시작에서의 guard 값 (이 부호에서 벗어나는 방향의 교차만 검출)
+        directions: guard별 검출 방향 (+1: 0 이하 → 양수, -1: 양수 → 0 이하)
+            None이면 g0의 부호로 결정
+    """
+
+    def __init__(self, guard_fun: Callable[[float, np.ndarray], np.ndarray], g0: np.ndarray,
+                 directions: Optional[np.ndarray] = None):
+        self.guard_fun = guard_fun
+        self.g0 = np.asarray(g0, dtype=float)
+        if directions is None:
+            directions = self.directions_from(self.g0)
+        self._key: Optional[Tuple[float, bytes]] = None
+        self._value: Optional[np.ndarray] = None
+        self.functions: List[Callable[[float, np.ndarray], float]] = []
+        for i, direction in enumerate(directions):
+            event = self._make_event(i, direction)
+            self.functions.append(event)
+
+    @staticmethod
+    def directions_from(g0: np.ndarray) -> np.ndarray:
+        """양수에서 시작하면 0 이하로, 0 이하에서 시작하면 양수로 넘어가는 교차"""
+        return np.where(np.asarray(g0) > 0, -1.0, 1.0)
+
+    def _make_event(self, i: int, direction: float):
+        def event(t, y):
+            return self._evaluate(t, y)[i]
+        event.terminal = True
+        event.direction = float(direction)
+        return event
+
+    def _evaluate(self, t: float, y: np.ndarray) -> np.ndarray:
+        key = (t, y.tobytes())
+        if key != self._key:
+            self._key = key
+            self._value = np.asarray(self.guard_fun(t, y), dtype=float)
+        return self._value
+
+    @staticmethod
+    def first(t_events: Sequence[np.ndarray]) -> Optional[Tuple[float, int]]:
+        """solve_ivp 결과의 t_events에서 가장 이른 (시각, guard 인덱스) (없으면 None)"""
+        best = None
+        for i, times in enumerate(t_events):
+            if len(times) and (best is None or times[0] < best[0]):
+                best = (float(times[0]), i)
+        return best
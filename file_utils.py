@@ -0,0 +1,29 @@
+"""
+file_utils.py
+파일 쓰기 공용 함수 (input_cache, result_store, checkpoint가 사용)
+- atomic_write: 임시 파일 → os.replace로 원자적 쓰기 (쓰는 도중 중단되어도 기존 파일 유지)
+"""
+
+import os
+import tempfile
+
+
+def atomic_write(path: str, write) -> None:
+    """
+    같은 디렉터리의 임시 파일에 write(f)로 쓴 뒤 os.replace로 path를 원자적으로 교체
+    (실패하면 임시 파일을 지우고 예외를 다시 발생, 기존 파일은 그대로 유지)
+
+    Args:
+        path: 대상 파일 경로
+        write: 바이너리 파일 객체를 받아 내용을 쓰는 함수
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
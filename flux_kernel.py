@@ -0,0 +1,510 @@
+"""
+flux_kernel.py
+Greenhouse_1 상태 벡터의 배열 우변 함수 (객체/포트에 쓰지 않는 유속 커널)
+- FluxKernel(models): 구성원 모델들의 파라미터를 한 번 읽어 배열로 보관
+  (모든 구성원이 같은 값이면 스칼라, 다르면 구성원 축 (N,) 배열)
+- hold(): 샘플링 구간 동안 유지되는 제어 출력(스크린, 환기창, 난방 유량, CO2 주입, 조명)과
+  초기화 플래그를 구성원별로 읽음 (제어기 샘플링 직후 한 번)
+- evaluate(t, y): y의 슬라이스에서 직접 유속을 계산해 dy/dt와 난방 열량을 반환
+  y는 (n,), (n, k) (solve_ivp vectorized의 열들), (n, N) (앙상블 구성원) 모두 가능하며
+  마지막 축이 배치 축
+- 단파 복사(Solar_model/Illumination)와 작물(TomatoYieldModel.calculate_derivatives_batch)은
+  각 컴포넌트의 배열 커널을 그대로 사용하므로 이 파라미터들은 구성원 사이에 같아야 함
+- 장파 복사는 RadiationNetwork의 링크와 ViewFactorCache의 view factor 경로로 구성하고
+  LAI(canopy.FF)와 스크린(thScreen.FF_i, FF_ij, hold()로 유지)에 따르는 인자만 매 호출 계산
+"""
+
+import inspect
+import operator
+from typing import Any, Callable, Sequence, Tuple
+
+import numpy as np
+
+# 상태에 따라 바뀌는 view factor 입력 → 동적 인자 행 (FFa/FFb 행, 1 - FFab 행)
+_DYNAMIC_VIEW_FACTORS = {'canopy.FF': (1, 2), 'thScreen.FF_i': (3, 4), 'thScreen.FF_ij': (5, 6)}
+_N_DYNAMIC = 7   # 행 0은 1 (동적 인자 없음)
+_VIEW_FACTOR_ATTRIBUTES = ('FFa', 'FFb', 'FFab1', 'FFab2', 'FFab3', 'FFab4')
+
+
+def _stack(models: Sequence[Any], get: Callable[[Any], Any]):
+    """구성원별 값: 모두 같으면 첫 값, 다르면 마지막 축이 구성원 축인 배열"""
+    values = [get(model) for model in models]
+    first = values[0]
+    if len(values) == 1:
+        return first
+    # 구성원 수가 많아도 비교는 배열 연산 한 번
+    stacked = np.asarray(values, dtype=float)
+    if (stacked == stacked[0]).all():
+        return first
+    return np.moveaxis(stacked, 0, -1)
+
+
+def _column(value) -> np.ndarray:
+    """벡터 파라미터를 (길이, 1) 또는 (길이, N) 모양으로 (배치 축과 브로드캐스트)"""
+    value = np.asarray(value, dtype=float)
+    return value[:, None] if value.ndim == 1 else value
+
+
+def _shared(models: Sequence[Any], get: Callable[[Any], Any], name: str):
+    """구성원 사이에 같아야 하는 값 (다르면 ValueError)"""
+    value = get(models[0])
+    for model in models[1:]:
+        if get(model) != value:
+            raise ValueError(f"'{name}'는 구성원마다 같아야 합니다")
+    return value
+
+
+def _same_array(a: np.ndarray, b: np.ndarray) -> bool:
+    """같은 메모리의 같은 배열 (fork된 구성원의 입력 테이블은 공유 배열의 서로 다른 뷰)"""
+    return a is b or (a.shape == b.shape and a.strides == b.strides
+                      and a.__array_interface__['data'][0] == b.__array_interface__['data'][0])
+
+
+def _parameters(obj: Any, names: Sequence[str]) -> Tuple:
+    return tuple(getattr(obj, name) for name in names)
+
+
+def _constructor_parameters(obj: Any, inputs: Sequence[str]) -> Tuple[str, ...]:
+    """생성자 인자 중 입력(inputs)을 뺀 파라미터 이름"""
+    names = inspect.signature(type(obj).__init__).parameters
+    return tuple(name for name in names if name != 'self' and name not in inputs)
+
+
+class FluxKernel:
+    """
+    Greenhouse_1 상태 벡터(state_layout 순서)의 배열 우변 함수
+
+    _evaluate_fluxes()와 같은 열/수증기/CO2 밸런스를 컴포넌트 파라미터와 y의 슬라이스로
+    계산합니다. 컴포넌트/포트 객체에는 쓰지 않으므로 한 번의 호출로 여러 상태 열
+    (유한차분 야코비안의 열, 앙상블 구성원)을 함께 계산할 수 있습니다.
+
+    제어 출력은 hold()로 읽은 값을 유지하고(sample-and-hold), 파라미터는 생성 시점의 값을
+    사용합니다. (파라미터를 바꾼 뒤에는 커널을 다시 생성)
+
+    Args:
+        models: 구성원 모델들 (같은 상태 레이아웃의 Greenhouse_1)
+    """
+
+    def __init__(self, models: Sequence[Any]):
+        self.models = list(models)
+        if not self.models:
+            raise ValueError("구성원 모델이 필요합니다")
+        models = self.models
+        base = models[0]
+        self.n = len(models)
+
+        layout = base.state_layout
+        self.n_states = len(layout)
+        self._i = {name: layout[name].start for name in (
+            'air.T', 'air_Top.T', 'cover.T', 'canopy.T', 'floor.T', 'thScreen.T',
+            'air.VP', 'air_Top.VP', 'CO2_air.CO2', 'CO2_top.CO2')}
+        self._soil = layout['Q_cd_Soil.T']
+        self._low = layout['pipe_low.h']
+        self._up = layout['pipe_up.h']
+        self._crop = layout['TYM']
+
+        # 배열 커널을 그대로 쓰는 컴포넌트 (파라미터는 구성원 사이에 같아야 함)
+        for path, names in (('solar_model', _constructor_parameters(base.solar_model,
+                                                                    ('I_glob', 'SC', 'LAI'))),
+                            ('illu', _constructor_parameters(base.illu, ('LAI',))),
+                            ('TYM', base.TYM.BATCH_PARAMETERS)):
+            _shared(models, lambda m: _parameters(getattr(m, path), names), path)
+        self._solar = base.solar_model
+        self._illu = base.illu
+        self._crop_model = base.TYM
+        self._SLA = base.TYM.SLA
+
+        # 입력 테이블 열 (모든 구성원이 같은 테이블을 override 없이 쓰면 한 번만 보간)
+        names = base.inputs.names
+        self._columns = np.array([names.index(name) for name in
+                                  ('T_out', 'T_sky', 'I_glob')], dtype=np.intp)
+        self._input_buffer = np.empty(len(names))
+
+        # 열용량 [J/K], 체적 [m³]
+        self.A = _stack(models, lambda m: m.air.A)
+        self.C_air = _stack(models, lambda m: m.air.rho * m.air.c_p * m.air.V)
+        self.c_p_top = _stack(models, lambda m: m.air_Top.c_p)
+        self.V_top = _stack(models, lambda m: m.air_Top.V)
+        self.R_a_top = _stack(models, lambda m: m.air_Top.R_a)
+        self.C_cover = _stack(models, lambda m: m.cover.rho * m.cover.c_p * m.cover.V)
+        self.L_cover = _stack(models, lambda m: m.cover.latent_heat_vap)
+        self.Cap_leaf = _stack(models, lambda m: m.canopy.Cap_leaf)
+        self.L_canopy = _stack(models, lambda m: m.canopy.latent_heat_vap)
+        self.C_floor = _stack(models, lambda m: m.floor.rho * m.floor.c_p * m.floor.V)
+        self.C_screen = _stack(models, lambda m: m.thScreen.rho * m.thScreen.c_p
+                               * m.thScreen.h * m.thScreen.A)
+
+        # 수증기압 적분기: dVP/dt = MV_flow * R * T / (M_H * 1e3 * V_air)
+        self.VP_air = _stack(models, lambda m: m.air.airVP.R / (m.air.airVP.M_H * 1e3
+                                                                 * m.air.airVP.V_air))
+        self.VP_top = _stack(models, lambda m: m.air_Top.air.R / (m.air_Top.air.M_H * 1e3
+                                                                   * m.air_Top.air.V_air))
+        self.cap_CO2_air = _stack(models, lambda m: m.CO2_air.cap_CO2)
+        self.cap_CO2_top = _stack(models, lambda m: m.CO2_top.cap_CO2)
+
+        # 대류 (Convection_Condensation/Evaporation, FreeConvection, OutsideAirConvection)
+        self.A_AirScr = _stack(models, lambda m: m.Q_cnv_AirScr.A)
+        self.A_AirCov = _stack(models, lambda m: m.Q_cnv_AirCov.A)
+        self.A_TopCov = _stack(models, lambda m: m.Q_cnv_TopCov.A)
+        self.A_ScrTop = _stack(models, lambda m: m.Q_cnv_ScrTop.A)
+        self.cos_AirCov = _stack(models, lambda m: np.cos(m.Q_cnv_AirCov.phi) ** (-0.66))
+        self.cos_TopCov = _stack(models, lambda m: np.cos(m.Q_cnv_TopCov.phi) ** (-0.66))
+        self.A_FlrAir = _stack(models, lambda m: m.Q_cnv_FlrAir.A)
+        self.s_FlrAir = _stack(models, lambda m: m.Q_cnv_FlrAir.s)
+        self.G_CanAir = _stack(models, lambda m: m.Q_cnv_CanAir.A * 2 * m.Q_cnv_CanAir.LAI
+                               * m.Q_cnv_CanAir.U)
+        self.G_CovOut = _stack(models, lambda m: m.Q_cnv_CovOut.A * self._outside_alpha(
+            m.Q_cnv_CovOut) / np.cos(m.Q_cnv_CovOut.phi))
+        self._pipe_convection = [self._pipe_parameters(models, name)
+                                 for name in ('Q_cnv_LowAir', 'Q_cnv_UpAir')]
+
+        # 환기 (NaturalVentilationRate_2) / 스크린 통과 (AirThroughScreen)
+        for name in ('Q_ven_AirOut', 'Q_ven_TopOut'):
+            _shared(models, lambda m: (getattr(m, name).thermalScreen,
+                                       getattr(m, name).forcedVentilation), name)
+        vent = lambda m: m.Q_ven_AirOut.natural_vent
+        self.vent_C = _stack(models, lambda m: vent(m).eta_RfFlr * vent(m).C_d / 2)
+        self.vent_h = _stack(models, lambda m: 9.81 * vent(m).h_vent / 2)
+        self.vent_C_w = _stack(models, lambda m: vent(m).C_w)
+        self.vent_leak = _stack(models, lambda m: vent(m).c_leakage)
+        _shared(models, lambda m: m.Q_ven_AirTop.properties is None, 'Q_ven_AirTop.properties')
+        self.scr_K = _stack(models, lambda m: m.Q_ven_AirTop.K)
+        self.scr_W = _stack(models, lambda m: m.Q_ven_AirTop.W)
+        self.scr_g = _stack(models, lambda m: m.Q_ven_AirTop.g_n)
+        self.scr_Ac = _stack(models, lambda m: m.Q_ven_AirTop.A * m.Q_ven_AirTop.c_p_air)
+
+        # 토양 전도 체인 [바닥, 레이어들, 심토양]
+        self.soil_g = _column(_stack(models, lambda m: m.Q_cd_Soil._g))
+        self.soil_C = _column(_stack(models, lambda m: m.Q_cd_Soil._C))
+        self.soil_series = _shared(models, lambda m: m.Q_cd_Soil._series, 'Q_cd_Soil._series')
+
+        # 난방 파이프 셀 (풍상 에너지 밸런스 + 셀별 열 포트 유량, 벽 온도 = 물 온도)
+        self._pipes = []
+        for name in ('pipe_low', 'pipe_up'):
+            _shared(models, lambda m: getattr(m, name).flow1DimInc.properties is None,
+                    f'{name}.flow1DimInc.properties')
+            flow = lambda m: getattr(m, name).flow1DimInc
+            self._pipes.append((_stack(models, lambda m: flow(m).Nt),
+                                _stack(models, lambda m: flow(m).c_p),
+                                _stack(models, lambda m: flow(m).rho * flow(m).Vi)))
+
+        self._build_radiation(models)
+        self.hold()
+
+    @staticmethod
+    def _outside_alpha(element) -> float:
+        """OutsideAirConvection의 풍속 함수 alpha (풍속은 파라미터 u)"""
+        du = 4 - element.u
+        return (1 / (1 + np.exp(-element.s * du)) * (2.8 + 1.2 * element.u)
+                + 1 / (1 + np.exp(element.s * du)) * 2.5 * element.u ** 0.8)
+
+    @staticmethod
+    def _pipe_parameters(models, name):
+        """PipeFreeConvection_N: Q = alpha(|dT|) * pi*d*l*N_p * dT (A*HEC*dT를 정리한 값)"""
+        free = _shared(models, lambda m: getattr(m, name).freePipe, f'{name}.freePipe')
+        element = lambda m: getattr(m, name)
+        if free:
+            G = _stack(models, lambda m: 1.28 * element(m).d ** (-0.25) * np.pi * element(m).d
+                       * element(m).l * element(m).N_p)
+            return G, 0.25
+        G = _stack(models, lambda m: 1.99 * np.pi * element(m).d * element(m).l * element(m).N_p)
+        return G, 0.32
+
+    @staticmethod
+    def _link_constant(model, name: str) -> float:
+        """링크의 REC_ab 중 상수 부분 (FFa 또는 FFb 상수가 0 이하이면 0)"""
+        element = getattr(model, name)
+        entry = model.view_factors.entries.get(name)
+        sources = entry[1] if entry is not None else {}
+        value = element.epsilon_a * element.epsilon_b * element.sigma
+        for attr in _VIEW_FACTOR_ATTRIBUTES:
+            source = sources.get(attr, getattr(element, attr))
+            if isinstance(source, str):
+                if source in _DYNAMIC_VIEW_FACTORS:
+                    continue
+                source = float(operator.attrgetter(source)(model))
+            if attr in ('FFa', 'FFb'):
+                if source <= 0:
+                    return 0.0
+                value *= source
+            else:
+                value *= 1 - source
+        return value
+
+    def _build_radiation(self, models) -> None:
+        """
+        링크별 REC_ab = c * 동적 인자 곱, 노드 쌍 면적, 노드 순유입 행렬 구성
+
+        c는 방사율, sigma와 상수 view factor의 곱이고 동적 인자(FFa/FFb는 max(FF, 0),
+        FFab는 1 - FF)는 evaluate()에서 LAI와 스크린 개폐로 계산합니다.
+        """
+        base = models[0]
+        network = base.radiation
+        self._n_nodes = network.n
+        self._nodes = {name: network.surfaces[name] for name in network.surfaces}
+
+        entries = base.view_factors.entries
+        constants, dynamic = [], []
+        for name, _, _, _ in network.links:
+            sources = entries[name][1] if name in entries else {}
+            rows = [_DYNAMIC_VIEW_FACTORS[sources[attr]][0 if attr in ('FFa', 'FFb') else 1]
+                    for attr in _VIEW_FACTOR_ATTRIBUTES
+                    if isinstance(sources.get(attr), str) and sources[attr] in _DYNAMIC_VIEW_FACTORS]
+            if len(rows) > 3:
+                raise ValueError(f"'{name}': 동적 view factor는 3개까지 지원합니다")
+            dynamic.append(rows + [0] * (3 - len(rows)))
+            constants.append(_stack(models, lambda m: self._link_constant(m, name)))
+        self._rec_constant = np.array(np.broadcast_arrays(*constants), dtype=float)
+        if self._rec_constant.ndim == 1:
+            self._rec_constant = self._rec_constant[:, None]
+        self._rec_dynamic = np.array(dynamic, dtype=np.intp).T
+
+        # 노드 쌍 (링크 a 노드 → b 노드), 쌍 면적, 노드별 순유입 = 받은 유속 - 준 유속
+        rows, cols, links = [], [], []
+        for k, (_, _, a, b) in enumerate(network.links):
+            for i in range(network.surfaces[a].start, network.surfaces[a].stop):
+                rows.append(i)
+                cols.append(network.surfaces[b].start)
+                links.append(k)
+        self._pair_rows = np.array(rows, dtype=np.intp)
+        self._pair_cols = np.array(cols, dtype=np.intp)
+        self._pair_links = np.array(links, dtype=np.intp)
+        self._pair_area = _column(_stack(models, lambda m: m.radiation.A[rows, cols]))
+        node = np.arange(self._n_nodes)[:, None]
+        self._incidence = ((self._pair_cols == node).astype(float)
+                           - (self._pair_rows == node))
+
+    def hold(self) -> None:
+        """구성원별 제어 출력과 초기화 플래그를 읽어 다음 hold()까지 유지"""
+        models = self.models
+        self.SC = _stack(models, lambda m: m.thScreen.SC)
+        # 스크린 view factor는 ThermalScreen.step()에서 SC로 갱신되는 값을 유지
+        self.FF_i = _stack(models, lambda m: m.thScreen.FF_i)
+        self.FF_ij = _stack(models, lambda m: m.thScreen.FF_ij)
+        self.U_vents_air = _stack(models, lambda m: m.Q_ven_AirOut.U_vents)
+        self.U_vents_top = _stack(models, lambda m: m.Q_ven_TopOut.U_vents)
+        self.u_air = _stack(models, lambda m: m.Q_ven_AirOut.u)
+        self.u_top = _stack(models, lambda m: m.Q_ven_TopOut.u)
+        self.Mdot = _stack(models, lambda m: m.PID_Mdot.CS)
+        self.h_in = _stack(models, lambda m: m.sourceMdot_1ry.flangeB.h_outflow)
+        self.MC_ext = _stack(models, lambda m: -m.MC_ExtAir.port.MC_flow)
+        self.C_out = _stack(models, lambda m: m.CO2out_ppm_to_mgm3)
+        self.T_soil_sp = _stack(models, lambda m: m.Q_cd_Soil.T_soil_sp)
+        self.switch = _stack(models, lambda m: m.illu.switch)
+        self._lamps_on = bool(np.any(self.switch != 0))
+        # 모든 구성원이 같은 입력 테이블을 override 없이 쓰는지 (입력 행을 한 번만 보간)
+        inputs = models[0].inputs
+        self.shared_inputs = all(not m.inputs.overrides and _same_array(m.inputs.data, inputs.data)
+                                 and _same_array(m.inputs.times, inputs.times)
+                                 and m.inputs.mode == inputs.mode for m in models)
+        # 잠열/수증기 유량 (Greenhouse_1은 질량 포트 유량을 스텝 경계에서만 갱신)
+        self.MV_air = _stack(models, lambda m: m.air.airVP.MV_flow)
+        self.MV_top = _stack(models, lambda m: m.air_Top.air.MV_flow)
+        self.MV_cover = _stack(models, lambda m: m.cover.MV_flow)
+        self.MV_canopy = _stack(models, lambda m: m.canopy.massPort.MV_flow)
+        self.MV_screen = _stack(models, lambda m: m.thScreen.massPort.MV_flow)
+
+        # 미분이 0으로 고정되는 블록 (compute_derivatives의 steadystate 조건)
+        def frozen(get):
+            return 1.0 - np.asarray(_stack(models, get), dtype=float)
+        self._live = {
+            'air.T': frozen(lambda m: m.air._initialization_phase and m.air.steadystate),
+            'air_Top.T': frozen(lambda m: m.air_Top._initialization_phase
+                                and m.air_Top.steadystate),
+            'cover.T': frozen(lambda m: m.cover.steadystate),
+            'canopy.T': frozen(lambda m: m.canopy.steadystate and not m.canopy._is_initialized),
+            'thScreen.T': frozen(lambda m: m.thScreen.steadystate),
+            'air.VP': frozen(lambda m: m.air.airVP._initialization_phase
+                             and m.air.airVP.steadystate),
+            'air_Top.VP': frozen(lambda m: m.air_Top.air._initialization_phase
+                                 and m.air_Top.air.steadystate),
+            'Q_cd_Soil.T': frozen(lambda m: m.Q_cd_Soil.steadystate),
+            'pipe_low.h': frozen(lambda m: m.pipe_low.flow1DimInc.frozen),
+            'pipe_up.h': frozen(lambda m: m.pipe_up.flow1DimInc.frozen),
+        }
+        self.W_el = self._illu._kernel(self.switch, 1.0)[6]   # 조명 전력 [W] (LAI 무관)
+
+    def _inputs(self, t: float):
+        """시간 t의 (Tout [K], Tsky [K], I_glob [W/m²]) (구성원별로 다르면 (N,) 배열)"""
+        models = self.models
+        if self.shared_inputs:
+            values = models[0].inputs.values(t, self._input_buffer).take(self._columns)
+        else:
+            values = np.stack([m.inputs.values(t)[self._columns] for m in models], axis=-1)
+        return values[0] + 273.15, values[1] + 273.15, values[2]
+
+    def derivatives(self, t: float, y: np.ndarray) -> np.ndarray:
+        """dy/dt (y와 같은 모양)"""
+        return self.evaluate(t, y)[0]
+
+    def evaluate(self, t: float, y: np.ndarray) -> Tuple[np.ndarray, Any]:
+        """
+        시간 t, 상태 y에서의 dy/dt와 난방 파이프가 내놓은 열량
+
+        Args:
+            t: 시간 [s]
+            y: 상태 (n,) 또는 마지막 축이 배치 축인 (n, B)
+
+        Returns:
+            (dy/dt (y와 같은 모양), 파이프 방열량 -(pipe_low.Q_flow + pipe_up.Q_flow) [W] (배치 모양))
+        """
+        y = np.asarray(y, dtype=float)
+        vector = y.ndim == 1
+        if vector:
+            y = y[:, None]
+        dy = np.empty_like(y)
+        i = self._i
+        Tout, Tsky, I_glob = self._inputs(t)
+        A, SC = self.A, self.SC
+
+        T_air, T_top, T_cov = y[i['air.T']], y[i['air_Top.T']], y[i['cover.T']]
+        T_can, T_flr, T_scr = y[i['canopy.T']], y[i['floor.T']], y[i['thScreen.T']]
+        C_air, C_top = y[i['CO2_air.CO2']], y[i['CO2_top.CO2']]
+        crop = y[self._crop]
+        LAI = self._SLA * crop[1]
+
+        # 단파 복사 (태양, 보광등) [W/m²], 출력이 I_glob/switch에 비례하므로 밤/소등이면 생략
+        if np.ndim(I_glob) == 0 and I_glob == 0:
+            R_SunCov = R_SunCan = R_SunFlr = R_SunAir = PAR_sun = 0.0
+        else:
+            (R_SunCov, _, R_SunCan, _, R_SunFlr, _, R_SunAir, _,
+             PAR_sun, _) = self._solar._kernel(I_glob, SC, LAI, np.exp)
+        if self._lamps_on:
+            _, _, R_IluAir, R_IluCan, R_IluFlr, PAR_illu, _ = self._illu._kernel(self.switch, LAI)
+        else:
+            R_IluAir = R_IluCan = R_IluFlr = PAR_illu = 0.0
+
+        # 대류 [W]
+        dT = T_air - T_scr
+        Q_AirScr = self.A_AirScr * SC * 1.7 * np.maximum(1e-9, np.abs(dT)) ** 0.33 * dT
+        dT = T_air - T_cov
+        Q_AirCov = (self.A_AirCov * (1 - SC) * 1.7 * np.maximum(1e-9, np.abs(dT)) ** 0.33
+                    * self.cos_AirCov * dT)
+        dT = T_top - T_cov
+        Q_TopCov = (self.A_TopCov * SC * 1.7 * np.maximum(1e-9, np.abs(dT)) ** 0.33
+                    * self.cos_TopCov * dT)
+        dT = T_scr - T_top
+        Q_ScrTop = self.A_ScrTop * SC * 1.7 * np.maximum(1e-9, np.abs(dT)) ** 0.33 * dT
+        dT = T_flr - T_air
+        s = self.s_FlrAir * dT
+        Q_FlrAir = self.A_FlrAir * (1 / (1 + np.exp(-s)) * 1.7 * np.abs(dT) ** 0.33
+                                    + 1 / (1 + np.exp(s)) * 1.3 * np.abs(dT) ** 0.25) * dT
+        Q_CanAir = self.G_CanAir * (T_can - T_air)
+        Q_CovOut = self.G_CovOut * (T_cov - Tout)
+
+        T_low = y[self._low] / self._pipes[0][1] + 273.15
+        T_up = y[self._up] / self._pipes[1][1] + 273.15
+        Q_pipe = []
+        for T_pipe, (G, exponent) in zip((T_low, T_up), self._pipe_convection):
+            dT = T_pipe.sum(axis=0) / len(T_pipe) - T_air
+            Q_pipe.append(G * np.maximum(1e-9, np.abs(dT)) ** exponent * dT)
+        Q_LowAir, Q_UpAir = Q_pipe
+
+        # 환기율 [m³/(m²·s)] (NaturalVentilationRate_2) / 스크린 통과 (AirThroughScreen)
+        f_AirOut = self._ventilation(T_air, Tout, self.U_vents_air, self.u_air, 1 - SC)
+        f_TopOut = self._ventilation(T_top, Tout, self.U_vents_top, self.u_top, SC)
+        rho_air, rho_top = 1e5 / (287.0 * T_air), 1e5 / (287.0 * T_top)
+        rho_mean = (rho_air + rho_top) / 2
+        dT = T_air - T_top
+        f_AirTop = (SC * self.scr_K * np.maximum(1e-9, np.abs(dT)) ** 0.66
+                    + (1 - SC) * np.maximum(1e-9, 0.5 * rho_mean * self.scr_W * (1 - SC)
+                                            * self.scr_g * np.maximum(1e-9, np.abs(rho_air - rho_top)))
+                    ** 0.5 / rho_mean)
+        Q_AirTop = self.scr_Ac * rho_air * f_AirTop * dT
+
+        # 장파 복사 [W] (노드별 순유입, 파이프는 셀마다 한 노드)
+        FF = 1 - np.exp(-0.94 * LAI)
+        factors = np.empty((_N_DYNAMIC,) + FF.shape)
+        factors[0] = 1.0
+        factors[1], factors[2] = np.maximum(FF, 0), 1 - FF
+        factors[3], factors[4] = np.maximum(self.FF_i, 0), 1 - self.FF_i
+        factors[5], factors[6] = np.maximum(self.FF_ij, 0), 1 - self.FF_ij
+        d = self._rec_dynamic
+        rec = self._rec_constant * factors[d[0]] * factors[d[1]] * factors[d[2]]
+        T4 = np.empty((self._n_nodes,) + FF.shape)
+        nodes = self._nodes
+        T4[nodes['canopy'].start] = T_can
+        T4[nodes['cover'].start] = T_cov
+        T4[nodes['floor'].start] = T_flr
+        T4[nodes['thScreen'].start] = T_scr
+        T4[nodes['sky'].start] = Tsky
+        T4[nodes['pipe_low']] = T_low
+        T4[nodes['pipe_up']] = T_up
+        T4 **= 4
+        Q_pairs = self._pair_area * rec[self._pair_links] * (T4[self._pair_rows] - T4[self._pair_cols])
+        rad = self._incidence @ Q_pairs
+        rad_can, rad_cov = rad[nodes['canopy'].start], rad[nodes['cover'].start]
+        rad_flr, rad_scr = rad[nodes['floor'].start], rad[nodes['thScreen'].start]
+
+        # 토양 전도 [W]
+        layers = y[self._soil]
+        chain = np.empty((len(layers) + 2,) + T_flr.shape)
+        chain[0], chain[1:-1], chain[-1] = T_flr, layers, self.T_soil_sp
+        q = self.soil_g * (chain[:-1] - chain[1:])
+        Q_soil = q.sum(axis=0)
+        if self.soil_series is not None:
+            Q_soil = Q_soil + q[self.soil_series]
+        dy[self._soil] = (q[:-1] - q[1:]) / self.soil_C * self._live['Q_cd_Soil.T']
+
+        # 표면/공기 열 밸런스 [K/s]
+        live = self._live
+        dy[i['air.T']] = live['air.T'] * (
+            -Q_AirScr - Q_AirCov + Q_FlrAir + Q_LowAir + Q_UpAir + Q_CanAir - Q_AirTop
+            + (R_SunAir + R_IluAir) * A) / self.C_air
+        Q_top = -Q_TopCov + Q_ScrTop + Q_AirTop
+        # Greenhouse_1._calculate_component_heat_balance의 상부공기 안정화 항
+        dT = T_air - T_top
+        Q_top = Q_top + np.where(np.abs(dT) < 0.1, np.where(dT < 0, 100.0, -100.0), 0.0)
+        dy[i['air_Top.T']] = live['air_Top.T'] * Q_top * self.R_a_top * T_top / (
+            1e5 * self.c_p_top * self.V_top)
+        dy[i['cover.T']] = live['cover.T'] * (
+            rad_cov + Q_AirCov + Q_TopCov - Q_CovOut + R_SunCov * A
+            + self.MV_cover * self.L_cover) / self.C_cover
+        dy[i['canopy.T']] = live['canopy.T'] * (
+            -Q_CanAir + rad_can + (R_SunCan + R_IluCan) * A
+            + self.MV_canopy * self.L_canopy) / (self.Cap_leaf * LAI * A)
+        dy[i['floor.T']] = (-Q_FlrAir - Q_soil + rad_flr + (R_SunFlr + R_IluFlr) * A) / self.C_floor
+        dy[i['thScreen.T']] = live['thScreen.T'] * np.minimum(np.maximum(
+            (rad_scr + Q_AirScr - Q_ScrTop + self.MV_screen * 2.45e6) / self.C_screen, -1.0), 1.0)
+
+        # 수증기압 [Pa/s]
+        dy[i['air.VP']] = live['air.VP'] * self.MV_air * self.VP_air * T_air
+        dy[i['air_Top.VP']] = live['air_Top.VP'] * self.MV_top * self.VP_top * T_top
+
+        # 작물 (CO2 흡수량은 CO2 밸런스에 사용)
+        dy[self._crop], MC_AirCan = self._crop_model.calculate_derivatives_batch(
+            crop, PAR_sun + PAR_illu, C_air / 1.94, T_can)
+
+        # CO2 [mg/(m³·s)] (CO2_Air.compute_derivatives의 안정화 한계 ±50,
+        # np.clip 대신 ufunc 쌍: 작은 배열에서 호출 비용이 훨씬 작음)
+        MC_AirTop = f_AirTop * (C_air - C_top)
+        MC_air = self.MC_ext - f_AirOut * (C_air - self.C_out) - MC_AirTop - MC_AirCan
+        MC_top = MC_AirTop - f_TopOut * (C_top - self.C_out)
+        dy[i['CO2_air.CO2']] = np.minimum(np.maximum(MC_air / self.cap_CO2_air, -50.0), 50.0)
+        dy[i['CO2_top.CO2']] = np.minimum(np.maximum(MC_top / self.cap_CO2_top, -50.0), 50.0)
+
+        # 난방 파이프 셀 엔탈피 [J/(kg·s)] (상부 파이프 입구 = 하부 파이프 출구)
+        # 셀 열 포트 유량 = 셀 노드 복사 순유입 - 공기 대류 (평균 온도 기반이므로 셀마다 1/N)
+        Q_heat = 0.0
+        for (Nt, _, capacity), sl, name, h_in, Q_conv in (
+                (self._pipes[0], self._low, 'pipe_low', self.h_in, Q_LowAir),
+                (self._pipes[1], self._up, 'pipe_up', y[self._low][-1], Q_UpAir)):
+            h = y[sl]
+            Q_port = rad[nodes[name]] - Q_conv / len(h)
+            M = np.maximum(self.Mdot / Nt, 0.0)
+            h_su = np.empty_like(h)
+            h_su[0], h_su[1:] = h_in, h[:-1]
+            dy[sl] = live[f'{name}.h'] * (M * (h_su - h) + Q_port / Nt) / capacity
+            Q_heat = Q_heat - Q_port.sum(axis=0)
+
+        if vector:
+            return dy[:, 0], Q_heat[0]
+        return dy, Q_heat
+
+    def _ventilation(self, T_zone, Tout, U_vents, u, share):
+        """NaturalVentilationRate_2의 구역 환기율: share * f_vent + 0.5 * f_leakage"""
+        dT = T_zone - Tout
+        T_mean = (T_zone + Tout) / 2
+        f_vent = U_vents * self.vent_C * np.sqrt(np.abs(self.vent_h * np.abs(dT) / T_mean
+                                                        + self.vent_C_w * u ** 2))
+        return share * f_vent + 0.5 * np.maximum(0.25, u) * self.vent_leak
@@ -0,0 +1,168 @@
+"""
+input_cache.py
+병합된 입력 테이블(날씨/설정값/스크린 사용 가능 신호)의 바이너리 캐시
+- 원본 텍스트 파일들을 읽어 time 기준 outer merge + 선형 보간한 테이블을
+  원본 옆 __inputcache__/ 디렉터리에 float64 .npy (time이 0번째 열)로 저장
+- 캐시 키: 원본 파일별 (크기, mtime, SHA-256 내용 해시)
+  · 크기/mtime이 같으면 저장된 해시를 신뢰 (원본 재해싱 없음)
+  · 다르면 내용 해시를 다시 계산하여 같으면 메타데이터만 갱신, 다르면 재생성
+- .npy는 np.load(mmap_mode='r')로 읽으므로 여러 프로세스가 같은 읽기 전용
+  매핑(OS 페이지 캐시)을 공유
+- 쓰기는 임시 파일 → os.replace로 원자적으로 수행 (file_utils.atomic_write)
+- register_input_table: 이미 파싱된 테이블(예: 공유 메모리 배열)을 원본 경로에 등록하면
+  이후 load_input_table은 파일을 읽지 않고 등록된 배열을 반환
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+from file_utils import atomic_write
+
+CACHE_DIR_NAME = '__inputcache__'
+CACHE_VERSION = 1
+
+# 원본 경로 목록(절대 경로) → (열 이름, 테이블) (프로세스 내 등록 테이블)
+_registered: Dict[Tuple[str, ...], Tuple[List[str], np.ndarray]] = {}
+
+
+def _table_key(paths: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(os.path.abspath(p) for p in paths)
+
+
+def register_input_table(paths: Sequence[str], names: Sequence[str], data: np.ndarray) -> None:
+    """
+    원본 파일 목록에 대한 병합 테이블을 등록합니다.
+
+    등록 후 같은 paths로 load_input_table을 호출하면 캐시/원본을 읽지 않고 data를
+    그대로 반환합니다. (스윕 작업자 프로세스에서 공유 메모리 테이블을 사용할 때)
+    """
+    names = list(names)
+    if names[0] != 'time' or data.ndim != 2 or data.shape[1] != len(names):
+        raise ValueError(f"테이블 형식이 올바르지 않습니다: {names[:1]}, {data.shape}")
+    _registered[_table_key(paths)] = (names, data)
+
+
+def unregister_input_table(paths: Sequence[str]) -> None:
+    _registered.pop(_table_key(paths), None)
+
+
+def merge_input_tables(paths: Sequence[str]) -> pd.DataFrame:
+    """
+    탭 구분 입력 파일들을 첫 번째 열(time) 기준으로 병합합니다.
+
+    outer merge 후 시간순 정렬하고 결측치를 선형 보간합니다.
+    """
+    df = None
+    for path in paths:
+        table = pd.read_csv(path, sep='\t')
+        table = table.rename(columns={table.columns[0]: 'time'})
+        df = table if df is None else pd.merge(df, table, on='time', how='outer')
+    df = df.sort_values('time').reset_index(drop=True)
+    df = df.interpolate(method='linear', limit_direction='both')
+    return df
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _cache_paths(paths: Sequence[str], cache_dir: Optional[str]) -> Tuple[str, str]:
+    """원본 파일 목록별 캐시 파일 경로 (.npy, .json)"""
+    abs_paths = [os.path.abspath(p) for p in paths]
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(abs_paths[0]), CACHE_DIR_NAME)
+    name = hashlib.sha1('\n'.join(abs_paths).encode('utf-8')).hexdigest()[:16]
+    base = os.path.join(cache_dir, f'inputs-{name}')
+    return base + '.npy', base + '.json'
+
+
+def _source_stats(paths: Sequence[str], previous: Optional[List[Dict]] = None) -> List[Dict]:
+    """원본 파일별 크기/mtime/해시 (크기·mtime이 이전과 같으면 이전 해시 재사용)"""
+    previous = {entry['path']: entry for entry in (previous or [])}
+    stats = []
+    for path in paths:
+        abs_path = os.path.abspath(path)
+        st = os.stat(abs_path)
+        entry = {'path': abs_path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        old = previous.get(abs_path)
+        if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+            entry['sha256'] = old['sha256']
+        else:
+            entry['sha256'] = _file_hash(abs_path)
+        stats.append(entry)
+    return stats
+
+
+def _read_meta(meta_path: str) -> Optional[Dict]:
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def _write_meta(meta_path: str, meta: Dict) -> None:
+    atomic_write(meta_path, lambda f: f.write(json.dumps(meta, indent=1).encode('utf-8')))
+
+
+def load_input_table(paths: Sequence[str], use_cache: bool = True,
+                     cache_dir: Optional[str] = None,
+                     mmap: bool = True) -> Tuple[List[str], np.ndarray]:
+    """
+    병합된 입력 테이블을 (열 이름, (n_samples, n_columns) float64 배열)로 반환합니다.
+
+    Args:
+        paths: 병합할 탭 구분 입력 파일 경로들 (첫 번째 열은 time)
+        use_cache: False이면 항상 원본을 파싱 (캐시를 읽거나 쓰지 않음)
+        cache_dir: 캐시 디렉터리 (None이면 첫 번째 원본 옆 __inputcache__/)
+        mmap: True이면 캐시를 읽기 전용 메모리 매핑으로 반환
+
+    Returns:
+        (names, data): names[0] == 'time'
+    """
+    registered = _registered.get(_table_key(paths))
+    if registered is not None:
+        return list(registered[0]), registered[1]
+
+    if not use_cache:
+        df = merge_input_tables(paths)
+        return list(df.columns), df.to_numpy(dtype=np.float64)
+
+    npy_path, meta_path = _cache_paths(paths, cache_dir)
+    meta = _read_meta(meta_path)
+    sources = _source_stats(paths, meta['sources'] if meta else None)
+
+    if meta is not None and os.path.exists(npy_path):
+        if [s['sha256'] for s in sources] == [s['sha256'] for s in meta['sources']]:
+            if sources != meta['sources']:
+                # 내용은 같고 mtime만 바뀐 경우: 메타데이터만 갱신
+                meta['sources'] = sources
+                try:
+                    _write_meta(meta_path, meta)
+                except OSError:
+                    pass
+            data = np.load(npy_path, mmap_mode='r' if mmap else None)
+            return list(meta['columns']), data
+
+    df = merge_input_tables(paths)
+    names = list(df.columns)
+    data = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+    try:
+        os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+        atomic_write(npy_path, lambda f: np.save(f, data))
+        _write_meta(meta_path, {'version': CACHE_VERSION, 'columns': names,
+                                'shape': list(data.shape), 'sources': sources})
+    except OSError:
+        # 읽기 전용 위치 등: 캐시 없이 계속
+        return names, data
+    if mmap:
+        data = np.load(npy_path, mmap_mode='r')
+    return names, data
@@ -0,0 +1,206 @@
+"""
+input_provider.py
+시간 인덱스 기반 입력(날씨/설정값/스크린 사용 가능 신호) 제공자
+- 병합된 입력 테이블을 로드 시점에 열(column)별 float64 NumPy 배열로 변환
+- 캐시된 커서(cursor)로 단조 증가하는 시간 조회를 O(1)에 처리
+  (큰 점프나 역방향 조회는 이진 탐색으로 커서 재설정)
+- 선형 보간('linear') 또는 0차 유지('zoh', 직전 샘플 유지) 값을 float로 반환
+- 열별 override(상수 또는 f(t, 원래값))로 테이블을 복사하지 않고 일부 입력(예: 설정값 일정) 교체
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+INTERPOLATION_MODES = ('linear', 'zoh')
+
+# 입력 override: 상수 또는 f(t, 테이블 값) → 값
+Override = Union[float, Callable[[float, float], float]]
+
+
+class InputRow:
+    """
+    한 시점의 입력값 (pandas Series 대신 사용하는 작은 구조체)
+
+    row['T_out'], 'ilu_sp' in row, row.get('CO2_sp', 1000) 형태로 접근하며
+    값은 모두 파이썬 float이다.
+    """
+
+    __slots__ = ('time', '_values', '_index')
+
+    def __init__(self, time: float, values: List[float], index: Dict[str, int]):
+        self.time = time
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, name: str) -> float:
+        return self._values[self._index[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def get(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        i = self._index.get(name)
+        return default if i is None else self._values[i]
+
+    def keys(self) -> List[str]:
+        return list(self._index)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {name: self._values[i] for name, i in self._index.items()}
+
+    def __repr__(self) -> str:
+        return f"InputRow(time={self.time}, {self.to_dict()})"
+
+
+class InputProvider:
+    """
+    시간 정렬된 입력 테이블의 O(1) 조회기
+
+    Args:
+        times: 샘플 시각 [s] (단조 증가)
+        columns: 열 이름 → 값 배열 (times와 같은 길이)
+        mode: 'linear' (선형 보간) 또는 'zoh' (직전 샘플 유지)
+
+    범위 밖 시간은 첫/마지막 샘플 값으로 유지된다.
+    """
+
+    # 커서에서 이 샘플 수 이상 떨어진 조회는 선형 이동 대신 이진 탐색
+    _MAX_SCAN = 8
+
+    def __init__(self, times: Sequence[float], columns: Dict[str, Sequence[float]],
+                 mode: str = 'linear'):
+        times = np.asarray(times, dtype=np.float64)
+        names = [name for name in columns if name != 'time']
+        # (n_samples, n_columns) 행 우선 배열: 한 시점의 모든 열을 한 번에 보간
+        data = np.empty((len(times), len(names)), dtype=np.float64)
+        for i, name in enumerate(names):
+            values = np.asarray(columns[name], dtype=np.float64)
+            if values.shape != times.shape:
+                raise ValueError(f"열 '{name}'의 길이가 times와 다릅니다: "
+                                 f"{values.shape} != {times.shape}")
+            data[:, i] = values
+        self._setup(times, data, names, mode)
+
+    def _setup(self, times: np.ndarray, data: np.ndarray, names: List[str], mode: str) -> None:
+        if mode not in INTERPOLATION_MODES:
+            raise ValueError(f"지원하지 않는 보간 방식: {mode} {INTERPOLATION_MODES}")
+        self.times = np.ascontiguousarray(times, dtype=np.float64)
+        if self.times.ndim != 1 or len(self.times) == 0:
+            raise ValueError("times는 비어 있지 않은 1차원 배열이어야 합니다")
+        if np.any(np.diff(self.times) <= 0):
+            raise ValueError("times는 엄격한 단조 증가여야 합니다")
+        self.names = list(names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self.data = data
+        self.mode = mode
+        self.overrides: Dict[str, Override] = {}
+        self._cursor = 0
+
+    @classmethod
+    def from_array(cls, data: np.ndarray, names: Sequence[str],
+                   mode: str = 'linear') -> 'InputProvider':
+        """
+        (n_samples, n_columns) 배열로부터 생성 (names[0] == 'time')
+
+        값 배열은 복사하지 않고 뷰로 사용하므로 input_cache의 읽기 전용
+        메모리 매핑을 여러 인스턴스/프로세스가 공유할 수 있다.
+        """
+        names = list(names)
+        if names[0] != 'time':
+            raise ValueError(f"첫 번째 열은 'time'이어야 합니다: {names[0]}")
+        provider = cls.__new__(cls)
+        provider._setup(data[:, 0], data[:, 1:], names[1:], mode)
+        return provider
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, mode: str = 'linear',
+                       time_column: str = 'time') -> 'InputProvider':
+        """병합된 입력 DataFrame('time' 열 포함)으로부터 생성"""
+        columns = {name: df[name].to_numpy(dtype=np.float64)
+                   for name in df.columns if name != time_column}
+        return cls(df[time_column].to_numpy(dtype=np.float64), columns, mode=mode)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def override(self, name: str, value: Override) -> None:
+        """
+        열 name의 값을 상수 또는 f(t, 테이블 값)으로 교체 (테이블은 수정하지 않음)
+        """
+        if name not in self._index:
+            raise KeyError(f"입력 열 '{name}'이(가) 없습니다")
+        self.overrides[name] = value
+
+    def _apply_overrides(self, t: float, out: np.ndarray) -> None:
+        for name, value in self.overrides.items():
+            j = self._index[name]
+            out[j] = value(t, out[j]) if callable(value) else value
+
+    def _locate(self, t: float) -> int:
+        """times[i] <= t < times[i+1]인 i (범위 밖이면 0 또는 마지막 인덱스)"""
+        times = self.times
+        last = len(times) - 1
+        i = self._cursor
+        if times[i] <= t and (i == last or t < times[i + 1]):
+            return i
+
+        # 커서 근처는 선형 이동 (단조 증가 시간에서 상수 시간)
+        for _ in range(self._MAX_SCAN):
+            if i < last and t >= times[i + 1]:
+                i += 1
+            elif i > 0 and t < times[i]:
+                i -= 1
+            else:
+                self._cursor = i
+                return i
+
+        i = int(np.searchsorted(times, t, side='right')) - 1
+        i = min(max(i, 0), last)
+        self._cursor = i
+        return i
+
+    def _weight(self, i: int, t: float) -> float:
+        """구간 [times[i], times[i+1]] 내 선형 보간 가중치 (0~1)"""
+        if self.mode == 'zoh' or i == len(self.times) - 1 or t <= self.times[i]:
+            return 0.0
+        w = (t - self.times[i]) / (self.times[i + 1] - self.times[i])
+        return min(w, 1.0)
+
+    def values(self, t: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """시간 t의 모든 열 값 (names 순서의 float64 배열)"""
+        i = self._locate(t)
+        w = self._weight(i, t)
+        if out is None:
+            out = np.empty(len(self.names), dtype=np.float64)
+        if w == 0.0:
+            out[:] = self.data[i]
+        else:
+            np.subtract(self.data[i + 1], self.data[i], out=out)
+            out *= w
+            out += self.data[i]
+        if self.overrides:
+            self._apply_overrides(t, out)
+        return out
+
+    def value(self, name: str, t: float) -> float:
+        """시간 t의 단일 열 값"""
+        i = self._locate(t)
+        w = self._weight(i, t)
+        j = self._index[name]
+        y0 = self.data[i, j]
+        y = y0 if w == 0.0 else y0 + w * (self.data[i + 1, j] - y0)
+        override = self.overrides.get(name)
+        if override is not None:
+            y = override(t, float(y)) if callable(override) else override
+        return float(y)
+
+    def row(self, t: float) -> InputRow:
+        """시간 t의 입력값 구조체"""
+        return InputRow(float(t), self.values(t).tolist(), self._index)
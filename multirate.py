@@ -0,0 +1,154 @@
+"""
+multirate.py
+느린 컴포넌트를 기본 스텝보다 긴 주기로 갱신하는 다중 속도(multi-rate) 스케줄러
+- 빠른 파티션(공기, 외피, 파이프 등)은 매 스텝 dt로 갱신
+- 느린 그룹(작물 TYM, 토양 레이어 등)은 자신의 갱신 주기(period)마다 한 번,
+  누적 경과시간만큼 갱신
+- 느린 그룹의 입력은 빠른 파티션에서 매 스텝 샘플링하여 dt 가중 시간평균으로 전달
+
+정확도:
+- 토양 레이어는 주어진 입력에 대해 정확히(SoilConduction 'exact', 또는 암시적 방법으로) 적분되므로
+  주기 P에 안정 한계가 없음. 유일한 오차원은 주기 동안 바닥 온도 T_floor(t)를 주기 평균 T̄로
+  고정하는 것: 주기 끝 레이어 온도 오차는 ∫₀ᴾ Φ(P-s)·Γ·(T_floor(s) - T̄) ds
+  (Φ, Γ: SoilConduction.propagator). T_floor - T̄의 적분은 0이므로 Φ가 주기 동안 거의 변하지 않는
+  깊은 레이어에서는 오차가 사라지고, 주기 내 T_floor가 속도 r [K/s]로 선형 변하면 시정수 τ인
+  표면 레이어의 오차는 약 r·P³/(12τ²)
+  (예: 토양 콘크리트층 τ ≈ 140 s, P = 60 s, 바닥 온도 10분에 1 K 변화 → 약 0.001 K)
+- 작물 TYM은 명시적 Euler로 한 번 갱신: 가장 짧은 시정수 τ에 대해 주기당 상태 변화량 대비
+  상대 오차가 P/(2τ) 이하 (τ ≥ 1일, P = 600 s → 0.4% 이하)
+- 입력을 시간평균으로 전달하므로 선형 결합(토양 전도)에서는 주기 동안 교환된
+  에너지 합이 빠른 파티션 쪽 유속 합과 일치 (에너지 보존)
+- 느린 그룹의 대수 출력(예: TYM.MC_AirCan)은 다음 갱신까지 유지되므로 최대 P만큼 지연
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# 온실 모델(Greenhouse_1, Greenhouse_2)의 느린 컴포넌트 기본 갱신 주기 [s] (dt 이하이면 매 스텝 갱신)
+UPDATE_PERIODS = {
+    'TYM': 600.0,       # 작물 생육 (시간~일 규모로 변화)
+    'Q_cd_Soil': 60.0,  # 토양 레이어 (정확 적분, 주기는 바닥 경계 온도 평균 구간)
+}
+
+
+@dataclass
+class RateGroup:
+    """같은 주기로 갱신되는 느린 컴포넌트 그룹"""
+    name: str                                        # 그룹 이름 (예: 'TYM', 'Q_cd_Soil')
+    period: float                                    # 갱신 주기 [s] (기본 dt 이하이면 매 스텝 갱신)
+    update: Callable[..., None]                      # update(dt, **평균 입력) 형태의 갱신 함수
+    inputs: Dict[str, Callable[[], float]] = field(default_factory=dict)  # 빠른 파티션 입력 샘플러
+    elapsed: float = 0.0                             # 마지막 갱신 이후 경과 시간 [s]
+    sums: Dict[str, float] = field(default_factory=dict)  # 입력의 dt 가중 누적합
+    n_updates: int = 0                               # 갱신 횟수
+
+
+class MultiRateScheduler:
+    """
+    느린 컴포넌트 그룹의 갱신 시점을 관리하는 스케줄러
+
+    매 스텝 advance(dt)를 호출하면 각 그룹의 입력을 샘플링하여 누적하고,
+    경과 시간이 주기에 도달한 그룹은 update(경과시간, **평균입력)으로 갱신한다.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, RateGroup] = {}
+
+    def add(self, name: str, period: float, update: Callable[..., None],
+            inputs: Optional[Dict[str, Callable[[], float]]] = None) -> RateGroup:
+        """
+        느린 그룹 등록
+
+        Args:
+            name: 그룹 이름 (스케줄러 내에서 유일해야 함)
+            period: 갱신 주기 [s] (0이면 매 스텝 갱신)
+            update: update(dt, **inputs) 형태의 갱신 함수
+            inputs: 입력 이름 → 현재값을 반환하는 함수 (시간평균되어 update에 전달)
+
+        Returns:
+            등록된 RateGroup
+        """
+        if name in self.groups:
+            raise ValueError(f"갱신 그룹 '{name}'이(가) 이미 등록되어 있습니다")
+        if period < 0:
+            raise ValueError(f"갱신 그룹 '{name}'의 주기는 0 이상이어야 합니다: {period}")
+        inputs = dict(inputs or {})
+        group = RateGroup(name=name, period=float(period), update=update, inputs=inputs,
+                          sums={key: 0.0 for key in inputs})
+        self.groups[name] = group
+        return group
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.groups
+
+    def __getitem__(self, name: str) -> RateGroup:
+        return self.groups[name]
+
+    def advance(self, dt: float) -> List[str]:
+        """
+        한 스텝(dt) 진행: 입력 샘플링 후 주기에 도달한 그룹 갱신
+
+        Returns:
+            이번 스텝에 갱신된 그룹 이름 목록
+        """
+        fired = []
+        for group in self.groups.values():
+            for key, sample in group.inputs.items():
+                group.sums[key] += sample() * dt
+            group.elapsed += dt
+            # 부동소수점 누적 오차로 주기를 한 스텝 넘기지 않도록 상대 여유를 둠
+            if group.elapsed >= group.period * (1.0 - 1e-9):
+                self._fire(group)
+                fired.append(group.name)
+        return fired
+
+    def flush(self) -> List[str]:
+        """경과 시간이 남아 있는 모든 그룹을 즉시 갱신 (시뮬레이션 종료/상태 저장 전)"""
+        fired = []
+        for group in self.groups.values():
+            if group.elapsed > 0:
+                self._fire(group)
+                fired.append(group.name)
+        return fired
+
+    def _fire(self, group: RateGroup) -> None:
+        averages = {key: total / group.elapsed for key, total in group.sums.items()}
+        group.update(group.elapsed, **averages)
+        group.elapsed = 0.0
+        for key in group.sums:
+            group.sums[key] = 0.0
+        group.n_updates += 1
+
+
+def build_greenhouse_scheduler(model: Any,
+                               update_periods: Optional[Dict[str, float]] = None) -> MultiRateScheduler:
+    """
+    온실 모델의 느린 컴포넌트 그룹을 스케줄러에 등록합니다.
+
+    - TYM: 작물 환경 입력(PAR, CO2, 작물 온도)의 주기 평균으로 한 번 적분
+    - Q_cd_Soil: 바닥 경계 온도의 주기 평균으로 레이어 온도를 한 번 정확히 적분
+
+    Args:
+        model: TYM, Q_cd_Soil, floor를 가진 온실 모델 (Greenhouse_1, Greenhouse_2)
+        update_periods: 그룹별 갱신 주기 override [s] (나머지는 UPDATE_PERIODS)
+    """
+    periods = dict(UPDATE_PERIODS)
+    periods.update(update_periods or {})
+
+    # 토양 레이어는 정확 적분(SoilConduction.propagator)이므로 주기에 안정 한계 없음
+    def update_soil(dt, T_floor):
+        # 주기 평균 바닥 온도로 레이어 유속 계산 후 적분 (포트 온도는 복원)
+        model.Q_cd_Soil.port_a.T = T_floor
+        model.Q_cd_Soil.step(dt)
+        model.Q_cd_Soil.port_a.T = model.floor.T
+
+    scheduler = MultiRateScheduler()
+    scheduler.add('TYM', periods['TYM'], model.TYM.step, inputs={
+        'R_PAR_can': lambda: model.TYM.R_PAR_can,
+        'CO2_air': lambda: model.TYM.CO2_air,
+        'T_canK': lambda: model.TYM.T_canK,
+    })
+    scheduler.add('Q_cd_Soil', periods['Q_cd_Soil'], update_soil, inputs={
+        'T_floor': lambda: model.Q_cd_Soil.port_a.T,
+    })
+    return scheduler
@@ -15,6 +15,14 @@ class PortType(Enum):
     FLUID = "fluid"
     CO2 = "co2"
 
+# 포트 타입별 기본 포트 속성
+PORT_ATTRIBUTES = {
+    PortType.HEAT: "T",
+    PortType.MASS: "VP",
+    PortType.RADIATION: "T",
+    PortType.CO2: "CO2",
+}
+
 @dataclass
 class PortConnection:
     """포트 연결 정보를 담는 데이터 클래스"""
@@ -25,12 +33,18 @@ class PortConnection:
     port_type: PortType
     bidirectional: bool = False
     description: str = ""
+    port_attribute: str = ""  # 기록할 포트 속성 (""이면 PORT_ATTRIBUTES[port_type])
 
 class PortConnectionManager:
     """포트 연결을 자동화하는 관리자 클래스"""
     
-    def __init__(self):
-        self.connections = self._initialize_connections()
+    def __init__(self, connections: Optional[List[PortConnection]] = None):
+        """
+        Args:
+            connections: 포트 연결 목록 (None이면 기본 목록,
+                connection_plan.load_connections()로 YAML에서 읽은 목록도 사용 가능)
+        """
+        self.connections = self._initialize_connections() if connections is None else list(connections)
         
     def _initialize_connections(self) -> List[PortConnection]:
         """모든 포트 연결 정보를 정의"""
@@ -115,56 +129,29 @@ class PortConnectionManager:
     
     def update_all_connections(self, greenhouse_instance):
         """모든 포트 연결을 자동으로 업데이트"""
-        for connection in self.connections:
-            self._update_single_connection(greenhouse_instance, connection)
+        self._plan(greenhouse_instance, None).execute(greenhouse_instance)
     
     def update_connections_by_type(self, greenhouse_instance, port_type: PortType):
         """특정 타입의 포트 연결만 업데이트"""
-        filtered_connections = [c for c in self.connections if c.port_type == port_type]
-        for connection in filtered_connections:
-            self._update_single_connection(greenhouse_instance, connection)
+        self._plan(greenhouse_instance, port_type).execute(greenhouse_instance)
     
-    def _update_single_connection(self, greenhouse_instance, connection: PortConnection):
-        """단일 포트 연결을 업데이트"""
-        try:
-            # 소스 컴포넌트와 포트 가져오기
-            source_component = getattr(greenhouse_instance, connection.source_component)
-            source_port = self._get_nested_attribute(source_component, connection.source_port)
-            
-            # 타겟 값 가져오기
-            if connection.target_attribute == "":
-                # 외부 변수인 경우 (Tout, Tsky, VPout 등)
-                target_value = getattr(greenhouse_instance, connection.target_component)
-            else:
-                target_component = getattr(greenhouse_instance, connection.target_component)
-                target_value = self._get_nested_attribute(target_component, connection.target_attribute)
-            
-            # 포트 연결 실행
-            if connection.port_type == PortType.HEAT:
-                source_port.T = target_value
-            elif connection.port_type == PortType.MASS:
-                source_port.VP = target_value
-            elif connection.port_type == PortType.RADIATION:
-                source_port.T = target_value
-            elif connection.port_type == PortType.CO2:
-                source_port.CO2 = target_value
-                
-        except Exception as e:
-            print(f"포트 연결 실패: {connection.source_component}.{connection.source_port} -> {connection.target_component}.{connection.target_attribute}")
-            print(f"오류: {e}")
-            # 오류가 발생해도 시뮬레이션을 계속 진행
-            pass
-    
-    def _get_nested_attribute(self, obj, attr_path: str):
-        """중첩된 속성에 접근 (예: massPort.VP)"""
-        if not attr_path:
-            return obj
+    def _plan(self, greenhouse_instance, port_type: Optional[PortType]):
+        """
+        연결 계획 (경로는 인스턴스/타입별로 한 번만 해석, 해석할 수 없는 연결은
+        처음 한 번 경고 후 제외)
+        
+        계획은 해석한 포트를 참조하므로 모델 인스턴스에 저장합니다. (모델과 함께 수명이
+        끝나고, checkpoint/fork로 복제된 모델은 복제된 포트를 가리키는 계획을 가짐)
+        """
+        from connection_plan import ConnectionPlan  # connection_plan이 이 모듈을 import
         
-        attributes = attr_path.split('.')
-        current_obj = obj
-        for attr in attributes:
-            current_obj = getattr(current_obj, attr)
-        return current_obj
+        plans = greenhouse_instance.__dict__.setdefault('_connection_plans', {})
+        manager, plan = plans.get(port_type, (None, None))
+        if manager is not self:
+            connections = [c for c in self.connections if port_type is None or c.port_type == port_type]
+            plan = ConnectionPlan(greenhouse_instance, connections, strict=False)
+            plans[port_type] = (self, plan)
+        return plan
 
 class PipeConnectionManager:
     """난방 파이프 관련 연결을 관리하는 특화된 클래스"""
@@ -0,0 +1,442 @@
+"""
+result_recorder.py
+실행 길이와 무관한 메모리로 시뮬레이션 결과를 기록하는 스트리밍 기록기
+- ResultRecorder.update(step, state): Greenhouse._get_state() 형태의 중첩 dict('time' 포함)를 기록
+  (첫 호출에서 숫자 값인 잎(leaf)들을 신호로 등록)
+- 기록 정책(policy):
+  · Decimate(every=N): N 스텝마다 한 샘플 유지 (고정 크기 청크 단위로 버퍼 증가)
+  · Aggregate(period): 구간(예: 1시간, 1일)별 min/mean/max를 온라인으로 계산
+  · Stream(directory, chunk_size): 고정 크기 청크가 찰 때마다 신호별 .npy 파일에 이어 쓰기
+    (메모리 O(chunk_size), 종료 시 result_store manifest 기록)
+- recorder.times / recorder.data는 SimulationResults와 같은 중첩 dict 구조이므로
+  plot_results를 그대로 사용할 수 있음
+- recorder.save(directory)는 result_store 형식(신호별 .npy + manifest.json)으로 저장
+"""
+
+import abc
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from result_store import TIME_NAME, flatten_data, nest_data, save_results, signal_file, write_manifest
+
+SignalPath = Tuple[str, ...]
+
+
+class NpyAppender:
+    """
+    1차원 .npy 파일에 값을 이어 쓰는 작성기
+
+    헤더를 고정 크기(128 바이트)로 예약해 두고 flush() 때 shape만 다시 써서,
+    쓰는 도중에도 np.load(mmap_mode='r')로 읽을 수 있는 유효한 .npy를 유지한다.
+    """
+
+    HEADER_SIZE = 128
+
+    def __init__(self, path: str, dtype=np.float64, resume: bool = False):
+        """
+        Args:
+            path: .npy 파일 경로
+            dtype: 값 자료형
+            resume: True이면 기존 파일(이 클래스가 쓴 파일)을 열어 끝에 이어 쓰기
+                (False이면 새 파일로 덮어씀)
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        if resume:
+            self._file = open(path, 'rb+')
+            self._read_header()
+        else:
+            self._file = open(path, 'wb+')
+            self._write_header()
+
+    def _read_header(self) -> None:
+        version = np.lib.format.read_magic(self._file)
+        if version != (1, 0):
+            raise ValueError(f"이어 쓸 수 없는 .npy 버전: {self.path} {version}")
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(self._file)
+        if self._file.tell() != self.HEADER_SIZE or dtype != self.dtype or len(shape) != 1:
+            raise ValueError(f"이어 쓸 수 없는 .npy 파일: {self.path}")
+        self.length = shape[0]
+
+    def truncate(self, length: int) -> None:
+        """앞의 length개 값만 남기고 버림"""
+        self.length = min(self.length, int(length))
+        self._file.truncate(self.HEADER_SIZE + self.length * self.dtype.itemsize)
+        self._write_header()
+
+    def _write_header(self) -> None:
+        self._file.seek(0)
+        np.lib.format.write_array_header_1_0(self._file, {
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (self.length,),
+        })
+        if self._file.tell() != self.HEADER_SIZE:
+            raise RuntimeError(f"예상하지 못한 .npy 헤더 크기: {self._file.tell()}")
+
+    def append(self, values: np.ndarray) -> None:
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(values.tobytes())
+        self.length += values.size
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def flush(self) -> None:
+        if self.closed:
+            return
+        self._write_header()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.flush()
+            self._file.close()
+
+
+class _ChunkBuffer:
+    """고정 크기 청크 리스트로 행(row)을 누적하는 버퍼 (재할당/복사 없이 증가)"""
+
+    def __init__(self, width: int, chunk_size: int):
+        self.width = width
+        self.chunk_size = chunk_size
+        self.chunks: List[np.ndarray] = []
+        self.length = 0
+
+    def append(self, row: np.ndarray) -> None:
+        i = self.length % self.chunk_size
+        if i == 0:
+            self.chunks.append(np.empty((self.chunk_size, self.width)))
+        self.chunks[-1][i] = row
+        self.length += 1
+
+    def array(self) -> np.ndarray:
+        if not self.chunks:
+            return np.empty((0, self.width))
+        out = np.concatenate(self.chunks, axis=0)
+        return out[:self.length]
+
+
+class RecordPolicy(abc.ABC):
+    """기록 정책 기본 클래스"""
+
+    def start(self, names: List[str]) -> None:
+        """신호 이름 목록으로 초기화 (첫 update 시 호출)"""
+        self.names = names
+
+    @abc.abstractmethod
+    def append(self, t: float, row: np.ndarray) -> None:
+        """한 스텝의 (시간, 신호 값 행) 기록"""
+
+    def finish(self) -> None:
+        """기록 종료 (버퍼 비우기)"""
+
+    @abc.abstractmethod
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(times (n,), values (n, n_signals))"""
+
+
+class Decimate(RecordPolicy):
+    """
+    N 스텝마다 한 샘플 유지
+
+    Args:
+        every: 샘플 간격 [스텝] (1이면 모든 스텝)
+        chunk_size: 버퍼 청크 크기 [행]
+    """
+
+    def __init__(self, every: int = 1, chunk_size: int = 4096):
+        if every < 1:
+            raise ValueError(f"every는 1 이상이어야 합니다: {every}")
+        self.every = int(every)
+        self.chunk_size = chunk_size
+        self._count = 0
+
+    def start(self, names: List[str]) -> None:
+        super().start(names)
+        self._buffer = _ChunkBuffer(len(names) + 1, self.chunk_size)
+        self._full = np.empty(len(names) + 1)
+
+    def append(self, t: float, row: np.ndarray) -> None:
+        if self._count % self.every == 0:
+            self._full[0] = t
+            self._full[1:] = row
+            self._buffer.append(self._full)
+        self._count += 1
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        table = self._buffer.array()
+        return table[:, 0], table[:, 1:]
+
+
+class Aggregate(RecordPolicy):
+    """
+    구간별 min/mean/max 온라인 집계
+
+    Args:
+        period: 집계 구간 길이 (기록되는 time과 같은 단위, 예: [h]이면 1.0 = 1시간, 24.0 = 1일)
+        t0: 구간 기준 시각 (None이면 첫 샘플 시각)
+
+    구간 시각은 구간 시작 시각이며, 진행 중인 마지막 구간도 결과에 포함된다.
+    """
+
+    STATISTICS = ('min', 'mean', 'max')
+
+    def __init__(self, period: float, t0: Optional[float] = None, chunk_size: int = 1024):
+        if period <= 0:
+            raise ValueError(f"period는 양수여야 합니다: {period}")
+        self.period = float(period)
+        self.t0 = t0
+        self.chunk_size = chunk_size
+
+    def start(self, names: List[str]) -> None:
+        super().start(names)
+        n = len(names)
+        # 완료된 구간: [시작시각, min..., sum..., max..., count]
+        self._done = _ChunkBuffer(3 * n + 2, self.chunk_size)
+        self._window = None
+        self._count = 0
+        self._sum = np.zeros(n)
+        self._min = np.full(n, np.inf)
+        self._max = np.full(n, -np.inf)
+
+    def _window_of(self, t: float) -> int:
+        return int(np.floor((t - self.t0) / self.period + 1e-9))
+
+    def _close_window(self) -> None:
+        if self._count == 0:
+            return
+        start = self.t0 + self._window * self.period
+        self._done.append(np.concatenate(([start], self._min, self._sum, self._max, [self._count])))
+        self._count = 0
+        self._sum[:] = 0.0
+        self._min[:] = np.inf
+        self._max[:] = -np.inf
+
+    def append(self, t: float, row: np.ndarray) -> None:
+        if self.t0 is None:
+            self.t0 = t
+        window = self._window_of(t)
+        if window != self._window:
+            self._close_window()
+            self._window = window
+        self._count += 1
+        self._sum += row
+        np.minimum(self._min, row, out=self._min)
+        np.maximum(self._max, row, out=self._max)
+
+    def statistics(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """통계 이름 → (구간 시작 시각, (n_windows, n_signals) 값)"""
+        n = len(self.names)
+        table = self._done.array()
+        if self._count > 0:
+            start = self.t0 + self._window * self.period
+            current = np.concatenate(([start], self._min, self._sum, self._max, [self._count]))
+            table = np.vstack([table, current])
+        times = table[:, 0]
+        count = table[:, -1:]
+        return {
+            'min': (times, table[:, 1:1 + n]),
+            'mean': (times, table[:, 1 + n:1 + 2 * n] / np.maximum(count, 1)),
+            'max': (times, table[:, 1 + 2 * n:1 + 3 * n]),
+        }
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.statistics()['mean']
+
+
+class Stream(RecordPolicy):
+    """
+    고정 크기 청크를 디스크로 스트리밍 (신호별 1차원 .npy 파일)
+
+    Args:
+        directory: 출력 디렉터리 (time.npy + '<경로>.npy' 파일들, 종료 시 manifest.json)
+        chunk_size: 메모리에 유지하는 최대 행 수
+        every: 샘플 간격 [스텝]
+        units: manifest에 기록할 신호 이름 → 단위
+        dt: manifest에 기록할 샘플 간격 (None이면 기록된 시간에서 추정)
+        config: manifest에 기록할 시뮬레이션 설정값
+        resume: True이면 directory에 이미 기록된 신호 파일들에 이어 씀
+            (체크포인트 재개용: 첫 샘플 시각 이후에 기록된 행은 버림)
+
+    finish() 후의 디렉터리는 result_store.ResultStore로 열 수 있다.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 3600, every: int = 1,
+                 units: Optional[Dict[str, str]] = None, dt: Optional[float] = None,
+                 config: Any = None, resume: bool = False):
+        self.directory = directory
+        self.chunk_size = int(chunk_size)
+        self.every = int(every)
+        self.units = units
+        self.dt = dt
+        self.config = config
+        self.resume = resume
+        self._count = 0
+        self._writers: List[NpyAppender] = []
+
+    def start(self, names: List[str]) -> None:
+        super().start(names)
+        os.makedirs(self.directory, exist_ok=True)
+        self._rows = np.empty((self.chunk_size, len(names) + 1))
+        self._n = 0
+        self._dt_seen: Optional[float] = None
+        self._t_first: Optional[float] = None
+        paths = [os.path.join(self.directory, signal_file(name)) for name in [TIME_NAME] + names]
+        if self.resume:
+            missing = [path for path in paths if not os.path.exists(path)]
+            if missing:
+                raise ValueError(f"이어 쓸 신호 파일이 없습니다: {missing}")
+        self._writers = [NpyAppender(path, resume=self.resume) for path in paths]
+        if self.resume and len({w.length for w in self._writers}) != 1:
+            raise ValueError(f"신호 파일 길이가 서로 다릅니다: {self.directory}")
+
+    def _drop_from(self, t: float) -> None:
+        """재개 시 시각 t 이후로 이미 기록된 행 버리기 (마지막 체크포인트 이후 기록분)"""
+        times = np.load(self._writers[0].path, mmap_mode='r')
+        keep = int(np.searchsorted(times, t, side='left'))
+        del times
+        for writer in self._writers:
+            writer.truncate(keep)
+
+    def append(self, t: float, row: np.ndarray) -> None:
+        if self._count % self.every == 0:
+            if self._t_first is None:
+                if self.resume:
+                    self._drop_from(t)
+                self._t_first = t
+            elif self._dt_seen is None:
+                self._dt_seen = t - self._t_first
+            self._rows[self._n, 0] = t
+            self._rows[self._n, 1:] = row
+            self._n += 1
+            if self._n == self.chunk_size:
+                self.flush()
+        self._count += 1
+
+    def flush(self) -> None:
+        """버퍼의 행들을 파일에 쓰고 헤더 갱신"""
+        if self._n > 0:
+            for j, writer in enumerate(self._writers):
+                writer.append(self._rows[:self._n, j])
+            self._n = 0
+        for writer in self._writers:
+            writer.flush()
+
+    def finish(self) -> None:
+        if not self._writers or self._writers[0].closed:
+            return
+        self.flush()
+        for writer in self._writers:
+            writer.close()
+        write_manifest(self.directory, [tuple(name.split('.')) for name in self.names],
+                       self._writers[0].length, units=self.units,
+                       dt=self._dt_seen if self.dt is None else self.dt, config=self.config)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """디스크의 신호별 파일을 읽기 전용 메모리 매핑으로 반환 (values는 신호 순서의 리스트)"""
+        self.flush()
+        columns = [np.load(w.path, mmap_mode='r') for w in self._writers]
+        return columns[0], columns[1:]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.number, bool, np.bool_))
+
+
+class ResultRecorder:
+    """
+    정책 기반 결과 기록기
+
+    Args:
+        policy: 기록 정책 (None이면 Decimate(1): 모든 스텝 유지)
+        rename: state 경로 → data 경로 재배치 (예: {('I_glob',): ('weather', 'I_glob')})
+        time_key: state에서 시간을 읽을 키
+
+    times, data 속성은 SimulationResults와 같은 형태이며, 평탄한 state를 기록한 경우
+    recorder['T_air']처럼 dict처럼 접근할 수 있다.
+    """
+
+    def __init__(self, policy: Optional[RecordPolicy] = None,
+                 rename: Optional[Dict[SignalPath, SignalPath]] = None, time_key: str = 'time'):
+        self.policy = policy if policy is not None else Decimate(1)
+        self.rename = dict(rename or {})
+        self.time_key = time_key
+        self.paths: Optional[List[SignalPath]] = None
+        self.n_updates = 0
+        self._row = None
+        self._data_paths: List[SignalPath] = []
+        self._cache: Optional[Tuple[int, np.ndarray, List[np.ndarray]]] = None
+
+    @property
+    def names(self) -> List[str]:
+        """신호 이름 ('.'으로 연결된 data 경로)"""
+        return ['.'.join(path) for path in self._data_paths]
+
+    def _start(self, state: Dict[str, Any]) -> None:
+        self.paths = [p for p, value in flatten_data(state) if _is_number(value) and p != (self.time_key,)]
+        self._data_paths = [self.rename.get(p, p) for p in self.paths]
+        self._row = np.empty(len(self.paths))
+        self.policy.start(self.names)
+
+    def update(self, step: int, state: Dict[str, Any]) -> None:
+        """한 스텝의 상태를 기록합니다. (step은 SimulationResults.update와의 호환용)"""
+        if self.paths is None:
+            self._start(state)
+        row = self._row
+        for j, path in enumerate(self.paths):
+            node = state
+            for key in path:
+                node = node[key]
+            row[j] = node
+        self.policy.append(float(state.get(self.time_key, step)), row)
+        self.n_updates += 1
+
+    def finish(self) -> None:
+        """기록 종료 (스트리밍 정책의 남은 청크를 디스크에 씀)"""
+        self.policy.finish()
+
+    def _columns(self) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """(times, 신호별 열 배열) - 기록이 추가되지 않았으면 이전 결과 재사용"""
+        if self.paths is None:
+            return np.empty(0), []
+        if self._cache is None or self._cache[0] != self.n_updates:
+            times, values = self.policy.arrays()
+            if isinstance(values, np.ndarray):
+                values = [values[:, j] for j in range(values.shape[1])]
+            self._cache = (self.n_updates, times, values)
+        return self._cache[1], self._cache[2]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._columns()[0]
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return nest_data(zip(self._data_paths, self._columns()[1]))
+
+    @property
+    def aggregates(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate 정책의 통계별 중첩 data ({'min': ..., 'mean': ..., 'max': ...})"""
+        if not isinstance(self.policy, Aggregate):
+            raise TypeError("aggregates는 Aggregate 정책에서만 사용할 수 있습니다")
+        stats = self.policy.statistics()
+        return {stat: nest_data(zip(self._data_paths, values.T))
+                for stat, (_, values) in stats.items()}
+
+    def save(self, directory: str, units: Optional[Dict[str, str]] = None,
+             dt: Optional[float] = None, config: Any = None) -> str:
+        """기록된 times/data를 result_store 형식으로 저장하고 manifest 경로를 반환합니다."""
+        return save_results(directory, self.times, self.data, units=units, dt=dt, config=config)
+
+    def keys(self) -> List[str]:
+        return [self.time_key] + self.names
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        times, columns = self._columns()
+        if name == self.time_key:
+            return times
+        return columns[self.names.index(name)]
@@ -0,0 +1,233 @@
+"""
+result_store.py
+열(column) 단위 시뮬레이션 결과 저장소
+- 결과 디렉터리 하나에 신호별 1차원 float64 .npy (time.npy + '<a.b.c>.npy')와
+  manifest.json (신호 경로/파일/단위, 샘플 수, dt, 설정값과 설정 해시)을 저장
+- 로드는 각 파일을 np.load(mmap_mode='r')로 필요할 때 매핑하여 중첩 data 구조를
+  재구성 (헤더만 읽으므로 수 GB의 연간 결과도 즉시 열림)
+- 시간 구간 슬라이싱은 매핑된 배열의 뷰로 반환 (복사 없음)
+- manifest는 모든 신호 파일을 쓴 뒤 마지막에 원자적으로 기록 (manifest가 있으면 완전한 결과)
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from file_utils import atomic_write
+
+MANIFEST_NAME = 'manifest.json'
+TIME_NAME = 'time'
+STORE_VERSION = 1
+
+SignalPath = Tuple[str, ...]
+
+
+def signal_file(name: str) -> str:
+    """신호 이름('.'으로 연결된 경로)의 파일 이름"""
+    return f'{name}.npy'
+
+
+def _config_dict(config: Any) -> Optional[Dict[str, Any]]:
+    if config is None:
+        return None
+    if dataclasses.is_dataclass(config):
+        return dataclasses.asdict(config)
+    return dict(config)
+
+
+def config_hash(config: Any) -> Optional[str]:
+    """설정값(dict 또는 dataclass)의 SHA-256 해시 (키 순서 무관)"""
+    config = _config_dict(config)
+    if config is None:
+        return None
+    text = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def flatten_data(data: Dict[str, Any], prefix: SignalPath = ()) -> List[Tuple[SignalPath, np.ndarray]]:
+    """중첩 data → [(경로, 배열)] (dict 순서 유지)"""
+    items = []
+    for key, value in data.items():
+        path = prefix + (key,)
+        if isinstance(value, dict):
+            items.extend(flatten_data(value, path))
+        else:
+            items.append((path, value))
+    return items
+
+
+def nest_data(items: Sequence[Tuple[SignalPath, Any]]) -> Dict[str, Any]:
+    """[(경로, 값)] → 중첩 data"""
+    data: Dict[str, Any] = {}
+    for path, value in items:
+        node = data
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return data
+
+
+def write_manifest(directory: str, paths: Sequence[SignalPath], n_samples: int,
+                   units: Optional[Dict[str, str]] = None, dt: Optional[float] = None,
+                   config: Any = None, time_unit: str = 'h') -> str:
+    """결과 디렉터리의 manifest.json을 원자적으로 기록하고 경로를 반환합니다."""
+    units = units or {}
+    signals = []
+    for path in paths:
+        name = '.'.join(path)
+        signals.append({'path': list(path), 'file': signal_file(name),
+                        'unit': units.get(name, '')})
+    manifest = {
+        'version': STORE_VERSION,
+        'n_samples': int(n_samples),
+        'time': {'file': signal_file(TIME_NAME), 'unit': time_unit},
+        'dt': None if dt is None else float(dt),
+        'config': _config_dict(config),
+        'config_hash': config_hash(config),
+        'signals': signals,
+    }
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    text = json.dumps(manifest, indent=1, ensure_ascii=False, default=str)
+    atomic_write(manifest_path, lambda f: f.write(text.encode('utf-8')))
+    return manifest_path
+
+
+def _infer_dt(times: np.ndarray) -> Optional[float]:
+    return float(times[1] - times[0]) if len(times) > 1 else None
+
+
+def save_results(directory: str, times: np.ndarray, data: Dict[str, Any],
+                 units: Optional[Dict[str, str]] = None, dt: Optional[float] = None,
+                 config: Any = None, time_unit: str = 'h') -> str:
+    """
+    시간 배열과 중첩 data를 열 단위 결과 디렉터리로 저장합니다.
+
+    Args:
+        directory: 결과 디렉터리 (없으면 생성)
+        times: 샘플 시각
+        data: 신호 배열의 중첩 dict (모든 배열은 times와 같은 길이)
+        units: 신호 이름('a.b.c') → 단위 문자열
+        dt: 샘플 간격 [time_unit] (None이면 times에서 추정)
+        config: 시뮬레이션 설정값 (manifest에 값과 해시 기록)
+        time_unit: times의 단위
+
+    Returns:
+        manifest.json 경로
+    """
+    times = np.asarray(times, dtype=np.float64)
+    items = flatten_data(data)
+    for path, array in items:
+        if len(array) != len(times):
+            raise ValueError(f"신호 '{'.'.join(path)}'의 길이가 times와 다릅니다: "
+                             f"{len(array)} != {len(times)}")
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, signal_file(TIME_NAME)), times)
+    for path, array in items:
+        np.save(os.path.join(directory, signal_file('.'.join(path))),
+                np.asarray(array, dtype=np.float64))
+    return write_manifest(directory, [path for path, _ in items], len(times), units=units,
+                          dt=_infer_dt(times) if dt is None else dt, config=config,
+                          time_unit=time_unit)
+
+
+class ResultStore:
+    """
+    열 단위 결과 디렉터리의 지연 로딩 뷰
+
+    Args:
+        directory: save_results 또는 result_recorder.Stream이 기록한 디렉터리
+        mmap: True이면 신호를 읽기 전용 메모리 매핑으로, False이면 메모리로 읽음
+
+    신호 배열은 처음 접근할 때 매핑되며, data는 전체 중첩 구조를 매핑된 배열로
+    재구성합니다. between(t_start, t_end)은 시간 구간의 뷰를 반환합니다.
+    """
+
+    def __init__(self, directory: str, mmap: bool = True):
+        self.directory = directory
+        self.mmap = mmap
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"결과 manifest가 없습니다: {manifest_path}") from None
+        if self.manifest.get('version') != STORE_VERSION:
+            raise ValueError(f"지원하지 않는 결과 저장소 버전: {self.manifest.get('version')}")
+        self.paths: List[SignalPath] = [tuple(s['path']) for s in self.manifest['signals']]
+        self._files = {'.'.join(tuple(s['path'])): s['file'] for s in self.manifest['signals']}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.manifest['n_samples']
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._files
+
+    @property
+    def names(self) -> List[str]:
+        """신호 이름 ('.'으로 연결된 data 경로)"""
+        return list(self._files)
+
+    @property
+    def units(self) -> Dict[str, str]:
+        return {'.'.join(s['path']): s['unit'] for s in self.manifest['signals']}
+
+    @property
+    def dt(self) -> Optional[float]:
+        return self.manifest['dt']
+
+    @property
+    def time_unit(self) -> str:
+        return self.manifest['time']['unit']
+
+    @property
+    def config(self) -> Optional[Dict[str, Any]]:
+        return self.manifest['config']
+
+    @property
+    def config_hash(self) -> Optional[str]:
+        return self.manifest['config_hash']
+
+    def _load(self, name: str, file: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.load(os.path.join(self.directory, file),
+                            mmap_mode='r' if self.mmap else None)
+            # 기록 중단 등으로 파일이 manifest보다 긴 경우 manifest 길이까지만 사용
+            array = array[:len(self)]
+            self._arrays[name] = array
+        return array
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._load(TIME_NAME, self.manifest['time']['file'])
+
+    def signal(self, name: str) -> np.ndarray:
+        """단일 신호 배열 (예: store.signal('temperatures.air'))"""
+        if name not in self._files:
+            raise KeyError(name)
+        return self._load(name, self._files[name])
+
+    __getitem__ = signal
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """전체 중첩 data (신호 배열은 매핑된 배열)"""
+        return nest_data([(path, self.signal('.'.join(path))) for path in self.paths])
+
+    def index_range(self, t_start: Optional[float] = None,
+                    t_end: Optional[float] = None) -> slice:
+        """t_start <= t <= t_end인 샘플의 인덱스 구간"""
+        times = self.times
+        i0 = 0 if t_start is None else int(np.searchsorted(times, t_start, side='left'))
+        i1 = len(times) if t_end is None else int(np.searchsorted(times, t_end, side='right'))
+        return slice(i0, i1)
+
+    def between(self, t_start: Optional[float] = None,
+                t_end: Optional[float] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """시간 구간 [t_start, t_end]의 (times, data) 뷰"""
+        index = self.index_range(t_start, t_end)
+        return self.times[index], nest_data(
+            [(path, self.signal('.'.join(path))[index]) for path in self.paths])
@@ -3,6 +3,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import logging
 from Greenhouse_1 import Greenhouse_1
+from result_recorder import ResultRecorder, Decimate
 import time
 import signal
 import sys
@@ -22,7 +23,7 @@ def signal_handler(signum, frame):
 # 시그널 핸들러 등록
 signal.signal(signal.SIGINT, signal_handler)
 
-def simulate_greenhouse(dt=1.0, sim_time=24*3600, debug_interval=3600):
+def simulate_greenhouse(dt=1.0, sim_time=24*3600, debug_interval=3600, recorder=None):
     """
     온실 시뮬레이션 실행
     
@@ -30,9 +31,10 @@ def simulate_greenhouse(dt=1.0, sim_time=24*3600, debug_interval=3600):
         dt (float): 시간 간격 [초]
         sim_time (float): 시뮬레이션 시간 [초]
         debug_interval (int): 디버그 출력 간격 [초]
+        recorder (ResultRecorder): 결과 기록기 (None이면 모든 스텝 기록)
     
     Returns:
-        dict: 시뮬레이션 결과
+        ResultRecorder: 시뮬레이션 결과 (results['T_air']처럼 dict처럼 접근)
     """
     global simulation_interrupted
     
@@ -48,24 +50,8 @@ def simulate_greenhouse(dt=1.0, sim_time=24*3600, debug_interval=3600):
         logging.error(f"온실 모델 초기화 실패: {e}")
         return None
     
-    # 결과 저장 배열
-    results = {
-        'time': np.zeros(n_steps),
-        'T_air': np.zeros(n_steps),
-        'T_air_top': np.zeros(n_steps),
-        'T_canopy': np.zeros(n_steps),
-        'T_cover': np.zeros(n_steps),
-        'T_floor': np.zeros(n_steps),
-        'RH_air': np.zeros(n_steps),
-        'RH_air_top': np.zeros(n_steps),
-        'VP_air': np.zeros(n_steps),
-        'VP_air_top': np.zeros(n_steps),
-        'CO2_air': np.zeros(n_steps),
-        'q_heat_tot': np.zeros(n_steps),
-        'E_thermal': np.zeros(n_steps),
-        'LAI': np.zeros(n_steps),
-        'DM_harvest': np.zeros(n_steps)
-    }
+    # 결과 기록기 (실행 길이와 무관한 메모리 사용)
+    results = recorder if recorder is not None else ResultRecorder(Decimate(every=1))
     
     # 시뮬레이션 루프
     start_time = time.time()
@@ -77,38 +63,33 @@ def simulate_greenhouse(dt=1.0, sim_time=24*3600, debug_interval=3600):
         
         try:
             # 시뮬레이션 스텝 실행
-            greenhouse.step(dt)
+            greenhouse.step(dt, step)
             
             # 결과 저장
             current_time = step * dt / 3600  # 시간 단위
-            results['time'][step] = current_time
-            
-            # 온도 데이터
-            results['T_air'][step] = greenhouse.air.T
-            results['T_air_top'][step] = greenhouse.air_Top.T
-            results['T_canopy'][step] = greenhouse.canopy.T
-            results['T_cover'][step] = greenhouse.cover.T
-            results['T_floor'][step] = greenhouse.floor.T
-            
-            # 습도 데이터
-            results['RH_air'][step] = greenhouse.air.RH
-            results['RH_air_top'][step] = greenhouse.air_Top.RH
-            results['VP_air'][step] = greenhouse.air.massPort.VP
-            results['VP_air_top'][step] = greenhouse.air_Top.massPort.VP
-            
-            # CO2 데이터
-            if hasattr(greenhouse, 'CO2_air'):
-                results['CO2_air'][step] = greenhouse.CO2_air.CO2_ppm
-            
-            # 에너지 데이터
-            results['q_heat_tot'][step] = greenhouse.q_tot
-            results['E_thermal'][step] = greenhouse.E_th_tot_kWhm2
-            
-            # 작물 데이터
-            if hasattr(greenhouse, 'canopy'):
-                results['LAI'][step] = greenhouse.canopy.LAI
-            if hasattr(greenhouse, 'TYM'):
-                results['DM_harvest'][step] = greenhouse.TYM.DM_Har
+            state = {
+                'time': current_time,
+                # 온도 데이터
+                'T_air': greenhouse.air.T,
+                'T_air_top': greenhouse.air_Top.T,
+                'T_canopy': greenhouse.canopy.T,
+                'T_cover': greenhouse.cover.T,
+                'T_floor': greenhouse.floor.T,
+                # 습도 데이터
+                'RH_air': greenhouse.air.RH,
+                'RH_air_top': greenhouse.air_Top.RH,
+                'VP_air': greenhouse.air.massPort.VP,
+                'VP_air_top': greenhouse.air_Top.massPort.VP,
+                # CO2 데이터
+                'CO2_air': greenhouse.CO2_air.CO2_ppm if hasattr(greenhouse, 'CO2_air') else 0.0,
+                # 에너지 데이터
+                'q_heat_tot': greenhouse.q_tot,
+                'E_thermal': greenhouse.E_th_tot_kWhm2,
+                # 작물 데이터
+                'LAI': greenhouse.canopy.LAI if hasattr(greenhouse, 'canopy') else 0.0,
+                'DM_harvest': greenhouse.TYM.DM_Har if hasattr(greenhouse, 'TYM') else 0.0,
+            }
+            results.update(step, state)
             
             # 진행 상황 출력
             if step % (debug_interval // dt) == 0:
@@ -117,18 +98,19 @@ def simulate_greenhouse(dt=1.0, sim_time=24*3600, debug_interval=3600):
                 logging.info(f"진행률: {progress:.1f}% ({step}/{n_steps}), "
                            f"시간: {current_time:.1f}h, "
                            f"실행시간: {elapsed:.1f}초, "
-                           f"T_air: {results['T_air'][step]:.1f}K, "
-                           f"RH_air: {results['RH_air'][step]*100:.1f}%")
+                           f"T_air: {state['T_air']:.1f}K, "
+                           f"RH_air: {state['RH_air']*100:.1f}%")
                 
                 # RH 100% 포화 경고
-                if results['RH_air'][step] >= 0.99:
-                    logging.warning(f"상대습도 포화 상태: {results['RH_air'][step]*100:.1f}%")
+                if state['RH_air'] >= 0.99:
+                    logging.warning(f"상대습도 포화 상태: {state['RH_air']*100:.1f}%")
         
         except Exception as e:
             logging.error(f"시뮬레이션 오류 (스텝 {step}): {e}")
             break
     
     # 시뮬레이션 완료
+    results.finish()
     elapsed_total = time.time() - start_time
     logging.info(f"시뮬레이션 완료: {elapsed_total:.1f}초")
     
@@ -2,11 +2,14 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import logging
+import os
 from pathlib import Path
 import json
 from Greenhouse_2 import Greenhouse_2
+from result_recorder import ResultRecorder, Decimate, Stream
+from result_store import ResultStore, flatten_data, nest_data, save_results
 import time
 import signal
 import sys
@@ -41,6 +44,10 @@ class SimulationConfig:
     sim_time: float = 24 * 3600.0      # 시뮬레이션 시간 [s] (24시간)
     time_unit_scaling: float = 1.0     # 시간 단위 스케일링
     debug_interval: int = 3600         # 디버그 출력 간격 (스텝, 1시간마다)
+    record_every: int = 1              # 결과 기록 간격 (스텝, 기본 기록기 Decimate 정책)
+    checkpoint_path: Optional[str] = None  # 체크포인트 파일 경로 (None이면 저장하지 않음)
+    checkpoint_every: int = 3600       # 체크포인트 저장 간격 (스텝, 0이면 주기 저장 안 함)
+    resume: bool = False               # checkpoint_path의 체크포인트에서 이어서 실행
     
     def __post_init__(self):
         """초기화 후 검증"""
@@ -60,6 +67,47 @@ class SimulationConfig:
         with open(filepath, 'w') as f:
             json.dump(self.__dict__, f, indent=4)
 
+# Greenhouse_2._get_state() 경로 → SimulationResults.data 경로 (나머지는 동일 경로)
+RESULT_RENAME = {('I_glob',): ('weather', 'I_glob')}
+
+# SimulationResults.data 신호별 단위 (결과 저장소 manifest에 기록)
+RESULT_UNITS = {
+    **{f'temperatures.{name}': '°C' for name in
+       ('air', 'air_top', 'canopy', 'cover', 'floor', 'screen', 'pipe_low', 'pipe_up',
+        'soil', 'outdoor', 'sky')},
+    'humidity.air_rh': '%', 'humidity.air_top_rh': '%',
+    **{f'humidity.{name}': 'Pa' for name in
+       ('air_vp', 'air_top_vp', 'cover_vp', 'screen_vp', 'canopy_vp')},
+    'energy.heating.q_low': 'W/m2', 'energy.heating.q_up': 'W/m2', 'energy.heating.q_tot': 'W/m2',
+    'energy.heating.E_th_tot_kWhm2': 'kWh/m2', 'energy.heating.E_th_tot': 'kWh',
+    'energy.electrical.W_el_illu': 'kWh/m2', 'energy.electrical.W_el_illu_instant': 'W/m2',
+    'energy.electrical.E_el_tot_kWhm2': 'kWh/m2', 'energy.electrical.E_el_tot': 'kWh',
+    'control.screen.SC': '1', 'control.screen.SC_usable': '1',
+    'control.ventilation.U_vents': '1',
+    **{f'control.ventilation.{name}': 'm3/(m2.s)' for name in
+       ('f_vent_AirOut', 'f_vent_TopOut', 'f_vent_AirTop', 'f_vent_total')},
+    'control.heating.Mdot': 'kg/s', 'control.heating.T_supply': '°C',
+    'control.co2.CO2_air': 'mg/m3', 'control.co2.CO2_injection': 'mg/(m2.s)',
+    'control.illumination.switch': '1', 'control.illumination.P_el': 'W',
+    'crop.LAI': 'm2/m2', 'crop.DM_Har': 'mg/m2', 'crop.C_Leaf': 'mg/m2', 'crop.C_Stem': 'mg/m2',
+    'crop.R_PAR_can': 'umol/(m2.s)', 'crop.MC_AirCan': 'mg/(m2.s)',
+    'weather.I_glob': 'W/m2',
+    'I_crop': 'W/m2',
+}
+
+
+def make_recorder(config: SimulationConfig, policy=None) -> ResultRecorder:
+    """
+    SimulationResults와 같은 data 구조로 기록하는 ResultRecorder를 생성합니다.
+    
+    Args:
+        config: 시뮬레이션 설정값 (policy가 None이면 record_every 간격의 Decimate 사용)
+        policy: result_recorder의 기록 정책 (Decimate, Aggregate, Stream)
+    """
+    if policy is None:
+        policy = Decimate(every=config.record_every)
+    return ResultRecorder(policy, rename=RESULT_RENAME)
+
 class SimulationResults:
     """시뮬레이션 결과를 관리하는 클래스"""
     def __init__(self, n_steps: int):
@@ -179,33 +227,60 @@ class SimulationResults:
         if 'I_crop' in state:
             self.data['I_crop'][step] = state['I_crop']
     
-    def save(self, filepath: str) -> None:
-        """결과를 NPZ 파일로 저장합니다."""
-        save_dict = {'times': self.times}
-        for category, subcategories in self.data.items():
-            if isinstance(subcategories, dict):
-                for subcategory, data in subcategories.items():
-                    if isinstance(data, dict):
-                        for key, array in data.items():
-                            save_dict[f'{category}_{subcategory}_{key}'] = array
-                    else:
-                        save_dict[f'{category}_{subcategory}'] = data
-            else:
-                save_dict[category] = subcategories
-        np.savez(filepath, **save_dict)
+    def save(self, directory: str, config: Optional[SimulationConfig] = None,
+             dt: Optional[float] = None) -> str:
+        """
+        결과를 열 단위 결과 저장소(신호별 .npy + manifest.json)로 저장합니다.
+        
+        Args:
+            directory: 결과 디렉터리
+            config: manifest에 값과 해시를 기록할 설정값
+            dt: 샘플 간격 [h] (None이면 times에서 추정)
+        
+        Returns:
+            str: manifest.json 경로
+        """
+        return save_results(directory, self.times, self.data, units=RESULT_UNITS,
+                            dt=dt, config=config)
     
     @classmethod
-    def load(cls, filepath: str) -> 'SimulationResults':
-        """NPZ 파일에서 결과를 로드합니다."""
-        data = np.load(filepath)
-        n_steps = len(data['times'])
-        results = cls(n_steps)
-        results.times = data['times']
-        # 데이터 복원 로직 구현 필요
+    def load(cls, path: str, t_start: Optional[float] = None, t_end: Optional[float] = None,
+             mmap: bool = True) -> 'SimulationResults':
+        """
+        저장된 결과를 로드합니다.
+        
+        결과 디렉터리는 신호 파일을 읽기 전용 메모리 매핑으로 열어 data 구조를
+        재구성하며 (store 속성에 ResultStore 유지), [t_start, t_end] 구간 [h]만
+        뷰로 잘라낼 수 있습니다. 이전 형식의 NPZ 파일도 읽을 수 있습니다.
+        """
+        results = cls(0)
+        if os.path.isdir(path):
+            results.store = ResultStore(path, mmap=mmap)
+            results.times, results.data = results.store.between(t_start, t_end)
+            return results
+        
+        # 이전 형식: 경로를 '_'로 연결한 키의 NPZ
+        with np.load(path) as npz:
+            results.times = npz['times']
+            items = []
+            for data_path, _ in flatten_data(results.data):
+                key = '_'.join(data_path)
+                if key in npz:
+                    items.append((data_path, npz[key]))
+        results.data = nest_data(items)
+        if t_start is not None or t_end is not None:
+            mask = np.ones(len(results.times), dtype=bool)
+            if t_start is not None:
+                mask &= results.times >= t_start
+            if t_end is not None:
+                mask &= results.times <= t_end
+            results.times = results.times[mask]
+            results.data = nest_data([(p, a[mask]) for p, a in flatten_data(results.data)])
         return results
 
-def plot_results(results: SimulationResults, save_path: Optional[str] = None) -> None:
-    """시뮬레이션 결과를 시각화합니다."""
+def plot_results(results: Union[SimulationResults, ResultRecorder],
+                 save_path: Optional[str] = None) -> None:
+    """시뮬레이션 결과를 시각화합니다. (SimulationResults 또는 ResultRecorder)"""
     fig = plt.figure(figsize=(20, 15))
     
     # 1. 온도 그래프
@@ -296,15 +371,26 @@ def plot_results(results: SimulationResults, save_path: Optional[str] = None) ->
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
     plt.show()
 
-def simulate_greenhouse(config: Optional[SimulationConfig] = None) -> SimulationResults:
+def _save_checkpoint(greenhouse: Greenhouse_2, config: SimulationConfig) -> None:
+    """설정된 경로에 체크포인트 저장 (경로가 없으면 무시)"""
+    if config.checkpoint_path:
+        greenhouse.save_checkpoint(config.checkpoint_path)
+        logging.debug(f"체크포인트 저장: {config.checkpoint_path} (다음 스텝 {greenhouse.next_time_idx})")
+
+def simulate_greenhouse(config: Optional[SimulationConfig] = None,
+                        recorder: Optional[ResultRecorder] = None) -> ResultRecorder:
     """
     온실 시뮬레이션을 실행합니다.
     
     Args:
         config: 시뮬레이션 설정값. None인 경우 기본값 사용
+        recorder: 결과 기록기. None인 경우 make_recorder(config) 사용
+            (config.resume으로 재개한 경우 재개 스텝 이후만 기록, Stream 정책은 기존 파일에 이어 씀)
+            (예: make_recorder(config, Aggregate(period=1.0))로 시간별 min/mean/max만 유지,
+             make_recorder(config, Stream('results_dir'))로 디스크 스트리밍)
     
     Returns:
-        SimulationResults: 시뮬레이션 결과
+        ResultRecorder: 시뮬레이션 결과 (times / data는 SimulationResults와 같은 구조)
     
     Raises:
         ValueError: 시뮬레이션 중 오류 발생 시
@@ -320,8 +406,15 @@ def simulate_greenhouse(config: Optional[SimulationConfig] = None) -> Simulation
         if config is None:
             config = SimulationConfig()
         
-        # 온실 모델 생성
-        greenhouse = Greenhouse_2(time_unit_scaling=config.time_unit_scaling)
+        # 온실 모델 생성 (또는 체크포인트에서 복원)
+        start_step = 0
+        if config.resume and config.checkpoint_path and os.path.exists(config.checkpoint_path):
+            greenhouse = Greenhouse_2.from_checkpoint(config.checkpoint_path)
+            start_step = greenhouse.next_time_idx
+            logging.info(f"체크포인트 {config.checkpoint_path}에서 재개: "
+                         f"스텝 {start_step} (t={start_step*config.dt/3600:.1f}h)")
+        else:
+            greenhouse = Greenhouse_2(time_unit_scaling=config.time_unit_scaling)
         n_steps = int(config.sim_time / config.dt)
         
         logging.info(f"시뮬레이션 시작: {n_steps}시간 ({n_steps} 스텝)")
@@ -329,27 +422,21 @@ def simulate_greenhouse(config: Optional[SimulationConfig] = None) -> Simulation
         logging.info(f"총 시뮬레이션 시간: {config.sim_time/3600:.1f}시간")
         logging.info("시뮬레이션을 중단하려면 Ctrl+C를 누르세요.")
         
-        # 결과 저장소 초기화
-        results = SimulationResults(n_steps)
+        # 결과 기록기 초기화 (실행 길이와 무관한 메모리 사용)
+        results = recorder if recorder is not None else make_recorder(config)
+        if start_step > 0 and isinstance(results.policy, Stream):
+            # 재개: 중단 전에 스트리밍한 파일을 덮어쓰지 않고 이어 씀
+            results.policy.resume = True
         
         # 시뮬레이션 루프
-        for i in range(n_steps):
+        for i in range(start_step, n_steps):
             try:
                 # 시뮬레이션 중단 확인
                 if simulation_interrupted:
                     logging.info(f"시뮬레이션이 {i} 스텝에서 중단되었습니다 (t={i*config.dt/3600:.1f}h)")
-                    # 현재까지의 결과만 반환
-                    results.times = results.times[:i]
-                    for category, subcategories in results.data.items():
-                        if isinstance(subcategories, dict):
-                            for subcategory, data in subcategories.items():
-                                if isinstance(data, dict):
-                                    for key, array in data.items():
-                                        results.data[category][subcategory][key] = array[:i]
-                                else:
-                                    results.data[category][subcategory] = data[:i]
-                        else:
-                            results.data[category] = subcategories[:i]
+                    # 현재 상태를 저장하고 현재까지의 결과만 반환
+                    _save_checkpoint(greenhouse, config)
+                    results.finish()
                     return results
                 
                 # 시뮬레이션 스텝 실행
@@ -358,6 +445,10 @@ def simulate_greenhouse(config: Optional[SimulationConfig] = None) -> Simulation
                 state['time'] = i * config.dt / 3600  # 시간 [h] 추가
                 results.update(i, state)
                 
+                # 주기적 체크포인트 (재개 시 다음 스텝부터 실행)
+                if config.checkpoint_every and (i + 1) % config.checkpoint_every == 0:
+                    _save_checkpoint(greenhouse, config)
+
                 # 디버그 출력 (매 시간마다)
                 if i % config.debug_interval == 0:
                     logging.info(f"\n=== Step {i} | t={state['time']:.1f} h ===")
@@ -382,23 +473,14 @@ def simulate_greenhouse(config: Optional[SimulationConfig] = None) -> Simulation
             
             except KeyboardInterrupt:
                 logging.info(f"시뮬레이션이 {i} 스텝에서 중단되었습니다 (t={i*config.dt/3600:.1f}h)")
-                # 현재까지의 결과만 반환
-                results.times = results.times[:i]
-                for category, subcategories in results.data.items():
-                    if isinstance(subcategories, dict):
-                        for subcategory, data in subcategories.items():
-                            if isinstance(data, dict):
-                                for key, array in data.items():
-                                    results.data[category][subcategory][key] = array[:i]
-                            else:
-                                results.data[category][subcategory] = data[:i]
-                    else:
-                        results.data[category] = subcategories[:i]
+                # 현재까지의 결과만 반환 (스텝 도중 중단되었으므로 마지막 주기 체크포인트 유지)
+                results.finish()
                 return results
             except Exception as e:
                 logging.error(f"스텝 {i} (t={i*config.dt/3600:.1f}h) 실행 중 오류 발생: {str(e)}")
                 raise
         
+        results.finish()
         logging.info("시뮬레이션 완료")
         return results
     
@@ -432,9 +514,9 @@ def main():
         logging.info(f"시뮬레이션 소요 시간: {elapsed:.2f}초 ({elapsed/60:.2f}분)")
         print(f"시뮬레이션 소요 시간: {elapsed:.2f}초 ({elapsed/60:.2f}분)")
 
-        # # 결과 저장
-        # results_path = Path('simulation_results.npz')
-        # results.save(str(results_path))
+        # # 결과 저장 (SimulationResults.load('simulation_results')로 로드)
+        # results_path = Path('simulation_results')
+        # results.save(str(results_path), units=RESULT_UNITS, config=config)
         # logging.info(f"시뮬레이션 결과를 {results_path}에 저장했습니다.")
 
         # 결과 시각화
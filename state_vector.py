@@ -0,0 +1,216 @@
+"""
+state_vector.py
+온실 모델의 동적 상태를 하나의 연속 float64 배열로 다루기 위한 레이아웃
+- 컴포넌트별 상태 블록(이름, 크기, getter/setter/derivative)을 순서대로 등록
+- pack(): 컴포넌트 객체 → 평탄화된 상태 벡터 y
+- unpack(y): 상태 벡터 → 컴포넌트 객체 (포트 온도 등 파생값 동기화 포함)
+- derivatives(): 각 컴포넌트의 compute_derivatives() 결과를 dydt 벡터로 수집
+- jacobian_sparsity(): 블록 내부 패턴 + 컴포넌트 연결(결합) 목록으로 희소 야코비안 패턴 생성
+- 블록별 steadystate 플래그(컴포넌트 속성)를 조회하고, 정상상태 초기화 중에는
+  released()로 플래그를 잠시 꺼서 전체 밸런스의 변화율을 평가
+"""
+
+import numpy as np
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from scipy.sparse import csr_matrix
+
+
+@dataclass
+class StateBlock:
+    """상태 벡터의 한 구간 (하나의 컴포넌트 상태)"""
+    name: str                                   # 블록 이름 (예: 'air.T', 'Q_cd_Soil.T')
+    size: int                                   # 원소 수
+    get: Callable[[], Any]                      # 현재 상태값 반환 (float 또는 배열)
+    set: Callable[[np.ndarray], None]           # 상태값 설정 (크기 size의 배열)
+    derivative: Callable[[], Any]               # 상태 변화율 반환 (float 또는 배열)
+    unit: str = ""                              # 단위 (문서화 및 결과 저장용)
+    start: int = 0                              # 상태 벡터 내 시작 인덱스
+    sparsity: Optional[np.ndarray] = None       # 블록 내부 야코비안 패턴 (size x size, None이면 dense)
+    flags: Tuple[Tuple[Any, str], ...] = ()     # steadystate 플래그 (객체, 속성 이름) 목록
+    residual: Optional[Callable[[], Any]] = None  # 정상상태 잔차 (None이면 derivative)
+
+    @property
+    def steadystate(self) -> bool:
+        """컴포넌트의 steadystate 플래그 (초기화 시 der(x)=0 여부)"""
+        return any(getattr(obj, attr) for obj, attr in self.flags)
+
+    @property
+    def slice(self) -> slice:
+        return slice(self.start, self.start + self.size)
+
+
+class StateLayout:
+    """
+    상태 블록들의 순서 있는 모음
+
+    등록 순서대로 y 벡터에 연속 배치되며, 이름으로 구간(slice)을 조회할 수 있다.
+    """
+
+    def __init__(self):
+        self.blocks: List[StateBlock] = []
+        self._index: Dict[str, StateBlock] = {}
+        self.size = 0
+
+    def add(self, name: str, size: int, get: Callable[[], Any],
+            set: Callable[[np.ndarray], None], derivative: Callable[[], Any],
+            unit: str = "", sparsity: Optional[np.ndarray] = None,
+            flags: Sequence[Tuple[Any, str]] = (),
+            residual: Optional[Callable[[], Any]] = None) -> StateBlock:
+        """
+        상태 블록 등록
+
+        Args:
+            name: 블록 이름 (레이아웃 내에서 유일해야 함)
+            size: 원소 수
+            get: 현재 상태값을 반환하는 함수
+            set: 상태값(크기 size의 배열)을 컴포넌트에 설정하는 함수
+            derivative: 상태 변화율을 반환하는 함수
+            unit: 단위 문자열
+            sparsity: 블록 내부 야코비안 패턴 (size x size bool 배열, None이면 dense)
+            flags: 블록의 steadystate 플래그를 가진 (객체, 속성 이름) 목록
+                (예: [(self.air, 'steadystate')], 토양은 레이어마다 한 항목)
+            residual: 정상상태 잔차 함수 (derivative가 안정화 한계로 잘리는 경우 잘리지 않은 밸런스,
+                None이면 derivative 사용)
+
+        Returns:
+            등록된 StateBlock
+        """
+        if name in self._index:
+            raise ValueError(f"상태 블록 '{name}'이(가) 이미 등록되어 있습니다")
+        if size < 1:
+            raise ValueError(f"상태 블록 '{name}'의 크기는 1 이상이어야 합니다: {size}")
+        if sparsity is not None:
+            sparsity = np.asarray(sparsity, dtype=bool)
+            if sparsity.shape != (size, size):
+                raise ValueError(f"상태 블록 '{name}'의 sparsity 크기 불일치: "
+                                 f"{sparsity.shape} != ({size}, {size})")
+        block = StateBlock(name=name, size=int(size), get=get, set=set,
+                           derivative=derivative, unit=unit, start=self.size,
+                           sparsity=sparsity, flags=tuple(flags),
+                           residual=residual)
+        self.blocks.append(block)
+        self._index[name] = block
+        self.size += block.size
+        return block
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __getitem__(self, name: str) -> slice:
+        return self._index[name].slice
+
+    def block(self, name: str) -> StateBlock:
+        return self._index[name]
+
+    @property
+    def names(self) -> List[str]:
+        return [block.name for block in self.blocks]
+
+    def steadystate_names(self) -> List[str]:
+        """steadystate 플래그가 켜진 블록 이름"""
+        return [block.name for block in self.blocks if block.steadystate]
+
+    def indices(self, names: Iterable[str]) -> np.ndarray:
+        """블록 이름들의 원소 인덱스 (레이아웃 순서)"""
+        blocks = sorted((self._index[name] for name in names), key=lambda block: block.start)
+        if not blocks:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([np.arange(block.start, block.start + block.size) for block in blocks])
+
+    @contextmanager
+    def released(self, names: Iterable[str]):
+        """
+        블록들의 steadystate 플래그를 잠시 끔 (with 블록 동안)
+
+        플래그가 켜진 컴포넌트는 compute_derivatives()가 0을 반환하므로,
+        정상상태 잔차(실제 밸런스의 변화율)를 평가할 때 사용
+        """
+        saved = [(obj, attr, getattr(obj, attr))
+                 for name in names for obj, attr in self._index[name].flags]
+        for obj, attr, _ in saved:
+            setattr(obj, attr, False)
+        try:
+            yield
+        finally:
+            for obj, attr, value in saved:
+                setattr(obj, attr, value)
+
+    def labels(self) -> List[str]:
+        """원소별 이름 (크기 1 블록은 이름 그대로, 그 외는 'name[i]')"""
+        labels = []
+        for block in self.blocks:
+            if block.size == 1:
+                labels.append(block.name)
+            else:
+                labels.extend(f"{block.name}[{i}]" for i in range(block.size))
+        return labels
+
+    def pack(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """컴포넌트 상태를 평탄화된 float64 벡터로 수집"""
+        y = np.empty(self.size, dtype=np.float64) if out is None else out
+        for block in self.blocks:
+            y[block.start:block.start + block.size] = block.get()
+        return y
+
+    def unpack(self, y: np.ndarray, names: Optional[Iterable[str]] = None) -> None:
+        """평탄화된 상태 벡터를 각 컴포넌트에 설정 (names가 있으면 그 블록만)"""
+        y = np.asarray(y, dtype=np.float64)
+        if y.shape != (self.size,):
+            raise ValueError(f"상태 벡터 크기 불일치: {y.shape} != ({self.size},)")
+        blocks = self.blocks if names is None else [self._index[name] for name in names]
+        for block in blocks:
+            block.set(y[block.start:block.start + block.size])
+
+    def derivatives(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """각 블록의 변화율을 평탄화된 float64 벡터로 수집"""
+        dydt = np.empty(self.size, dtype=np.float64) if out is None else out
+        for block in self.blocks:
+            dydt[block.start:block.start + block.size] = block.derivative()
+        return dydt
+
+    def residuals(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """각 블록의 정상상태 잔차(residual, 없으면 변화율)를 평탄화된 벡터로 수집"""
+        r = np.empty(self.size, dtype=np.float64) if out is None else out
+        for block in self.blocks:
+            fun = block.derivative if block.residual is None else block.residual
+            r[block.start:block.start + block.size] = fun()
+        return r
+
+    def jacobian_sparsity(self, couplings: Iterable[Tuple[str, Sequence[str]]]) -> csr_matrix:
+        """
+        희소 야코비안 패턴 ∂(dy/dt)/∂y 생성
+
+        - 대각 블록: 각 블록의 sparsity (없으면 dense)
+        - 비대각 블록: couplings의 각 항목 (유속 이름, 결합된 블록 이름들)에 대해
+          결합된 블록 쌍 사이를 모두 채움 (유속은 양쪽 상태에 의존하고 양쪽 밸런스에 들어감)
+
+        Args:
+            couplings: (유속 이름, 블록 이름 목록) 튜플의 반복자
+
+        Returns:
+            csr_matrix: (size x size) 0/1 패턴 (solve_ivp의 jac_sparsity로 사용)
+        """
+        pattern = np.zeros((self.size, self.size), dtype=bool)
+        for block in self.blocks:
+            s = block.slice
+            pattern[s, s] = True if block.sparsity is None else block.sparsity
+        for flux, names in couplings:
+            unknown = [name for name in names if name not in self._index]
+            if unknown:
+                raise KeyError(f"결합 '{flux}'에 등록되지 않은 상태 블록이 있습니다: {unknown}")
+            for a in names:
+                for b in names:
+                    pattern[self._index[a].slice, self._index[b].slice] = True
+        return csr_matrix(pattern.astype(np.int8))
+
+
+def band_pattern(size: int, lower: int = 1, upper: int = 1) -> np.ndarray:
+    """띠(band) 형태의 블록 내부 패턴 (1차원 체인: 토양 레이어, 파이프 셀 등)"""
+    idx = np.arange(size)
+    offset = idx[None, :] - idx[:, None]
+    return (offset >= -lower) & (offset <= upper)
@@ -0,0 +1,76 @@
+"""
+steady_state.py
+평탄화된 상태 벡터에 대한 정상상태(der(x)=0) 초기화 솔버
+- 선택한 상태 원소 x = y[index]에 대해 변화율 f(y)[index] = 0을 만족하는 값을 구함
+  (나머지 상태는 시작값으로 고정: Modelica의 steadystate=false 초기화와 같음)
+- scipy.optimize.least_squares(trf, Newton 계열 신뢰 영역)로 풀며,
+  야코비안 희소 패턴이 주어지면 유한차분을 열 그룹 단위로 계산
+- 잔차는 원소별 변화율 척도(rate_scale)로 나누어 단위가 다른 상태(K, Pa, mg/m³, J/kg)를
+  같은 크기로 맞춤
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Union
+
+import numpy as np
+from scipy.optimize import least_squares
+
+
+@dataclass
+class SteadyStateResult:
+    """정상상태 풀이 결과"""
+    y: np.ndarray               # 전체 상태 벡터 (선택한 원소만 갱신)
+    residual: float             # 척도화한 잔차의 최대 절대값
+    success: bool               # residual <= tol
+    nfev: int                   # 변화율 함수 호출 수 (야코비안 계산 제외)
+    message: str                # least_squares 종료 메시지
+
+
+def solve_steady_state(fun: Callable[[np.ndarray], np.ndarray], y0: np.ndarray,
+                       index: Sequence[int], rate_scale: Union[float, np.ndarray] = 1.0,
+                       state_scale: Union[float, np.ndarray] = 1.0, jac_sparsity=None,
+                       lower: Union[float, np.ndarray] = -np.inf, tol: float = 1e-3,
+                       max_nfev: Optional[int] = None) -> SteadyStateResult:
+    """
+    y[index]를 풀어 fun(y)[index] = 0인 상태를 구합니다.
+
+    Args:
+        fun: fun(y) → dy/dt (전체 상태 벡터)
+        y0: 시작 상태 (선택하지 않은 원소는 고정값)
+        index: 풀 원소 인덱스
+        rate_scale: 선택 원소별 변화율 척도 (잔차 = dy/dt / rate_scale)
+        state_scale: 선택 원소별 상태 척도 (least_squares의 x_scale)
+        jac_sparsity: 전체 야코비안 희소 패턴 (선택 원소의 부분 행렬만 사용, None이면 dense)
+        lower: 선택 원소의 하한 (예: 절대온도/수증기압은 0)
+        tol: 수렴 판정 기준 (척도화한 잔차의 최대 절대값)
+        max_nfev: 최대 함수 호출 수 (None이면 least_squares 기본값)
+
+    Returns:
+        SteadyStateResult
+    """
+    index = np.asarray(index, dtype=np.intp)
+    y = np.array(y0, dtype=np.float64)
+    if len(index) == 0:
+        return SteadyStateResult(y=y, residual=0.0, success=True, nfev=0, message="풀 상태 없음")
+
+    rate_scale = np.broadcast_to(np.asarray(rate_scale, dtype=float), index.shape)
+    state_scale = np.broadcast_to(np.asarray(state_scale, dtype=float), index.shape)
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), index.shape)
+
+    def residual(x):
+        y[index] = x
+        return fun(y)[index] / rate_scale
+
+    sparsity = None
+    if jac_sparsity is not None:
+        sparsity = jac_sparsity[index][:, index]
+
+    # 시작값이 하한 위에 있어야 함 (trf는 내부점에서 시작)
+    x0 = np.maximum(y[index], np.nextafter(lower, np.inf))
+    sol = least_squares(residual, x0, jac_sparsity=sparsity, x_scale=state_scale,
+                        bounds=(lower, np.inf), method='trf', ftol=1e-12, xtol=1e-12,
+                        gtol=1e-12, max_nfev=max_nfev)
+    y[index] = sol.x
+    error = float(np.max(np.abs(sol.fun)))
+    return SteadyStateResult(y=y, residual=error, success=error <= tol,
+                             nfev=int(sol.nfev), message=sol.message)
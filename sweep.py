@@ -0,0 +1,211 @@
+"""
+sweep.py
+프로세스 풀 시나리오 스윕 실행기 (simulate_greenhouse2.simulate_greenhouse + SimulationConfig)
+- run_sweep(configs, workers=N): 시나리오를 프로세스 풀로 분산하고 끝나는 순서대로 결과를 스트리밍
+- 병합된 날씨/설정값/스크린 입력 테이블은 부모가 한 번 로드하여 multiprocessing.shared_memory에
+  올리고, 작업자는 읽기 전용 배열로 붙여 input_cache에 등록 (작업자마다 텍스트를 다시 파싱하지 않음)
+- 작업자는 전체 시계열 대신 요약 KPI만 누적
+  (최종 DM_Har, E_th_tot_kWhm2, E_el_tot_kWhm2, 실내 RH 0.85 초과 시간)
+- 실패한 시나리오는 retries 횟수만큼 재시도하고, 그래도 실패하면 오류와 함께 결과로 보고
+- 풀에는 작업자 수만큼만 제출하고 하나가 끝날 때마다 남은 시나리오를 채움
+- 작업자 프로세스가 죽어 풀이 깨지면 그때 실행 중이던 시나리오들만 시도 횟수를 세지 않고
+  작업자 1개짜리 풀에서 하나씩 다시 실행 (단독으로도 죽는 시나리오만 실패로 집계),
+  아직 시작하지 않은 시나리오는 새 풀에서 병렬로 계속 실행
+"""
+
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from input_cache import load_input_table, register_input_table
+from Greenhouse_2 import WEATHER_DATA_PATH, SETPOINT_DATA_PATH, SCREEN_USABLE_PATH
+from simulate_greenhouse2 import SimulationConfig, simulate_greenhouse
+
+DEFAULT_INPUT_PATHS = (WEATHER_DATA_PATH, SETPOINT_DATA_PATH, SCREEN_USABLE_PATH)
+RH_THRESHOLD = 0.85
+
+
+class KPIAccumulator:
+    """
+    simulate_greenhouse의 recorder 자리에 넣는 요약 KPI 누적기 (메모리 O(1))
+
+    Args:
+        dt: 시뮬레이션 시간 간격 [s]
+        rh_threshold: 고습 판정 상대습도 [0-1]
+    """
+
+    def __init__(self, dt: float, rh_threshold: float = RH_THRESHOLD):
+        self.dt = dt
+        self.rh_threshold = rh_threshold
+        self.n_updates = 0
+        self.seconds_above_rh = 0.0
+        self._last: Optional[Dict[str, Any]] = None
+
+    def update(self, step: int, state: Dict[str, Any]) -> None:
+        # state['humidity']['air_rh']는 [%]
+        if state['humidity']['air_rh'] > self.rh_threshold * 100:
+            self.seconds_above_rh += self.dt
+        self._last = state
+        self.n_updates += 1
+
+    def finish(self) -> None:
+        pass
+
+    def kpis(self) -> Dict[str, float]:
+        """최종/누적 KPI (기록된 스텝이 없으면 NaN)"""
+        last = self._last
+        if last is None:
+            return {'DM_Har': np.nan, 'E_th_tot_kWhm2': np.nan, 'E_el_tot_kWhm2': np.nan,
+                    'hours_RH_above': np.nan, 'n_steps': 0}
+        return {
+            'DM_Har': float(last['crop']['DM_Har']),                             # [mg/m²]
+            'E_th_tot_kWhm2': float(last['energy']['heating']['E_th_tot_kWhm2']),   # [kWh/m²]
+            'E_el_tot_kWhm2': float(last['energy']['electrical']['E_el_tot_kWhm2']),  # [kWh/m²]
+            'hours_RH_above': self.seconds_above_rh / 3600.0,                   # [h]
+            'n_steps': self.n_updates,
+        }
+
+
+@dataclass
+class SweepResult:
+    """시나리오 하나의 결과"""
+    index: int                                  # configs 내 위치
+    config: SimulationConfig
+    kpis: Optional[Dict[str, float]] = None     # 성공 시 KPI
+    error: Optional[str] = None                 # 최종 실패 시 오류 메시지
+    attempts: int = 0                           # 실행 시도 횟수
+    elapsed: float = 0.0                        # 마지막 시도의 실행 시간 [s]
+    pid: Optional[int] = None                   # 마지막 시도를 실행한 작업자 프로세스 ID
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# 작업자 프로세스의 공유 메모리 핸들 (프로세스 종료까지 유지)
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(shm_name: str, shape, dtype: str, names: List[str], paths: List[str]) -> None:
+    global _worker_shm
+    # Ctrl+C는 부모가 처리 (작업자가 시뮬레이션을 중간에 끊고 성공으로 보고하지 않도록)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    table = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_shm.buf)
+    table.flags.writeable = False
+    register_input_table(paths, names, table)
+
+
+def _run_scenario(config: SimulationConfig, rh_threshold: float):
+    accumulator = KPIAccumulator(config.dt, rh_threshold)
+    start = time.perf_counter()
+    simulate_greenhouse(config, recorder=accumulator)
+    return accumulator.kpis(), time.perf_counter() - start, os.getpid()
+
+
+def run_sweep(configs: Iterable[SimulationConfig], workers: Optional[int] = None,
+              retries: int = 1, input_paths: Optional[Sequence[str]] = None,
+              rh_threshold: float = RH_THRESHOLD, mp_context=None) -> Iterator[SweepResult]:
+    """
+    시나리오들을 프로세스 풀에서 실행하고 끝나는 순서대로 결과를 반환합니다.
+
+    Args:
+        configs: 시나리오별 시뮬레이션 설정값
+        workers: 작업자 프로세스 수 (None이면 CPU 수, 풀이 깨진 뒤에는 단독 실행용 작업자 1개 추가)
+        retries: 실패한 시나리오의 재시도 횟수
+        input_paths: 병합할 입력 파일들 (None이면 Greenhouse_2의 기본 입력)
+        rh_threshold: 고습 시간 KPI의 상대습도 기준 [0-1]
+        mp_context: multiprocessing 컨텍스트 (None이면 플랫폼 기본값)
+
+    Yields:
+        SweepResult (성공 시 kpis, 재시도 후에도 실패하면 error)
+
+    예:
+        for result in run_sweep(configs, workers=8):
+            print(result.index, result.kpis if result.ok else result.error)
+    """
+    configs = list(configs)
+    paths = [os.path.abspath(p) for p in (input_paths or DEFAULT_INPUT_PATHS)]
+    names, table = load_input_table(paths)
+    table = np.ascontiguousarray(table)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(table.nbytes, 1))
+    pool: Optional[ProcessPoolExecutor] = None
+    solo_pool: Optional[ProcessPoolExecutor] = None   # 용의자 단독 실행용 (작업자 1개)
+    try:
+        np.ndarray(table.shape, dtype=table.dtype, buffer=shm.buf)[:] = table
+        initargs = (shm.name, table.shape, table.dtype.str, names, paths)
+
+        limit = workers or os.cpu_count() or 1   # 풀에 동시에 제출하는 시나리오 수
+        attempts = [0] * len(configs)
+        todo = deque(range(len(configs)))
+        isolate = deque()    # 풀이 깨질 때 실행 중이던 시나리오 (단독 풀에서 하나씩 재실행)
+        running: Dict[Any, Tuple[int, bool]] = {}   # future → (시나리오, 단독 실행 여부)
+        while todo or isolate or running:
+            if pool is None and todo:
+                pool = ProcessPoolExecutor(workers, mp_context=mp_context,
+                                           initializer=_init_worker, initargs=initargs)
+            in_pool = sum(not solo for _, solo in running.values())
+            # 작업자 수만큼만 제출: 풀이 깨졌을 때 대기 중인 시나리오까지 용의자가 되지 않도록
+            for _ in range(min(limit - in_pool, len(todo))):
+                i = todo.popleft()
+                running[pool.submit(_run_scenario, configs[i], rh_threshold)] = (i, False)
+            if isolate and not any(solo for _, solo in running.values()):
+                if solo_pool is None:
+                    solo_pool = ProcessPoolExecutor(1, mp_context=mp_context,
+                                                    initializer=_init_worker, initargs=initargs)
+                i = isolate.popleft()
+                running[solo_pool.submit(_run_scenario, configs[i], rh_threshold)] = (i, True)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = solo_broken = False
+            for future in done:
+                i, solo = running.pop(future)
+                try:
+                    kpis, elapsed, pid = future.result()
+                except BrokenProcessPool:
+                    if not solo:
+                        # 어느 시나리오가 작업자를 죽였는지 알 수 없으므로 시도 횟수를 세지 않고
+                        # 단독 실행으로 다시 확인
+                        broken = True
+                        isolate.append(i)
+                        continue
+                    solo_broken = True
+                    error = "작업자 프로세스가 비정상 종료되었습니다"
+                except Exception as exc:
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    attempts[i] += 1
+                    yield SweepResult(i, configs[i], kpis=kpis, attempts=attempts[i],
+                                      elapsed=elapsed, pid=pid)
+                    continue
+                attempts[i] += 1
+                if attempts[i] <= retries:
+                    (isolate if solo else todo).append(i)
+                else:
+                    yield SweepResult(i, configs[i], error=error, attempts=attempts[i])
+
+            if broken:
+                # 깨진 풀에서 아직 끝나지 않은 시나리오도 같은 용의자
+                for future, (i, solo) in list(running.items()):
+                    if not solo:
+                        del running[future]
+                        isolate.append(i)
+                pool.shutdown(wait=True, cancel_futures=True)
+                pool = None
+            if solo_broken:
+                solo_pool.shutdown(wait=True, cancel_futures=True)
+                solo_pool = None
+    finally:
+        for executor in (pool, solo_pool):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,128 @@
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import checkpoint
+from Greenhouse_1 import Greenhouse_1
+from Greenhouse_2 import Greenhouse_2
+
+
+class Holder:
+    """임시 포트를 공유하는 테스트용 컴포넌트"""
+
+    def __init__(self):
+        self.port = type('MassPort', (), {'VP': 0.0, 'P': 1e5})()
+        self.port.owner = self   # 순환 참조
+        self.alias = self.port
+
+
+class TestCheckpointPickling(unittest.TestCase):
+    """체크포인트 직렬화 테스트"""
+
+    def test_adhoc_port_roundtrip(self):
+        """type()으로 만든 임시 포트도 공유/순환 참조를 유지하며 복원"""
+        holder = Holder()
+        holder.port.VP = 1234.5
+        buffer = io.BytesIO()
+        checkpoint._Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(holder)
+        restored = pickle.loads(buffer.getvalue())
+        self.assertIs(restored.alias, restored.port)
+        self.assertIs(restored.port.owner, restored)
+        self.assertEqual(restored.port.VP, 1234.5)
+        self.assertEqual(restored.port.P, 1e5)
+
+
+class TestGreenhouseCheckpoint(unittest.TestCase):
+    """체크포인트 재개가 중단 없는 실행과 비트 단위로 같은지 확인"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'greenhouse.ckpt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_same_state(self, a, b):
+        self.assertEqual(a.keys(), b.keys())
+        for key, value in a.items():
+            if isinstance(value, dict):
+                self.assert_same_state(value, b[key])
+            else:
+                self.assertEqual(value, b[key], key)
+
+    def run_and_resume(self, cls, n_before=650, n_after=650):
+        reference = cls()
+        for i in range(n_before):
+            reference.step(1.0, i)
+        reference.save_checkpoint(self.path)
+
+        resumed = cls.from_checkpoint(self.path)
+        self.assertEqual(resumed.next_time_idx, n_before)
+        for i in range(n_before, n_before + n_after):
+            reference.step(1.0, i)
+            resumed.step(1.0, resumed.next_time_idx)
+        return reference, resumed
+
+    def test_greenhouse_2_bit_exact(self):
+        reference, resumed = self.run_and_resume(Greenhouse_2)
+        self.assert_same_state(reference._get_state(), resumed._get_state())
+        # 제어기 내부 상태와 누적 에너지
+        np.testing.assert_array_equal(reference.PID_Mdot.y, resumed.PID_Mdot.y)
+        np.testing.assert_array_equal(reference.U_vents.PID.y, resumed.U_vents.PID.y)
+        self.assertEqual(reference.SC.state, resumed.SC.state)
+        self.assertEqual(reference.E_th_tot_kWhm2, resumed.E_th_tot_kWhm2)
+        self.assertEqual(reference.W_el_illu, resumed.W_el_illu)
+        self.assertEqual(reference.scheduler['TYM'].n_updates, resumed.scheduler['TYM'].n_updates)
+
+    def test_greenhouse_1_bit_exact(self):
+        reference, resumed = self.run_and_resume(Greenhouse_1, 400, 300)
+        np.testing.assert_array_equal(reference.pack_state(), resumed.pack_state())
+        self.assertIsNot(resumed.state_layout, reference.state_layout)
+
+    def test_class_mismatch(self):
+        Greenhouse_2().save_checkpoint(self.path)
+        with self.assertRaises(ValueError):
+            Greenhouse_1.from_checkpoint(self.path)
+
+
+class TestGreenhouseFork(unittest.TestCase):
+    """상태 분기(fork) 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parent = Greenhouse_2()
+        for i in range(300):
+            cls.parent.step(1.0, i)
+
+    def test_children_share_static_tables(self):
+        child, = self.parent.fork(1)
+        self.assertIsNot(child.air, self.parent.air)
+        self.assertIsNot(child.PID_Mdot, self.parent.PID_Mdot)
+        self.assertIs(child.Q_cd_Soil.G_s, self.parent.Q_cd_Soil.G_s)
+        self.assertTrue(np.shares_memory(child.inputs.data, self.parent.inputs.data))
+        self.assertEqual(child.inputs._cursor, self.parent.inputs._cursor)
+        self.assertEqual(child.next_time_idx, 300)
+
+    def test_forks_are_independent(self):
+        """override 없는 자식은 부모와 동일 궤적, 설정값을 바꾼 자식은 분기"""
+        reference = self.parent.fork(1)[0]
+        same, warmer = self.parent.fork(2, overrides=[None, {'T_sp': 30.0}])
+        for i in range(300, 900):
+            # 자식들을 번갈아 진행해도 서로 영향이 없어야 함
+            warmer.step(1.0, i)
+            same.step(1.0, i)
+            reference.step(1.0, i)
+        self.assertEqual(same.air.T, reference.air.T)
+        self.assertEqual(same.E_th_tot_kWhm2, reference.E_th_tot_kWhm2)
+        self.assertNotEqual(warmer.air.T, reference.air.T)
+
+    def test_overrides_length(self):
+        with self.assertRaises(ValueError):
+            self.parent.fork(2, overrides=[{'T_sp': 18.0}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from connection_plan import ConnectionPlan, load_connections
+from port_connection_manager import PortConnection, PortConnectionManager, PortType
+
+
+def make_model():
+    return SimpleNamespace(
+        air=SimpleNamespace(T=293.0, massPort=SimpleNamespace(VP=1500.0)),
+        cover=SimpleNamespace(T=280.0),
+        Tout=275.0,
+        Q_cnv=SimpleNamespace(heatPort_a=SimpleNamespace(T=0.0), heatPort_b=SimpleNamespace(T=0.0),
+                              massPort_a=SimpleNamespace(VP=0.0)),
+        Q_ven=SimpleNamespace(HeatPort_a=SimpleNamespace(T=0.0), HeatPort_b=SimpleNamespace(T=0.0)),
+        soil=SimpleNamespace(T_soil_sp=0.0),
+    )
+
+
+class TestConnectionPlan(unittest.TestCase):
+    """포트 연결 계획 테스트"""
+
+    def test_load_sections_and_port_attributes(self):
+        text = """
+heat_connections:
+  - source: "Q_cnv"
+    source_port: "heatPort_a"
+    target: "air"
+    target_attr: "T"
+  - source: "soil"
+    source_port: ""
+    target: "Tout"
+    target_attr: ""
+    port_attr: "T_soil_sp"
+mass_connections:
+  - source: "Q_cnv"
+    source_port: "massPort_a"
+    target: "air"
+    target_attr: "massPort.VP"
+"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'connections.yaml')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            connections = load_connections(path)
+            self.assertEqual([c.port_type for c in connections], [PortType.HEAT, PortType.HEAT, PortType.MASS])
+            self.assertEqual(len(load_connections(path, ['mass_connections', 'co2_connections'])), 1)
+            with self.assertRaises(ValueError):
+                load_connections(path, ['ventilation'])
+
+        model = make_model()
+        plan = ConnectionPlan(model, connections)
+        plan.execute(model)
+        self.assertEqual(model.Q_cnv.heatPort_a.T, 293.0)
+        self.assertEqual(model.soil.T_soil_sp, 275.0)
+        self.assertEqual(model.Q_cnv.massPort_a.VP, 1500.0)
+
+    def test_shared_sources_are_read_once(self):
+        model = make_model()
+        connections = [
+            PortConnection("Q_cnv", "heatPort_a", "air", "T", PortType.HEAT),
+            PortConnection("Q_ven", "HeatPort_a", "air", "T", PortType.HEAT),
+            PortConnection("Q_cnv", "heatPort_b", "cover", "T", PortType.HEAT),
+            PortConnection("Q_ven", "HeatPort_b", "Tout", "", PortType.HEAT),
+        ]
+        plan = ConnectionPlan(model, connections)
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(plan.paths, ['air.T', 'cover.T', 'Tout'])
+        self.assertEqual(plan.source_index, (0, 0, 1, 2))
+
+        model.air.T, model.Tout = 300.0, None  # 값은 변환 없이 전달
+        plan.execute(model)
+        self.assertEqual(model.Q_ven.HeatPort_a.T, 300.0)
+        self.assertIsNone(model.Q_ven.HeatPort_b.T)
+        # 생성 시 해석한 포트 객체에 기록
+        port = model.Q_cnv.heatPort_a
+        model.Q_cnv.heatPort_a = SimpleNamespace(T=0.0)
+        plan.execute(model)
+        self.assertEqual(port.T, 300.0)
+
+    def test_unresolved_connections(self):
+        model = make_model()
+        bad = [PortConnection("Q_cnv", "heatPort_a", "air", "T", PortType.HEAT),
+               PortConnection("Q_cnv", "heatPort_a", "Tout", "T", PortType.HEAT),
+               PortConnection("Q_missing", "port_a", "air", "T", PortType.HEAT),
+               PortConnection("Q_cnv", "heatPort_a", "air", "T", PortType.CO2)]
+        with self.assertRaises(ValueError):
+            ConnectionPlan(model, bad)
+        with self.assertWarns(UserWarning):
+            plan = ConnectionPlan(model, bad, strict=False)
+        self.assertEqual(len(plan), 1)
+
+    def test_manager_uses_plan_per_instance(self):
+        manager = PortConnectionManager([
+            PortConnection("Q_cnv", "heatPort_a", "air", "T", PortType.HEAT),
+            PortConnection("Q_cnv", "massPort_a", "air", "massPort.VP", PortType.MASS),
+        ])
+        first, second = make_model(), make_model()
+        second.air.T = 310.0
+        manager.update_connections_by_type(first, PortType.HEAT)
+        self.assertEqual(first.Q_cnv.heatPort_a.T, 293.0)
+        self.assertEqual(first.Q_cnv.massPort_a.VP, 0.0)
+        manager.update_all_connections(second)
+        self.assertEqual(second.Q_cnv.heatPort_a.T, 310.0)
+        self.assertEqual(second.Q_cnv.massPort_a.VP, 1500.0)
+        # 계획은 모델에 저장되므로 번갈아 갱신해도 다른 모델의 포트를 쓰지 않음
+        first.air.T = 295.0
+        manager.update_connections_by_type(first, PortType.HEAT)
+        self.assertEqual(first.Q_cnv.heatPort_a.T, 295.0)
+        self.assertEqual(second.Q_cnv.heatPort_a.T, 310.0)
+
+        # 해제된 모델과 같은 id를 받은 새 모델도 자기 포트로 계획을 만듦
+        del first, second
+        third = make_model()
+        third.air.T = 320.0
+        manager.update_connections_by_type(third, PortType.HEAT)
+        self.assertEqual(third.Q_cnv.heatPort_a.T, 320.0)
+
+    def test_greenhouse_connections(self):
+        """Greenhouse_1의 포트 연결이 YAML 계획으로 전달됨"""
+        from Greenhouse_1 import Greenhouse_1
+        model = Greenhouse_1()
+        self.assertGreaterEqual(len(model.heat_connections) + len(model.mass_connections), 50)
+        model.air.T, model.Tout, model.T_soil7 = 295.5, 271.0, 280.0
+        model.air.massPort.VP, model.CO2out_ppm_to_mgm3 = 1234.0, 777.0
+        model._update_port_connections_ports_only(0.0)
+        self.assertEqual(model.Q_cnv_AirScr.heatPort_a.T, 295.5)
+        self.assertEqual(model.Q_ven_TopOut.HeatPort_b.T, 271.0)
+        self.assertEqual(model.Q_cd_Soil.T_soil_sp, 280.0)
+        self.assertEqual(model.RH_air_sensor.massPort.VP, 1234.0)
+        self.assertEqual(model.MC_TopOut.port_b.CO2, 777.0)
+        self.assertEqual(model.CO2out.CO2, 777.0)
+        self.assertEqual(model.sourceMdot_1ry.in_Mdot, model.PID_Mdot.CS)
+
+        # 체크포인트에서 복원한 계획은 복원된 포트에 기록
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'gh.ckpt')
+            model.save_checkpoint(path)
+            restored = Greenhouse_1.from_checkpoint(path)
+        restored.air.T = 301.0
+        restored._update_heat_ports()
+        self.assertEqual(restored.Q_cnv_AirScr.heatPort_a.T, 301.0)
+        self.assertEqual(model.Q_cnv_AirScr.heatPort_a.T, 295.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
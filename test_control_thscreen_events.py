@@ -0,0 +1,70 @@
+import math
+import unittest
+from ControlSystems.Climate.Control_ThScreen import Control_ThScreen, STATES, GUARDS
+
+
+def make(RH_air=0.75, R_Glob_can=100.0, T_out=278.15, T_air_sp=293.15, SC_usable=1.0):
+    sc = Control_ThScreen(R_Glob_can_min=32)
+    sc.RH_air, sc.R_Glob_can, sc.T_out, sc.T_air_sp, sc.SC_usable = \
+        RH_air, R_Glob_can, T_out, T_air_sp, SC_usable
+    return sc
+
+
+class TestThScreenTransitionTable(unittest.TestCase):
+    """전이 표 기반 보온 스크린 제어기 이벤트 테스트"""
+
+    def test_state_names(self):
+        sc = make()
+        self.assertEqual(sc.state, 'closed')
+        sc.state = 'crack'
+        self.assertEqual(sc.state_id, STATES.index('crack'))
+        self.assertEqual(len(sc.guard_values()), len(GUARDS))
+
+    def test_next_timer_event(self):
+        """입력이 일정하면 다음 전이 시각은 남은 타이머 대기 시간"""
+        sc = make()
+        self.assertEqual(sc.time_to_next_event(), 0.0)   # T2 (closed → opening_ColdDay) 즉시 가능
+        sc.step(1.0)
+        self.assertEqual(sc.state, 'opening_ColdDay')
+        self.assertEqual(sc.time_to_next_event(), 52 * 60)
+        sc.step(100.0)
+        self.assertEqual(sc.time_to_next_event(), 52 * 60 - 100)
+        sc.step(sc.time_to_next_event())
+        self.assertEqual(sc.state, 'open')
+        # open: T4 대기 중(2시간)에는 T2/T3가 막힘
+        self.assertEqual(sc.time_to_next_event(), 2 * 3600)
+        sc.step(3600.0)
+        self.assertEqual(sc.state, 'open')
+        sc.SC_usable = 0.0
+        self.assertEqual(sc.time_to_next_event(), 0.0)
+
+    def test_no_event(self):
+        sc = make(R_Glob_can=0.0)
+        self.assertTrue(math.isinf(sc.time_to_next_event()))
+
+    def test_advance_matches_small_steps(self):
+        """큰 dt의 advance는 1초 스텝과 같은 전이 순서 (step(3600)은 전이를 놓침)"""
+        fine, coarse, single = make(RH_air=0.9, R_Glob_can=0.0), make(RH_air=0.9, R_Glob_can=0.0), \
+            make(RH_air=0.9, R_Glob_can=0.0)
+        for _ in range(3600):
+            fine.step(1.0)
+        coarse.advance(3600.0)
+        single.step(3600.0)
+        self.assertEqual(fine.state, 'crack2')       # closed → crack → (15분) → crack2
+        self.assertEqual(coarse.state, fine.state)
+        self.assertEqual(coarse.SC, fine.SC)
+        self.assertEqual(single.state, 'crack')
+
+    def test_advance_timer_chain(self):
+        """opening_ColdDay(52분) → open 이후 타이머는 전이 시각부터 누적"""
+        fine, coarse = make(), make()
+        for _ in range(3600):
+            fine.step(1.0)
+        coarse.advance(3600.0)
+        self.assertEqual(coarse.state, 'open')
+        self.assertEqual(fine.state, 'open')
+        self.assertAlmostEqual(coarse.timer, fine.timer, delta=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
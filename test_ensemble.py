@@ -0,0 +1,87 @@
+import timeit
+import unittest
+import numpy as np
+from ensemble import GreenhouseEnsemble, resolve, assign
+from Greenhouse_1 import Greenhouse_1
+
+
+class TestGreenhouseEnsemble(unittest.TestCase):
+    """앙상블 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.base = Greenhouse_1()
+        for i in range(60):
+            cls.base.step(1.0, i)
+
+    def test_parameter_sweep(self):
+        """기준값 구성원은 단일 모델과 같은 궤적, 다른 방사율은 분기"""
+        eps = [0.84, 0.6, 0.95]
+        ensemble = GreenhouseEnsemble(self.base, {
+            ('Q_rad_CanCov.epsilon_b', 'Q_rad_CovSky.epsilon_a', 'Q_rad_FlrCov.epsilon_b'): eps,
+        })
+        self.assertEqual(len(ensemble), 3)
+        np.testing.assert_array_equal(ensemble.get('Q_rad_CovSky.epsilon_a'), eps)
+
+        single = self.base.fork(1)[0]
+        out = ensemble.run(120, 1.0, record=['cover.T', 'air.T'], every=30)
+        for i in range(60, 180):
+            single.step(1.0, i)
+
+        self.assertEqual(out['cover.T'].shape, (4, 3))
+        np.testing.assert_array_equal(out['time'], [60.0, 90.0, 120.0, 150.0])
+        # 배치 오일러 진행은 구성원별 step()과 같은 궤적
+        np.testing.assert_allclose(ensemble.get('cover.T')[0], single.cover.T, atol=0.02)
+        np.testing.assert_allclose(ensemble.get('air.T')[0], single.air.T, atol=0.02)
+        self.assertEqual(ensemble.states().shape, (3, len(single.pack_state())))
+        T_cover = ensemble.get('cover.T')
+        # 외피 방사율이 클수록 하늘로의 복사 손실이 커져 외피 온도가 낮음
+        self.assertLess(T_cover[2], T_cover[0])
+        self.assertLess(T_cover[0], T_cover[1])
+
+    def test_members_are_independent(self):
+        """배치 안의 구성원은 같은 파라미터의 1구성원 앙상블과 같은 상태"""
+        key = ('Q_rad_CanCov.epsilon_b', 'Q_rad_CovSky.epsilon_a', 'Q_rad_FlrCov.epsilon_b')
+        batch = GreenhouseEnsemble(self.base, {key: [0.84, 0.6]}, shared_controllers=True)
+        alone = GreenhouseEnsemble(self.base, {key: [0.6]}, shared_controllers=True)
+        batch.run(60, 1.0)
+        alone.run(60, 1.0)
+        np.testing.assert_allclose(batch.y[:, 1], alone.y[:, 0], rtol=1e-12)
+
+    def test_sync_updates_members(self):
+        """sync()는 배치 상태와 누적 에너지를 구성원 객체에 반영"""
+        ensemble = GreenhouseEnsemble(self.base, n=2)
+        ensemble.run(30, 1.0)
+        self.assertEqual(ensemble.next_time_idx, self.base.next_time_idx + 30)
+        np.testing.assert_array_equal(ensemble[1].pack_state(), ensemble.y[:, 1])
+        np.testing.assert_array_equal(ensemble.get('E_th_tot_kWhm2'),
+                                      [m.E_th_tot_kWhm2 for m in ensemble])
+        self.assertGreater(ensemble[0].E_th_tot_kWhm2, self.base.E_th_tot_kWhm2)
+
+    def test_batched_step_faster_than_member_steps(self):
+        """구성원 20개의 배치 스텝은 구성원별 step() 20번보다 빠름"""
+        ensemble = GreenhouseEnsemble(self.base, n=20, shared_controllers=True)
+        members = self.base.fork(20)
+        ensemble.step(1.0)
+        start = self.base.next_time_idx + 1
+        t_batch = min(timeit.repeat(lambda: ensemble.step(1.0), number=5, repeat=3))
+        t_members = min(timeit.repeat(lambda: [m.step(1.0, start) for m in members],
+                                      number=5, repeat=3))
+        self.assertLess(t_batch, t_members)
+
+    def test_setup_and_size_validation(self):
+        ensemble = GreenhouseEnsemble(self.base, n=2, setup=lambda m, i: assign(m, 'air.h_Air', 3.0 + i))
+        np.testing.assert_array_equal(ensemble.get('air.h_Air'), [3.0, 4.0])
+        with self.assertRaises(ValueError):
+            GreenhouseEnsemble(self.base, {'air.h_Air': [3.0, 4.0]}, n=3)
+        with self.assertRaises(AttributeError):
+            GreenhouseEnsemble(self.base, {'air.no_such_parameter': [1.0]})
+        with self.assertRaises(TypeError):
+            GreenhouseEnsemble(object(), n=2)
+
+    def test_resolve_index(self):
+        self.assertIs(resolve(self.base, 'Q_cd_Soil.Layer_s.0'), self.base.Q_cd_Soil.Layer_s[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
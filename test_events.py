@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+from scipy.integrate import solve_ivp
+from events import GuardEvents
+from ControlSystems.HVAC.Control_1 import Control_1
+from ControlSystems.HVAC.Control_2 import Control_2
+from ControlSystems.HVAC.Control_Dehumidifier import Control_Dehumidifier
+from ControlSystems.Climate.Control_Illu import Control_Illu
+from ControlSystems.Climate.Control_ThScreen import Control_ThScreen
+
+
+class TestGuards(unittest.TestCase):
+    """제어기 guard 선언 테스트"""
+
+    def test_guard_lengths(self):
+        for cls in (Control_1, Control_2, Control_Dehumidifier, Control_Illu, Control_ThScreen):
+            self.assertEqual(len(cls().guard_values()), len(cls.GUARDS))
+
+    def test_guards_read_step_inputs(self):
+        """guard_values()는 step()이 쓰는 입력 속성을 읽음 (모든 제어기가 같은 규약)"""
+        ctrl = Control_1()
+        ctrl.step(330.0, 10.0, 320.0, 1.0)
+        g = ctrl.guard_values()
+        self.assertAlmostEqual(g[Control_1.GUARDS.index('T_tank - T_max')], 330.0 - ctrl.T_max)
+        self.assertAlmostEqual(g[Control_1.GUARDS.index('Mdot_1ry - Mdot_max')], 10.0 - ctrl.Mdot_max)
+        ctrl.T_tank = 340.0
+        self.assertAlmostEqual(ctrl.guard_values()[Control_1.GUARDS.index('T_tank - T_max')],
+                               340.0 - ctrl.T_max)
+
+
+class TestCrossingTime(unittest.TestCase):
+
+    def test_event_time_matches_fine_steps(self):
+        """큰 구간 + 이벤트 근 찾기로 구한 전이 시각이 1초 스텝 전이 시각과 일치"""
+        ctrl = Control_1()
+        ctrl.time = 2e3
+        ctrl.T_high_tank = 273.15 + 50
+        T_tank = lambda t: 325.0 + 0.01 * t            # 선형 상승 → T_max(333.15 K) 통과
+        ctrl.Mdot_1ry, ctrl.T_low_TES = 20.0, 320.0
+
+        def guard(t, y):
+            ctrl.T_tank = y[0]
+            return ctrl.guard_values()
+        rhs = lambda t, y: np.array([0.01])
+
+        fine = Control_1()
+        fine.state = 'runCHP'
+        fine.T_high_tank = 273.15 + 50
+        t_fine = None
+        for k in range(1, 3601):
+            fine.step(T_tank(k), 20.0, 320.0, 1.0)
+            if fine.state == 'All_off':
+                t_fine = k
+                break
+
+        y0 = np.array([T_tank(0.0)])
+        events = GuardEvents(guard, guard(0.0, y0))
+        sol = solve_ivp(rhs, (0.0, 3600.0), y0, events=events.functions, rtol=1e-10, atol=1e-10)
+        t_cross, i = GuardEvents.first(sol.t_events)
+        self.assertEqual(Control_1.GUARDS[i], 'T_tank - hysteresis_high')   # 328.15 K가 먼저
+        self.assertAlmostEqual(t_cross, 315.0, delta=1e-3)
+
+        # 교차 시각에서 다시 시작: 방금 교차한 guard는 반대 방향만 검출 (Greenhouse_1.integrate와 같음)
+        y1 = sol.y_events[i][0]
+        g1 = guard(t_cross, y1)
+        directions = GuardEvents.directions_from(g1)
+        directions[i] = -events.functions[i].direction
+        events = GuardEvents(guard, g1, directions)
+        sol = solve_ivp(rhs, (t_cross, 3600.0), y1, events=events.functions, rtol=1e-10, atol=1e-10)
+        t_cross, i = GuardEvents.first(sol.t_events)
+        self.assertEqual(Control_1.GUARDS[i], 'T_tank - T_max')
+        self.assertAlmostEqual(t_cross, 815.0, delta=1e-3)
+        self.assertEqual(t_fine, 816)     # 1초 스텝은 교차 후 첫 경계에서 전이
+
+    def test_no_crossing(self):
+        guard = lambda t, y: np.array([1.0 + y[0]])
+        events = GuardEvents(guard, guard(0.0, np.array([0.0])))
+        sol = solve_ivp(lambda t, y: np.array([1.0]), (0.0, 10.0), np.array([0.0]), events=events.functions)
+        self.assertIsNone(GuardEvents.first(sol.t_events))
+
+    def test_solve_ivp_terminal_event(self):
+        """GuardEvents는 교차 방향의 첫 영교차에서 적분을 멈춤"""
+        ctrl = Control_Dehumidifier()
+
+        def guard(t, y):
+            ctrl.T_air = y[0]
+            return ctrl.guard_values()
+        y0 = np.array([296.0])
+        events = GuardEvents(guard, guard(0.0, y0))
+        # 냉각: dT/dt = -(T - 290)/100 → 295.15 K, 293.15 K 순서로 통과
+        sol = solve_ivp(lambda t, y: -(y - 290.0) / 100.0, (0.0, 500.0), y0,
+                        events=events.functions, rtol=1e-10, atol=1e-10)
+        t_event, i = GuardEvents.first(sol.t_events)
+        self.assertEqual(Control_Dehumidifier.GUARDS[i], 'T_air - 295.15')
+        self.assertAlmostEqual(t_event, 100.0 * np.log(6.0 / 5.15), places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import numpy as np
+from Flows.FluidFlow.Flow1DimInc import Flow1DimInc
+from Components.Greenhouse.HeatingPipe import HeatingPipe
+
+
+def make_flow(N=10, Nt=1, method='explicit_euler', m_flow=0.3):
+    flow = Flow1DimInc(N=N, Nt=Nt, Mdotnom=0.3, Unom=1000.0, V=0.03, A=16.0,
+                       Tstart_inlet=353.15, Tstart_outlet=323.15, steadystate=False,
+                       method=method)
+    flow.InFlow.m_flow = m_flow
+    flow.InFlow.h_outflow = flow.specific_enthalpy(2e5, 363.15)
+    flow.thermalPortConverter.multi.T[:] = 293.15
+    flow.T_wall[:] = 293.15
+    return flow
+
+
+class TestFlow1DimInc(unittest.TestCase):
+    """배열 기반 파이프 셀 에너지 밸런스 테스트"""
+
+    def test_derivatives_match_cells(self):
+        """벡터화한 변화율 = 셀 단위 업윈드 밸런스 (Nt = 1)"""
+        flow = make_flow(N=6)
+        flow.T_wall[:] = np.linspace(290.0, 300.0, 6)
+        for upstream, cell in zip(flow.Cells, flow.Cells[1:]):
+            cell.InFlow.m_flow = flow.InFlow.m_flow
+            cell.InFlow.h_outflow = upstream.h
+        expected = [cell.compute_derivatives() for cell in flow.Cells]
+        np.testing.assert_allclose(flow.compute_derivatives(), expected, rtol=1e-12)
+
+    def test_cells_are_views(self):
+        """Cells[i].h / Wall_int.T는 배열 원소를 직접 읽고 씀"""
+        flow = make_flow(N=4)
+        flow.Cells[2].h = 1.0e5
+        self.assertEqual(flow.h[2], 1.0e5)
+        flow.set_enthalpies(np.full(4, 2.0e5))
+        self.assertEqual(flow.Cells[1].h, 2.0e5)
+        self.assertAlmostEqual(flow.Summary.T[0], 2.0e5 / flow.c_p + 273.15)
+        flow.Cells[0].Wall_int.T = 310.0
+        self.assertEqual(flow.T_wall[0], 310.0)
+        with self.assertRaises(ValueError):
+            Flow1DimInc(N=4, method='rk4')
+
+    def test_steadystate_pipe(self):
+        flow = make_flow()
+        flow.steadystate = True
+        h0 = flow.get_enthalpies()
+        np.testing.assert_array_equal(flow.compute_derivatives(), 0.0)
+        flow.step(10.0)
+        np.testing.assert_array_equal(flow.h, h0)
+
+    def test_steadystate_only_during_initialization(self):
+        """steadystate는 초기화 단계에서만 h를 고정 (complete_initialization 이후 동적)"""
+        flow = make_flow()
+        flow.steadystate = True
+        flow.complete_initialization()
+        h0 = flow.get_enthalpies()
+        flow.step(10.0)
+        self.assertFalse(np.array_equal(flow.h, h0))
+
+    def test_imposed_heat_flow(self):
+        """열 포트 유량 모드: 유량 0에서 셀 엔탈피 변화 = Q_port*dt/(rho*Vi*Nt), Q_tot = 포트 합"""
+        for method in ('explicit_euler', 'backward_euler'):
+            flow = Flow1DimInc(N=5, Nt=4, V=0.03, A=16.0, steadystate=False, method=method,
+                               imposed_heat_flow=True)
+            flow.InFlow.m_flow = 0.0
+            flow.Q_port[:] = np.linspace(-5e3, 1e3, 5)
+            h0 = flow.get_enthalpies()
+            flow.step(20.0)
+            np.testing.assert_allclose((flow.h - h0) * flow.rho * flow.Vi * flow.Nt,
+                                       flow.Q_port * 20.0, rtol=1e-12)
+            self.assertAlmostEqual(flow.Q_tot, -4e3 * 2.5)
+
+    def test_backward_euler_steady_energy_balance(self):
+        """dt ≫ 셀 체류시간에서도 안정, 정상상태에서 M*(h_out - h_in) = Q_tot"""
+        flow = make_flow(N=200, Nt=3, method='backward_euler', m_flow=0.9)
+        residence = flow.rho * flow.Vi / (flow.InFlow.m_flow / flow.Nt)
+        self.assertLess(residence, 1.0)
+        for _ in range(50):
+            flow.step(60.0)
+        T = flow.temperatures()
+        self.assertTrue(np.all(np.diff(T) < 0))
+        self.assertTrue(np.all((T > 293.15) & (T < 363.15)))
+        np.testing.assert_allclose(flow.compute_derivatives(), 0.0, atol=1e-6)
+        enthalpy_rise = flow.InFlow.m_flow * (flow.OutFlow.h_outflow - flow.InFlow.h_outflow)
+        self.assertAlmostEqual(enthalpy_rise / flow.Q_tot, 1.0, places=6)
+        self.assertEqual(flow.OutFlow.m_flow, -flow.InFlow.m_flow)
+
+    def test_backward_euler_converges_to_explicit(self):
+        """작은 dt에서 암시적 적분과 명시적 적분이 일치"""
+        explicit, implicit = make_flow(), make_flow(method='backward_euler')
+        for _ in range(2000):
+            explicit.step(0.01)
+            implicit.step(0.01)
+        np.testing.assert_allclose(implicit.temperatures(), explicit.temperatures(), atol=0.05)
+
+
+class TestHeatingPipeCells(unittest.TestCase):
+
+    def test_many_cells(self):
+        """N = 200 셀 파이프: 열 포트와 Summary 크기, 출구 온도"""
+        pipe = HeatingPipe(A=14000, d=0.051, l=50, N=200, N_p=625, freePipe=False,
+                           steadystate=False, method='backward_euler')
+        pipe.pipe_in.m_flow = 80.0
+        pipe.pipe_in.h_outflow = pipe.flow1DimInc.specific_enthalpy(2e5, 363.15)
+        for _ in range(20):
+            pipe.step(60.0)
+        self.assertEqual(len(pipe.heatPorts), 200)
+        self.assertEqual(pipe.heatPorts[-1].T, pipe.get_outlet_temperature())
+        self.assertLess(pipe.get_outlet_temperature(), pipe.get_inlet_temperature())
+        self.assertEqual(pipe.pipe_out.h_outflow, pipe.flow1DimInc.h[-1])
+
+    def test_heat_ports_drive_cells(self):
+        """열 포트 유량이 셀 에너지 밸런스에 들어감 (유량 0: 방출한 열만큼 엔탈피 감소)"""
+        pipe = HeatingPipe(A=14000, d=0.051, l=50, N=5, N_p=625, freePipe=False,
+                           steadystate=False)
+        pipe.pipe_in.m_flow = 0.0
+        flow = pipe.flow1DimInc
+        content = flow.rho * flow.Vi * flow.Nt * flow.h.sum()
+        T_in = pipe.get_inlet_temperature()
+        Q = np.full(5, -2e5)
+        pipe.set_heat_flows(Q)
+        self.assertEqual(pipe.Q_flow, -1e6)
+        self.assertEqual(pipe.heatPorts[2].Q_flow, -2e5)
+        for _ in range(60):
+            pipe.step(1.0)
+        self.assertAlmostEqual(flow.rho * flow.Vi * flow.Nt * flow.h.sum() - content, -6e7,
+                               delta=1e-3)
+        self.assertLess(pipe.get_inlet_temperature(), T_in)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,281 @@
+import timeit
+import unittest
+import numpy as np
+from Greenhouse_1 import Greenhouse_1, BALANCE_STATES
+from steady_state import solve_steady_state
+
+
+class TestGreenhouseStateVector(unittest.TestCase):
+    """Greenhouse_1 평탄화 상태 벡터 / rhs 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.gh = Greenhouse_1()
+        for i in range(3):
+            cls.gh.step(1.0, i)
+
+    def test_layout(self):
+        """레이아웃 크기와 블록 구성 확인"""
+        layout = self.gh.state_layout
+        expected = (6 + 2 + 2 + len(self.gh.Q_cd_Soil.layers)
+                    + self.gh.pipe_low.N + self.gh.pipe_up.N + self.gh.TYM.n_states)
+        self.assertEqual(len(layout), expected)
+        self.assertEqual(len(layout.labels()), expected)
+        self.assertEqual(len(set(layout.labels())), expected)
+        self.assertEqual(self.gh.pack_state().dtype, np.float64)
+
+    def test_pack_unpack_roundtrip(self):
+        """pack → unpack → pack 결과가 동일해야 함"""
+        layout = self.gh.state_layout
+        y = self.gh.pack_state()
+        y_mod = y.copy()
+        y_mod[layout['air.T']] += 1.5
+        y_mod[layout['Q_cd_Soil.T']] -= 0.5
+        self.gh.unpack_state(y_mod)
+        np.testing.assert_array_equal(self.gh.pack_state(), y_mod)
+        self.assertEqual(self.gh.air.heatPort.T, y_mod[layout['air.T']][0])
+        self.gh.unpack_state(y)
+        np.testing.assert_array_equal(self.gh.pack_state(), y)
+
+    def test_rhs_is_pure(self):
+        """rhs는 상태와 제어기 내부값을 진행시키지 않아야 함"""
+        y = self.gh.pack_state()
+        pid_y = self.gh.PID_Mdot.y.copy()
+        screen_state = self.gh.SC.state
+        dydt_1 = self.gh.rhs(3.0, y)
+        dydt_2 = self.gh.rhs(3.0, y)
+        np.testing.assert_array_equal(dydt_1, dydt_2)
+        np.testing.assert_array_equal(self.gh.pack_state(), y)
+        np.testing.assert_array_equal(self.gh.PID_Mdot.y, pid_y)
+        self.assertEqual(self.gh.SC.state, screen_state)
+        self.assertTrue(np.all(np.isfinite(dydt_1)))
+
+    def test_rhs_matches_component_balance(self):
+        """FluxKernel rhs는 컴포넌트 객체 경로(_evaluate_fluxes)의 밸런스와 일치해야 함"""
+        gh = self.gh
+        layout = gh.state_layout
+        y = gh.pack_state()
+        # 제어 출력 교란: 스크린 일부 닫힘, 환기창 개방, 난방, CO2 주입
+        gh.thScreen.set_screen_closure(0.6)
+        gh._synchronize_screen_components()
+        gh.Q_ven_AirOut.U_vents = gh.Q_ven_TopOut.U_vents = 0.3
+        gh.sourceMdot_1ry.Mdot = gh.PID_Mdot.CS = 5.0
+        gh.MC_ExtAir.U_MCext = 0.7
+        gh.MC_ExtAir.calculate()
+        y_mod = y.copy()
+        y_mod[layout['air.T']] += 2.0
+        y_mod[layout['thScreen.T']] += 3.0
+        y_mod[layout['CO2_air.CO2']] += 200.0
+        y_mod[layout['pipe_low.h']] += np.linspace(0.0, 5e4, gh.pipe_low.N)
+        try:
+            dydt = gh.rhs(3.0, y_mod)
+            np.testing.assert_array_equal(gh.pack_state(), y)   # 객체에 쓰지 않음
+            # 객체 경로의 입력(LAI, 작물 환경)은 한 호출 늦으므로 두 번 평가
+            for _ in range(2):
+                gh.unpack_state(y_mod)
+                gh._evaluate_fluxes(3.0)
+            np.testing.assert_allclose(dydt, layout.derivatives(), rtol=1e-9, atol=1e-15)
+        finally:
+            gh.unpack_state(y)
+
+    def test_rhs_columns(self):
+        """(n, k) 상태는 열마다 독립된 rhs"""
+        y = self.gh.pack_state()
+        Y = np.stack([y, y * 1.001, y * 0.999], axis=1)
+        dydt = self.gh.rhs(3.0, Y)
+        self.assertEqual(dydt.shape, Y.shape)
+        for j in range(Y.shape[1]):
+            np.testing.assert_allclose(dydt[:, j], self.gh.rhs(3.0, Y[:, j]), rtol=1e-12)
+
+    def test_rhs_faster_than_step(self):
+        """상태 열 8개의 rhs 한 번은 step() 8번보다 빨라야 함 (객체/포트 쓰기 없음)"""
+        gh = Greenhouse_1()
+        for i in range(3):
+            gh.step(1.0, i)
+        Y = np.repeat(gh.pack_state()[:, None], 8, axis=1)
+        gh.rhs(3.0, Y)
+        # 반복 측정의 최솟값 (다른 프로세스에 의한 지연 제외),
+        # 열 하나의 rhs와 step()은 비용이 비슷하므로 적분기가 쓰는 열 묶음으로 비교
+        t_rhs = min(timeit.repeat(lambda: gh.rhs(3.0, Y), number=20, repeat=5))
+        t_step = min(timeit.repeat(lambda: [gh.step(1.0, 3) for _ in range(8)], number=20, repeat=5))
+        self.assertLess(t_rhs, t_step)
+
+
+class TestGreenhouseImplicitIntegration(unittest.TestCase):
+    """Greenhouse_1 희소 야코비안 패턴 / 암시적 적분 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.gh = Greenhouse_1()
+        for i in range(3):
+            cls.gh.step(1.0, i)
+
+    def test_sparsity_covers_numerical_jacobian(self):
+        """유한차분 야코비안의 비영 원소는 모두 연결 기반 패턴에 포함되어야 함"""
+        pattern = self.gh.jacobian_sparsity().toarray().astype(bool)
+        n = len(self.gh.state_layout)
+        self.assertEqual(pattern.shape, (n, n))
+        self.assertTrue(np.all(np.diag(pattern)))
+
+        y = self.gh.pack_state()
+        f0 = self.gh.rhs(3.0, y)
+        for j in range(n):
+            y_p = y.copy()
+            y_p[j] += 1e-4 * max(1.0, abs(y[j]))
+            changed = np.abs(self.gh.rhs(3.0, y_p) - f0) > 1e-12 * (1 + np.abs(f0))
+            self.assertFalse(np.any(changed & ~pattern[:, j]),
+                             f"패턴 누락: 열 {self.gh.state_layout.labels()[j]}")
+        self.gh.unpack_state(y)
+
+    def test_integrate_output_grid(self):
+        """BDF 적분 결과는 사용자 출력 격자 위에 있어야 함"""
+        result = self.gh.integrate(t_end=903.0, t_start=3.0, output_dt=300.0)
+        np.testing.assert_allclose(result['time'], [3.0, 303.0, 603.0, 903.0])
+        self.assertEqual(result['y'].shape, (4, len(self.gh.state_layout)))
+        self.assertTrue(np.all(np.isfinite(result['y'])))
+        np.testing.assert_array_equal(result['y'][-1], self.gh.pack_state())
+        self.assertGreater(result['njev'], 0)
+
+        layout = self.gh.state_layout
+        T_air = result['y'][:, layout['air.T']]
+        self.assertTrue(np.all((T_air > 273.15) & (T_air < 323.15)))
+
+    def test_integrate_screen_timer_event(self):
+        """출력 간격보다 짧은 스크린 타이머 전이(crack → 15분 → crack2)를 놓치지 않음"""
+        gh = Greenhouse_1()
+        result = gh.integrate(t_end=1200.0, output_dt=1200.0)
+        self.assertEqual(gh.SC.state, 'crack2')
+        self.assertAlmostEqual(gh.SC.timer, 0.0)
+        self.assertIn('events', result)
+
+    def test_integrate_guard_event_fires_once(self):
+        """교차 시각에서 다시 시작해도 같은 guard 교차를 반복 검출하지 않음"""
+        gh = Greenhouse_1()
+        result = gh.integrate(t_end=6 * 3600, output_dt=1800)
+        times = [t for t, _ in result['events']]
+        self.assertGreater(len(times), 0)
+        self.assertTrue(set(name for _, name in result['events']) <= set(gh.guard_names))
+        self.assertEqual(len(gh.guard_names), len(gh._guard_values(0.0, gh.pack_state())))
+        self.assertEqual(len(set(times)), len(times))
+        self.assertTrue(np.all(np.diff(times) > 0))
+
+    def test_integrate_faster_than_step(self):
+        """BDF 적분은 같은 구간의 1초 step()보다 빠르고 누적 난방 에너지가 일치 (보조 상태 적분)"""
+        implicit, explicit = Greenhouse_1(), Greenhouse_1()
+        start = timeit.default_timer()
+        implicit.integrate(t_end=1800.0, output_dt=60.0)  # 1분 제어 샘플링 (파이프 물이 유량 이력을 따름)
+        t_integrate = timeit.default_timer() - start
+        start = timeit.default_timer()
+        for i in range(1800):
+            explicit.step(1.0, i)
+        t_step = timeit.default_timer() - start
+        self.assertLess(t_integrate, t_step)
+        self.assertGreater(explicit.E_th_tot_kWhm2, 0.0)
+        self.assertAlmostEqual(implicit.E_th_tot_kWhm2, explicit.E_th_tot_kWhm2,
+                               delta=0.02 * explicit.E_th_tot_kWhm2)
+        self.assertAlmostEqual(implicit.E_th_tot, implicit.E_th_tot_kWhm2 * 1.4e4)
+
+    def test_integrate_rejects_explicit_method(self):
+        with self.assertRaises(ValueError):
+            self.gh.integrate(t_end=600.0, method='RK45')
+
+
+class TestPipeHeatBalance(unittest.TestCase):
+    """난방 파이프 셀 에너지 밸런스: 열 포트로 방출한 열은 파이프 물에서 빠져나감"""
+
+    @staticmethod
+    def pipe_enthalpy(gh) -> float:
+        """두 파이프 물의 엔탈피 합 [J]"""
+        return sum(f.rho * f.Vi * f.Nt * f.h.sum()
+                   for f in (gh.pipe_low.flow1DimInc, gh.pipe_up.flow1DimInc))
+
+    def test_idle_pipes_cool_down(self):
+        """유량 0: 파이프 엔탈피 감소량 = 방출열 = 누적 난방 에너지, 파이프 온도 하강"""
+        gh = Greenhouse_1()
+        gh.PID_Mdot.CSmax = 0.0
+        H0 = self.pipe_enthalpy(gh)
+        T0 = gh.pipe_low.flow1DimInc.temperatures().mean()
+        emitted = 0.0
+        for i in range(600):
+            gh.step(1.0, i)
+            self.assertEqual(gh.sourceMdot_1ry.flangeB.m_flow, 0.0)
+            emitted -= gh.pipe_low.Q_flow + gh.pipe_up.Q_flow
+        self.assertGreater(emitted, 0.0)
+        self.assertAlmostEqual((H0 - self.pipe_enthalpy(gh)) / emitted, 1.0, places=9)
+        self.assertAlmostEqual(gh.E_th_tot_kWhm2 * 1.4e4 * 3.6e6 / emitted, 1.0, places=9)
+        self.assertLess(gh.pipe_low.flow1DimInc.temperatures().mean(), T0 - 5.0)
+
+    def test_rhs_pipe_balance(self):
+        """rhs의 파이프 엔탈피 변화율 합 = 유입 엔탈피 - 유출 엔탈피 + 열 포트 유량 합"""
+        gh = Greenhouse_1()
+        gh.sourceMdot_1ry.in_Mdot = gh.PID_Mdot.CS = 5.0
+        gh.sourceMdot_1ry.step(0.0)
+        layout = gh.state_layout
+        y = gh.pack_state()
+        y[layout['pipe_low.h']] += np.linspace(0.0, 5e4, gh.pipe_low.N)
+        dydt = gh.rhs(0.0, y)
+        for _ in range(2):   # 객체 경로의 입력(LAI)은 한 호출 늦음
+            gh.unpack_state(y)
+            gh._evaluate_fluxes(0.0)
+        low, up = gh.pipe_low.flow1DimInc, gh.pipe_up.flow1DimInc
+        dH = sum(f.rho * f.Vi * f.Nt * dydt[layout[name]].sum()
+                 for name, f in (('pipe_low.h', low), ('pipe_up.h', up)))
+        advected = gh.PID_Mdot.CS * (low.InFlow.h_outflow - up.h[-1])
+        self.assertAlmostEqual(dH / (advected + gh.pipe_low.Q_flow + gh.pipe_up.Q_flow), 1.0,
+                               places=9)
+
+    def test_full_day(self):
+        """24시간 적분이 끝나고 상태 검증(온도 범위, 상하부 온도차)을 통과, 난방 에너지는 유한"""
+        gh = Greenhouse_1()
+        result = gh.integrate(t_end=24 * 3600, output_dt=600)
+        self.assertTrue(np.all(np.isfinite(result['y'])))
+        gh._verify_state()
+        # 파이프가 무한 열원이면 공급수와 무관하게 누적 에너지가 계속 증가
+        self.assertGreater(gh.E_th_tot_kWhm2, 0.0)
+        self.assertLess(gh.E_th_tot_kWhm2, 2.0)
+
+
+class TestSteadyStateInitialization(unittest.TestCase):
+    """정상상태 초기화 테스트"""
+
+    def test_solve_linear_system(self):
+        """선택한 원소만 풀고 나머지는 고정 (dy/dt = A y + b)"""
+        A = np.array([[-2.0, 1.0, 0.0], [1.0, -3.0, 1.0], [0.0, 1.0, -1.0]])
+        b = np.array([1.0, 0.0, 0.0])
+        y0 = np.array([0.0, 0.0, 5.0])
+        result = solve_steady_state(lambda y: A @ y + b, y0, [0, 1], tol=1e-9)
+        self.assertTrue(result.success)
+        self.assertEqual(result.y[2], 5.0)
+        np.testing.assert_allclose((A @ result.y + b)[:2], 0.0, atol=1e-9)
+
+    def test_flagged_states(self):
+        """steadystate 플래그가 켜진 상태(CO2, 상부 수증기압, 파이프 셀)만 평형으로 풂"""
+        gh = Greenhouse_1()
+        layout = gh.state_layout
+        names = layout.steadystate_names()
+        self.assertIn('CO2_top.CO2', names)
+        self.assertNotIn('air.T', names)
+        T_air = gh.air.T
+        result = gh.initialize_steady_state()
+        self.assertTrue(result.success)
+        self.assertEqual(gh.air.T, T_air)
+        with layout.released(names):
+            residual = gh.rhs(0.0, gh.pack_state())
+        self.assertLess(abs(residual[layout['CO2_top.CO2']][0]), 1e-6)
+        # 초기화 단계 종료 후에는 상부 수증기압도 동적으로 진행
+        self.assertFalse(gh.air_Top.air._initialization_phase)
+
+    def test_balance_states(self):
+        """모든 열/수증기/CO2 밸런스가 평형에서 시작"""
+        gh = Greenhouse_1()
+        gh.initialize_steady_state(states=BALANCE_STATES)
+        layout = gh.state_layout
+        dydt = gh.rhs(0.0, gh.pack_state())
+        index = layout.indices(BALANCE_STATES)
+        np.testing.assert_allclose(dydt[index], 0.0, atol=1e-6)
+        with self.assertRaises(KeyError):
+            gh.initialize_steady_state(states=['no_such_block'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+from input_cache import load_input_table, merge_input_tables, register_input_table, unregister_input_table
+
+
+class TestInputCache(unittest.TestCase):
+    """병합 입력 테이블 바이너리 캐시 테스트"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.weather = os.path.join(self.dir, 'weather.txt')
+        self.setpoint = os.path.join(self.dir, 'sp.txt')
+        self._write(self.weather, 'time\tT_out\n0\t5\n3600\t7\n')
+        self._write(self.setpoint, 'time\tT_sp\n0\t20\n1800\t21\n')
+        self.paths = [self.weather, self.setpoint]
+        self.cache_dir = os.path.join(self.dir, '__inputcache__')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    @staticmethod
+    def _write(path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def _npy_path(self):
+        return [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir)
+                if f.endswith('.npy')][0]
+
+    def test_cache_matches_merge(self):
+        """캐시 값은 원본 병합 결과와 같고, 두 번째 로드는 메모리 매핑"""
+        expected = merge_input_tables(self.paths)
+        names, data = load_input_table(self.paths)
+        self.assertEqual(names, list(expected.columns))
+        np.testing.assert_array_equal(data, expected.to_numpy(dtype=np.float64))
+        np.testing.assert_array_equal(data[:, 0], [0.0, 1800.0, 3600.0])
+        np.testing.assert_array_equal(data[:, 1], [5.0, 6.0, 7.0])   # 선형 보간된 결측치
+
+        names2, data2 = load_input_table(self.paths)
+        self.assertIsInstance(data2, np.memmap)
+        self.assertFalse(data2.flags.writeable)
+        np.testing.assert_array_equal(data2, data)
+
+    def test_touch_reuses_cache(self):
+        """내용이 같으면 mtime만 바뀌어도 캐시 재사용"""
+        load_input_table(self.paths)
+        mtime = os.stat(self._npy_path()).st_mtime_ns
+        time.sleep(0.01)
+        os.utime(self.weather)
+        _, data = load_input_table(self.paths)
+        self.assertEqual(os.stat(self._npy_path()).st_mtime_ns, mtime)
+        np.testing.assert_array_equal(data[:, 1], [5.0, 6.0, 7.0])
+
+    def test_content_change_invalidates(self):
+        """원본 내용이 바뀌면 자동으로 재생성"""
+        load_input_table(self.paths)
+        self._write(self.weather, 'time\tT_out\n0\t1\n3600\t3\n')
+        _, data = load_input_table(self.paths)
+        np.testing.assert_array_equal(data[:, 1], [1.0, 2.0, 3.0])
+
+    def test_no_cache(self):
+        names, data = load_input_table(self.paths, use_cache=False)
+        self.assertFalse(os.path.exists(self.cache_dir))
+        self.assertEqual(names, ['time', 'T_out', 'T_sp'])
+
+    def test_registered_table(self):
+        """등록된 테이블은 파일을 읽지 않고 그대로 반환"""
+        table = np.array([[0.0, 1.0, 2.0], [60.0, 3.0, 4.0]])
+        register_input_table(self.paths, ['time', 'T_out', 'T_sp'], table)
+        try:
+            names, data = load_input_table([os.path.relpath(p) for p in self.paths])
+            self.assertIs(data, table)
+            self.assertEqual(names, ['time', 'T_out', 'T_sp'])
+            self.assertFalse(os.path.exists(self.cache_dir))
+        finally:
+            unregister_input_table(self.paths)
+        _, data = load_input_table(self.paths)
+        np.testing.assert_array_equal(data[:, 1], [5.0, 6.0, 7.0])
+        with self.assertRaises(ValueError):
+            register_input_table(self.paths, ['T_out', 'time'], np.zeros((2, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import pandas as pd
+from input_provider import InputProvider
+
+
+class TestInputProvider(unittest.TestCase):
+    """시간 인덱스 입력 제공자 테스트"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'time': [0.0, 1800.0, 3600.0, 7200.0],
+            'T_out': [5.0, 6.0, 8.0, 4.0],
+            'SC': [1.0, 0.0, 0.0, 1.0],
+        })
+        self.linear = InputProvider.from_dataframe(self.df, mode='linear')
+        self.zoh = InputProvider.from_dataframe(self.df, mode='zoh')
+
+    def test_linear_interpolation(self):
+        """선형 보간값이 np.interp와 일치"""
+        for t in [0.0, 1.0, 900.0, 1800.0, 2700.0, 5400.0, 7199.0]:
+            row = self.linear.row(t)
+            self.assertAlmostEqual(row['T_out'], np.interp(t, self.df['time'], self.df['T_out']))
+            self.assertIsInstance(row['T_out'], float)
+
+    def test_zero_order_hold(self):
+        """0차 유지: 직전 샘플 값"""
+        self.assertEqual(self.zoh.value('T_out', 1799.0), 5.0)
+        self.assertEqual(self.zoh.value('T_out', 1800.0), 6.0)
+        self.assertEqual(self.zoh.value('SC', 7000.0), 0.0)
+
+    def test_out_of_range_holds_end_values(self):
+        self.assertEqual(self.linear.value('T_out', -10.0), 5.0)
+        self.assertEqual(self.linear.value('T_out', 1e6), 4.0)
+
+    def test_cursor_random_access(self):
+        """역방향/큰 점프 조회도 정확해야 함 (커서 재설정)"""
+        for t in [7000.0, 100.0, 3600.0, 3599.0, 0.0, 7200.0, 2000.0]:
+            self.assertAlmostEqual(self.linear.value('T_out', t),
+                                   np.interp(t, self.df['time'], self.df['T_out']))
+
+    def test_row_struct(self):
+        row = self.linear.row(900.0)
+        self.assertIn('SC', row)
+        self.assertNotIn('time', row)
+        self.assertNotIn('ilu_sp', row)
+        self.assertEqual(row.get('ilu_sp', 0.0), 0.0)
+        self.assertEqual(set(row.to_dict()), {'T_out', 'SC'})
+
+    def test_overrides(self):
+        """override는 테이블을 바꾸지 않고 값만 교체"""
+        provider = InputProvider.from_dataframe(self.df)
+        provider.override('T_out', 20.0)
+        provider.override('SC', lambda t, v: 1.0 - v)
+        row = provider.row(900.0)
+        self.assertEqual(row['T_out'], 20.0)
+        self.assertEqual(provider.value('T_out', 900.0), 20.0)
+        self.assertAlmostEqual(row['SC'], 1.0 - self.linear.value('SC', 900.0))
+        self.assertAlmostEqual(self.linear.value('T_out', 900.0),
+                               np.interp(900.0, self.df['time'], self.df['T_out']))
+        with self.assertRaises(KeyError):
+            provider.override('ilu_sp', 1.0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            InputProvider.from_dataframe(self.df, mode='cubic')
+        with self.assertRaises(ValueError):
+            InputProvider([0.0, 0.0], {'a': [1.0, 2.0]})
+
+
+if __name__ == '__main__':
+    unittest.main()
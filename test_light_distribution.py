@@ -0,0 +1,77 @@
+import time
+import unittest
+import numpy as np
+from Components.Greenhouse.Solar_model import Solar_model
+from Components.Greenhouse.Illumination import Illumination
+
+
+def trajectories(n, seed=0):
+    rng = np.random.default_rng(seed)
+    I_glob = np.clip(600.0 * np.sin(np.linspace(0, 2 * np.pi * n / 1440, n)), 0, None)
+    SC = rng.uniform(0, 1, n)
+    LAI = np.linspace(0.5, 3.5, n)
+    switch = (rng.uniform(0, 1, n) > 0.5).astype(float)
+    return I_glob, SC, LAI, switch
+
+
+class TestLightDistributionBatch(unittest.TestCase):
+    """일사/조명 광분포 배치 계산 테스트"""
+
+    def test_solar_batch_matches_scalar(self):
+        solar = Solar_model(A=1.4e4, I_glob=0.0)
+        I_glob, SC, LAI, _ = trajectories(500)
+        batch = solar.compute_batch(I_glob, SC, LAI)
+        self.assertEqual(set(batch), set(Solar_model.OUTPUTS))
+        for i in range(0, 500, 37):
+            solar.I_glob, solar.SC, solar.LAI = I_glob[i], SC[i], LAI[i]
+            solar.step(1.0)
+            for name in Solar_model.OUTPUTS:
+                self.assertAlmostEqual(batch[name][i], getattr(solar, name), delta=1e-12 * (1 + abs(batch[name][i])))
+            self.assertAlmostEqual(solar.compute()['R_SunFlr_Glob'], solar.R_SunFlr_Glob, places=12)
+
+    def test_illumination_batch_matches_scalar(self):
+        illu = Illumination(A=1.4e4, power_input=True, p_el=100)
+        _, _, LAI, switch = trajectories(200)
+        batch = illu.compute_batch(switch, LAI)
+        for i in range(0, 200, 13):
+            illu.switch, illu.LAI = switch[i], LAI[i]
+            result = illu.step(1.0)
+            for name in Illumination.OUTPUTS:
+                self.assertAlmostEqual(batch[name][i], result[name], places=9)
+
+    def test_scalar_inputs_broadcast(self):
+        """SC, LAI 생략 시 현재 값, 스칼라는 I_glob 길이로 확장"""
+        solar = Solar_model(A=1.0, I_glob=0.0, SC=0.3, LAI=2.0)
+        batch = solar.compute_batch([0.0, 100.0, 200.0])
+        self.assertEqual(batch['R_t_Glob'].shape, (3,))
+        self.assertEqual(batch['R_t_Glob'][0], 0.0)
+        np.testing.assert_allclose(batch['R_t_Glob'][2], 2 * batch['R_t_Glob'][1])
+        self.assertEqual(solar.compute_batch(100.0, LAI=2.0)['R_t_Glob'], batch['R_t_Glob'][1])
+
+    def test_step_reads_precomputed_row(self):
+        solar = Solar_model(A=1.4e4, I_glob=0.0)
+        illu = Illumination(A=1.4e4, power_input=True, p_el=100)
+        I_glob, SC, LAI, switch = trajectories(100)
+        table = solar.precompute(I_glob, SC, LAI)
+        illu.precompute(switch, LAI)
+        solar.step(1.0, row=42)
+        result = illu.step(1.0, row=42)
+        self.assertEqual(solar.R_SunCan_Glob, table['R_SunCan_Glob'][42])
+        self.assertEqual(illu.R_IluCan_Glob.value, result['R_IluCan_Glob'])
+        self.assertEqual(illu.W_el, illu.table['W_el'][42])
+
+    def test_year_at_one_minute(self):
+        """1년 (1분 간격, 525600행) 광분포 계산"""
+        I_glob, SC, LAI, switch = trajectories(525600)
+        start = time.perf_counter()
+        batch = Solar_model(A=1.4e4, I_glob=0.0).compute_batch(I_glob, SC, LAI)
+        Illumination(A=1.4e4, power_input=True, p_el=100).compute_batch(switch, LAI)
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertTrue(np.all(np.isfinite(batch['R_SunCan_Glob'])))
+        # 흡수된 일사는 투과 일사를 넘지 않음
+        self.assertTrue(np.all(batch['R_SunCan_Glob'] + batch['R_SunFlr_Glob']
+                               <= I_glob * 1.0 + 1e-9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from multirate import MultiRateScheduler
+
+
+class TestMultiRateScheduler(unittest.TestCase):
+    """다중 속도 스케줄러 테스트"""
+
+    def setUp(self):
+        self.calls = []
+        self.u = 0.0
+        self.scheduler = MultiRateScheduler()
+        self.scheduler.add('slow', 10.0, lambda dt, u: self.calls.append((dt, u)),
+                           inputs={'u': lambda: self.u})
+
+    def test_fires_once_per_period_with_average_input(self):
+        """주기마다 한 번, 경과시간과 dt 가중 평균 입력으로 갱신"""
+        for i in range(25):
+            self.u = float(i)
+            self.scheduler.advance(1.0)
+        self.assertEqual(len(self.calls), 2)
+        self.assertAlmostEqual(self.calls[0][0], 10.0)
+        self.assertAlmostEqual(self.calls[0][1], 4.5)    # mean(0..9)
+        self.assertAlmostEqual(self.calls[1][1], 14.5)   # mean(10..19)
+        self.assertEqual(self.scheduler['slow'].n_updates, 2)
+
+    def test_flush_applies_remaining_time(self):
+        """flush는 남은 경과시간만큼 갱신"""
+        for _ in range(3):
+            self.u = 2.0
+            self.scheduler.advance(1.0)
+        self.assertEqual(self.scheduler.flush(), ['slow'])
+        self.assertAlmostEqual(self.calls[-1][0], 3.0)
+        self.assertAlmostEqual(self.calls[-1][1], 2.0)
+        self.assertEqual(self.scheduler.flush(), [])
+
+    def test_zero_period_fires_every_step(self):
+        """주기가 dt 이하이면 매 스텝 갱신"""
+        fast = []
+        self.scheduler.add('fast', 0.0, lambda dt: fast.append(dt))
+        for _ in range(5):
+            self.scheduler.advance(0.5)
+        self.assertEqual(fast, [0.5] * 5)
+
+    def test_float_period_accumulation(self):
+        """dt=0.1 누적 오차가 있어도 주기 10 s에서 정확히 갱신"""
+        for _ in range(100):
+            self.scheduler.advance(0.1)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_duplicate_name(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.add('slow', 1.0, lambda dt: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import math
+import unittest
+import numpy as np
+from scipy.integrate import solve_ivp
+from ControlSystems.PID import PID
+
+
+class SolverPID(PID):
+    """기존 구현: 매 스텝 solve_ivp(RK45)로 [I, Dx] 적분 (포화 중 track은 I를 따름)"""
+
+    def _advance(self, dt, SPs, PVs):
+        sol = solve_ivp(fun=self._system_dynamics, t_span=[0, dt], y0=self.y,
+                        method='RK45', args=(SPs, PVs, self.y[0]))
+        self.y = sol.y[:, -1]
+
+
+class TestPID(unittest.TestCase):
+    """이산 시간 해석해 PID와 solve_ivp 적분 결과 비교"""
+
+    def run_pair(self, params, dt=1.0, n=600):
+        exact, reference = PID(**params), SolverPID(**params)
+        PVmin, PVmax = params.get('PVmin', 0), params.get('PVmax', 1)
+        span = PVmax - PVmin
+        out = []
+        for k in range(n):
+            # 설정값 계단 변화 + 느린 진동 (포화와 안티 와인드업 구간 포함)
+            SP = PVmin + span * (0.3 if k < n // 3 else 0.8)
+            PV = PVmin + span * (0.5 + 0.3 * math.sin(k * dt / 200.0))
+            for pid in (exact, reference):
+                pid.SP, pid.PV = SP, PV
+                pid.step(dt)
+            out.append((exact.CS, reference.CS, *exact.y, *reference.y))
+        return np.array(out)
+
+    def assert_equivalent(self, out, params):
+        span = params.get('CSmax', 1) - params.get('CSmin', 0)
+        np.testing.assert_allclose(out[:, 0], out[:, 1], rtol=0, atol=2e-3 * span)
+        # RK45 기본 허용오차(rtol=1e-3) 수준에서 일치
+        np.testing.assert_allclose(out[:, 2:4], out[:, 4:6], rtol=1e-3, atol=5e-4)
+
+    def test_matches_solver(self):
+        cases = [
+            # Greenhouse_1 PID_Mdot / PID_CO2 (PI)
+            dict(Kp=-0.7, Ti=600, Td=0, CSstart=0.5, PVstart=0.5,
+                 PVmin=291.15, PVmax=295.15, CSmin=0, CSmax=86.75),
+            dict(Kp=0.4, Ti=0.5, CSstart=0.5, PVstart=0.5, PVmin=708.1, PVmax=1649.3,
+                 CSmin=0, CSmax=1),
+            # 미분 필터와 설정값 가중치 (b, c, Nd, Ni)
+            dict(Kp=1.5, Ti=120, Td=30, Nd=5, Ni=0.5, b=0.7, c=0.3,
+                 PVmin=10, PVmax=30, CSmin=-2, CSmax=5),
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                out = self.run_pair(params)
+                self.assert_equivalent(out, params)
+
+    def test_variable_dt(self):
+        """dt가 바뀌면 미분 필터 감쇠율을 다시 계산"""
+        params = dict(Kp=1.0, Ti=100, Td=20, Nd=4, c=0.5)
+        for dt in (1.0, 10.0, 1.0):
+            self.assert_equivalent(self.run_pair(params, dt=dt, n=100), params)
+
+    def test_exact_filter_step(self):
+        """입력이 일정하면 한 스텝 결과가 연속 시간 해와 일치 (큰 dt에서도 안정)"""
+        pid = PID(Kp=1.0, Ti=50, Td=10, Nd=2, c=1.0, PVstart=0.2)
+        pid.SP, pid.PV = 0.6, 0.2
+        I0, Dx0 = pid.y
+        u = pid.c * 0.6 - 0.2
+        pid.step(100.0)
+        self.assertAlmostEqual(pid.y[1], u + (Dx0 - u) * math.exp(-2 * 100.0 / 10), places=12)
+        self.assertAlmostEqual(pid.y[0], I0 + 100.0 * (0.6 - 0.2) / 50, places=12)
+
+    def test_saturated_large_step(self):
+        """dt ≫ Ti로 샘플링해도 포화 중 적분 항은 발산하지 않고 한계값으로 수렴"""
+        params = dict(Kp=0.4, Ti=0.5, PVmin=708.1, PVmax=1649.3, CSmin=0, CSmax=1)
+        large, small = PID(**params), PID(**params)
+        large.SP = small.SP = 2134.0
+        large.PV = small.PV = 656.7
+        for _ in range(20):
+            large.step(600.0)
+        for _ in range(6000):
+            small.step(2.0)
+        self.assertEqual(large.CS, 1.0)
+        self.assertTrue(np.all(np.isfinite(large.y)))
+        self.assertAlmostEqual(large.y[0], small.y[0], places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import pickle
+import unittest
+import numpy as np
+from ControlSystems.PID import PID
+from ControlSystems.PIDBank import PIDBank
+from ControlSystems.Climate.Uvents_RH_T_Mdot import Uvents_RH_T_Mdot
+from ensemble import GreenhouseEnsemble
+from Greenhouse_1 import Greenhouse_1
+
+
+def make_pids():
+    return [
+        PID(Kp=0.7, Ti=600, PVmin=291.15, PVmax=295.15, CSmax=86.75),
+        PID(Kp=0.4, Ti=0.5, PVmin=708.1, PVmax=1649),
+        PID(Kp=1.5, Ti=120, Td=30, Nd=5, Ni=0.5, b=0.7, c=0.3, PVmin=10, PVmax=30, CSmin=-2, CSmax=5),
+        PID(Kp=-0.5, Ti=0, Td=10, PVmin=0.1, PVmax=1.0),
+        PID(Kp=0, Ti=100),
+    ]
+
+
+class TestPIDBank(unittest.TestCase):
+    """벡터화 PID 뱅크 테스트"""
+
+    def test_matches_scalar_pids(self):
+        """뱅크 결과는 개별 PID.step과 같음 (포화/안티 와인드업, 미분 필터 포함)"""
+        scalar, banked = make_pids(), make_pids()
+        bank = PIDBank(capacity=2)
+        indices = bank.register_all(banked)
+        np.testing.assert_array_equal(indices, np.arange(5))
+        rng = np.random.default_rng(0)
+        for k in range(300):
+            dt = 1.0 if k < 200 else 5.0
+            for a, b in zip(scalar, banked):
+                span = a.PVmax - a.PVmin
+                a.PV = b.PV = a.PVmin + span * rng.uniform(-0.2, 1.2)
+                a.SP = b.SP = a.PVmin + span * (0.3 if k < 100 else 0.8)
+                a.step(dt)
+            bank.step(dt)
+            np.testing.assert_allclose([b.CS for b in banked], [a.CS for a in scalar],
+                                       rtol=1e-12, atol=1e-12)
+        # 연결된 PID의 y는 뱅크 상태의 뷰 (별도 복사 없이 최신 값)
+        for a, b in zip(scalar, banked):
+            np.testing.assert_allclose(b.y, a.y, rtol=1e-12, atol=1e-12)
+            self.assertEqual(b.track, a.track)
+        np.testing.assert_array_equal(bank.I, [b.y[0] for b in banked])
+
+    def test_registered_pid_delegates(self):
+        pid, reference = make_pids()[0], make_pids()[0]
+        bank = PIDBank()
+        bank.register(pid)
+        with self.assertRaises(ValueError):
+            PIDBank().register(pid)
+        for p in (pid, reference):
+            p.PV, p.SP = 292.0, 293.0
+            p.step(1.0)
+        self.assertEqual(pid.CS, reference.CS)
+        self.assertEqual(bank.CS[0], reference.CS)
+        self.assertEqual(bank.track[0], reference.track)
+        np.testing.assert_array_equal(bank.I, [reference.y[0]])
+        # 개별 진행 후 뱅크 진행도 같은 궤적
+        for _ in range(3):
+            bank.step(1.0)
+            reference.step(1.0)
+        np.testing.assert_array_equal(pid.y, reference.y)
+        self.assertEqual(pid.CS, reference.CS)
+
+    def test_state_views_survive_growth_and_pickle(self):
+        pids = make_pids()
+        bank = PIDBank(capacity=1)
+        bank.register_all(pids)   # 용량 증가 후에도 PID.y는 새 배열의 뷰
+        for pid in pids:
+            self.assertTrue(np.shares_memory(pid.y, bank._y))
+        # 뱅크보다 PID가 먼저 직렬화되는 경우와 그 반대 모두 다시 연결
+        for obj in (pids, bank):
+            copy = pickle.loads(pickle.dumps(obj))
+            copied_bank = copy if isinstance(copy, PIDBank) else copy[0].bank
+            for pid in copied_bank.members:
+                self.assertTrue(np.shares_memory(pid.y, copied_bank._y))
+
+    def test_uvents_controllers(self):
+        """Uvents_RH_T_Mdot의 PID 3개를 뱅크에 등록해도 같은 출력"""
+        banked, reference = Uvents_RH_T_Mdot(), Uvents_RH_T_Mdot()
+        bank = PIDBank()
+        bank.register_all(banked.controllers)
+        for k in range(200):
+            for u in (banked, reference):
+                u.T_air, u.RH_air, u.Mdot = 295.0 + 0.02 * k, 0.9, 0.04
+            banked.set_pid_inputs()
+            bank.step(1.0)
+            banked.combine()
+            reference.step(1.0)
+            self.assertAlmostEqual(banked.y, reference.y, places=12)
+
+
+class TestSharedControllerEnsemble(unittest.TestCase):
+
+    def test_shared_bank_matches_individual(self):
+        base = Greenhouse_1()
+        for i in range(30):
+            base.step(1.0, i)
+        parameters = {'air.h_Air': [3.8, 4.2, 4.6]}
+        shared = GreenhouseEnsemble(base, parameters, shared_controllers=True)
+        separate = GreenhouseEnsemble(base, parameters)
+        self.assertEqual(len(shared.pid_bank), 3 * 5)
+        for _ in range(120):
+            shared.step(1.0)
+            separate.step(1.0)
+        np.testing.assert_allclose(shared.get('air.T'), separate.get('air.T'), rtol=1e-12)
+        np.testing.assert_allclose(shared.get('U_vents.y'), separate.get('U_vents.y'), rtol=1e-12)
+        np.testing.assert_allclose(shared.get('PID_Mdot.CS'), separate.get('PID_Mdot.CS'), rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import pickle
+import unittest
+import numpy as np
+from Media import PropertyTables as pt
+from Media.PropertyTables import PropertyTable, PropertyTable2D, water_properties, air_properties
+from Flows.FluidFlow.Flow1DimInc import Flow1DimInc
+from Flows.FluidFlow.Cell1DimInc import Cell1DimInc
+from Flows.HeatAndVapourTransfer.AirThroughScreen import AirThroughScreen
+
+
+class TestPropertyTables(unittest.TestCase):
+    """물성 테이블 테스트"""
+
+    def test_error_bounds(self):
+        """기준식과의 오차가 기록된 오차 한계 이내"""
+        water = water_properties()
+        T = np.random.default_rng(0).uniform(273.15, 373.15, 2000)
+        for name, f, table in (('rho', pt.water_density, water.density), ('cp', pt.water_cp, water.cp),
+                               ('h', pt.water_enthalpy, water.enthalpy)):
+            self.assertLess(np.max(np.abs(table(T) - f(T))), 2 * water.error[name] + 1e-9)
+        self.assertLess(water.error['rho'], 1e-6)
+        self.assertLess(water.error['T'], 1e-8)
+
+        air = air_properties()
+        p = np.linspace(0.9e5, 1.1e5, 2000)
+        T = np.linspace(253.15, 333.15, 2000)
+        np.testing.assert_allclose(air.density(p, T), pt.air_density(p, T), rtol=1e-5)
+        np.testing.assert_allclose(air.viscosity(T), pt.air_viscosity(T), rtol=1e-10)
+
+    def test_reference_values(self):
+        water = water_properties()
+        self.assertAlmostEqual(water.density(277.13), 1000.0, delta=0.05)
+        self.assertAlmostEqual(water.density(353.15), 971.8, delta=0.1)
+        self.assertAlmostEqual(water.cp(298.15), 4181.3, delta=5.0)
+        self.assertAlmostEqual(water.enthalpy(373.15), 419.1e3, delta=500.0)
+        self.assertAlmostEqual(water.temperature(water.enthalpy(341.7)), 341.7, places=7)
+        air = air_properties()
+        self.assertAlmostEqual(air.cp(300.0), 1005.25, places=6)
+        self.assertAlmostEqual(air.density(1e5, 293.15), 1e5 / (287.0 * 293.15), places=5)
+
+    def test_scalar_and_array_agree(self):
+        water, air = water_properties(), air_properties()
+        T = np.linspace(260.0, 390.0, 27)  # 격자 밖 외삽 포함
+        np.testing.assert_allclose(water.density(T), [water.density(float(x)) for x in T], rtol=1e-14)
+        np.testing.assert_allclose(water.temperature(T * 1e3), [water.temperature(float(x) * 1e3) for x in T],
+                                   rtol=1e-14)
+        np.testing.assert_allclose(air.density(1.01e5, T), [air.density(1.01e5, float(x)) for x in T],
+                                   rtol=1e-14)
+        self.assertIsInstance(water.cp(300.0), float)
+
+    def test_extrapolation_is_linear(self):
+        table = PropertyTable(0.0, 1.0, 11, {'y': lambda x: 2.0 * x + 1.0})
+        self.assertAlmostEqual(table('y', 3.0), 7.0, places=10)
+        np.testing.assert_allclose(table('y', np.array([-1.0, 0.5, 2.0])), [-1.0, 2.0, 5.0], atol=1e-10)
+
+    def test_linear_and_bilinear(self):
+        linear = PropertyTable(0.0, 2.0, 3, {'y': np.square}, kind='linear')
+        self.assertEqual(linear('y', 0.5), 0.5)
+        self.assertEqual(linear.error['y'], 0.25)
+        table = PropertyTable2D(0.0, 1.0, 2, 0.0, 1.0, 2, {'z': lambda x, y: x + 2 * y})
+        self.assertAlmostEqual(table('z', 0.25, 0.5), 1.25)
+        self.assertEqual(table.error['z'], 0.0)
+        with self.assertRaises(ValueError):
+            PropertyTable(0.0, 1.0, 3, {'y': np.square}, kind='quadratic')
+
+    def test_shared_and_picklable(self):
+        self.assertIs(water_properties(), water_properties())
+        copy = pickle.loads(pickle.dumps(water_properties()))
+        self.assertEqual(copy.density(300.0), water_properties().density(300.0))
+
+
+class TestComponentsWithTables(unittest.TestCase):
+    """배관/셀/환기 모델의 테이블 사용"""
+
+    def test_flow1diminc_with_tables(self):
+        for method in ('explicit_euler', 'backward_euler'):
+            pipe = Flow1DimInc(N=5, steadystate=False, method=method, properties=water_properties(),
+                               Tstart_inlet=353.15, Tstart_outlet=343.15)
+            self.assertAlmostEqual(pipe.temperatures()[0], 353.15, places=6)
+            pipe.InFlow.m_flow = 0.2
+            pipe.InFlow.h_outflow = pipe.specific_enthalpy(1e5, 363.15)
+            pipe.thermalPortConverter.multi.T = np.full(5, 293.15)
+            for _ in range(2000):
+                pipe.step(1.0)
+            T = pipe.temperatures()
+            self.assertTrue(np.all(np.diff(T) < 0))   # 벽으로 열 손실
+            self.assertLess(T[0], 363.15)
+            self.assertAlmostEqual(pipe.M_tot, pipe.V * np.mean(pipe.Summary.rho), places=9)
+            self.assertLess(pipe.M_tot, pipe.V * 1000.0)
+
+    def test_implicit_matches_explicit_with_tables(self):
+        pipes = [Flow1DimInc(N=4, steadystate=False, method=m, properties=water_properties())
+                 for m in ('explicit_euler', 'backward_euler')]
+        for pipe in pipes:
+            pipe.InFlow.m_flow = 0.05
+            pipe.InFlow.h_outflow = pipe.specific_enthalpy(1e5, 333.15)
+            pipe.thermalPortConverter.multi.T = np.full(4, 300.0)
+            for _ in range(600):
+                pipe.step(0.05)
+        np.testing.assert_allclose(pipes[0].temperatures(), pipes[1].temperatures(), atol=0.05)
+
+    def test_cell_uses_water_density(self):
+        cell = Cell1DimInc(Vi=0.01, Ai=0.1, Mdotnom=0.1, Unom=100.0, pstart=1e5,
+                           hstart=4.2e5 + water_properties().enthalpy(313.15))
+        self.assertAlmostEqual(cell.T, 313.15, places=6)
+        self.assertAlmostEqual(cell.rho, 992.2, delta=0.1)
+        state = cell.fluidState
+        cell.h += 4186.0
+        cell._update_fluid_properties()
+        self.assertIs(cell.fluidState, state)
+        self.assertAlmostEqual(state['temperature'], 314.15, delta=0.01)
+
+    def test_air_through_screen(self):
+        default = AirThroughScreen(A=1.0, W=2.0, K=0.2e-3, SC=0.5)
+        tables = AirThroughScreen(A=1.0, W=2.0, K=0.2e-3, SC=0.5, properties=air_properties())
+        args = (295.0, 290.0, 1500.0, 1200.0, 0.0)
+        default.update(*args)
+        tables.update(*args)
+        self.assertAlmostEqual(tables.rho_air, default.rho_air, places=5)
+        self.assertAlmostEqual(tables.Q_flow, default.Q_flow, delta=0.01 * abs(default.Q_flow))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from Functions import Psychrometrics as psy
+from Functions.SaturatedVapourPressure import SaturatedVapourPressure
+from Functions.WaterVapourPressure import WaterVapourPressure
+from Modelica.Media.MoistAir.relativeHumidity_pTX import relativeHumidity_pTX
+from Components.Greenhouse.Air import Air
+from Components.Greenhouse.BasicComponents.SurfaceVP import SurfaceVP
+from Flows.Sensors.RHSensor import RHSensor
+
+
+class TestPsychrometrics(unittest.TestCase):
+    """습공기 상태 함수 테스트"""
+
+    def test_reference_values(self):
+        self.assertAlmostEqual(psy.p_sat(273.16), 611.657, delta=0.5)
+        self.assertAlmostEqual(psy.p_sat(293.15), 2339.0, delta=3.0)
+        self.assertAlmostEqual(psy.p_sat(373.15), 101325.0, delta=0.02 * 101325.0)
+
+    def test_scalar_and_array_agree(self):
+        T = np.linspace(263.15, 318.15, 12)
+        VP = np.linspace(300.0, 5000.0, 12)
+        for f, args in ((psy.p_sat, (T,)), (psy.dp_sat_dT, (T,)), (psy.relative_humidity, (T, VP)),
+                        (psy.humidity_ratio, (VP,)), (psy.dew_point, (VP,)),
+                        (psy.vapour_pressure, (T, np.full(12, 0.7)))):
+            batch = f(*args)
+            self.assertIsInstance(batch, np.ndarray)
+            scalar = [f(*(float(a[i]) for a in args)) for i in range(12)]
+            self.assertIsInstance(scalar[0], float)
+            np.testing.assert_allclose(batch, scalar, rtol=1e-14)
+
+    def test_inverses(self):
+        T = np.linspace(273.15, 313.15, 9)
+        VP = psy.vapour_pressure(T, 0.65)
+        np.testing.assert_allclose(psy.relative_humidity(T, VP), 0.65)
+        np.testing.assert_allclose(psy.dew_point(psy.p_sat(T)), T)
+        np.testing.assert_allclose(psy.vapour_pressure_from_humidity_ratio(psy.humidity_ratio(VP)), VP)
+        self.assertLess(psy.dew_point(VP[4]), T[4])
+        self.assertEqual(psy.relative_humidity(290.0, 1e5), 1.0)
+
+    def test_derivative(self):
+        T = np.linspace(273.15, 313.15, 9)
+        h = 1e-4
+        numeric = (psy.p_sat(T + h) - psy.p_sat(T - h)) / (2 * h)
+        np.testing.assert_allclose(psy.dp_sat_dT(T), numeric, rtol=1e-8)
+
+    def test_components_share_formula(self):
+        """Air, RHSensor, SurfaceVP, 외기 VP가 같은 포화수증기압을 사용"""
+        T, RH = 291.15, 0.8
+        VP = WaterVapourPressure().calculate(T - 273.15, RH * 100)
+        self.assertAlmostEqual(VP, RH * SaturatedVapourPressure().calculate(T - 273.15))
+
+        surface = SurfaceVP(T=T)
+        self.assertEqual(surface.VP, psy.p_sat(T))
+
+        air = Air(A=1.0, h_Air=4.0)
+        air.T = T
+        air.massPort.VP = VP
+        air._update_humidity()
+        self.assertAlmostEqual(air.RH, RH, places=12)
+
+        sensor = RHSensor()
+        sensor.heatPort.T = T
+        sensor.massPort.VP = VP
+        sensor.update()
+        self.assertAlmostEqual(sensor.RH, RH, places=12)
+        self.assertAlmostEqual(sensor.w_air, air.w_air, places=15)
+        self.assertAlmostEqual(relativeHumidity_pTX(psy.P_ATM, T, [air.w_air]), RH, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+from Flows.HeatTransfer.Radiation_T4 import Radiation_T4
+from Flows.HeatTransfer.Radiation_N import Radiation_N
+from Flows.HeatTransfer.RadiationNetwork import RadiationNetwork
+from Greenhouse_1 import Greenhouse_1
+
+
+def make_network():
+    network = RadiationNetwork()
+    for name in ('canopy', 'cover', 'sky'):
+        network.add_surface(name)
+    network.add_surface('pipe', N=3)
+    elements = {
+        'CanCov': Radiation_T4(A=100.0, epsilon_a=1.0, epsilon_b=0.84, FFa=0.8, FFab1=0.1),
+        'CovSky': Radiation_T4(A=100.0, epsilon_a=0.84, epsilon_b=1.0),
+        'PipeCan': Radiation_N(A=100.0, epsilon_a=0.88, epsilon_b=1.0, N=3, FFa=0.2, FFb=0.8),
+        'PipeCov': Radiation_N(A=100.0, epsilon_a=0.88, epsilon_b=0.84, N=3, FFa=0.2, FFab1=0.8),
+    }
+    network.connect('CanCov', elements['CanCov'], 'canopy', 'cover')
+    network.connect('CovSky', elements['CovSky'], 'cover', 'sky')
+    network.connect('PipeCan', elements['PipeCan'], 'pipe', 'canopy')
+    network.connect('PipeCov', elements['PipeCov'], 'pipe', 'cover')
+    network.set_temperature('canopy', 292.0)
+    network.set_temperature('cover', 280.0)
+    network.set_temperature('sky', 260.0)
+    network.set_temperature('pipe', [330.0, 325.0, 320.0])
+    return network, elements
+
+
+class TestRadiationNetwork(unittest.TestCase):
+    """장파 복사 네트워크 테스트"""
+
+    def test_matches_elements(self):
+        """링크 열유량 = 각 복사 요소의 step() 결과"""
+        network, elements = make_network()
+        network.step()
+        T = {name: network.T[nodes] for name, nodes in network.surfaces.items()}
+        for name, (a, b) in (('CanCov', ('canopy', 'cover')), ('CovSky', ('cover', 'sky'))):
+            element = elements[name]
+            element.port_a.T, element.port_b.T = T[a][0], T[b][0]
+            self.assertAlmostEqual(network.link_flow(name), element.step(), places=9)
+        for name, b in (('PipeCan', 'canopy'), ('PipeCov', 'cover')):
+            element = elements[name]
+            element.set_heatPorts_a_temperature(T['pipe'])
+            element.set_port_b_temperature(T[b][0])
+            self.assertAlmostEqual(network.link_flow(name), element.step(), places=9)
+
+    def test_net_flows(self):
+        """표면 순유입의 합 = 0, 표면 순유입 = 링크 유량의 합"""
+        network, _ = make_network()
+        Q_surface = network.step()
+        self.assertAlmostEqual(np.sum(Q_surface), 0.0, places=9)
+        self.assertAlmostEqual(network.net_flow('canopy'),
+                               network.link_flow('PipeCan') - network.link_flow('CanCov'), places=9)
+        self.assertAlmostEqual(network.net_flow('sky'), network.link_flow('CovSky'), places=9)
+        self.assertAlmostEqual(network.net_flow('pipe'),
+                               -network.link_flow('PipeCan') - network.link_flow('PipeCov'), places=9)
+
+    def test_coefficients_follow_elements(self):
+        """view factor 변경은 update_coefficients 이후 반영"""
+        network, elements = make_network()
+        network.step()
+        before = network.link_flow('CanCov')
+        elements['CanCov'].FFab1 = 0.5
+        elements['CanCov']._update_REC_ab()
+        network.step()
+        self.assertEqual(network.link_flow('CanCov'), before)
+        network.update_coefficients()
+        network.step()
+        self.assertAlmostEqual(network.link_flow('CanCov') / before, 0.5 / 0.9, places=12)
+
+    def test_invalid_links(self):
+        network, elements = make_network()
+        with self.assertRaises(ValueError):
+            network.connect('CanCov2', elements['CanCov'], 'canopy', 'cover')
+        with self.assertRaises(ValueError):
+            network.connect('PipeSky', elements['CovSky'], 'pipe', 'sky')
+        with self.assertRaises(ValueError):
+            network.add_surface('cover')
+
+
+class TestGreenhouseRadiation(unittest.TestCase):
+    """모델 수준 검증: 온실 전체 복사 네트워크와 난방 파이프 에너지 보존"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.gh = Greenhouse_1()
+
+    def pipe_enthalpy(self) -> float:
+        """두 파이프 물의 엔탈피 합 [J]"""
+        return sum(f.rho * f.Vi * f.Nt * f.h.sum()
+                   for f in (self.gh.pipe_low.flow1DimInc, self.gh.pipe_up.flow1DimInc))
+
+    def test_network_conserves_energy(self):
+        """모든 노드(파이프 셀 포함)의 장파 순유입 합 = 0"""
+        gh = self.gh
+        for i in range(5):
+            gh.step(1.0, i)
+            radiation = gh.radiation
+            self.assertGreater(np.abs(radiation.Q).sum(), 0.0)
+            self.assertAlmostEqual(radiation.Q_node.sum() / np.abs(radiation.Q).sum(), 0.0,
+                                   places=12)
+
+    def test_pipe_emission_matches_enthalpy_loss(self):
+        """파이프 순방출열(복사 + 대류) = 물 엔탈피 감소량 - 유입/유출 엔탈피 차"""
+        gh = self.gh
+        low, up = gh.pipe_low.flow1DimInc, gh.pipe_up.flow1DimInc
+        for i in range(5):
+            H0, h_out = self.pipe_enthalpy(), up.h[-1]
+            gh.step(1.0, i)
+            Mdot, h_in = low.InFlow.m_flow, low.InFlow.h_outflow
+            emitted = -(gh.pipe_low.Q_flow + gh.pipe_up.Q_flow)
+            # 열 포트 유량 = 장파 복사 + 공기 대류
+            for pipe, name, convection in ((gh.pipe_low, 'pipe_low', gh.Q_cnv_LowAir),
+                                           (gh.pipe_up, 'pipe_up', gh.Q_cnv_UpAir)):
+                Q_cnv = sum(port.Q_flow for port in convection.heatPorts_a.ports)
+                self.assertAlmostEqual(pipe.Q_flow / (gh.radiation.net_flow(name) - Q_cnv), 1.0,
+                                       places=12)
+            self.assertGreater(emitted, 0.0)
+            loss = H0 - self.pipe_enthalpy() + Mdot * (h_in - h_out)
+            self.assertAlmostEqual(loss / emitted, 1.0, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from result_recorder import ResultRecorder, RecordPolicy, Decimate, Aggregate, Stream
+
+
+def make_state(i):
+    """중첩 상태 (Greenhouse_2._get_state() 형태 축소판)"""
+    return {
+        'time': i / 60.0,   # [h]
+        'temperatures': {'air': 20.0 + 0.01 * i, 'floor': 15.0},
+        'control': {'screen': {'SC': float(i % 2)}},
+        'I_glob': 2.0 * i,
+        'label': 'ignored',
+    }
+
+
+class TestResultRecorder(unittest.TestCase):
+    """결과 기록기 테스트"""
+
+    def test_decimate_keeps_every_nth_step(self):
+        recorder = ResultRecorder(Decimate(every=10, chunk_size=4))
+        for i in range(95):
+            recorder.update(i, make_state(i))
+        recorder.finish()
+        self.assertEqual(len(recorder.times), 10)
+        np.testing.assert_allclose(recorder.times, np.arange(0, 95, 10) / 60.0)
+        np.testing.assert_allclose(recorder.data['temperatures']['air'],
+                                   20.0 + 0.01 * np.arange(0, 95, 10))
+
+    def test_nested_data_and_rename(self):
+        """data는 state 구조를 따르고 rename 경로로 재배치, 숫자가 아닌 값은 제외"""
+        recorder = ResultRecorder(rename={('I_glob',): ('weather', 'I_glob')})
+        for i in range(3):
+            recorder.update(i, make_state(i))
+        data = recorder.data
+        np.testing.assert_allclose(data['weather']['I_glob'], [0.0, 2.0, 4.0])
+        np.testing.assert_allclose(data['control']['screen']['SC'], [0.0, 1.0, 0.0])
+        self.assertNotIn('I_glob', data)
+        self.assertNotIn('label', data)
+        self.assertIn('temperatures.floor', recorder.keys())
+        np.testing.assert_allclose(recorder['temperatures.floor'], [15.0] * 3)
+
+    def test_aggregate_min_mean_max(self):
+        """1시간 창별 min/mean/max (창 크기만큼만 메모리 사용)"""
+        recorder = ResultRecorder(Aggregate(period=1.0, chunk_size=2))
+        n = 5 * 60   # 1분 간격 5시간
+        for i in range(n):
+            recorder.update(i, make_state(i))
+        recorder.finish()
+        air = 20.0 + 0.01 * np.arange(n).reshape(5, 60)
+        np.testing.assert_allclose(recorder.times, np.arange(5.0))
+        stats = recorder.aggregates
+        np.testing.assert_allclose(stats['min']['temperatures']['air'], air.min(axis=1))
+        np.testing.assert_allclose(stats['mean']['temperatures']['air'], air.mean(axis=1))
+        np.testing.assert_allclose(stats['max']['temperatures']['air'], air.max(axis=1))
+        np.testing.assert_allclose(recorder.data['temperatures']['air'], air.mean(axis=1))
+
+    def test_aggregate_partial_window_on_finish(self):
+        recorder = ResultRecorder(Aggregate(period=1.0))
+        for i in range(90):
+            recorder.update(i, make_state(i))
+        recorder.finish()
+        self.assertEqual(len(recorder.times), 2)
+        self.assertAlmostEqual(recorder.aggregates['max']['temperatures']['air'][1], 20.89)
+
+    def test_aggregates_requires_aggregate_policy(self):
+        with self.assertRaises(TypeError):
+            ResultRecorder().aggregates
+
+    def test_record_policy_is_abstract(self):
+        with self.assertRaises(TypeError):
+            RecordPolicy()
+
+
+class TestStreamPolicy(unittest.TestCase):
+    """디스크 스트리밍 정책 테스트"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_chunks_flushed_to_npy(self):
+        policy = Stream(self.directory, chunk_size=16)
+        recorder = ResultRecorder(policy)
+        for i in range(40):
+            recorder.update(i, make_state(i))
+            # 메모리 버퍼는 청크 크기를 넘지 않음
+            self.assertLess(policy._n, 16)
+            self.assertEqual(policy._rows.shape[0], 16)
+        recorder.finish()
+
+        air = np.load(os.path.join(self.directory, 'temperatures.air.npy'))
+        np.testing.assert_allclose(air, 20.0 + 0.01 * np.arange(40))
+        np.testing.assert_allclose(np.load(os.path.join(self.directory, 'time.npy')),
+                                   np.arange(40) / 60.0)
+
+        # 읽기 전용 메모리 매핑으로 재구성
+        sc = recorder.data['control']['screen']['SC']
+        self.assertIsInstance(sc, np.memmap)
+        np.testing.assert_allclose(sc, np.arange(40) % 2)
+
+    def test_resume_appends_to_existing_files(self):
+        first = ResultRecorder(Stream(self.directory, chunk_size=16))
+        for i in range(30):
+            first.update(i, make_state(i))
+        first.finish()
+
+        # 스텝 25의 체크포인트에서 재개: 25 이후 기록분은 버리고 이어 씀
+        resumed = ResultRecorder(Stream(self.directory, chunk_size=16, resume=True))
+        for i in range(25, 40):
+            resumed.update(i, make_state(i))
+        resumed.finish()
+
+        np.testing.assert_allclose(np.load(os.path.join(self.directory, 'time.npy')),
+                                   np.arange(40) / 60.0)
+        np.testing.assert_allclose(np.load(os.path.join(self.directory, 'temperatures.air.npy')),
+                                   20.0 + 0.01 * np.arange(40))
+
+    def test_resume_requires_existing_files(self):
+        recorder = ResultRecorder(Stream(self.directory, resume=True))
+        with self.assertRaises(ValueError):
+            recorder.update(0, make_state(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
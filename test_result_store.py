@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from result_store import ResultStore, save_results, config_hash, MANIFEST_NAME
+from result_recorder import ResultRecorder, Stream
+from simulate_greenhouse2 import SimulationConfig, SimulationResults, RESULT_UNITS
+
+
+class TestResultStore(unittest.TestCase):
+    """열 단위 결과 저장소 테스트"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.times = np.arange(48) * 0.5   # [h]
+        self.data = {
+            'temperatures': {'air': 20.0 + self.times, 'floor': np.full(48, 15.0)},
+            'energy': {'heating': {'q_tot': 3.0 * self.times}},
+            'I_crop': np.sin(self.times),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_roundtrip_memmap(self):
+        config = {'dt': 1.0, 'sim_time': 86400.0}
+        save_results(self.directory, self.times, self.data,
+                     units={'temperatures.air': '°C'}, config=config)
+        store = ResultStore(self.directory)
+        self.assertEqual(len(store), 48)
+        self.assertAlmostEqual(store.dt, 0.5)
+        self.assertEqual(store.units['temperatures.air'], '°C')
+        self.assertEqual(store.config_hash, config_hash(config))
+        self.assertEqual(store.config, config)
+
+        data = store.data
+        self.assertIsInstance(data['energy']['heating']['q_tot'], np.memmap)
+        np.testing.assert_array_equal(store.times, self.times)
+        np.testing.assert_array_equal(data['temperatures']['air'], self.data['temperatures']['air'])
+        np.testing.assert_array_equal(data['I_crop'], self.data['I_crop'])
+        self.assertEqual(store.names, ['temperatures.air', 'temperatures.floor',
+                                       'energy.heating.q_tot', 'I_crop'])
+
+    def test_time_range_slice(self):
+        save_results(self.directory, self.times, self.data)
+        times, data = ResultStore(self.directory).between(2.0, 5.0)
+        np.testing.assert_array_equal(times, [2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0])
+        np.testing.assert_array_equal(data['temperatures']['air'], 20.0 + times)
+
+    def test_config_hash_order_independent(self):
+        self.assertEqual(config_hash({'a': 1, 'b': 2}), config_hash({'b': 2, 'a': 1}))
+        self.assertNotEqual(config_hash({'a': 1}), config_hash({'a': 2}))
+        self.assertEqual(config_hash(SimulationConfig()), config_hash(SimulationConfig()))
+
+    def test_length_mismatch(self):
+        self.data['I_crop'] = self.data['I_crop'][:10]
+        with self.assertRaises(ValueError):
+            save_results(self.directory, self.times, self.data)
+
+    def test_stream_policy_writes_manifest(self):
+        """Stream 정책의 출력 디렉터리는 그대로 결과 저장소"""
+        recorder = ResultRecorder(Stream(self.directory, chunk_size=8,
+                                         units={'temperatures.air': '°C'}))
+        for i, t in enumerate(self.times):
+            recorder.update(i, {'time': t, 'temperatures': {'air': 20.0 + t}})
+        recorder.finish()
+        with open(os.path.join(self.directory, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest['n_samples'], 48)
+        store = ResultStore(self.directory)
+        self.assertAlmostEqual(store.dt, 0.5)
+        np.testing.assert_array_equal(store['temperatures.air'], 20.0 + self.times)
+
+
+class TestSimulationResultsLoad(unittest.TestCase):
+    """SimulationResults 저장/로드 테스트"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.results = SimulationResults(24)
+        self.results.times = np.arange(24.0)
+        self.results.data['temperatures']['air'][:] = np.linspace(15, 25, 24)
+        self.results.data['energy']['electrical']['E_el_tot'][:] = np.arange(24.0)
+        self.results.data['weather']['I_glob'][:] = 100.0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_same_data(self, loaded, expected, index=slice(None)):
+        self.assertEqual(loaded.keys(), expected.keys())
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                self.assert_same_data(loaded[key], value, index)
+            else:
+                np.testing.assert_array_equal(loaded[key], value[index])
+
+    def test_save_load_directory(self):
+        path = os.path.join(self.directory, 'run')
+        self.results.save(path, config=SimulationConfig())
+        loaded = SimulationResults.load(path)
+        np.testing.assert_array_equal(loaded.times, self.results.times)
+        self.assert_same_data(loaded.data, self.results.data)
+        self.assertEqual(loaded.store.units['humidity.air_vp'], RESULT_UNITS['humidity.air_vp'])
+        self.assertEqual(loaded.store.config['dt'], SimulationConfig().dt)
+
+        part = SimulationResults.load(path, t_start=6.0, t_end=11.0)
+        np.testing.assert_array_equal(part.times, np.arange(6.0, 12.0))
+        self.assert_same_data(part.data, self.results.data, slice(6, 12))
+
+    def test_load_legacy_npz(self):
+        """이전 NPZ 형식 ('_'로 연결한 키)"""
+        path = os.path.join(self.directory, 'results.npz')
+        save_dict = {'times': self.results.times}
+        for category, value in self.results.data.items():
+            if isinstance(value, dict):
+                for sub, array in value.items():
+                    if isinstance(array, dict):
+                        for key, leaf in array.items():
+                            save_dict[f'{category}_{sub}_{key}'] = leaf
+                    else:
+                        save_dict[f'{category}_{sub}'] = array
+            else:
+                save_dict[category] = value
+        np.savez(path, **save_dict)
+        loaded = SimulationResults.load(path)
+        np.testing.assert_array_equal(loaded.times, self.results.times)
+        self.assert_same_data(loaded.data, self.results.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
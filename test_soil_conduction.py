@@ -0,0 +1,132 @@
+import unittest
+import numpy as np
+from Flows.HeatTransfer.SoilConduction import SoilConduction, tridiagonal_factor, tridiagonal_solve
+
+
+def make_soil(N_c=2, N_s=5):
+    soil = SoilConduction(A=100.0, N_c=N_c, N_s=N_s, steadystate=False)
+    soil.port_a.T = 300.0
+    soil.T_soil_sp = 280.0
+    soil.set_layer_temperatures(np.linspace(295.0, 285.0, len(soil.layers)))
+    return soil
+
+
+class TestSoilConduction(unittest.TestCase):
+    """토양 레이어 RC 회로 정확 적분 테스트"""
+
+    def test_derivatives_match_layer_flows(self):
+        """행렬 변화율 = 전도체별 유속으로 계산한 레이어 순열유속 / 열용량"""
+        for N_c, N_s in ((0, 5), (1, 5), (2, 5), (3, 8), (2, 1)):
+            soil = make_soil(N_c, N_s)
+            soil.calculate()
+            expected = [layer.Q_flow / (layer.rho * layer.c_p * layer.V) for layer in soil.layers]
+            np.testing.assert_allclose(soil.compute_derivatives(), expected, rtol=1e-12, atol=1e-15)
+
+    def test_layers_are_array_views(self):
+        """레이어/포트 온도와 순열유속은 T_layers, Q_layers 원소를 가리킴"""
+        soil = make_soil(3, 4)
+        layer = soil.Layer_s[1]
+        soil.T_layers[soil.N_c - 1 + 1] = 290.5
+        self.assertEqual(layer.T, 290.5)
+        self.assertEqual(layer.heatPort.T, 290.5)
+        soil.Layer_c[0].set_temperature(299.0)
+        self.assertEqual(soil.get_layer_temperatures()[0], 299.0)
+        self.assertIs(soil.TC_c[1].port_a, soil.Layer_c[0].heatPort)
+        soil.calculate()
+        self.assertEqual(layer.Q_flow, soil.Q_layers[soil.N_c])
+
+    def test_step_matches_fine_euler(self):
+        """정확 적분 = 작은 간격의 명시적 Euler 극한"""
+        soil = make_soil()
+        T0 = soil.get_layer_temperatures()
+        T = T0
+        h = 0.05
+        for _ in range(int(600 / h)):
+            soil.set_layer_temperatures(T)
+            T = T + h * soil.compute_derivatives()
+        soil.set_layer_temperatures(T0)
+        soil.step(600.0)
+        np.testing.assert_allclose(soil.get_layer_temperatures(), T, atol=2e-4)
+
+    def test_step_splitting(self):
+        """경계 온도가 일정하면 한 번의 600 s 스텝 = 60 s 스텝 10번"""
+        once, split = make_soil(), make_soil()
+        once.step(600.0)
+        for _ in range(10):
+            split.step(60.0)
+        np.testing.assert_allclose(once.get_layer_temperatures(), split.get_layer_temperatures(),
+                                   rtol=0, atol=1e-9)
+
+    def test_many_layers_uniform(self):
+        """N_s = 50에서도 균일 온도는 유지되고 큰 스텝도 안정"""
+        soil = SoilConduction(A=100.0, N_s=50, steadystate=False)
+        soil.port_a.T = soil.T_soil_sp = 290.0
+        soil.set_layer_temperatures(np.full(len(soil.layers), 290.0))
+        for _ in range(10):
+            soil.step(86400.0)
+        np.testing.assert_allclose(soil.get_layer_temperatures(), 290.0, atol=1e-6)
+
+
+class TestSoilImplicit(unittest.TestCase):
+    """임의 두께 분포 + 암시적(삼중대각) 토양 적분 테스트"""
+
+    def deep_column(self, method, n=100):
+        # 1 cm ~ 1 m로 늘어나는 깊은 토양 (얇은 윗층은 명시적 Euler 안정 한계가 수 초)
+        soil = SoilConduction(A=100.0, N_c=1, th_s=np.geomspace(0.01, 1.0, n),
+                              lambda_s=np.linspace(0.6, 1.2, n), rho_cp_s=np.full(n, 2.2e6),
+                              method=method)
+        soil.port_a.T = 300.0
+        soil.T_soil_sp = 283.15
+        soil.set_layer_temperatures(np.full(n, 283.15))
+        return soil
+
+    def test_tridiagonal(self):
+        rng = np.random.default_rng(0)
+        for n in (1, 2, 30):
+            lower, upper = rng.uniform(-1, 0, n - 1), rng.uniform(-1, 0, n - 1)
+            diag = 3.0 + rng.uniform(0, 1, n)
+            d = rng.normal(size=n)
+            M = np.diag(diag) + np.diag(lower, -1) + np.diag(upper, 1)
+            factor = tridiagonal_factor(lower, diag, upper)
+            x = tridiagonal_solve(factor, d)
+            np.testing.assert_allclose(M @ x, d, atol=1e-12)
+            np.testing.assert_array_equal(tridiagonal_solve(factor, d), x)   # 분해 재사용
+
+    def test_profile_conductances(self):
+        """균일 두께/전도율이면 레이어 사이 전도도 = λA/th, 양 끝은 반 두께"""
+        soil = SoilConduction(A=2.0, N_c=0, th_s=[0.1] * 4, lambda_s=0.8)
+        self.assertEqual(soil.N_s, 4)
+        np.testing.assert_allclose(soil.G_s, [32.0, 16.0, 16.0, 16.0])
+        self.assertAlmostEqual(soil.G_ss, 32.0)
+        with self.assertRaises(ValueError):
+            SoilConduction(A=2.0, th_s=[0.1] * 4, lambda_s=[0.8, 0.9])
+        with self.assertRaises(ValueError):
+            SoilConduction(A=2.0, method='rk4')
+
+    def test_stable_at_one_hour(self):
+        """dt = 3600 s에서 100층이 발산하지 않음 (BE는 경계/초기 온도 범위 안에 머묾)"""
+        for method, margin in (('backward_euler', 1e-9), ('crank_nicolson', 17.0)):
+            soil = self.deep_column(method)
+            for _ in range(24 * 30):
+                soil.step(3600.0)
+                T = soil.get_layer_temperatures()
+                self.assertTrue(np.all((T > 283.15 - margin) & (T < 300.0 + margin)), method)
+
+    def test_implicit_converges_to_exact(self):
+        """dt를 줄이면 암시적 방법이 정확 적분에 수렴 (CN이 BE보다 정확)"""
+        exact = self.deep_column('exact', n=30)
+        for _ in range(6):
+            exact.step(600.0)
+        errors = {}
+        for method in ('backward_euler', 'crank_nicolson'):
+            soil = self.deep_column(method, n=30)
+            for _ in range(60):
+                soil.step(60.0)
+            errors[method] = np.max(np.abs(soil.get_layer_temperatures()
+                                           - exact.get_layer_temperatures()))
+        self.assertLess(errors['crank_nicolson'], errors['backward_euler'])
+        self.assertLess(errors['backward_euler'], 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from simulate_greenhouse2 import SimulationConfig
+from sweep import KPIAccumulator, run_sweep
+
+
+class CrashingConfig(SimulationConfig):
+    """작업자 프로세스에서 역직렬화되는 순간 프로세스를 종료시키는 설정"""
+
+    def __setstate__(self, state):
+        os._exit(1)
+
+
+class TestKPIAccumulator(unittest.TestCase):
+
+    def test_kpis(self):
+        kpi = KPIAccumulator(dt=60.0)
+        self.assertTrue(np.isnan(kpi.kpis()['DM_Har']))
+        for step, rh in enumerate([80.0, 90.0, 86.0, 70.0]):
+            kpi.update(step, {'humidity': {'air_rh': rh}, 'crop': {'DM_Har': step * 10.0},
+                              'energy': {'heating': {'E_th_tot_kWhm2': step * 0.5},
+                                         'electrical': {'E_el_tot_kWhm2': 0.1}}})
+        result = kpi.kpis()
+        self.assertEqual(result['DM_Har'], 30.0)
+        self.assertEqual(result['E_th_tot_kWhm2'], 1.5)
+        self.assertAlmostEqual(result['hours_RH_above'], 2 * 60.0 / 3600.0)
+        self.assertEqual(result['n_steps'], 4)
+
+
+class TestRunSweep(unittest.TestCase):
+    """프로세스 풀 스윕 테스트"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sweep_isolates_failures(self):
+        """실패한 시나리오는 재시도 후 오류로 보고되고 나머지 시나리오는 정상 완료"""
+        broken = os.path.join(self.directory, 'broken.ckpt')
+        with open(broken, 'wb') as f:
+            f.write(b'not a checkpoint')
+        configs = [
+            SimulationConfig(dt=1.0, sim_time=120.0, debug_interval=10**6, checkpoint_every=0),
+            SimulationConfig(dt=1.0, sim_time=60.0, debug_interval=10**6,
+                             checkpoint_path=broken, resume=True),
+            SimulationConfig(dt=2.0, sim_time=120.0, debug_interval=10**6, checkpoint_every=0),
+        ]
+        results = {r.index: r for r in run_sweep(configs, workers=2, retries=1)}
+
+        self.assertEqual(sorted(results), [0, 1, 2])
+        self.assertFalse(results[1].ok)
+        self.assertEqual(results[1].attempts, 2)
+        for i in (0, 2):
+            self.assertTrue(results[i].ok, results[i].error)
+            self.assertEqual(results[i].attempts, 1)
+            self.assertTrue(np.isfinite(results[i].kpis['E_th_tot_kWhm2']))
+        self.assertEqual(results[0].kpis['n_steps'], 120)
+        self.assertEqual(results[2].kpis['n_steps'], 60)
+
+    def test_worker_crash_charged_to_culprit(self):
+        """작업자를 죽이는 시나리오만 실패로 집계되고 함께 실행 중이던 시나리오는 정상 완료"""
+        healthy = [SimulationConfig(dt=1.0, sim_time=60.0, debug_interval=10**6, checkpoint_every=0)
+                   for _ in range(4)]
+        configs = healthy[:2] + [CrashingConfig(dt=1.0, sim_time=60.0)] + healthy[2:]
+        results = {r.index: r for r in run_sweep(configs, workers=3, retries=1)}
+
+        self.assertEqual(sorted(results), [0, 1, 2, 3, 4])
+        self.assertFalse(results[2].ok)
+        self.assertEqual(results[2].attempts, 2)
+        for i in (0, 1, 3, 4):
+            self.assertTrue(results[i].ok, results[i].error)
+            self.assertEqual(results[i].attempts, 1)
+            self.assertEqual(results[i].kpis['n_steps'], 60)
+
+    def test_parallel_after_crash(self):
+        """풀이 깨질 때 시작하지 않은 시나리오는 단독 실행이 아니라 새 풀에서 병렬로 실행"""
+        healthy = [SimulationConfig(dt=1.0, sim_time=60.0, debug_interval=10**6, checkpoint_every=0)
+                   for _ in range(6)]
+        configs = [CrashingConfig(dt=1.0, sim_time=60.0)] + healthy
+        results = {r.index: r for r in run_sweep(configs, workers=2, retries=0)}
+
+        self.assertEqual(sorted(results), list(range(7)))
+        self.assertFalse(results[0].ok)
+        for i in range(1, 7):
+            self.assertTrue(results[i].ok, results[i].error)
+            self.assertEqual(results[i].attempts, 1)
+        # 단독 풀(작업자 1개)만 쓰면 PID는 하나, 새 풀의 작업자 2개가 함께 쓰이면 셋 이상
+        self.assertGreaterEqual(len({results[i].pid for i in range(1, 7)}), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
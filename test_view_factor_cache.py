@@ -0,0 +1,104 @@
+import unittest
+from types import SimpleNamespace
+from Flows.HeatTransfer.Radiation_T4 import Radiation_T4
+from Flows.HeatTransfer.Radiation_N import Radiation_N
+from Flows.HeatTransfer.ViewFactorCache import ViewFactorCache
+
+
+def make_cache(tol=1e-12):
+    model = SimpleNamespace(
+        canopy=SimpleNamespace(FF=0.6),
+        thScreen=SimpleNamespace(FF_i=0.0, FF_ij=0.0),
+        pipe_up=SimpleNamespace(FF=0.1),
+        CanScr=Radiation_T4(A=100.0, epsilon_a=1.0, epsilon_b=1.0),
+        UpCan=Radiation_N(A=100.0, epsilon_a=0.88, epsilon_b=1.0, N=3),
+    )
+    cache = ViewFactorCache(tol=tol)
+    cache.add_entry('CanScr', model.CanScr,
+                    {'FFa': 'canopy.FF', 'FFb': 'thScreen.FF_i', 'FFab1': 'pipe_up.FF'})
+    cache.add_entry('UpCan', model.UpCan, {'FFa': 'pipe_up.FF', 'FFb': 'canopy.FF', 'FFab1': 0.0})
+    return model, cache
+
+
+class TestViewFactorCache(unittest.TestCase):
+    """view factor 의존성 캐시 테스트"""
+
+    def test_recompute_only_dependents(self):
+        model, cache = make_cache()
+        self.assertTrue(cache.update(model))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertEqual(model.CanScr.REC_ab, 0.0)  # 스크린 열림
+
+        # 입력 변화 없음: 모두 캐시 적중
+        for _ in range(10):
+            self.assertFalse(cache.update(model))
+        self.assertEqual((cache.hits, cache.misses), (20, 2))
+
+        # 스크린만 닫힘: 스크린에 의존하는 요소만 재계산
+        rec_up = model.UpCan.REC_ab
+        model.thScreen.FF_i = 1.0
+        self.assertTrue(cache.update(model))
+        self.assertEqual((cache.hits, cache.misses), (21, 3))
+        self.assertEqual(model.UpCan.REC_ab, rec_up)
+        self.assertAlmostEqual(model.CanScr.REC_ab, 0.6 * 0.9 * model.CanScr.sigma)
+
+        # LAI 변화: 두 요소 모두 재계산
+        model.canopy.FF = 0.7
+        cache.update(model)
+        self.assertEqual(cache.misses, 5)
+        self.assertEqual(model.UpCan.FFb, 0.7)
+
+    def test_tolerance(self):
+        """tol 이하의 변화는 누적되어 tol을 넘을 때 재계산"""
+        model, cache = make_cache(tol=1e-3)
+        cache.update(model)
+        for _ in range(3):
+            model.canopy.FF += 4e-4
+            cache.update(model)
+        self.assertEqual(cache.misses, 4)
+        self.assertAlmostEqual(model.CanScr.FFa, 0.6 + 2 * 4e-4 + 4e-4)
+
+    def test_invalidate_and_errors(self):
+        model, cache = make_cache()
+        cache.update(model)
+        cache.invalidate('UpCan')
+        cache.update(model)
+        self.assertEqual(cache.misses, 3)
+        cache.invalidate()
+        cache.update(model)
+        self.assertEqual(cache.misses, 5)
+        # 요소 파라미터(방사율) 변경도 재계산
+        model.UpCan.epsilon_a = 0.5
+        cache.update(model)
+        self.assertEqual(cache.misses, 6)
+        self.assertAlmostEqual(model.UpCan.REC_ab, 0.5 * 0.1 * 0.6 * model.UpCan.sigma)
+        with self.assertRaises(ValueError):
+            cache.add_entry('UpCan', model.UpCan, {})
+        with self.assertRaises(ValueError):
+            cache.add_entry('Other', model.UpCan, {'FFx': 'canopy.FF'})
+
+
+class TestGreenhouseViewFactors(unittest.TestCase):
+
+    def test_constant_screen_hits(self):
+        """스크린과 LAI가 일정하면 REC_ab 재계산 없이 캐시 적중"""
+        from Greenhouse_1 import Greenhouse_1
+        model = Greenhouse_1()
+        cache = model.view_factors
+        misses = cache.misses
+        for _ in range(5):
+            cache.update(model)
+        self.assertEqual(cache.misses, misses)
+        self.assertEqual(cache.hits % len(cache.entries), 0)
+
+        # 스크린이 닫히면 스크린 관련 요소만 다시 계산하고 네트워크 REC 행렬 갱신
+        model.thScreen.set_screen_closure(1.0)
+        model._update_radiation_coefficients()
+        self.assertEqual(cache.misses - misses, 9)
+        i, j = model.radiation.surfaces['thScreen'].start, model.radiation.surfaces['cover'].start
+        self.assertEqual(model.radiation.REC[i, j], model.Q_rad_ScrCov.REC_ab)
+        self.assertGreater(model.Q_rad_ScrCov.REC_ab, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()